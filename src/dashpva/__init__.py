@@ -1,10 +1,25 @@
 """DashPVA: Distributed Analysis and Streaming Hub with Process Variable Access."""
 
-from importlib.metadata import version
+from dashpva.utils.startup import when_imported
 
-__version__ = version("DashPVA")
 
-try:
-    import hdf5plugin  # noqa: F401
-except Exception:
-    pass
+def _register_hdf5plugin(_h5py):
+    try:
+        import hdf5plugin  # noqa: F401
+    except Exception:
+        pass
+
+
+# hdf5plugin registers its compression filters with h5py; importing it pulls in
+# h5py and numpy (~150 ms), so only do it in processes that import h5py.
+when_imported('h5py', _register_hdf5plugin)
+
+
+def __getattr__(name):
+    # importlib.metadata costs ~20 ms; only resolve the version when asked
+    if name == '__version__':
+        from importlib.metadata import version
+        value = version("DashPVA")
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -7,6 +7,38 @@ import click
 
 CONTEXT_SETTINGS = dict(help_option_names=['-h', '--help'])
 
+_SIM_MODULE = 'dashpva.consumers.caIOC_servers.ad_sim_server_modified'
+
+# Module each command runs in a fresh interpreter (what `DashPVA startup` profiles)
+ENTRY_MODULES = {
+    'run': 'dashpva.viewer.launcher.launcher',
+    'hkl3d': 'dashpva.viewer.hkl3d.hkl_3d_viewer',
+    'detector': 'dashpva.viewer.area_det.area_det_viewer',
+    'setup': 'dashpva.workflow.workflow',
+    'bayesian': 'dashpva.viewer.bayesian.bayesian_viewer',
+    'workbench': 'dashpva.viewer.workbench.workbench',
+    'h5viewer': 'dashpva.hdf_viewer.interactive',
+    'pyfai': 'dashpva.viewer.pyFAI_analysis',
+    'phasefitter': 'dashpva.viewer.phase_fitter',
+    'monitor': 'dashpva.viewer.scan_view',
+    'sim': _SIM_MODULE,
+}
+
+
+def _run(cmd):
+    """Run ``cmd`` to completion and return its exit code.
+
+    In a process forked by the launcher's viewer host the Python command runs
+    in this already warmed-up interpreter instead of a new one.
+    """
+    if os.environ.pop('DASHPVA_VIEWER_HOST_CHILD', None):
+        from dashpva.viewer.launcher.viewer_host import run_in_process
+        code = run_in_process(cmd)
+        if code is not None:
+            return code
+    return subprocess.run(cmd).returncode
+
+
 @click.group(context_settings=CONTEXT_SETTINGS)
 def cli():
     """
@@ -21,17 +53,21 @@ def cli():
 
 
 @cli.command()
-def run():
+@click.option('--prewarm', is_flag=True,
+              help='Open viewers from a pre-warmed host process (Linux; faster repeat launches).')
+def run(prewarm):
     """Open DashPVA launcher menu with process tracking and indicators."""
     click.echo('Opening DashPVA Launcher')
-    exit_code = subprocess.run([sys.executable, '-m', 'dashpva.viewer.launcher.launcher']).returncode
+    if prewarm:
+        os.environ['DASHPVA_VIEWER_HOST'] = '1'
+    exit_code = _run([sys.executable, '-m', ENTRY_MODULES['run']])
     sys.exit(exit_code)
 
 @cli.command()
 def hkl3d():
     """Launch HKL 3D Viewer"""
     click.echo('Running HKL 3D Viewer')
-    exit_code = subprocess.run([sys.executable, '-m', 'dashpva.viewer.hkl3d.hkl_3d_viewer']).returncode
+    exit_code = _run([sys.executable, '-m', ENTRY_MODULES['hkl3d']])
     sys.exit(exit_code)
 
 
@@ -49,12 +85,12 @@ def detector(pv, prefix):
     if pv and prefix:
         raise click.UsageError('Use only one of --pv or --prefix.')
     click.echo('Running Area Detector Viewer')
-    cmd = [sys.executable, '-m', 'dashpva.viewer.area_det.area_det_viewer']
+    cmd = [sys.executable, '-m', ENTRY_MODULES['detector']]
     if pv and pv.strip():
         cmd += ['--channel', pv.strip()]
     elif prefix and prefix.strip():
         cmd += ['--channel', f'{prefix.strip()}:Pva1:Image']
-    exit_code = subprocess.run(cmd).returncode
+    exit_code = _run(cmd)
     sys.exit(exit_code)
 
 
@@ -68,21 +104,21 @@ def setup(ioc):
         return
 
     click.echo('Running standard PVA setup...')
-    exit_code = subprocess.run([sys.executable, '-m', 'dashpva.workflow.workflow']).returncode
+    exit_code = _run([sys.executable, '-m', ENTRY_MODULES['setup']])
     sys.exit(exit_code)
 
 @cli.command()
 def bayesian():
     """Launch the Bayesian Optimization viewer (blop)"""
     click.echo('Running Bayesian Optimization viewer (blop)')
-    subprocess.run([sys.executable, '-m', 'dashpva.viewer.bayesian.bayesian_viewer'])
+    _run([sys.executable, '-m', ENTRY_MODULES['bayesian']])
 
 
 @cli.command()
 def workbench():
     """Launch Workbench - Data Analysis Tool"""
     click.echo('Running Workbench - Data Analysis Tool')
-    exit_code = subprocess.run([sys.executable, '-m', 'dashpva.viewer.workbench.workbench']).returncode
+    exit_code = _run([sys.executable, '-m', ENTRY_MODULES['workbench']])
     sys.exit(exit_code)
 
 
@@ -90,7 +126,7 @@ def workbench():
 def h5viewer():
     """Launch HDF5 Viewer — interactive HDF5 file browser and image viewer."""
     click.echo('Running HDF5 Viewer')
-    exit_code = subprocess.run([sys.executable, '-m', 'dashpva.hdf_viewer.interactive']).returncode
+    exit_code = _run([sys.executable, '-m', ENTRY_MODULES['h5viewer']])
     sys.exit(exit_code)
 
 
@@ -98,7 +134,7 @@ def h5viewer():
 def pyfai():
     """Launch pyFAI 1D Reduction — live azimuthal integration."""
     click.echo('Running pyFAI 1D Reduction')
-    exit_code = subprocess.run([sys.executable, '-m', 'dashpva.viewer.pyFAI_analysis']).returncode
+    exit_code = _run([sys.executable, '-m', ENTRY_MODULES['pyfai']])
     sys.exit(exit_code)
 
 
@@ -106,11 +142,10 @@ def pyfai():
 def phasefitter():
     """Launch XRD Phase Fitter — fit crystal phases to 1D diffraction patterns."""
     click.echo('Running XRD Phase Fitter')
-    exit_code = subprocess.run([sys.executable, '-m', 'dashpva.viewer.phase_fitter']).returncode
+    exit_code = _run([sys.executable, '-m', ENTRY_MODULES['phasefitter']])
     sys.exit(exit_code)
 
 
-_SIM_MODULE = 'dashpva.consumers.caIOC_servers.ad_sim_server_modified'
 _PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
 
 
@@ -168,6 +203,7 @@ def sim(ctx, **kwargs):
     Presets:
       DashPVA sim          Random frames (default)
       DashPVA sim pyfai    CeO2 diffraction image for pyFAI
+      DashPVA sim replay   Pre-compressed frame pool at a precise rate
     """
     if ctx.invoked_subcommand is not None:
         return
@@ -179,7 +215,7 @@ def sim(ctx, **kwargs):
     merged = {k: (kwargs[k] if kwargs[k] is not None else defaults[k]) for k in defaults}
     click.echo('Starting area detector simulation (random frames)...')
     cmd = _build_sim_cmd(**merged)
-    sys.exit(subprocess.run(cmd).returncode)
+    sys.exit(_run(cmd))
 
 
 @sim.command('pyfai')
@@ -194,7 +230,44 @@ def sim_pyfai(**kwargs):
     merged = {k: (kwargs[k] if kwargs[k] is not None else defaults[k]) for k in defaults}
     click.echo('Starting area detector simulation (CeO2 pyFAI)...')
     cmd = _build_sim_cmd(**merged)
-    sys.exit(subprocess.run(cmd).returncode)
+    sys.exit(_run(cmd))
+
+
+@sim.command('replay')
+@_sim_options
+@click.option('--scan', 'scan_file', type=click.Path(exists=True, dir_okay=False), default=None,
+              help='DashPVA HDF5 scan to replay with its per-frame metadata (default: generated frames).')
+@click.option('--codec', type=click.Choice(['none', 'lz4', 'bslz4', 'blosc']), default='lz4',
+              show_default=True, help='Codec frames are pre-compressed with.')
+@click.option('--profile', type=click.Choice(['constant', 'jitter', 'burst']), default='constant',
+              show_default=True, help='Timing profile (all keep the mean frame rate).')
+@click.option('--jitter', type=float, default=0.25, show_default=True,
+              help='Jitter profile: maximum displacement in frame periods (<= 0.5).')
+@click.option('--burst-size', type=int, default=10, show_default=True, help='Burst profile: frames per burst.')
+@click.option('--seed', type=int, default=0, show_default=True, help='Seed of the timing schedule.')
+@click.option('--cache-size', type=int, default=1000, show_default=True, help='Maximum frames in the replay pool.')
+def sim_replay(scan_file, codec, profile, jitter, burst_size, seed, cache_size, **kwargs):
+    """Replay a preloaded, pre-compressed frame pool at a precise rate.
+
+    Frames (from --scan, an input file, or generated) are loaded and compressed
+    once; publishing then follows a deterministic schedule, so consumers can be
+    load-tested at high rates and the same run reproduced.
+    """
+    # Generated frames are slow to make: keep the pool small unless replaying a scan
+    defaults = dict(
+        channel='pvapy:image', fps=100, dt='uint16', nf=0 if scan_file else 100,
+        rt=60, rp=1000, nx=512, ny=512, mpv='ca://x,ca://y',
+        input_file=None,
+    )
+    merged = {k: (kwargs[k] if kwargs[k] is not None else defaults[k]) for k in defaults}
+    click.echo(f'Starting area detector replay ({profile}, {codec})...')
+    cmd = _build_sim_cmd(**merged) + [
+        '-rm', '-rc', codec, '-rpf', profile, '-rj', str(jitter),
+        '-rbs', str(burst_size), '-rs', str(seed), '-cs', str(cache_size),
+    ]
+    if scan_file:
+        cmd.extend(['-rf', os.path.abspath(scan_file)])
+    sys.exit(_run(cmd))
 
 
 @sim.command('probe')
@@ -238,7 +311,7 @@ def sim_probe(channel, fps, dt, rt, rp, nx, ny, shape, fwhm_x, fwhm_y, amp, bg,
         cmd.append('-noise')
     if truth_pvs:
         cmd.append('-truth')
-    sys.exit(subprocess.run(cmd).returncode)
+    sys.exit(_run(cmd))
 
 
 @cli.command()
@@ -248,14 +321,239 @@ def monitor(name, channel):
     """Open a specific monitor by name. Supported: scan (alias: scan-monitors)."""
     click.echo(f'Opening monitor: {name}')
     if name in ('scan', 'scan-monitors'):
-        command = [sys.executable, '-m', 'dashpva.viewer.scan_view']
+        command = [sys.executable, '-m', ENTRY_MODULES['monitor']]
     else:
         raise click.BadParameter(f'Unknown view name: {name}')
     if channel:
         command.extend(['--channel', channel])
-    exit_code = subprocess.run(command).returncode
+    exit_code = _run(command)
     sys.exit(exit_code)
 
 
+@cli.command()
+@click.argument('entries', nargs=-1)
+@click.option('--windows', is_flag=True,
+              help='Also time every launcher viewer from launch to its first window.')
+@click.option('--repeat', type=int, default=1, show_default=True,
+              help='Launches per viewer for --windows (the median is reported).')
+@click.option('--top', type=int, default=10, show_default=True,
+              help='Packages / modules listed per entry point.')
+@click.option('--timeout', type=float, default=60.0, show_default=True,
+              help='Seconds to wait for a viewer window.')
+@click.option('--json', 'json_path', default=None, type=click.Path(dir_okay=False),
+              help='Also write the full report as JSON.')
+@click.option('--host', 'use_host', is_flag=True,
+              help='With --windows, launch through a pre-warmed viewer host (as run --prewarm).')
+def startup(entries, windows, repeat, top, timeout, json_path, use_host):
+    """Profile start-up cost: import time per entry point, time to first window per viewer.
+
+    ENTRIES are command names (e.g. detector h5viewer) or launcher view keys;
+    default is all of them. Imports are measured with 'python -X importtime'
+    in a fresh interpreter. Viewers run with QT_QPA_PLATFORM=offscreen unless
+    it is already set, and are closed as soon as their first window shows.
+    """
+    import json
+    from dataclasses import asdict
+
+    from dashpva.utils.startup import (
+        format_import_report,
+        measure_first_window,
+        profile_imports,
+    )
+    from dashpva.viewer.launcher.registry import get_views
+
+    views = get_views()
+    known = set(ENTRY_MODULES) | {v['key'] for v in views}
+    unknown = [e for e in entries if e not in known]
+    if unknown:
+        raise click.BadParameter(f"unknown entry point(s): {', '.join(unknown)}", param_hint='ENTRIES')
+
+    modules = {'cli': 'dashpva.cli'}
+    modules.update({k: m for k, m in ENTRY_MODULES.items() if not entries or k in entries})
+    report = {'imports': [], 'first_window': []}
+    for key, module in modules.items():
+        result = profile_imports(module)
+        report['imports'].append(dict(result.to_dict(), entry=key))
+        click.echo(format_import_report(result, top=top))
+        click.echo('')
+
+    host = None
+    if windows and use_host:
+        from dashpva.viewer.launcher import viewer_host
+        if not viewer_host.supported():
+            raise click.UsageError('--host needs Linux')
+        host = viewer_host.ViewerHostClient.start()
+        if not host.wait_ready(timeout=120):
+            host.close()
+            raise click.ClickException('viewer host did not start')
+
+    if windows:
+        click.echo('Time to first window' + (' (viewer host):' if host else ':'))
+        for view in views:
+            command = view['cmd'][3] if view['cmd'][1:3] == ['-m', 'dashpva.cli'] else None
+            if entries and view['key'] not in entries and command not in entries:
+                continue
+            result = measure_first_window(view['cmd'], name=view['key'], repeat=repeat, timeout=timeout,
+                                          spawn=host.spawn if host else None)
+            report['first_window'].append(dict(asdict(result), median=result.median))
+            if result.median is not None:
+                click.echo(f"  {result.median * 1e3:7.0f} ms  {view['key']:<20} {result.title}")
+            else:
+                click.echo(f"  {'failed':>10}  {view['key']:<20} {result.error}")
+        if host is not None:
+            host.close()
+
+    if json_path:
+        with open(json_path, 'w') as f:
+            json.dump(report, f, indent=2)
+        click.echo(f'Report written to {json_path}')
+
+
+def _int_list(ctx, param, value):
+    try:
+        return [int(v) for v in value.split(',') if v.strip()]
+    except ValueError:
+        raise click.BadParameter('expected comma-separated integers, e.g. 1,2,4') from None
+
+
+@cli.command()
+@click.option('--dofs', default='1,2,4', callback=_int_list, show_default=True,
+              help='DOF counts to benchmark (comma-separated).')
+@click.option('--objectives', default='1', callback=_int_list, show_default=True,
+              help='Objective counts to benchmark (comma-separated).')
+@click.option('--iterations', type=int, default=20, show_default=True,
+              help='Optimization rounds per campaign.')
+@click.option('--points', 'n_points', type=int, default=1, show_default=True,
+              help='Points suggested per round.')
+@click.option('--transport', type=click.Choice(['sim', 'pva']), default='sim', show_default=True,
+              help='sim: ophyd.sim devices; pva: local PVA DOFs + probe_sim_server objectives.')
+@click.option('--seed', type=int, default=0, show_default=True, help='numpy/torch seed per campaign.')
+@click.option('--json', 'json_path', default=None, type=click.Path(dir_okay=False),
+              help='Also write per-round timings as JSON.')
+def optbench(dofs, objectives, iterations, n_points, transport, seed, json_path):
+    """Benchmark the Bayesian optimizer loop: evaluations/s and time per phase.
+
+    Runs full blop campaigns headless for every DOF x objective count and
+    reports model fit, acquisition, move, read and tell time per evaluation.
+    """
+    import json
+
+    from dashpva.viewer.bayesian import benchmark
+
+    missing = benchmark.missing_dependencies(transport)
+    if missing:
+        raise click.ClickException(
+            f"optbench needs {', '.join(missing)} (install the 'bayesian' extra)")
+    cases = benchmark.campaign_grid(dofs, objectives, iterations=iterations,
+                                    n_points=n_points, transport=transport)
+    for case in cases:
+        err = case.validate()
+        if err:
+            raise click.BadParameter(err)
+    results = benchmark.run_benchmark(
+        cases, seed=seed,
+        on_result=lambda r: click.echo(f"  {r.case.label}: "
+                                       + (r.error or f"{r.evals_per_s:.2f} evals/s")))
+    click.echo('')
+    click.echo(benchmark.format_results(results))
+    if json_path:
+        with open(json_path, 'w') as f:
+            json.dump(benchmark.summarize(results), f, indent=2)
+        click.echo(f'Report written to {json_path}')
+    if any(r.error for r in results):
+        sys.exit(1)
+
+
+def _roi(ctx, param, value):
+    try:
+        rois = [tuple(int(v) for v in roi.split(',')) for roi in value]
+    except ValueError:
+        raise click.BadParameter('expected x,y,width,height, e.g. 100,120,64,64') from None
+    if any(len(roi) != 4 for roi in rois):
+        raise click.BadParameter('expected x,y,width,height, e.g. 100,120,64,64')
+    return rois
+
+
+@cli.command()
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--dataset', default='/entry/data/data', show_default=True,
+              help='Image stack inside the HDF5 file.')
+@click.option('--roi', 'rois', multiple=True, callback=_roi, metavar='X,Y,W,H',
+              help='q partition (repeatable). Default: the whole frame.')
+@click.option('--levels', type=int, default=10, show_default=True, help='Multi-tau levels.')
+@click.option('--bufs', type=int, default=8, show_default=True, help='Buffers (lags) per level; even.')
+@click.option('--frame-time', type=float, default=None, help='Seconds per frame; lags reported in s.')
+@click.option('--json', 'json_path', type=click.Path(dir_okay=False, writable=True), default=None,
+              help='Also write lags and g2 as JSON to this file.')
+def xpcs(path, dataset, rois, levels, bufs, frame_time, json_path):
+    """Multi-tau XPCS g2(q, tau) of an HDF5 image stack, streamed in chunks."""
+    import json
+
+    import h5py
+
+    from dashpva.utils import multitau
+
+    with h5py.File(path, 'r') as h5:
+        if dataset not in h5:
+            raise click.BadParameter(f'{dataset!r} not found in {path}', param_hint='--dataset')
+        shape = h5[dataset].shape[1:]
+    labels = multitau.roi_labels(shape, rois or [(0, 0, shape[1], shape[0])])
+    try:
+        result = multitau.correlate_hdf5(path, dataset, labels, num_levels=levels, num_bufs=bufs)
+    except ValueError as e:
+        raise click.ClickException(str(e)) from None
+    lags = result.lags * frame_time if frame_time else result.lags
+    unit = 's' if frame_time else 'frames'
+    click.echo(f'{result.frames} frames, {len(result.q_labels)} partition(s)')
+    click.echo(f"{'tau [' + unit + ']':>14}" + ''.join(f'{"q" + str(q):>10}' for q in result.q_labels))
+    for i, lag in enumerate(lags):
+        click.echo(f'{lag:>14.6g}' + ''.join(f'{v:>10.4f}' for v in result.g2[:, i]))
+    if json_path:
+        with open(json_path, 'w') as f:
+            json.dump({'lags': lags.tolist(), 'unit': unit, 'q_labels': result.q_labels.tolist(),
+                       'g2': result.g2.tolist(), 'pairs': result.pairs.tolist(),
+                       'frames': result.frames}, f, indent=2)
+        click.echo(f'g2 written to {json_path}')
+
+
+@cli.command('vit-stitch')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--dataset', default='/entry/data/data', show_default=True,
+              help='Recorded (512, 256) VIT streams inside the HDF5 file.')
+@click.option('--ids', 'ids_dataset', default=None,
+              help='Dataset of per-frame uniqueIds. Default: consecutive from --first-id.')
+@click.option('--first-id', type=int, default=None,
+              help='uniqueId of the first frame. Default: VIT_STITCH_ID_OFFSET (first scan position).')
+@click.option('--positions', 'positions_csv', type=click.Path(exists=True, dir_okay=False), default=None,
+              help='Scan positions CSV (col0=y_m, col1=x_m). Default: VIT_STITCH_POSITIONS_CSV.')
+@click.option('--workers', type=int, default=None, help='Shift worker processes. Default: CPU count - 1.')
+@click.option('--chunk', type=int, default=16, show_default=True, help='Frames per worker task.')
+@click.option('-o', '--output', type=click.Path(dir_okay=False, writable=True), default=None,
+              help='Output HDF5 file. Default: <PATH stem>_stitched.h5')
+def vit_stitch(path, dataset, ids_dataset, first_id, positions_csv, workers, chunk, output):
+    """Stitch a recorded VIT scan offline with the pipelined stitcher."""
+    import h5py
+
+    from dashpva.utils.vit_stitch import PANEL_NAMES, stitch_hdf5
+
+    try:
+        panels, stats = stitch_hdf5(
+            path, dataset, ids_dataset, first_id, positions_csv_path=positions_csv,
+            workers=workers, chunk=chunk)
+    except (KeyError, ValueError) as e:
+        raise click.ClickException(str(e.args[0])) from None
+    click.echo(stats.summary())
+    if panels is None:
+        raise click.ClickException(f'{dataset!r} in {path} has no frames')
+    output = output or f'{os.path.splitext(path)[0]}_stitched.h5'
+    with h5py.File(output, 'w') as h5:
+        grp = h5.create_group('/entry/stitch')
+        for name, panel in zip(PANEL_NAMES, panels):
+            grp.create_dataset(name, data=panel, compression='gzip', compression_opts=4)
+        grp.attrs.update({'source': os.path.abspath(path), 'dataset': dataset, 'frames': stats.frames,
+                          'resets': stats.resets, 'elapsed_s': stats.elapsed})
+    click.echo(f'Stitched panels written to {output}')
+
+
 if __name__ == '__main__':
     cli()
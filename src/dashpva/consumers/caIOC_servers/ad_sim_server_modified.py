@@ -37,6 +37,20 @@ try:
     import yaml
 except ImportError:
     yaml = None
+# Replay codecs optional
+try:
+    import lz4.block
+except ImportError:
+    lz4 = None
+try:
+    import bitshuffle
+except ImportError:
+    bitshuffle = None
+try:
+    import blosc2
+except ImportError:
+    blosc2 = None
+import itertools
 import logging
 
 import pvaccess as pva
@@ -489,6 +503,194 @@ class TiffZoomFileGenerator(FrameGenerator):
     def getFrameInfo(self):
         return (self.nInputFrames, self.rows, self.cols, self.colorMode, self.dtype, self.compressorName)
 
+class ReplayFramePool:
+    ''' Preloaded frame pool for replay mode.
+
+    Every frame is compressed once with the replay codec and wrapped in a
+    ready-to-publish NTNDArray that carries the frame's metadata values as
+    attributes, so publishing only has to stamp the unique id and timestamps.
+    '''
+
+    CODECS = ['lz4', 'bslz4', 'blosc']
+    # Image stacks of DashPVA scan files (NeXus scan and analysis scan layouts)
+    SCAN_IMAGE_DATASETS = ['/entry/data/data', '/data/images']
+    # Per-frame metadata series are read from groups with these names
+    SCAN_METADATA_GROUPS = ['metadata', 'scan_pos']
+    READ_BLOCK_SIZE = 16
+
+    def __init__(self, codec=None, colorMode=AdImageUtility.COLOR_MODE_MONO):
+        if codec == 'none':
+            codec = None
+        if codec and codec not in self.CODECS:
+            raise Exception(f'Invalid replay codec: {codec}. Available codecs: {self.CODECS}')
+        codecModule = {'lz4': lz4, 'bslz4': bitshuffle, 'blosc': blosc2}.get(codec, True)
+        if not codecModule:
+            raise Exception(f'Missing {codec} support.')
+        self.codec = codec
+        self.colorMode = colorMode
+        self.frames = []
+        self.metadata = []
+        self.rows = 0
+        self.cols = 0
+        self.dtype = None
+        self.frameShape = None
+        self.uncompressedBytes = 0
+        self.compressedBytes = 0
+
+    def __len__(self):
+        return len(self.frames)
+
+    def __getitem__(self, frameId):
+        return self.frames[frameId], self.metadata[frameId]
+
+    def getUncompressedFrameSize(self):
+        return self.uncompressedBytes // max(len(self.frames), 1)
+
+    def getCompressedFrameSize(self):
+        return self.compressedBytes // max(len(self.frames), 1)
+
+    def compressFrame(self, frameData):
+        frameData = np.ascontiguousarray(frameData)
+        if self.codec == 'lz4':
+            compressed = lz4.block.compress(frameData.tobytes(), store_size=False)
+        elif self.codec == 'bslz4':
+            compressed = bitshuffle.compress_lz4(frameData.ravel())
+        elif self.codec == 'blosc':
+            compressed = blosc2.compress(frameData.tobytes(), typesize=frameData.itemsize)
+        else:
+            return frameData
+        return np.frombuffer(compressed, dtype=np.uint8)
+
+    def addFrame(self, frameData, metadataValueDict=None):
+        frameData = np.asarray(frameData)
+        if self.frameShape is None:
+            self.frameShape = frameData.shape
+            self.rows, self.cols = frameData.shape[:2]
+            self.dtype = frameData.dtype
+        elif frameData.shape != self.frameShape or frameData.dtype != self.dtype:
+            raise Exception(f'Replay frame {len(self.frames)} ({frameData.shape}, {frameData.dtype}) does not match pool frames ({self.frameShape}, {self.dtype})')
+        frameId = len(self.frames)
+        data = self.compressFrame(frameData)
+        if self.colorMode == AdImageUtility.COLOR_MODE_MONO:
+            ntnda = AdImageUtility.generateNtNdArray2D(frameId, data, self.cols, self.rows, self.dtype, self.codec)
+        else:
+            ntnda = AdImageUtility.generateNtNdArray(frameId, data, self.cols, self.rows, self.colorMode, self.dtype, self.codec)
+        metadataValueDict = metadataValueDict or {}
+        attributes = [pva.NtAttribute('ColorMode', pva.PvInt(self.colorMode))]
+        for name, value in metadataValueDict.items():
+            attributes.append(pva.NtAttribute(name, pva.PvDouble(float(value))))
+        ntnda['attribute'] = attributes
+        self.frames.append(ntnda)
+        self.metadata.append(metadataValueDict)
+        self.uncompressedBytes += frameData.nbytes
+        self.compressedBytes += data.nbytes
+
+    @classmethod
+    def fromGenerators(cls, frameGeneratorList, nFrames, codec=None, colorMode=AdImageUtility.COLOR_MODE_MONO, metadataValues=None):
+        ''' Preload up to nFrames frames from frame generators; metadataValues(frameId) gives each frame's metadata. '''
+        pool = cls(codec, colorMode)
+        for fg in frameGeneratorList:
+            nInputFrames, ny, nx, fgColorMode, dtype, compressorName = fg.getFrameInfo()
+            if compressorName:
+                raise Exception('Replay mode compresses frames itself and needs uncompressed input frames.')
+            for fgFrameId in range(0, nInputFrames):
+                if len(pool) >= nFrames:
+                    return pool
+                frameData = fg.getFrameData(fgFrameId)
+                if frameData is None:
+                    break
+                pool.addFrame(frameData, metadataValues(len(pool)) if metadataValues else None)
+        return pool
+
+    @classmethod
+    def fromHdfScan(cls, filePath, datasetPath, nFrames, codec=None):
+        ''' Preload up to nFrames frames and their metadata series from a DashPVA HDF5 scan file. '''
+        if not h5:
+            raise Exception('Missing HDF support.')
+        pool = cls(codec)
+        with h5.File(filePath, 'r') as f:
+            if not datasetPath:
+                datasetPath = next((path for path in cls.SCAN_IMAGE_DATASETS if path in f), None)
+                if datasetPath is None:
+                    raise Exception(f'No image dataset ({", ".join(cls.SCAN_IMAGE_DATASETS)}) in {filePath}, please specify one.')
+            dataset = f[datasetPath]
+            if dataset.ndim not in (2, 3):
+                raise Exception(f'Cannot replay {dataset.ndim}D dataset {datasetPath}.')
+            nScanFrames = 1 if dataset.ndim == 2 else len(dataset)
+            series = cls.readScanMetadata(f, nScanFrames)
+            nFrames = min(nFrames, nScanFrames)
+            for start in range(0, nFrames, cls.READ_BLOCK_SIZE):
+                if dataset.ndim == 2:
+                    block = dataset[()][np.newaxis]
+                else:
+                    block = dataset[start:min(start+cls.READ_BLOCK_SIZE, nFrames)]
+                for frameId, frameData in enumerate(block, start):
+                    pool.addFrame(frameData, {name: values[frameId] for name, values in series.items()})
+        print(f'Loaded {len(pool)} replay frames from {filePath}:{datasetPath} (metadata: {", ".join(series) or "none"})')
+        return pool
+
+    @classmethod
+    def readScanMetadata(cls, h5File, nFrames):
+        ''' Numeric per-frame series from the metadata groups, keyed by PV name (or dataset name). '''
+        series = {}
+
+        def visit(path, obj):
+            if not isinstance(obj, h5.Dataset) or obj.ndim != 1 or len(obj) != nFrames or obj.dtype.kind not in 'iuf':
+                return
+            if not set(path.split('/')[:-1]) & set(cls.SCAN_METADATA_GROUPS):
+                return
+            name = obj.attrs.get('pv_name', path.split('/')[-1])
+            if isinstance(name, bytes):
+                name = name.decode()
+            series[str(name)] = obj[()]
+
+        h5File.visititems(visit)
+        return series
+
+class ReplayTiming:
+    ''' Deterministic publish schedule for replay mode.
+
+    Iterating yields the publish time of every frame in seconds from the first
+    one. The "constant" profile spaces frames evenly at the target rate,
+    "jitter" moves each frame by a seeded random fraction (up to +/- jitter)
+    of the frame period, and "burst" publishes groups of burstSize frames back
+    to back at the start of each burst period. All profiles keep the mean
+    frame rate, and a given seed always produces the same schedule.
+    '''
+
+    PROFILES = ['constant', 'jitter', 'burst']
+    # Frames cannot swap places with at most half a period of jitter
+    MAX_JITTER = 0.5
+    BLOCK_SIZE = 1024
+
+    def __init__(self, frameRate, profile='constant', jitter=0.25, burstSize=10, seed=0):
+        if profile not in self.PROFILES:
+            raise Exception(f'Invalid replay profile: {profile}. Available profiles: {self.PROFILES}')
+        if not 0 <= jitter <= self.MAX_JITTER:
+            raise Exception(f'Replay jitter must be between 0 and {self.MAX_JITTER} frame periods.')
+        if burstSize < 1:
+            raise Exception('Replay burst size must be at least 1 frame.')
+        self.deltaT = 0
+        if frameRate > 0:
+            self.deltaT = 1.0/frameRate
+        self.profile = profile
+        self.jitter = jitter
+        self.burstSize = burstSize
+        self.seed = seed
+
+    def __iter__(self):
+        rng = np.random.default_rng(self.seed)
+        for start in itertools.count(0, self.BLOCK_SIZE):
+            slots = np.arange(start, start+self.BLOCK_SIZE, dtype=np.float64)
+            if self.profile == 'jitter':
+                slots += rng.uniform(-self.jitter, self.jitter, self.BLOCK_SIZE)
+            elif self.profile == 'burst':
+                slots -= slots % self.burstSize
+            yield from (np.maximum(slots, 0)*self.deltaT).tolist()
+
+    def offsets(self, nFrames):
+        return np.fromiter(itertools.islice(self, nFrames), dtype=np.float64, count=nFrames)
+
 
 class AdSimServer:
     ''' AD Sim Server class. '''
@@ -500,6 +702,8 @@ class AdSimServer:
     MIN_CACHE_SIZE = 1
     CACHE_TIMEOUT = 1.0
     DELAY_CORRECTION = 0.0001
+    # Replay publisher sleeps until this close to a deadline, then spins
+    REPLAY_SPIN_TIME = 0.0005
     NOTIFICATION_DELAY = 0.1
     BYTES_IN_MEGABYTE = 1000000
     METADATA_TYPE_DICT = {
@@ -507,7 +711,7 @@ class AdSimServer:
         'timeStamp' : pva.PvTimeStamp()
     }
 
-    def __init__(self, inputDirectory, inputFile, mmapMode, hdfDataset, hdfCompressionMode, cfgFile, frameRate, nFrames, cacheSize, nx, ny, colorMode, datatype, minimum, maximum, runtime, channelName, notifyPv, notifyPvValue, metadataPv, startDelay, shutdownDelay, reportPeriod, disableCurses):
+    def __init__(self, inputDirectory, inputFile, mmapMode, hdfDataset, hdfCompressionMode, cfgFile, frameRate, nFrames, cacheSize, nx, ny, colorMode, datatype, minimum, maximum, runtime, channelName, notifyPv, notifyPvValue, metadataPv, startDelay, shutdownDelay, reportPeriod, disableCurses, replayMode=False, replayFile=None, replayCodec=None, replayProfile='constant', replayJitter=0.25, replayBurstSize=10, replaySeed=0):
         self.lock = threading.Lock()
         self.deltaT = 0
         self.cacheTimeout = self.CACHE_TIMEOUT
@@ -536,6 +740,9 @@ class AdSimServer:
         self.x_positions, self.y_positions = self.generate_raster_scan_positions(size=self.nscans)
         self.scan_gen_instance = self.scan_gen(self.x_positions, self.y_positions)  
         self.current_scan_position = None  # Cache for current scan position
+        self.replayMode = replayMode or replayFile is not None
+        self.framePool = None
+        self.replayTiming = None
         inputFiles = []
         if inputDirectory is not None:
             inputFiles = [os.path.join(inputDirectory, f) for f in os.listdir(inputDirectory) if os.path.isfile(os.path.join(inputDirectory, f))]
@@ -563,20 +770,37 @@ class AdSimServer:
             else:
                 self.frameGeneratorList.append(NumpyFileGenerator(f, mmapMode))
 
-        if not self.frameGeneratorList:
+        if not self.frameGeneratorList and replayFile is None:
             nf = nFrames
             if nf <= 0:
                 nf = self.frameCacheSize
             self.frameGeneratorList.append(NumpyRandomGenerator(nf, nx, ny, colorMode, datatype, minimum, maximum))
 
-        self.nInputFrames = 0
-        for fg in self.frameGeneratorList:
-            nInputFrames, self.rows, self.cols, colorMode, self.dtype, self.compressorName = fg.getFrameInfo()
-            self.nInputFrames += nInputFrames
-        if self.nFrames > 0:
-            self.nInputFrames = min(self.nFrames, self.nInputFrames)
+        if self.replayMode:
+            # Replay pool holds at most cache size frames
+            poolSize = self.frameCacheSize
+            if nFrames > 0:
+                poolSize = min(nFrames, poolSize)
+            if replayFile is not None:
+                self.framePool = ReplayFramePool.fromHdfScan(replayFile, hdfDataset, poolSize, replayCodec)
+            else:
+                metadataPvs = sum(self.parseMetadataPvs(metadataPv), [])
+                self.framePool = ReplayFramePool.fromGenerators(self.frameGeneratorList, poolSize, replayCodec, self.colorMode, lambda frameId: self.getReplayMetadataValueDict(metadataPvs, frameId))
+            if not len(self.framePool):
+                raise Exception('No frames to replay.')
+            self.replayTiming = ReplayTiming(frameRate, replayProfile, replayJitter, replayBurstSize, replaySeed)
+            self.nInputFrames = len(self.framePool)
+            self.rows, self.cols, self.dtype, self.compressorName = self.framePool.rows, self.framePool.cols, self.framePool.dtype, self.framePool.codec
+            fg = self.framePool
+        else:
+            self.nInputFrames = 0
+            for fg in self.frameGeneratorList:
+                nInputFrames, self.rows, self.cols, colorMode, self.dtype, self.compressorName = fg.getFrameInfo()
+                self.nInputFrames += nInputFrames
+            if self.nFrames > 0:
+                self.nInputFrames = min(self.nFrames, self.nInputFrames)
+            fg = self.frameGeneratorList[0]
 
-        fg = self.frameGeneratorList[0]
         self.frameRate = frameRate
         self.uncompressedImageSize = IntWithUnits(fg.getUncompressedFrameSize(), 'B')
         self.compressedImageSize = IntWithUnits(fg.getCompressedFrameSize(), 'B')
@@ -607,7 +831,10 @@ class AdSimServer:
             self.frameCache = {}
 
         print(f'Number of input frames: {self.nInputFrames} (size: {self.cols}x{self.rows}, {self.uncompressedImageSize}, type: {self.dtype}, compressor: {self.compressorName}, compressed size: {self.compressedImageSize})')
-        print(f'Frame cache type: {type(self.frameCache)} (cache size: {self.frameCacheSize})')
+        if self.framePool is not None:
+            print(f'Replay pool: {len(self.framePool)} frames (codec: {self.framePool.codec}, profile: {replayProfile}, seed: {replaySeed})')
+        else:
+            print(f'Frame cache type: {type(self.frameCache)} (cache size: {self.frameCacheSize})')
         print(f'Expected data rate: {self.compressedDataRate} (uncompressed: {self.uncompressedDataRate})')
 
         self.currentFrameId = 0
@@ -621,8 +848,13 @@ class AdSimServer:
         self.screen = None
         self.screenInitialized = False
         self.disableCurses = disableCurses
+        self.replayLagSum = 0
+        self.replayLagMax = 0
 
-        if self.nInputFrames > 0:
+        if self.framePool is not None:
+            self.cols = self.framePool.cols
+            self.rows = self.framePool.rows
+        elif self.nInputFrames > 0:
             self.cols = self.frameGeneratorList[0].cols
             self.rows = self.frameGeneratorList[0].rows
         else:
@@ -640,22 +872,25 @@ class AdSimServer:
                 pass
         return screen
 
-    def setupMetadataPvs(self, metadataPv):
-        self.caMetadataPvs = []
-        self.pvaMetadataPvs = []
-        self.metadataPvs = []
-        if not metadataPv:
-            return
-        mPvs = metadataPv.split(',')
-        for mPv in mPvs:
+    @staticmethod
+    def parseMetadataPvs(metadataPv):
+        # Returns (CA PVs, PVA PVs); assume CA is the default protocol
+        caMetadataPvs = []
+        pvaMetadataPvs = []
+        for mPv in (metadataPv or '').split(','):
             if not mPv:
                 continue
-
-            # Assume CA is the default protocol
             if mPv.startswith('pva://'):
-                self.pvaMetadataPvs.append(mPv.replace('pva://', ''))
+                pvaMetadataPvs.append(mPv.replace('pva://', ''))
             else:
-                self.caMetadataPvs.append(mPv.replace('ca://', ''))
+                caMetadataPvs.append(mPv.replace('ca://', ''))
+        return caMetadataPvs, pvaMetadataPvs
+
+    def setupMetadataPvs(self, metadataPv):
+        self.caMetadataPvs, self.pvaMetadataPvs = self.parseMetadataPvs(metadataPv)
+        self.metadataPvs = []
+        if not metadataPv:
+            return
         self.metadataPvs = self.caMetadataPvs+self.pvaMetadataPvs
         if self.caMetadataPvs:
             if not os.environ.get('EPICS_DB_INCLUDE_PATH'):
@@ -760,6 +995,12 @@ class AdSimServer:
         for index, mPv in enumerate(self.metadataPvs):
             metadataValueDict[mPv] = value[index]
         return metadataValueDict
+
+    def getReplayMetadataValueDict(self, metadataPvs, frameId):
+        # Same scan positions as getMetadataValueDict, fixed per pool frame
+        index = frameId % len(self.x_positions)
+        value = (self.x_positions[index], self.y_positions[index])
+        return dict(zip(metadataPvs, value))
     
     def updateMetadataPvs(self, metadataValueDict):
         # Returns time when metadata is published
@@ -767,10 +1008,14 @@ class AdSimServer:
         # For PVA metadata will have the same timestamp as data
         for mPv in self.caMetadataPvs:
             value = metadataValueDict.get(mPv)
+            if value is None:
+                continue
             self.metadataIoc.putField(mPv, str(value))
         t = time.time()
         for mPv in self.pvaMetadataPvs:
             value = metadataValueDict.get(mPv)
+            if value is None:
+                continue
             mPvObject = pva.PvObject(self.METADATA_TYPE_DICT, {'value' : value, 'timeStamp' : pva.PvTimeStamp(t)})
             self.pvaServer.updateUnchecked(mPv, mPvObject)
         return t
@@ -893,6 +1138,58 @@ class AdSimServer:
                     threading.Timer(delay, self.framePublisher).start()
                     return
 
+    def waitUntil(self, deadline):
+        # time.sleep() alone can overshoot by a scheduler tick
+        while True:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                return
+            if remaining > self.REPLAY_SPIN_TIME:
+                time.sleep(remaining - self.REPLAY_SPIN_TIME)
+            else:
+                time.sleep(0)
+
+    def replayPublisher(self):
+        # Publishes pool frames on the replay schedule from this thread
+        nPoolFrames = len(self.framePool)
+        scheduleStart = time.perf_counter()
+        for offset in self.replayTiming:
+            if self.isDone:
+                return
+            if offset > self.runtime:
+                self.printReport(f'Server exiting after reaching runtime of {self.runtime:.3f} seconds')
+                self.isDone = True
+                return
+            deadline = scheduleStart + offset
+            self.waitUntil(deadline)
+            lag = time.perf_counter() - deadline
+            self.replayLagSum += lag
+            self.replayLagMax = max(self.replayLagMax, lag)
+
+            # Metadata PVs get the values carried by the frame's attributes
+            frame, metadataValueDict = self.framePool[self.nPublishedFrames % nPoolFrames]
+            updateTime = self.updateMetadataPvs(metadataValueDict)
+            self.currentFrameId += 1
+            frame['uniqueId'] = self.currentFrameId
+            ts = pva.PvTimeStamp(updateTime)
+            frame['timeStamp'] = ts
+            frame['dataTimeStamp'] = ts
+
+            self.pvaServer.updateUnchecked(self.channelName, frame)
+            self.lastPublishedTime = time.time()
+            self.nPublishedFrames += 1
+
+            runtime = 0
+            frameRate = 0
+            if self.nPublishedFrames > 1:
+                runtime = self.lastPublishedTime - self.startTime
+                frameRate = (self.nPublishedFrames - 1)/runtime if runtime > 0 else 0
+            else:
+                self.startTime = self.lastPublishedTime
+            if self.reportPeriod > 0 and (self.nPublishedFrames % self.reportPeriod) == 0:
+                report = f'Published frame id {self.currentFrameId:6d} @ {self.lastPublishedTime:.3f}s (frame rate: {frameRate:.4f}fps; runtime: {runtime:.3f}s; lag: {lag*1000:.3f}ms)'
+                self.printReport(report)
+
     def printReport(self, report):
         with self.lock:
             if not self.screenInitialized:
@@ -906,6 +1203,10 @@ class AdSimServer:
                 print(report)
 
     def start(self):
+        if self.framePool is not None:
+            self.pvaServer.start()
+            threading.Timer(self.startDelay, self.replayPublisher).start()
+            return
         threading.Thread(target=self.frameProducer, daemon=True).start()
         self.pvaServer.start()
         threading.Timer(self.startDelay, self.framePublisher).start()
@@ -930,6 +1231,8 @@ class AdSimServer:
         print(f'\nServer runtime: {runtime:.4f} seconds')
         print(f'Published frames: {self.nPublishedFrames:6d} @ {frameRate:.4f} fps')
         print(f'Data rate: {dataRate}')
+        if self.framePool is not None and self.nPublishedFrames > 0:
+            print(f'Replay schedule lag: {self.replayLagSum/self.nPublishedFrames*1000:.3f} ms mean, {self.replayLagMax*1000:.3f} ms max')
 
 def main():
     parser = argparse.ArgumentParser(description='PvaPy Area Detector Simulator')
@@ -958,6 +1261,13 @@ def main():
     parser.add_argument('-shd', '--shutdown-delay', type=float, dest='shutdown_delay', default=10.0, help='Server shutdown delay in seconds (default: 10 seconds)')
     parser.add_argument('-rp', '--report-period', type=int, dest='report_period', default=1, help='Reporting period for publishing frames; if set to <=0 no frames will be reported as published (default: 1)')
     parser.add_argument('-dc', '--disable-curses', dest='disable_curses', default=False, action='store_true', help='Disable curses library screen handling. This is enabled by default, except when logging into standard output is turned on.')
+    parser.add_argument('-rm', '--replay-mode', dest='replay_mode', default=False, action='store_true', help='Replay mode: preload a pool of frames (up to the number of frames and the cache size), compress them once with the replay codec and publish them from a dedicated thread on a deterministic schedule. Frames come from the input files, or are generated if no input is given.')
+    parser.add_argument('-rf', '--replay-file', type=str, dest='replay_file', default=None, help='DashPVA HDF5 scan file to replay, together with its per-frame metadata (implies replay mode). Images are read from the HDF5 dataset option if given, otherwise from /entry/data/data or /data/images.')
+    parser.add_argument('-rc', '--replay-codec', type=str, dest='replay_codec', default='none', choices=['none'] + ReplayFramePool.CODECS, help='Codec used to pre-compress replayed frames (default: none)')
+    parser.add_argument('-rpf', '--replay-profile', type=str, dest='replay_profile', default='constant', choices=ReplayTiming.PROFILES, help='Replay timing profile: constant (evenly spaced frames), jitter (each frame displaced by a random fraction of the frame period) or burst (groups of frames published back to back); all profiles keep the mean frame rate (default: constant)')
+    parser.add_argument('-rj', '--replay-jitter', type=float, dest='replay_jitter', default=0.25, help=f'Maximum displacement of a frame for the jitter profile, in frame periods (default: 0.25, maximum: {ReplayTiming.MAX_JITTER})')
+    parser.add_argument('-rbs', '--replay-burst-size', type=int, dest='replay_burst_size', default=10, help='Number of frames per burst for the burst profile (default: 10)')
+    parser.add_argument('-rs', '--replay-seed', type=int, dest='replay_seed', default=0, help='Random seed of the replay schedule; the same seed always produces the same schedule (default: 0)')
 
     args, unparsed = parser.parse_known_args()
     if len(unparsed) > 0:
@@ -966,7 +1276,7 @@ def main():
 
     server = None
     try:
-        server = AdSimServer(inputDirectory=args.input_directory, inputFile=args.input_file, mmapMode=args.mmap_mode, hdfDataset=args.hdf_dataset, hdfCompressionMode=args.hdf_compression_mode, cfgFile=args.config_file, frameRate=args.frame_rate, nFrames=args.n_frames, cacheSize=args.cache_size, nx=args.n_x_pixels, ny=args.n_y_pixels, colorMode=args.color_mode, datatype=args.datatype, minimum=args.minimum, maximum=args.maximum, runtime=args.runtime, channelName=args.channel_name, notifyPv=args.notify_pv, notifyPvValue=args.notify_pv_value, metadataPv=args.metadata_pv, startDelay=args.start_delay, shutdownDelay=args.shutdown_delay, reportPeriod=args.report_period, disableCurses=args.disable_curses)
+        server = AdSimServer(inputDirectory=args.input_directory, inputFile=args.input_file, mmapMode=args.mmap_mode, hdfDataset=args.hdf_dataset, hdfCompressionMode=args.hdf_compression_mode, cfgFile=args.config_file, frameRate=args.frame_rate, nFrames=args.n_frames, cacheSize=args.cache_size, nx=args.n_x_pixels, ny=args.n_y_pixels, colorMode=args.color_mode, datatype=args.datatype, minimum=args.minimum, maximum=args.maximum, runtime=args.runtime, channelName=args.channel_name, notifyPv=args.notify_pv, notifyPvValue=args.notify_pv_value, metadataPv=args.metadata_pv, startDelay=args.start_delay, shutdownDelay=args.shutdown_delay, reportPeriod=args.report_period, disableCurses=args.disable_curses, replayMode=args.replay_mode, replayFile=args.replay_file, replayCodec=args.replay_codec, replayProfile=args.replay_profile, replayJitter=args.replay_jitter, replayBurstSize=args.replay_burst_size, replaySeed=args.replay_seed)
 
         server.start()
         expectedRuntime = args.runtime+args.start_delay
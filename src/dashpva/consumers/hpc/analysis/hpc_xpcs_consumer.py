@@ -0,0 +1,232 @@
+"""Live multi-tau XPCS g2 on a detector image stream.
+
+Feeds every incoming detector image (PVA NTNDArray, decompressed by pvapy)
+into a :class:`dashpva.utils.multitau.MultiTauCorrelator` and publishes the
+current g2(q, tau) on a PVA channel every ``publishEvery`` frames. Images are
+forwarded unchanged to the output channel, so the processor can sit anywhere in
+a pipeline.
+
+The q partitions come from ``labels`` (an ``.npy`` label image: 0 = ignored,
+1..N = partition) or ``rois`` (``"x,y,w,h;x,y,w,h"``, one partition each).
+
+Published structure (``g2Channel``, default ``<outputChannel>:g2``)::
+
+    lags      double[]   delay per lag (frames, or seconds with frameTime)
+    qLabels   int[]      partition label per row of g2
+    g2        double[]   nQ x nLags, row-major
+    pairs     long[]     frame pairs averaged per lag
+    nQ, nLags int
+    nFrames   ulong      frames correlated
+    nGaps     ulong      uniqueId gaps seen since the processor started
+    nMissed   ulong      frames lost in those gaps
+
+Multi-tau lags count frames, so a dropped frame misaligns every lag after it.
+On a ``uniqueId`` gap the g2 so far is published and the correlation restarts
+(``resetOnGap``, default on); with ``resetOnGap`` off it carries on and the gap
+counts tell how many frames the published g2 is missing.
+
+Runs under pvapy's HPC streaming framework:
+    python -m pvapy.cli.hpcConsumer \\
+        --input-channel S12-PILATUS1:Pva1:Image \\
+        --output-channel S12-PILATUS1:Xpcs \\
+        --processor-file .../hpc_xpcs_consumer.py \\
+        --processor-class HpcXpcsProcessor \\
+        --processor-args '{"rois": "100,100,64,64;300,100,64,64", "frameTime": 0.001}'
+"""
+
+import time
+
+import numpy as np
+import pvaccess as pva
+from pvapy.hpc.adImageProcessor import AdImageProcessor
+from pvapy.utility.floatWithUnits import FloatWithUnits
+
+from dashpva.utils.multitau import (
+    DEFAULT_BATCH,
+    DEFAULT_BUFS,
+    DEFAULT_LEVELS,
+    MultiTauCorrelator,
+    roi_labels,
+)
+
+G2_STRUCTURE = {'lags': [pva.DOUBLE], 'qLabels': [pva.INT], 'g2': [pva.DOUBLE], 'pairs': [pva.LONG],
+                'nQ': pva.INT, 'nLags': pva.INT, 'nFrames': pva.ULONG,
+                'nGaps': pva.ULONG, 'nMissed': pva.ULONG}
+
+
+def parse_rois(text):
+    """``"x,y,w,h;x,y,w,h"`` -> list of int 4-tuples."""
+    rois = []
+    for part in str(text).split(';'):
+        if part.strip():
+            values = [int(v) for v in part.split(',')]
+            if len(values) != 4:
+                raise ValueError(f"ROI {part!r} is not x,y,width,height")
+            rois.append(tuple(values))
+    return rois
+
+
+def g2_pvobject(result, frame_time=None, gaps=0, missed=0):
+    """PvObject carrying a :class:`~dashpva.utils.multitau.G2Result` and the stream's gap counts."""
+    lags = result.lags * frame_time if frame_time else result.lags
+    return pva.PvObject(
+        G2_STRUCTURE,
+        {'lags': [float(v) for v in lags],
+         'qLabels': [int(v) for v in result.q_labels],
+         'g2': [float(v) for v in np.nan_to_num(result.g2).ravel()],
+         'pairs': [int(v) for v in result.pairs],
+         'nQ': len(result.q_labels), 'nLags': len(result.lags), 'nFrames': int(result.frames),
+         'nGaps': int(gaps), 'nMissed': int(missed)})
+
+
+class HpcXpcsProcessor(AdImageProcessor):
+
+    DEFAULT_PUBLISH_EVERY = 100
+
+    def __init__(self, configDict={}):
+        AdImageProcessor.__init__(self, configDict)
+        self.correlator = None
+        self.labels = None
+        self.rois = None
+        self.numLevels = DEFAULT_LEVELS
+        self.numBufs = DEFAULT_BUFS
+        self.batch = DEFAULT_BATCH
+        self.publishEvery = self.DEFAULT_PUBLISH_EVERY
+        self.frameTime = None
+        self.g2Channel = None
+        self.resetOnGap = True
+        self._ownServer = None
+        self.configure(configDict)
+        if self.labels is None and not self.rois:
+            raise ValueError("HpcXpcsProcessor needs 'labels' (.npy label image) or 'rois' (x,y,w,h;...)")
+
+        self.nFramesProcessed = 0
+        self.nFrameErrors = 0
+        self.nG2Published = 0
+        self.nGaps = 0
+        self.nMissedFrames = 0
+        self.lastUniqueId = None
+        self.processingTime = 0
+
+    def configure(self, configDict):
+        """Apply the given keys; new partitions or lag layout restart the correlation."""
+        restart = False
+        if 'labels' in configDict:
+            self.labels = np.load(configDict['labels'])
+            self.rois = None
+            restart = True
+        elif 'rois' in configDict:
+            self.labels = None
+            self.rois = parse_rois(configDict['rois'])
+            restart = True
+        for key in ('numLevels', 'numBufs', 'batch'):
+            if key in configDict:
+                setattr(self, key, int(configDict[key]))
+                restart = True
+        if 'publishEvery' in configDict:
+            self.publishEvery = max(1, int(configDict['publishEvery']))
+        if 'frameTime' in configDict:
+            self.frameTime = float(configDict['frameTime']) or None
+        if 'g2Channel' in configDict:
+            self.g2Channel = configDict['g2Channel']
+        if 'resetOnGap' in configDict:
+            value = configDict['resetOnGap']
+            self.resetOnGap = value.lower() in ('1', 'true', 'yes') if isinstance(value, str) else bool(value)
+        if restart:
+            self.correlator = None
+
+    def start(self):
+        if not self.g2Channel:
+            self.g2Channel = f'{self.outputChannel or "dashpva:xpcs"}:g2'
+        if self.pvaServer is None:
+            self._ownServer = self.pvaServer = pva.PvaServer()
+        self.pvaServer.addRecord(self.g2Channel, pva.PvObject(G2_STRUCTURE))
+
+    def stop(self):
+        if self.correlator is not None and self.correlator.frames:
+            self.publish()
+        if self._ownServer is not None:
+            self._ownServer.stop()
+            self._ownServer = None
+
+    def _build_correlator(self, shape):
+        labels = self.labels if self.labels is not None else roi_labels(shape, self.rois)
+        if labels.shape != shape:
+            raise ValueError(f"labels shape {labels.shape} does not match image shape {shape}")
+        self.correlator = MultiTauCorrelator(labels, num_levels=self.numLevels,
+                                             num_bufs=self.numBufs, batch=self.batch)
+
+    def publish(self):
+        """Publish g2 of the frames correlated so far."""
+        if self.pvaServer is None or self.correlator is None:
+            return
+        self.pvaServer.update(self.g2Channel, g2_pvobject(self.correlator.g2(), self.frameTime,
+                                                          self.nGaps, self.nMissedFrames))
+        self.nG2Published += 1
+
+    def _check_sequence(self, uniqueId):
+        """Count a break in ``uniqueId``; with resetOnGap, publish and restart the correlation."""
+        last, self.lastUniqueId = self.lastUniqueId, uniqueId
+        if last is None or uniqueId == last + 1:
+            return
+        self.nGaps += 1
+        # A lower id is a restarted acquisition, not lost frames
+        self.nMissedFrames += max(0, uniqueId - last - 1)
+        self.logger.warning(f'uniqueId gap: {last} -> {uniqueId}')
+        if self.resetOnGap and self.correlator is not None and self.correlator.frames:
+            self.publish()
+            self.correlator.reset()
+
+    def process(self, pvObject):
+        t0 = time.time()
+        try:
+            image = self.reshapeNtNdArray(pvObject)[1]
+            if image is None:
+                self.updateOutputChannel(pvObject)
+                return pvObject
+            if self.correlator is None:
+                self._build_correlator(image.shape)
+            self._check_sequence(int(pvObject['uniqueId']))
+            self.correlator.update(image)
+            self.nFramesProcessed += 1
+            if self.correlator.frames % self.publishEvery == 0:
+                self.publish()
+        except Exception as ex:
+            self.nFrameErrors += 1
+            self.logger.error(f'XPCS processing failed: {ex}')
+        self.updateOutputChannel(pvObject)
+        self.processingTime += time.time() - t0
+        return pvObject
+
+    def resetStats(self):
+        self.nFramesProcessed = 0
+        self.nFrameErrors = 0
+        self.nG2Published = 0
+        self.nGaps = 0
+        self.nMissedFrames = 0
+        self.processingTime = 0
+
+    def getStats(self):
+        processedFrameRate = 0
+        if self.processingTime > 0:
+            processedFrameRate = self.nFramesProcessed / self.processingTime
+        return {
+            'nFramesProcessed': self.nFramesProcessed,
+            'nFrameErrors': self.nFrameErrors,
+            'nG2Published': self.nG2Published,
+            'nGaps': self.nGaps,
+            'nMissedFrames': self.nMissedFrames,
+            'processingTime': FloatWithUnits(self.processingTime, 's'),
+            'processedFrameRate': FloatWithUnits(processedFrameRate, 'fps'),
+        }
+
+    def getStatsPvaTypes(self):
+        return {
+            'nFramesProcessed': pva.UINT,
+            'nFrameErrors': pva.UINT,
+            'nG2Published': pva.UINT,
+            'nGaps': pva.UINT,
+            'nMissedFrames': pva.UINT,
+            'processingTime': pva.DOUBLE,
+            'processedFrameRate': pva.DOUBLE,
+        }
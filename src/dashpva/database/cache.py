@@ -0,0 +1,213 @@
+"""
+In-process read cache and change notifications for DatabaseInterface
+
+Viewers, the workflow and the config layer each create their own
+``DatabaseInterface`` and re-read the same profiles and settings trees on
+startup and on every dialog refresh, one SQLAlchemy session per call. All
+interfaces on the same engine share one ``ReadCache``:
+
+- Reads are memoized per (topic, method, arguments). Topics are
+  ``"profiles"`` (profiles and their config entries) and ``"settings"``.
+- Every write through any interface drops its topic and notifies subscribers.
+- Commits made outside this process's interfaces (another process, a seed
+  script, raw sqlite) are detected through SQLite's ``PRAGMA data_version`` on
+  a dedicated connection, which changes whenever another connection commits.
+  The check is a single pragma, run before serving a cached read or from
+  ``poll_external_changes``.
+
+Cached ORM objects are detached snapshots shared between callers; treat them
+as read-only. Containers (lists, dicts) are copied on the way out, so callers
+may modify what they get back.
+"""
+
+import copy
+import logging
+import os
+import sqlite3
+import threading
+import weakref
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+_log = logging.getLogger(__name__)
+
+PROFILES = 'profiles'
+SETTINGS = 'settings'
+TOPICS = (PROFILES, SETTINGS)
+# Topic passed to subscribers when an outside commit was detected
+EXTERNAL = 'external'
+
+
+def _copy_out(value):
+    if isinstance(value, dict):
+        return copy.deepcopy(value)
+    if isinstance(value, list):
+        return list(value)
+    return value
+
+
+class _StrongRef:
+    """Same call interface as a weakref, for plain functions (kept alive until unsubscribed)."""
+
+    def __init__(self, obj):
+        self._obj = obj
+
+    def __call__(self):
+        return self._obj
+
+
+class ReadCache:
+    """Memoized reads for one database, with topic invalidation and subscribers."""
+
+    def __init__(self, db_file: Optional[str] = None):
+        self._values: Dict[Tuple, Any] = {}
+        self._generation = dict.fromkeys(TOPICS, 0)
+        self._subscribers = []
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self._db_file = db_file
+        self._version_conn = None
+        self._data_version = None
+
+    # ------------------------------------------------------------------ reads
+    def get_or_load(self, topic: str, key: Tuple, loader: Callable[[], Any]):
+        """Cached value for ``key`` under ``topic``, calling ``loader`` on a miss."""
+        full_key = (topic,) + key
+        with self._lock:
+            self._check_external()
+            if full_key in self._values:
+                self.hits += 1
+                return _copy_out(self._values[full_key])
+            self.misses += 1
+            generation = self._generation[topic]
+        value = loader()
+        with self._lock:
+            # A write during the load makes the result possibly stale: serve it, don't keep it
+            if self._generation[topic] == generation:
+                self._values[full_key] = value
+        return _copy_out(value)
+
+    # ---------------------------------------------------------- invalidation
+    def invalidate(self, topic: Optional[str] = None, detail: str = '') -> None:
+        """Drop cached reads of ``topic`` (all topics if None) and notify subscribers."""
+        topics = TOPICS if topic is None else (topic,)
+        with self._lock:
+            for t in topics:
+                self._generation[t] += 1
+            self._values = {k: v for k, v in self._values.items() if k[0] not in topics}
+            # Our own commits also bump data_version on the watch connection
+            self._data_version = self._read_data_version()
+        self._notify(topic, detail)
+
+    def poll_external_changes(self) -> bool:
+        """Check for commits made outside the interfaces; invalidate and notify if any."""
+        with self._lock:
+            changed = self._check_external(notify=False)
+        if changed:
+            self._notify(EXTERNAL, '')
+        return changed
+
+    def _check_external(self, notify: bool = True) -> bool:
+        version = self._read_data_version()
+        if version is None or version == self._data_version:
+            return False
+        first = self._data_version is None
+        self._data_version = version
+        if first:
+            return False
+        for t in TOPICS:
+            self._generation[t] += 1
+        self._values = {}
+        _log.debug("Database changed outside this process's interfaces; read cache dropped")
+        if notify:
+            self._notify(EXTERNAL, '')
+        return True
+
+    def _read_data_version(self) -> Optional[int]:
+        if self._db_file is None:
+            return None
+        try:
+            if self._version_conn is None:
+                self._version_conn = sqlite3.connect(self._db_file, check_same_thread=False)
+            return self._version_conn.execute('PRAGMA data_version').fetchone()[0]
+        except sqlite3.Error as e:
+            _log.debug(f"data_version check unavailable for {self._db_file}: {e}")
+            self._db_file = None
+            return None
+
+    def _after_fork(self) -> None:
+        # The parent's watch connection and locks are not ours to use
+        self._lock = threading.RLock()
+        self._version_conn = None
+        self._data_version = None
+        self._values = {}
+        for t in TOPICS:
+            self._generation[t] += 1
+
+    # ------------------------------------------------------------ subscribers
+    def subscribe(self, callback: Callable[[str, str], None],
+                  topics: Optional[Iterable[str]] = None) -> Callable[[], None]:
+        """Call ``callback(topic, detail)`` after changes; returns an unsubscribe function.
+
+        Bound methods are held weakly, so a closed window does not need to
+        unsubscribe. ``topics`` limits notifications (EXTERNAL is always sent).
+        """
+        if hasattr(callback, '__self__') and hasattr(callback, '__func__'):
+            ref = weakref.WeakMethod(callback)
+        else:
+            ref = _StrongRef(callback)
+        entry = (ref, None if topics is None else frozenset(topics))
+        with self._lock:
+            self._subscribers.append(entry)
+
+        def unsubscribe() -> None:
+            with self._lock:
+                if entry in self._subscribers:
+                    self._subscribers.remove(entry)
+        return unsubscribe
+
+    def _notify(self, topic: Optional[str], detail: str) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers)
+        dead = []
+        for entry in subscribers:
+            ref, topics = entry
+            callback = ref()
+            if callback is None:
+                dead.append(entry)
+                continue
+            if topics is not None and topic not in (None, EXTERNAL) and topic not in topics:
+                continue
+            try:
+                callback(topic, detail)
+            except Exception:
+                _log.exception("Database change subscriber failed")
+        if dead:
+            with self._lock:
+                self._subscribers = [e for e in self._subscribers if e not in dead]
+
+
+_caches: 'weakref.WeakKeyDictionary' = weakref.WeakKeyDictionary()
+_caches_lock = threading.Lock()
+
+
+def cache_for(engine) -> ReadCache:
+    """The shared ReadCache of ``engine`` (created on first use)."""
+    with _caches_lock:
+        cache = _caches.get(engine)
+        if cache is None:
+            db_file = engine.url.database if engine.url.get_backend_name() == 'sqlite' else None
+            if db_file in (None, '', ':memory:'):
+                db_file = None
+            cache = ReadCache(db_file)
+            _caches[engine] = cache
+        return cache
+
+
+def _after_fork_in_child() -> None:
+    for cache in list(_caches.values()):
+        cache._after_fork()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
@@ -2,6 +2,7 @@
 # SQLAlchemy models for DashPVA profile management
 # """
 import logging
+import os
 
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
@@ -28,6 +29,15 @@ _engine = create_engine(
 _Session = sessionmaker(bind=_engine, expire_on_commit=False)
 
 
+def _after_fork_in_child():
+    # Pooled connections belong to the parent (e.g. the launcher's viewer host)
+    _engine.dispose(close=False)
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
 def get_engine():
     """Return the shared database engine."""
     return _engine
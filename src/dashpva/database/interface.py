@@ -17,12 +17,16 @@ Usage:
 Notes:
 - Initializes the SQLite database on construction.
 - Wraps internal ProfileManager methods with a stable, GUI/service-friendly API.
+- Reads are served from a process-wide cache shared by all interfaces on the
+  same database and dropped on writes (see dashpva.database.cache). Use
+  ``subscribe`` to be told when profiles or settings change.
 """
 
 import logging
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
 
-from dashpva.database.db import create_tables, init_database
+from dashpva.database.cache import PROFILES, SETTINGS, cache_for
+from dashpva.database.db import create_tables, get_engine, init_database
 from dashpva.database.managers.profile import ProfileManager
 from dashpva.database.managers.settings import SettingsManager
 from dashpva.database.models.profile import Profile, ProfileConfig
@@ -33,7 +37,7 @@ _log = logging.getLogger(__name__)
 class DatabaseInterface:
     """Facade over ProfileManager providing a stable public API."""
 
-    def __init__(self) -> None:
+    def __init__(self, use_cache: bool = True) -> None:
         # Ensure DB file/tables exist
         init_database()
         # Ensure any new tables are created (e.g., 'settings')
@@ -41,29 +45,68 @@ class DatabaseInterface:
         # Internal manager implementation
         self._mgr = ProfileManager()
         self._settings_mgr = SettingsManager()
+        # Shared with every other interface on this engine
+        self._cache = cache_for(get_engine())
+        self._use_cache = use_cache
+
+    def _read(self, topic: str, fn: Callable, *args):
+        if not self._use_cache:
+            return fn(*args)
+        key = (fn.__name__,) + tuple(tuple(a) if isinstance(a, list) else a for a in args)
+        return self._cache.get_or_load(topic, key, lambda: fn(*args))
+
+    def _write(self, topic: str, fn: Callable, *args):
+        try:
+            return fn(*args)
+        finally:
+            self._cache.invalidate(topic, fn.__name__)
+
+    # Cache / change notifications
+
+    def subscribe(self, callback: Callable[[str, str], None], topics: Optional[Iterable[str]] = None) -> Callable[[], None]:
+        """
+        Call ``callback(topic, detail)`` after profiles or settings change.
+
+        ``topic`` is 'profiles', 'settings', 'external' (committed outside
+        DatabaseInterface, e.g. by another process) or None (everything was
+        invalidated); ``detail`` names the write.
+        Callbacks run on the writing thread. Returns an unsubscribe function.
+        """
+        return self._cache.subscribe(callback, topics)
+
+    def poll_external_changes(self) -> bool:
+        """Check for commits made by other processes; notifies subscribers. Cheap enough for a timer."""
+        return self._cache.poll_external_changes()
+
+    def invalidate_cache(self, topic: Optional[str] = None) -> None:
+        """Drop cached reads of ``topic`` ('profiles' / 'settings'), or all of them."""
+        self._cache.invalidate(topic)
+
+    def cache_info(self) -> Dict[str, int]:
+        return {'hits': self._cache.hits, 'misses': self._cache.misses}
 
     # Profiles CRUD
 
     def create_profile(self, name: str, description: Optional[str] = None) -> Optional[Profile]:
-        return self._mgr.create_profile(name, description)
+        return self._write(PROFILES, self._mgr.create_profile, name, description)
 
     def get_all_profiles(self) -> List[Profile]:
-        return self._mgr.get_all_profiles()
+        return self._read(PROFILES, self._mgr.get_all_profiles)
 
     def get_profile_by_id(self, profile_id: int) -> Optional[Profile]:
-        return self._mgr.get_profile_by_id(profile_id)
+        return self._read(PROFILES, self._mgr.get_profile_by_id, profile_id)
 
     def get_profile_by_name(self, name: str) -> Optional[Profile]:
-        return self._mgr.get_profile_by_name(name)
+        return self._read(PROFILES, self._mgr.get_profile_by_name, name)
 
     def update_profile_name(self, profile_id: int, new_name: str) -> bool:
-        return self._mgr.update_profile_name(profile_id, new_name)
+        return self._write(PROFILES, self._mgr.update_profile_name, profile_id, new_name)
 
     def update_profile_description(self, profile_id: int, description: str) -> bool:
-        return self._mgr.update_profile_description(profile_id, description)
+        return self._write(PROFILES, self._mgr.update_profile_description, profile_id, description)
 
     def delete_profile(self, profile_id: int) -> bool:
-        return self._mgr.delete_profile(profile_id)
+        return self._write(PROFILES, self._mgr.delete_profile, profile_id)
     
     # Detector CRUD
     #
@@ -73,28 +116,28 @@ class DatabaseInterface:
     # Selected / Default flags
 
     def set_selected_profile(self, profile_id: int) -> bool:
-        return self._mgr.set_selected_profile(profile_id)
+        return self._write(PROFILES, self._mgr.set_selected_profile, profile_id)
 
     def clear_selected_profiles(self) -> bool:
-        return self._mgr.clear_selected_profiles()
+        return self._write(PROFILES, self._mgr.clear_selected_profiles)
 
     def get_selected_profile(self) -> Optional[Profile]:
-        return self._mgr.get_selected_profile()
+        return self._read(PROFILES, self._mgr.get_selected_profile)
 
     def set_default_profile(self, profile_id: int) -> bool:
-        return self._mgr.set_default_profile(profile_id)
+        return self._write(PROFILES, self._mgr.set_default_profile, profile_id)
 
     def unset_default_profile(self, profile_id: int) -> bool:
-        return self._mgr.unset_default_profile(profile_id)
+        return self._write(PROFILES, self._mgr.unset_default_profile, profile_id)
 
     def get_default_profile(self) -> Optional[Profile]:
-        return self._mgr.get_default_profile()
+        return self._read(PROFILES, self._mgr.get_default_profile)
 
     def any_default_exists(self) -> bool:
-        return self._mgr.any_default_exists()
+        return self._read(PROFILES, self._mgr.any_default_exists)
 
     def profile_exists(self, name: str) -> bool:
-        return self._mgr.profile_exists(name)
+        return self._read(PROFILES, self._mgr.profile_exists, name)
 
     # Configuration entries
 
@@ -106,33 +149,33 @@ class DatabaseInterface:
         config_value: str,
         config_section: Optional[str] = None,
     ) -> bool:
-        return self._mgr.add_profile_config(profile_id, config_type, config_key, config_value, config_section)
+        return self._write(PROFILES, self._mgr.add_profile_config, profile_id, config_type, config_key, config_value, config_section)
 
     def get_profile_configs(self, profile_id: int, config_type: Optional[str] = None) -> List[ProfileConfig]:
-        return self._mgr.get_profile_configs(profile_id, config_type)
+        return self._read(PROFILES, self._mgr.get_profile_configs, profile_id, config_type)
 
     def clear_profile_configs(self, profile_id: int) -> bool:
-        return self._mgr.clear_profile_configs(profile_id)
+        return self._write(PROFILES, self._mgr.clear_profile_configs, profile_id)
 
     def update_config_value(self, config_id: int, new_value: str) -> bool:
-        return self._mgr.update_config_value(config_id, new_value)
+        return self._write(PROFILES, self._mgr.update_config_value, config_id, new_value)
 
     def delete_config_entry(self, config_id: int) -> bool:
-        return self._mgr.delete_config_entry(config_id)
+        return self._write(PROFILES, self._mgr.delete_config_entry, config_id)
 
     def rename_config_type(self, profile_id: int, old_type: str, new_type: str) -> bool:
-        return self._mgr.rename_config_type(profile_id, old_type, new_type)
+        return self._write(PROFILES, self._mgr.rename_config_type, profile_id, old_type, new_type)
 
     # Import / Export TOML
 
     def import_toml_to_profile(self, profile_id: int, toml_data: Dict[str, Any]) -> bool:
-        return self._mgr.import_toml_to_profile(profile_id, toml_data)
+        return self._write(PROFILES, self._mgr.import_toml_to_profile, profile_id, toml_data)
 
     def import_toml_file(self, profile_id: int, toml_file_path: str) -> bool:
-        return self._mgr.import_toml_file(profile_id, toml_file_path)
+        return self._write(PROFILES, self._mgr.import_toml_file, profile_id, toml_file_path)
 
     def export_profile_to_toml(self, profile_id: int) -> Dict[str, Any]:
-        return self._mgr.export_profile_to_toml(profile_id)
+        return self._read(PROFILES, self._mgr.export_profile_to_toml, profile_id)
 
     def export_profile_to_toml_file(self, profile_id: int, output_path: str) -> bool:
         return self._mgr.export_profile_to_toml_file(profile_id, output_path)
@@ -140,7 +183,7 @@ class DatabaseInterface:
     # Defaults / Seeding
 
     def ensure_shipped_default_profile(self, toml_file_path: str, name: str = "device:metadata:default") -> Optional[Profile]:
-        return self._mgr.ensure_shipped_default_profile(toml_file_path, name)
+        return self._write(PROFILES, self._mgr.ensure_shipped_default_profile, toml_file_path, name)
 
     def seed_system_defaults_from_toml(self, toml_file_path: str, name: str = "device:metadata:default") -> bool:
         """
@@ -154,87 +197,87 @@ class DatabaseInterface:
     # Utilities
 
     def clone_profile_configs(self, source_profile_id: int, dest_profile_id: int) -> bool:
-        return self._mgr.clone_profile_configs(source_profile_id, dest_profile_id)
+        return self._write(PROFILES, self._mgr.clone_profile_configs, source_profile_id, dest_profile_id)
 
     # Settings read wrappers
     def get_root_settings(self):
-        return self._settings_mgr.get_root_settings()
+        return self._read(SETTINGS, self._settings_mgr.get_root_settings)
 
     def get_setting_children(self, setting_id: int):
-        return self._settings_mgr.get_children(setting_id)
+        return self._read(SETTINGS, self._settings_mgr.get_children, setting_id)
 
     def get_all_setting_values(self, setting_id: int) -> Dict[str, Any]:
-        return self._settings_mgr.get_all_setting_values(setting_id)
+        return self._read(SETTINGS, self._settings_mgr.get_all_setting_values, setting_id)
 
     def get_all_setting_values_with_type(self, setting_id: int):
-        return self._settings_mgr.get_all_setting_values_with_type(setting_id)
+        return self._read(SETTINGS, self._settings_mgr.get_all_setting_values_with_type, setting_id)
 
     def create_setting(self, name: str, type_: str, desc: str = '', parent_id: Optional[int] = None):
-        return self._settings_mgr.create_setting(name, type_, desc, parent_id)
+        return self._write(SETTINGS, self._settings_mgr.create_setting, name, type_, desc, parent_id)
 
     def add_setting_value(self, setting_id: int, key: str, value, value_type=None) -> bool:
-        return self._settings_mgr.add_setting_value(setting_id, key, value, value_type)
+        return self._write(SETTINGS, self._settings_mgr.add_setting_value, setting_id, key, value, value_type)
 
     def create_child_setting(self, parent_id: int, name: str, type_: str, desc: Optional[str] = None):
-        return self._settings_mgr.create_child_setting(parent_id, name, type_, desc)
+        return self._write(SETTINGS, self._settings_mgr.create_child_setting, parent_id, name, type_, desc)
 
     def get_all_settings(self):
-        return self._settings_mgr.get_all_settings()
+        return self._read(SETTINGS, self._settings_mgr.get_all_settings)
 
     def get_settings_by_type(self, type_: str):
-        return self._settings_mgr.get_settings_by_type(type_)
+        return self._read(SETTINGS, self._settings_mgr.get_settings_by_type, type_)
 
     def get_setting_by_name(self, name: str):
-        return self._settings_mgr.get_setting_by_name(name)
+        return self._read(SETTINGS, self._settings_mgr.get_setting_by_name, name)
 
     def get_setting_by_id(self, id_: int):
-        return self._settings_mgr.get_setting_by_id(id_)
+        return self._read(SETTINGS, self._settings_mgr.get_setting_by_id, id_)
 
     def get_distinct_setting_types(self):
-        return self._settings_mgr.get_distinct_types()
+        return self._read(SETTINGS, self._settings_mgr.get_distinct_types)
 
     def update_setting_desc(self, id_: int, desc: str) -> bool:
-        return self._settings_mgr.update_setting_desc(id_, desc)
+        return self._write(SETTINGS, self._settings_mgr.update_setting_desc, id_, desc)
 
     def update_setting(self, id_: int, name: str, type_: str) -> bool:
-        return self._settings_mgr.update_setting(id_, name, type_)
+        return self._write(SETTINGS, self._settings_mgr.update_setting, id_, name, type_)
 
     def delete_setting(self, id_: int) -> bool:
-        return self._settings_mgr.delete_setting(id_)
+        return self._write(SETTINGS, self._settings_mgr.delete_setting, id_)
 
     # Setting Value operations
 
     def add_setting_value_by_name(self, setting_name: str, key: str, value: Union[str, int]) -> bool:
-        return self._settings_mgr.add_setting_value_by_name(setting_name, key, value)
+        return self._write(SETTINGS, self._settings_mgr.add_setting_value_by_name, setting_name, key, value)
 
     def update_setting_value(self, setting_id: int, key: str, value, value_type=None) -> bool:
-        return self._settings_mgr.update_setting_value(setting_id, key, value, value_type)
+        return self._write(SETTINGS, self._settings_mgr.update_setting_value, setting_id, key, value, value_type)
 
     def update_setting_value_by_name(self, setting_name: str, key: str, value: Union[str, int]) -> bool:
-        return self._settings_mgr.update_setting_value_by_name(setting_name, key, value)
+        return self._write(SETTINGS, self._settings_mgr.update_setting_value_by_name, setting_name, key, value)
 
     def get_setting_value(self, setting_id: int, key: str) -> Optional[Union[str, int]]:
-        return self._settings_mgr.get_setting_value(setting_id, key)
+        return self._read(SETTINGS, self._settings_mgr.get_setting_value, setting_id, key)
 
     def get_setting_value_by_name(self, setting_name: str, key: str) -> Optional[Union[str, int]]:
-        return self._settings_mgr.get_setting_value_by_name(setting_name, key)
+        return self._read(SETTINGS, self._settings_mgr.get_setting_value_by_name, setting_name, key)
 
     def remove_setting_value(self, setting_id: int, key: str) -> bool:
-        return self._settings_mgr.remove_setting_value(setting_id, key)
+        return self._write(SETTINGS, self._settings_mgr.remove_setting_value, setting_id, key)
 
     def remove_setting_value_by_name(self, setting_name: str, key: str) -> bool:
-        return self._settings_mgr.remove_setting_value_by_name(setting_name, key)
+        return self._write(SETTINGS, self._settings_mgr.remove_setting_value_by_name, setting_name, key)
 
     def get_all_setting_values_by_name(self, setting_name: str) -> Dict[str, Union[str, int]]:
-        return self._settings_mgr.get_all_setting_values_by_name(setting_name)
+        return self._read(SETTINGS, self._settings_mgr.get_all_setting_values_by_name, setting_name)
 
     # Hierarchical settings operations
 
     def get_setting_tree(self):
-        return self._settings_mgr.get_setting_tree()
+        return self._read(SETTINGS, self._settings_mgr.get_setting_tree)
 
     def get_setting_by_path(self, path: List[str]):
-        return self._settings_mgr.get_setting_by_path(path)
+        return self._read(SETTINGS, self._settings_mgr.get_setting_by_path, path)
 
     def move_setting(self, setting_id: int, new_parent_id: Optional[int]) -> bool:
-        return self._settings_mgr.move_setting(setting_id, new_parent_id)
+        return self._write(SETTINGS, self._settings_mgr.move_setting, setting_id, new_parent_id)
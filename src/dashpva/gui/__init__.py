@@ -14,6 +14,9 @@ def configure_app(app):
     Colors come from ``theme_colors`` via ``$NAME`` substitution so the stylesheet
     keeps a single source of truth (e.g. ``background-color: $SUCCESS;``). Unknown
     ``$NAME`` tokens are left untouched (``safe_substitute``).
+
+    Also installs the time-to-first-window probe when ``DASHPVA_STARTUP_PROBE``
+    is set (see ``dashpva.utils.startup``).
     """
     import os
     from string import Template
@@ -21,6 +24,7 @@ def configure_app(app):
     from PyQt5.QtWidgets import QStyleFactory
 
     from dashpva.gui import theme_colors
+    from dashpva.utils.startup import install_first_window_probe
 
     module_label = os.environ.get('DASHPVA_MODULE_LABEL')
     if module_label:
@@ -33,3 +37,5 @@ def configure_app(app):
     if qss_file.is_file():
         qss = Template(qss_file.read_text(encoding="utf-8"))
         app.setStyleSheet(qss.safe_substitute(vars(theme_colors)))
+
+    install_first_window_probe(app)
@@ -0,0 +1,254 @@
+"""Chunk-aligned background loading of HDF5 frame ranges.
+
+HDF5ImageViewer used to read the selected frame range (optionally cropped) with
+one h5py slice on the GUI thread. This module reads it in blocks that follow the
+dataset's chunk layout instead:
+
+  * ``block_shape`` — the read unit: a whole number of chunks, grown across the
+    frame first and then along the frame axis until it holds about
+    ``block_bytes``.
+  * ``ChunkCache`` — byte-budgeted LRU of decoded blocks. It outlives a single
+    load, so loading an overlapping range or changing the crop only decodes the
+    blocks not seen yet.
+  * ``FrameRangeReader`` — fills the output array one band of blocks (along the
+    frame axis) at a time, yielding after each band and checking a cancel event
+    between blocks.
+  * ``FrameRangeLoader`` — QObject worker that runs a reader on a QThread and
+    reports progress, so the viewer can show frames as they arrive.
+
+Contiguous (unchunked) datasets have no decode cost to save; they are read in
+frame bands of about ``block_bytes`` straight from the requested selection and
+are not cached.
+
+Blocks handed out by the cache are read-only views; copy before modifying.
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+import h5py
+import numpy as np
+from PyQt5.QtCore import QObject, pyqtSignal, pyqtSlot
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_BYTES = 512 * 1024 * 1024  # decoded blocks kept between loads
+DEFAULT_BLOCK_BYTES = 8 * 1024 * 1024    # target size of one read
+
+
+def block_shape(shape: Tuple[int, int, int], chunks: Optional[Tuple[int, int, int]],
+                itemsize: int, block_bytes: int = DEFAULT_BLOCK_BYTES) -> Tuple[int, int, int]:
+    """Read unit for a ``(frames, rows, cols)`` dataset with the given chunk shape.
+
+    Starts from one chunk (one full frame for contiguous data), doubles rows and
+    columns in turn up to the frame size, then takes whole multiples of that
+    along the frame axis until the block reaches ``block_bytes``.
+    """
+    shape = tuple(max(1, int(s)) for s in shape)
+    block = [min(int(c), s) for c, s in zip(chunks or (1,) + shape[1:], shape)]
+
+    def nbytes():
+        return block[0] * block[1] * block[2] * itemsize
+
+    while nbytes() < block_bytes and (block[1] < shape[1] or block[2] < shape[2]):
+        for axis in (1, 2):
+            if block[axis] < shape[axis] and nbytes() < block_bytes:
+                block[axis] = min(shape[axis], block[axis] * 2)
+    if nbytes() < block_bytes and block[0] < shape[0]:
+        block[0] = min(shape[0], block[0] * max(1, block_bytes // nbytes()))
+    return tuple(block)
+
+
+class ChunkCache:
+    """Thread-safe, byte-budgeted LRU of decoded dataset blocks."""
+
+    def __init__(self, max_bytes: int = DEFAULT_CACHE_BYTES):
+        self.max_bytes = int(max_bytes)
+        self._lock = threading.Lock()
+        self._blocks = OrderedDict()  # (file, dataset, shape, block shape, origin) -> ndarray
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key) -> Optional[np.ndarray]:
+        with self._lock:
+            data = self._blocks.get(key)
+            if data is None:
+                self.misses += 1
+                return None
+            self._blocks.move_to_end(key)
+            self.hits += 1
+            return data
+
+    def put(self, key, data: np.ndarray) -> np.ndarray:
+        """Store ``data`` (made read-only) and evict the oldest blocks over budget."""
+        data.flags.writeable = False
+        if data.nbytes > self.max_bytes:
+            return data
+        with self._lock:
+            old = self._blocks.pop(key, None)
+            if old is not None:
+                self._bytes -= old.nbytes
+            self._blocks[key] = data
+            self._bytes += data.nbytes
+            while self._bytes > self.max_bytes:
+                _, evicted = self._blocks.popitem(last=False)
+                self._bytes -= evicted.nbytes
+        return data
+
+    def drop_file(self, path: str) -> None:
+        """Forget every block read from ``path``."""
+        with self._lock:
+            for key in [k for k in self._blocks if k[0] == path]:
+                self._bytes -= self._blocks.pop(key).nbytes
+
+    def clear(self) -> None:
+        with self._lock:
+            self._blocks.clear()
+            self._bytes = 0
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+    def __len__(self):
+        return len(self._blocks)
+
+
+def _span(sel: Optional[slice], size: int) -> Tuple[int, int]:
+    start, stop, step = (sel or slice(None)).indices(size)
+    if step != 1:
+        raise ValueError("only contiguous row/column ranges can be loaded")
+    return start, max(start, stop)
+
+
+class FrameRangeReader:
+    """Frames ``start:stop`` of a 2D or 3D dataset, cropped to ``rows`` x ``cols``.
+
+    ``out`` is allocated up front with shape ``(frames, rows, cols)`` (a 2D
+    dataset is one frame) and filled in order by :meth:`bands`; ``loaded`` frames
+    at its start are complete.
+    """
+
+    def __init__(self, dataset: h5py.Dataset, start: int = 0, stop: Optional[int] = None,
+                 rows: Optional[slice] = None, cols: Optional[slice] = None,
+                 cache: Optional[ChunkCache] = None, block_bytes: int = DEFAULT_BLOCK_BYTES):
+        if dataset.ndim not in (2, 3):
+            raise ValueError(f"expected a 2D or 3D dataset, got {dataset.ndim}D")
+        self.dataset = dataset
+        self._flat = dataset.ndim == 2
+        self.shape = (1,) + dataset.shape if self._flat else tuple(dataset.shape)
+        chunks = dataset.chunks
+        if chunks is not None and self._flat:
+            chunks = (1,) + chunks
+        self.chunked = chunks is not None
+        self.block = block_shape(self.shape, chunks, dataset.dtype.itemsize, block_bytes)
+        self.cache = cache if self.chunked else None
+
+        stop = self.shape[0] if stop is None else stop
+        self.frames = _span(slice(start, stop), self.shape[0])
+        self.rows = _span(rows, self.shape[1])
+        self.cols = _span(cols, self.shape[2])
+        self.out = np.empty(tuple(hi - lo for lo, hi in (self.frames, self.rows, self.cols)),
+                            dtype=dataset.dtype)
+        self.loaded = 0
+        self.cancelled = False
+
+    def __len__(self):
+        return self.out.shape[0]
+
+    def _read(self, f0, f1, r0, r1, c0, c1) -> np.ndarray:
+        if self._flat:
+            return self.dataset[r0:r1, c0:c1][np.newaxis]
+        return self.dataset[f0:f1, r0:r1, c0:c1]
+
+    def _block(self, origin) -> np.ndarray:
+        f0, r0, c0 = origin
+        bf, br, bc = self.block
+        key = None
+        if self.cache is not None:
+            key = (self.dataset.file.filename, self.dataset.name, self.shape, self.block, origin)
+            data = self.cache.get(key)
+            if data is not None:
+                return data
+        data = self._read(f0, min(f0 + bf, self.shape[0]), r0, min(r0 + br, self.shape[1]),
+                          c0, min(c0 + bc, self.shape[2]))
+        return self.cache.put(key, data) if key is not None else data
+
+    def bands(self, cancel: Optional[threading.Event] = None):
+        """Fill :attr:`out`, yielding the number of frames loaded after each band.
+
+        Stops early (setting :attr:`cancelled`) once ``cancel`` is set.
+        """
+        (fa, fb), (ra, rb), (ca, cb) = self.frames, self.rows, self.cols
+        if not self.out.size:
+            return
+        if not self.chunked:
+            step = max(1, self.block[0])
+            for f0 in range(fa, fb, step):
+                if cancel is not None and cancel.is_set():
+                    self.cancelled = True
+                    return
+                f1 = min(f0 + step, fb)
+                self.out[f0 - fa:f1 - fa] = self._read(f0, f1, ra, rb, ca, cb)
+                self.loaded = f1 - fa
+                yield self.loaded
+            return
+
+        bf, br, bc = self.block
+        for f0 in range(fa - fa % bf, fb, bf):
+            for r0 in range(ra - ra % br, rb, br):
+                for c0 in range(ca - ca % bc, cb, bc):
+                    if cancel is not None and cancel.is_set():
+                        self.cancelled = True
+                        return
+                    data = self._block((f0, r0, c0))
+                    # Intersection of the block with the requested selection
+                    lo = (max(f0, fa), max(r0, ra), max(c0, ca))
+                    hi = (min(f0 + bf, fb), min(r0 + br, rb), min(c0 + bc, cb))
+                    self.out[lo[0] - fa:hi[0] - fa, lo[1] - ra:hi[1] - ra, lo[2] - ca:hi[2] - ca] = \
+                        data[lo[0] - f0:hi[0] - f0, lo[1] - r0:hi[1] - r0, lo[2] - c0:hi[2] - c0]
+            self.loaded = min(f0 + bf, fb) - fa
+            yield self.loaded
+
+    def read(self, cancel: Optional[threading.Event] = None) -> np.ndarray:
+        """Load the whole selection and return :attr:`out`."""
+        for _ in self.bands(cancel):
+            pass
+        return self.out
+
+
+class FrameRangeLoader(QObject):
+    """Runs a :class:`FrameRangeReader` on a worker thread.
+
+    Every signal carries the ``job`` id it was created with so the receiver can
+    ignore a load it has already superseded. ``finished`` carries the filled
+    array, or None when the load was cancelled.
+    """
+
+    progress = pyqtSignal(int, int)     # job, frames loaded
+    finished = pyqtSignal(int, object)  # job, (frames, rows, cols) array or None
+    failed = pyqtSignal(int, str)       # job, error message
+
+    def __init__(self, job: int, reader: FrameRangeReader):
+        super().__init__()
+        self.job = job
+        self.reader = reader
+        self._cancel = threading.Event()
+
+    def cancel(self) -> None:
+        """Stop after the block being read; safe to call from any thread."""
+        self._cancel.set()
+
+    @pyqtSlot()
+    def run(self):
+        try:
+            for loaded in self.reader.bands(self._cancel):
+                self.progress.emit(self.job, loaded)
+        except Exception as e:
+            logger.debug(f"Loading {self.reader.dataset.name} failed", exc_info=True)
+            self.failed.emit(self.job, str(e))
+            return
+        self.finished.emit(self.job, None if self.reader.cancelled else self.reader.out)
@@ -7,6 +7,8 @@
 """
 For cross correlations 
 """
+from collections import OrderedDict
+
 import numpy as np
 from scipy.fftpack.helper import next_fast_len
 
@@ -228,8 +230,219 @@ class crosscor:
         return ccorrs
 
 def _centered(img,sz):
+    #works on the last two axes so a stack of correlations is centered at once
     n=sz//2
-    img=np.take(img,np.arange(-n[0],sz[0]-n[0]),0,mode="wrap")
-    img=np.take(img,np.arange(-n[1],sz[1]-n[1]),1,mode="wrap")
+    img=np.take(img,np.arange(-n[0],sz[0]-n[0]),-2,mode="wrap")
+    img=np.take(img,np.arange(-n[1],sz[1]-n[1]),-1,mode="wrap")
     return img
 
+
+# memory budget of one block of spectra products in TwoTimeCorrelator
+DEFAULT_BLOCK_BYTES = 64 * 2**20
+_PLAN_CACHE_SIZE = 8
+_plans = OrderedDict()
+
+
+def _mask_plan(submask):
+    '''
+        FFT size, mask spectrum and mask autocorrelation for one ROI mask.
+        Shared by every correlator on the same ROI shape and mask, so moving
+        between datasets or frame ranges does not redo the mask FFTs.
+    '''
+    sizes = np.array(submask.shape)
+    key = (submask.shape, submask.tobytes())
+    plan = _plans.get(key)
+    if plan is None:
+        fshape = tuple(next_fast_len(int(d)) for d in 2*sizes - 1)
+        mma1 = np.fft.rfftn(submask, fshape, axes=(0, 1))
+        maskcor = _centered(np.fft.irfftn(mma1 * mma1.conj(), fshape, axes=(0, 1)), sizes)
+        maskcor *= maskcor > .5
+        plan = (fshape, mma1, maskcor)
+        _plans[key] = plan
+        while len(_plans) > _PLAN_CACHE_SIZE:
+            _plans.popitem(last=False)
+    else:
+        _plans.move_to_end(key)
+    return plan
+
+
+class TwoTimeCorrelator:
+    '''
+        Cross-correlations between any frames of a stack over one 2D ROI.
+        The FFT of every frame is taken once and kept, together with the
+        per-frame normalization terms, so a frame pair costs a single
+        inverse FFT and the full two-time matrix is built from the cached
+        spectra block by block.
+        ``pair(i, j)`` gives the same result as
+        ``crosscor(shape, mask=mask, normalization=...)(frames[i], frames[j])``.
+        Examples
+        --------
+        >> tt = TwoTimeCorrelator(data[:, rows, cols], normalization='symavg')
+        >> ccr = tt.pair(0, 10)
+        >> c2 = tt.two_time()             # (N, N) zero-lag correlation
+        >> peaks = tt.two_time('peak')    # (N, N) correlation maximum
+    '''
+    def __init__(self, frames, mask=None, normalization=None, block_bytes=DEFAULT_BLOCK_BYTES):
+        '''
+            Parameters
+            ----------
+            frames : 3D array-like (N, rows, cols)
+                The frames cropped to the ROI. Read block by block, so an
+                h5py dataset works without loading it whole.
+            mask : 2D np.ndarray, optional
+                Non-zero pixels take part in the correlation. The correlation
+                is computed over the bounding box of the mask. If None, every
+                pixel is used.
+            normalization : string or list of strings, optional
+                'regular' and/or 'symavg', as for crosscor. Defaults to
+                ['regular'].
+            block_bytes : int
+                Memory budget of the temporary arrays of one block. The kept
+                spectra take ``nbytes`` on top of it.
+        '''
+        if normalization is None:
+            normalization = ['regular']
+        elif not isinstance(normalization, list):
+            normalization = list([normalization])
+        self.normalization = normalization
+        self.block_bytes = int(block_bytes)
+
+        nframes = len(frames)
+        shape = tuple(frames.shape[1:]) if hasattr(frames, 'shape') else np.shape(frames[0])
+        if len(shape) != 2:
+            raise ValueError(f"frames must be a stack of 2D images, got frame shape {shape}")
+        if mask is None:
+            mask = np.ones(shape)
+        mask = np.asarray(mask) != 0
+        if mask.shape != shape:
+            raise ValueError(f"mask shape {mask.shape} does not match frame shape {shape}")
+        if not mask.any():
+            raise ValueError("mask selects no pixels")
+        rows = np.flatnonzero(mask.any(axis=1))
+        cols = np.flatnonzero(mask.any(axis=0))
+        self.window = (slice(rows[0], rows[-1] + 1), slice(cols[0], cols[-1] + 1))
+        self.submask = mask[self.window].astype(float)
+        self.sizes = np.array(self.submask.shape)
+        self.centers = self.sizes // 2
+        self.fshape, self.mma1, self.maskcor = _mask_plan(self.submask)
+        self._overlap = self.maskcor > .5
+
+        fshape = self.fshape
+        self.spectra = np.empty((nframes, fshape[0], fshape[1]//2 + 1), dtype=complex)
+        if 'symavg' in normalization:
+            #frame x mask and mask x frame correlations of every frame
+            self.icorr1 = np.empty((nframes,) + self.submask.shape)
+            self.icorr2 = np.empty((nframes,) + self.submask.shape)
+        if 'regular' in normalization:
+            self.means = np.empty(nframes)
+
+        step = max(1, self.block_bytes // (3 * 8 * fshape[0] * fshape[1]))
+        for a in range(0, nframes, step):
+            b = min(a + step, nframes)
+            imgs = np.asarray(frames[a:b], dtype=float)[(slice(None),) + self.window] * self.submask
+            spec = np.fft.rfftn(imgs, fshape, axes=(-2, -1))
+            self.spectra[a:b] = spec
+            if 'symavg' in normalization:
+                self.icorr1[a:b] = self._inverse(spec * self.mma1.conj())
+                self.icorr2[a:b] = self._inverse(self.mma1 * spec.conj())
+            if 'regular' in normalization:
+                self.means[a:b] = imgs[:, self._overlap].mean(axis=1)
+
+    def __len__(self):
+        return len(self.spectra)
+
+    @property
+    def nbytes(self):
+        '''Memory held by the cached spectra and normalization terms.'''
+        held = [self.spectra] + [getattr(self, k) for k in ('icorr1', 'icorr2', 'means') if hasattr(self, k)]
+        return sum(a.nbytes for a in held)
+
+    def _inverse(self, spec):
+        return _centered(np.fft.irfftn(spec, self.fshape, axes=(-2, -1)), self.sizes)
+
+    def _normalize(self, ccorr, ii, jj, window=(slice(None), slice(None))):
+        #ccorr is (len(ii), len(jj)) correlations over `window` of the ROI
+        maskcor = self.maskcor[window]
+        if 'symavg' in self.normalization:
+            denom = self.icorr1[ii][:, None][(Ellipsis,) + window] * self.icorr2[jj][None, :][(Ellipsis,) + window]
+            np.divide(ccorr * maskcor, denom, out=ccorr, where=np.abs(denom) > 0)
+        if 'regular' in self.normalization:
+            # only run on overlapping regions for correlation
+            means = self.means[ii][:, None] * self.means[jj][None, :]
+            np.divide(ccorr, maskcor * means[..., None, None], out=ccorr, where=self._overlap[window])
+        return ccorr
+
+    def pair(self, i, j=None):
+        '''
+            Normalized cross-correlation of frame i against frame j (or its
+            autocorrelation when j is None). Zero shift is at ``centers``.
+        '''
+        if j is None:
+            j = i
+        ccorr = self._inverse(self.spectra[i] * self.spectra[j].conj())
+        return self._normalize(ccorr[None, None], [i], [j])[0, 0]
+
+    def two_time(self, statistic='center'):
+        '''
+            Two-time correlation matrix C[i, j] over all frames.
+            Parameters
+            ----------
+            statistic : 'center' or 'peak'
+                'center' takes the correlation at zero shift, computed directly
+                from the spectra without inverse FFTs. 'peak' takes the maximum
+                of each normalized correlation, which follows speckle that
+                drifts between frames; it costs one inverse FFT per pair and is
+                computed for i <= j and mirrored.
+            Returns
+            -------
+            c2 : (N, N) np.ndarray
+        '''
+        if statistic == 'center':
+            return self._two_time_center()
+        if statistic == 'peak':
+            return self._two_time_peak()
+        raise ValueError(f"unknown statistic {statistic!r}; use 'center' or 'peak'")
+
+    def _two_time_center(self):
+        #zero-shift value of irfftn = sum over the full spectrum / size; the
+        #half spectrum counts every column but the first (and Nyquist) twice
+        n = len(self)
+        fshape = self.fshape
+        weights = np.full(self.spectra.shape[-1], 2.)
+        weights[0] = 1.
+        if fshape[1] % 2 == 0:
+            weights[-1] = 1.
+        spectra = self.spectra.reshape(n, -1)
+        weights = np.broadcast_to(weights, self.spectra.shape[1:]).ravel()
+        c2 = np.empty((n, n))
+        step = max(1, self.block_bytes // (2 * spectra.itemsize * max(n, spectra.shape[1])))
+        for a in range(0, n, step):
+            b = min(a + step, n)
+            #Re(x . conj(y)) == Re(conj(x) . y): no conjugated copy of all spectra
+            c2[a:b] = (np.conj(spectra[a:b] * weights) @ spectra.T).real / (fshape[0] * fshape[1])
+        c = self.centers
+        center = (slice(c[0], c[0] + 1), slice(c[1], c[1] + 1))
+        rows = np.arange(n)
+        for a in range(0, n, step):
+            b = min(a + step, n)
+            block = c2[a:b, :, None, None]
+            c2[a:b] = self._normalize(block, rows[a:b], rows, center)[:, :, 0, 0]
+        return c2
+
+    def _two_time_peak(self):
+        n = len(self)
+        per_pair = 4 * 8 * self.fshape[0] * self.fshape[1]
+        step = max(1, int(np.sqrt(self.block_bytes / per_pair)))
+        c2 = np.empty((n, n))
+        rows = np.arange(n)
+        for a in range(0, n, step):
+            b = min(a + step, n)
+            for c in range(a, n, step):
+                d = min(c + step, n)
+                spec = self.spectra[a:b, None] * self.spectra[None, c:d].conj()
+                ccorr = self._normalize(self._inverse(spec), rows[a:b], rows[c:d])
+                block = ccorr.max(axis=(-2, -1))
+                c2[a:b, c:d] = block
+                c2[c:d, a:b] = block.T
+        return c2
+
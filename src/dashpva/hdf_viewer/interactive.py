@@ -1,35 +1,17 @@
 import getpass
+import glob
+import json
 import os
+import re
 import sys
-
-# Set HDF5 plugin path dynamically based on current environment
-try:
-    import hdf5plugin
-    plugin_path = os.path.join(os.path.dirname(hdf5plugin.__file__), 'plugins')
-    if os.path.exists(plugin_path):
-        os.environ["HDF5_PLUGIN_PATH"] = plugin_path
-    else:
-        # Fallback to DashPVA venv if hdf5plugin is installed there
-        dashpva_plugin_path = os.path.expanduser("~/DashPVA/.venv/lib/python3.11/site-packages/hdf5plugin/plugins")
-        if os.path.exists(dashpva_plugin_path):
-            os.environ["HDF5_PLUGIN_PATH"] = dashpva_plugin_path
-except ImportError:
-    # Fallback to DashPVA venv path
-    dashpva_plugin_path = os.path.expanduser("~/DashPVA/.venv/lib/python3.11/site-packages/hdf5plugin/plugins")
-    if os.path.exists(dashpva_plugin_path):
-        os.environ["HDF5_PLUGIN_PATH"] = dashpva_plugin_path
-
-import json
 import time
 import traceback
+from importlib.util import find_spec
 
 import h5py
-import matplotlib.pyplot as plt
 import numpy as np
 import pyqtgraph as pg
-from matplotlib.colors import LogNorm
-from matplotlib.patches import Rectangle
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import QObject, Qt, QThread, pyqtSignal, pyqtSlot
 from PyQt5.QtWidgets import (
     QApplication,
     QCheckBox,
@@ -51,34 +33,50 @@ from PyQt5.QtWidgets import (
 )
 from pyqtgraph import RectROI
 
-try:
-    from dashpva.hdf_viewer import crosscor
-    CROSSCOR_AVAILABLE = True
-except ImportError:
-    CROSSCOR_AVAILABLE = False
-    print("Warning: crosscor module not available. Cross-correlation features will be disabled.")
-import glob
-import re
-
-from scipy.interpolate import griddata
-
 from dashpva.gui import configure_app
-
-# Configure matplotlib
-plt.rcParams.update({
-    'font.size': 8,
-    'font.family': 'serif',
-    'axes.labelsize': 'small',
-    'axes.titlesize': 'medium'
-})
+from dashpva.hdf_viewer.chunk_loader import (
+    ChunkCache,
+    FrameRangeLoader,
+    FrameRangeReader,
+)
+from dashpva.utils.autoscale import autoscale_levels
+from dashpva.utils.startup import lazy_module
+
+
+def _style_pyplot(pyplot):
+    pyplot.rcParams.update({
+        'font.size': 8,
+        'font.family': 'serif',
+        'axes.labelsize': 'small',
+        'axes.titlesize': 'medium'
+    })
+
+
+# matplotlib, scipy and crosscor are only needed by the analysis reports, not
+# to show the browser window; load them on first use
+plt = lazy_module('matplotlib.pyplot', on_load=_style_pyplot)
+_interpolate = lazy_module('scipy.interpolate')
+CROSSCOR_AVAILABLE = find_spec('scipy') is not None
+if CROSSCOR_AVAILABLE:
+    crosscor = lazy_module('dashpva.hdf_viewer.crosscor')
+else:
+    print("Warning: crosscor module not available. Cross-correlation features will be disabled.")
 
 # Disable OpenGL for pyqtgraph to avoid GL-related errors
 pg.setConfigOption('useOpenGL', False)
 pg.setConfigOptions(imageAxisOrder='row-major')
 
+def _roi_slices(frame_shape, ROI):
+    """Row and column slices of a (center_col, center_row, width, height) ROI."""
+    center_col, center_row, col_roi_width, row_roi_width = ROI
+    col_slice = slice(max(0, center_col - col_roi_width // 2), min(frame_shape[1], center_col + col_roi_width // 2))
+    row_slice = slice(max(0, center_row - row_roi_width // 2), min(frame_shape[0], center_row + row_roi_width // 2))
+    return row_slice, col_slice
+
+
 # Speckle_analyzer class, refactored to work with already loaded data
 class Speckle_analyzer:
-    def __init__(self, data, ROI=(830,920,70,50), frame_index=0, compare_frame_index=0):
+    def __init__(self, data, ROI=(830,920,70,50), frame_index=0, compare_frame_index=0, correlator=None):
         """
         Initialize the Speckle_analyzer with already loaded data
         
@@ -89,8 +87,11 @@ class Speckle_analyzer:
             compare_frame_index: The frame index to compare with the reference
                                 If same as frame_index, performs self-correlation.
                                 If different, performs cross-correlation between frames.
+            correlator: Optional crosscor.TwoTimeCorrelator over this ROI of data;
+                        the frame pair is then read from its cached spectra.
         """
         self.dataset = data
+        self.correlator = correlator
         self.frame_index = frame_index
         self.compare_frame_index = compare_frame_index
         profile_time = time.time()
@@ -109,17 +110,18 @@ class Speckle_analyzer:
         
     def cross_corr(self, ref_frame_idx, compare_frame_idx, ROI):
         self.ref_frame = self.dataset[ref_frame_idx]
-        center_col, center_row, col_roi_width, row_roi_width = ROI
-        col_slice = slice(max(0, center_col - col_roi_width // 2), min(self.ref_frame.shape[1], center_col + col_roi_width // 2))
-        row_slice = slice(max(0, center_row - row_roi_width // 2), min(self.ref_frame.shape[0], center_row + row_roi_width // 2))
+        row_slice, col_slice = _roi_slices(self.ref_frame.shape, ROI)
         
         ref_frame = self.ref_frame[row_slice, col_slice]
-        compare_frame = self.dataset[compare_frame_idx][row_slice, col_slice]
         
-        if not CROSSCOR_AVAILABLE:
-            raise ImportError("crosscor module is required for cross-correlation analysis")
-        cross_corr = crosscor.crosscor(ref_frame.shape, mask=None, normalization="symavg")
-        ccr = cross_corr(ref_frame, compare_frame)
+        if self.correlator is not None:
+            ccr = self.correlator.pair(ref_frame_idx, compare_frame_idx)
+        else:
+            if not CROSSCOR_AVAILABLE:
+                raise ImportError("crosscor module is required for cross-correlation analysis")
+            compare_frame = self.dataset[compare_frame_idx][row_slice, col_slice]
+            cross_corr = crosscor.crosscor(ref_frame.shape, mask=None, normalization="symavg")
+            ccr = cross_corr(ref_frame, compare_frame)
         
         p = np.unravel_index(np.argmax(ccr, axis=None), ccr.shape)
         ax = (ccr[p[0] - 1, p[1]] + ccr[p[0] + 1, p[1]] - 2 * ccr[p[0], p[1]]) / 2.
@@ -137,6 +139,9 @@ class Speckle_analyzer:
         return result
     
     def plot_report(self):
+        from matplotlib.colors import LogNorm
+        from matplotlib.patches import Rectangle
+
         fig = plt.figure(figsize=(16, 10))
         gs = fig.add_gridspec(4, 6, width_ratios=[1.0, 1.0, 1.2, 1.5, 1.2, 1.5])
 
@@ -256,8 +261,39 @@ class Speckle_analyzer:
         plt.savefig('speckle_profile.pdf', dpi=400, bbox_inches='tight')
         plt.show()
 
+class TwoTimeWorker(QObject):
+    """Builds a TwoTimeCorrelator over ROI frames and its two-time matrix off the GUI thread.
+
+    ``finished`` carries the key the job was started with, the correlator (for
+    reuse by later analyses of the same ROI) and the (N, N) two-time matrix.
+    """
+
+    finished = pyqtSignal(object, object, object)  # key, correlator, c2
+    failed = pyqtSignal(str)                       # error message
+
+    def __init__(self, key, frames):
+        super().__init__()
+        self.key = key
+        self.frames = frames
+
+    @pyqtSlot()
+    def run(self):
+        try:
+            correlator = crosscor.TwoTimeCorrelator(self.frames, normalization="symavg")
+            c2 = correlator.two_time()
+        except Exception as e:
+            traceback.print_exc()
+            self.failed.emit(str(e))
+            return
+        self.finished.emit(self.key, correlator, c2)
+
+
 # Main GUI class
 class HDF5ImageViewer(QMainWindow):
+    # Minimum seconds between redraws of a frame range that is still loading;
+    # redraws of a long prefix are spaced further so they cost at most ~20%
+    PARTIAL_REFRESH_INTERVAL = 0.5
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("HDF5 Viewer with Speckle Analysis")
@@ -464,6 +500,10 @@ class HDF5ImageViewer(QMainWindow):
         self.analyze_speckle_button = QPushButton("Analyze Speckle")
         self.analyze_speckle_button.clicked.connect(self.analyze_speckle)
         
+        self.two_time_button = QPushButton("Two-Time")
+        self.two_time_button.setToolTip("Two-time correlation of the ROI over all loaded frames")
+        self.two_time_button.clicked.connect(self.plot_two_time)
+        
         self.plot_motor_positions_button = QPushButton("Plot Motor Positions")
         self.plot_motor_positions_button.clicked.connect(self.plot_motor_positions)
         
@@ -473,6 +513,7 @@ class HDF5ImageViewer(QMainWindow):
         analysis_layout.addWidget(self.other_frame_label)
         analysis_layout.addWidget(self.other_frame_spin)
         analysis_layout.addWidget(self.analyze_speckle_button)
+        analysis_layout.addWidget(self.two_time_button)
         analysis_layout.addWidget(self.plot_motor_positions_button)
         analysis_layout.addStretch(1)
         
@@ -519,6 +560,18 @@ class HDF5ImageViewer(QMainWindow):
         self.current_roi = None
         self.selected_dataset_path = None
         self.binned_data = None
+        # Bumped whenever binned_data is replaced (see _set_binned_data)
+        self._data_generation = 0
+        # TwoTimeCorrelator of the current ROI, reused until the ROI or data change
+        self._correlator = None
+        self._correlator_key = None
+        # Two-time job in flight as (thread, worker, roi), or None
+        self._two_time_job = None
+        # Background frame loading: decoded chunks are kept across tree clicks
+        self._chunk_cache = ChunkCache()
+        self._load_workers = []
+        self._load_job = 0
+        self._frame_request = None
         
         # For tracking dataset dimensions
         self.original_dimensions = None
@@ -619,7 +672,9 @@ class HDF5ImageViewer(QMainWindow):
         self.load_button.setEnabled(True)
         
         # Clear previous data
+        self._cancel_load(wait=True)
         if self.h5_file is not None:
+            self._chunk_cache.drop_file(self.h5_file.filename)
             self.h5_file.close()
             self.h5_file = None
         self.tree_widget.clear()
@@ -634,7 +689,9 @@ class HDF5ImageViewer(QMainWindow):
             return
             
         try:
+            self._cancel_load(wait=True)
             if self.h5_file is not None:
+                self._chunk_cache.drop_file(self.h5_file.filename)
                 self.h5_file.close()
             
             self.h5_file = h5py.File(self.selected_file_path, 'r', libver='latest', swmr=True)
@@ -643,7 +700,7 @@ class HDF5ImageViewer(QMainWindow):
             self.build_h5_tree('/', self.h5_file)
             self.tree_widget.expandToDepth(0)
             self.current_h5_obj = None
-            self.binned_data = None
+            self._set_binned_data(None)
         except Exception as e:
             self.status_label.setText(f"Error opening file: {str(e)}")
             print(f"Error opening file: {str(e)}")
@@ -669,6 +726,8 @@ class HDF5ImageViewer(QMainWindow):
 
     def on_item_clicked(self, item, column):
         path = item.data(0, Qt.UserRole)
+        if self._frame_request is not None and self._frame_request['path'] != path:
+            self._cancel_load()
         if path in self.h5_file:
             self.current_h5_obj = self.h5_file[path]
             if isinstance(self.current_h5_obj, h5py.Dataset):
@@ -769,6 +828,7 @@ class HDF5ImageViewer(QMainWindow):
             return
             
         dataset = self.current_h5_obj
+        self._cancel_load()
         try:
             if len(dataset.shape) == 1:
                 self.stacked_widget.setCurrentWidget(self.plot_widget)
@@ -783,6 +843,7 @@ class HDF5ImageViewer(QMainWindow):
                 self.validate_parameters(dataset)
                 
                 # Load only the selected frame range for 3D datasets
+                start_frame, end_frame = 0, 0
                 if len(dataset.shape) == 3:
                     start_frame = self.start_frame_spin.value()
                     end_frame = self.end_frame_spin.value()
@@ -793,155 +854,37 @@ class HDF5ImageViewer(QMainWindow):
                         self.start_frame_spin.setValue(start_frame)
                         self.end_frame_spin.setValue(end_frame)
                     
-                    # Load only selected frames
-                    self.status_label.setText(f"Loading frames {start_frame} to {end_frame}...")
-                    QApplication.processEvents()  # Update UI
-                    
-                    if self.enable_crop_checkbox.isChecked():
-                        # Apply cropping when loading
-                        x_start = self.x_start_spin.value()
-                        x_end = self.x_end_spin.value()
-                        y_start = self.y_start_spin.value()
-                        y_end = self.y_end_spin.value()
-                        
-                        image = dataset[start_frame:end_frame+1, y_start:y_end+1, x_start:x_end+1]
-                        self.cropping_applied = True
-                        self.current_dimensions = (y_end - y_start + 1, x_end - x_start + 1)
-                    else:
-                        image = dataset[start_frame:end_frame+1]
-                        self.cropping_applied = False
-                        self.current_dimensions = (dataset.shape[1], dataset.shape[2])
-                else:
-                    # For 2D datasets
-                    if self.enable_crop_checkbox.isChecked():
-                        # Apply cropping
-                        x_start = self.x_start_spin.value()
-                        x_end = self.x_end_spin.value()
-                        y_start = self.y_start_spin.value()
-                        y_end = self.y_end_spin.value()
-                        
-                        image = dataset[y_start:y_end+1, x_start:x_end+1]
-                        image = np.expand_dims(image, axis=0)  # Add dummy dimension
-                        self.cropping_applied = True
-                        self.current_dimensions = (y_end - y_start + 1, x_end - x_start + 1)
-                    else:
-                        image = dataset[()]
-                        # Add dummy dimension for 2D data to be treated as one frame
-                        image = np.expand_dims(image, axis=0)
-                        self.cropping_applied = False
-                        self.current_dimensions = (dataset.shape[0], dataset.shape[1])
-                
-                # Update threshold values based on actual data statistics (if auto is enabled)
-                # Do this BEFORE applying threshold so values are calculated from raw data
-                if hasattr(self, 'chk_threshold_auto') and self.chk_threshold_auto.isChecked():
-                    self.update_threshold_values_from_data(image)
-                
-                # Apply thresholding if enabled
-                if self.chk_threshold.isChecked():
-                    image = self.apply_threshold(image)
-                
-                # Apply downsampling/binning if selected
-                bin_factor = int(self.bin_combo.currentText().split(' ')[0])
-                
-                # Validate bin factor against image dimensions
-                min_dimension = min(image.shape[1], image.shape[2])
-                if bin_factor >= min_dimension:
-                    bin_factor = max(1, min_dimension // 2)  # Auto-adjust to max safe value
-                    self.bin_combo.setCurrentText(f"{bin_factor}" if bin_factor > 1 else "1 (None)")
-                    self.status_label.setText(f"Warning: Bin factor reduced to {bin_factor} to fit image dimensions")
-                    QApplication.processEvents()  # Update UI
-                
-                if bin_factor > 1:
-                    # Simple nearest-neighbor downsampling
-                    if len(dataset.shape) == 3:
-                        # For 3D dataset: keep all frames, downsample each frame
-                        # Calculate exact size after downsampling with stride
-                        h_binned = len(range(0, image.shape[1], bin_factor))
-                        w_binned = len(range(0, image.shape[2], bin_factor))
-                        new_shape = (image.shape[0], h_binned, w_binned)
-                        
-                        self.binned_data = np.zeros(new_shape, dtype=image.dtype)
-                        for i in range(image.shape[0]):
-                            self.binned_data[i] = image[i, ::bin_factor, ::bin_factor]
-                    else:
-                        # For 2D dataset
-                        h_binned = len(range(0, image.shape[1], bin_factor))
-                        w_binned = len(range(0, image.shape[2], bin_factor))
-                        new_shape = (1, h_binned, w_binned)
-                        
-                        self.binned_data = np.zeros(new_shape, dtype=image.dtype)
-                        self.binned_data[0] = image[0, ::bin_factor, ::bin_factor]
+                if self.enable_crop_checkbox.isChecked():
+                    # Apply cropping when loading
+                    x_start = self.x_start_spin.value()
+                    x_end = self.x_end_spin.value()
+                    y_start = self.y_start_spin.value()
+                    y_end = self.y_end_spin.value()
                     
-                    image = self.binned_data
-                    self.current_dimensions = (h_binned, w_binned)
+                    rows, cols = slice(y_start, y_end + 1), slice(x_start, x_end + 1)
+                    self.cropping_applied = True
+                    self.current_dimensions = (y_end - y_start + 1, x_end - x_start + 1)
                 else:
-                    self.binned_data = image
-                
-                # Get pixel dimensions for the title
+                    rows, cols = None, None
+                    self.cropping_applied = False
+                    self.current_dimensions = tuple(dataset.shape[-2:])
+
+                # Frames are read chunk by chunk on a worker thread and shown
+                # as they arrive; see _on_frames_progress/_on_frames_loaded
+                reader = FrameRangeReader(dataset, start_frame, end_frame + 1, rows, cols,
+                                          cache=self._chunk_cache)
+                self._frame_request = {
+                    'path': self.selected_dataset_path,
+                    'reader': reader,
+                    'start_frame': start_frame,
+                    'end_frame': end_frame,
+                    'redraw_at': 0.0,
+                }
+                self._start_frame_load(reader)
                 if len(dataset.shape) == 3:
-                    original_frames = dataset.shape[0]
-                    height, width = image.shape[1], image.shape[2]
-                    
-                    title = f"Image Dimensions: {width}x{height} pixels (Frames {start_frame}-{end_frame} of {original_frames})"
-                    
-                    if self.cropping_applied:
-                        orig_height, orig_width = self.original_dimensions
-                        crop_text = f" [Cropped from {orig_width}x{orig_height}]"
-                        title += crop_text
-                        
-                    if bin_factor > 1:
-                        title += f" [Downsampled {bin_factor}x]"
+                    self.status_label.setText(f"Loading frames {start_frame} to {end_frame}...")
                 else:
-                    height, width = image.shape[1], image.shape[2]
-                    title = f"Image Dimensions: {width}x{height} pixels"
-                    
-                    if self.cropping_applied:
-                        orig_height, orig_width = self.original_dimensions
-                        crop_text = f" [Cropped from {orig_width}x{orig_height}]"
-                        title += crop_text
-                        
-                    if bin_factor > 1:
-                        title += f" [Downsampled {bin_factor}x]"
-                
-                self.image_view.view.setTitle(title)
-
-                # Compute min/max levels
-                min_level, max_level = np.nanmin(image), np.nanmax(image)
-                if self.log_scale_checkbox.isChecked():
-                    # Clip negative values to 0 for log1p (log1p requires x > -1)
-                    image = np.clip(image, 0, None)
-                    image = np.nan_to_num(image, nan=0.0, posinf=0.0, neginf=0.0)
-                    image = np.log1p(image)
-                    min_level = np.log1p(max(0, min_level)) if not np.isnan(min_level) else 0
-                    max_level = np.log1p(max(0, max_level)) if not np.isnan(max_level) else 0
-                
-                # Use vmin/vmax from spin boxes if they are within valid range
-                vmin = self.vmin_spin.value()
-                vmax = self.vmax_spin.value()
-                if vmin < vmax:
-                    if self.log_scale_checkbox.isChecked():
-                        vmin = np.log1p(max(0, vmin))
-                        vmax = np.log1p(max(0, vmax))
-                    min_level = vmin
-                    max_level = vmax
-
-                # Display the image
-                self.image_view.setImage(image, autoRange=False, autoLevels=False, 
-                                        levels=(min_level, max_level), autoHistogramRange=False)
-                
-                # Apply colormap (magma is default)
-                self.update_colormap(self.colormap_combo.currentText())
-                
-                # Apply autoscale if enabled
-                if self.auto_linear_scale_checkbox.isChecked():
-                    self.apply_autoscale()
-                
-                load_info = f"Loaded {image.shape[0]} frames"
-                if self.cropping_applied:
-                    load_info += f", cropped to {width}x{height}"
-                if bin_factor > 1:
-                    load_info += f", downsampled {bin_factor}x"
-                self.status_label.setText(f"{load_info} from {self.selected_file_path}")
+                    self.status_label.setText("Loading image...")
             else:
                 raise ValueError("Dataset shape not supported for plotting.")
         except Exception as e:
@@ -949,6 +892,179 @@ class HDF5ImageViewer(QMainWindow):
             self.stacked_widget.setCurrentWidget(self.blank_widget)
             traceback.print_exc()
 
+    def _start_frame_load(self, reader):
+        """Run reader on a worker thread, reporting to the _on_frames_* slots."""
+        self._load_job += 1
+        thread = QThread()
+        worker = FrameRangeLoader(self._load_job, reader)
+        worker.moveToThread(thread)
+        thread.started.connect(worker.run)
+        worker.progress.connect(self._on_frames_progress)
+        worker.finished.connect(self._on_frames_loaded)
+        worker.failed.connect(self._on_frames_failed)
+        # Ensure thread quits after work
+        worker.finished.connect(thread.quit)
+        worker.failed.connect(thread.quit)
+        # Keep cancelled loads referenced until their thread has exited
+        self._load_workers.append((thread, worker))
+        thread.finished.connect(self._prune_load_workers)
+        thread.start()
+
+    def _prune_load_workers(self):
+        self._load_workers = [(t, w) for t, w in self._load_workers if not t.isFinished()]
+
+    def _cancel_load(self, wait=False):
+        """Cancel loads in flight; with wait, block until their threads exit."""
+        for thread, worker in list(self._load_workers):
+            worker.cancel()
+            if wait:
+                thread.quit()
+                thread.wait(5000)
+        request = self._frame_request
+        if request is not None and request['reader'].loaded < len(request['reader']):
+            self.status_label.setText(
+                f"Loading cancelled after {request['reader'].loaded} of {len(request['reader'])} frames")
+        self._frame_request = None
+        # Results of cancelled jobs are ignored
+        self._load_job += 1
+
+    def _on_frames_progress(self, job, loaded):
+        request = self._frame_request
+        if job != self._load_job or request is None:
+            return
+        total = len(request['reader'])
+        start = time.monotonic()
+        if loaded < total and start >= request['redraw_at']:
+            self._show_frames(request['reader'].out[:loaded], partial=True)
+            self.status_label.setText(f"Loading: {loaded} of {total} frames...")
+            cost = time.monotonic() - start
+            request['redraw_at'] = start + max(self.PARTIAL_REFRESH_INTERVAL, 5 * cost)
+
+    def _on_frames_loaded(self, job, image):
+        request = self._frame_request
+        if job != self._load_job or request is None or image is None:
+            return
+        self._frame_request = None
+        try:
+            self._show_frames(image, request=request)
+        except Exception as e:
+            self.status_label.setText(f"Error plotting dataset: {str(e)}")
+            self.stacked_widget.setCurrentWidget(self.blank_widget)
+            traceback.print_exc()
+
+    def _on_frames_failed(self, job, message):
+        if job != self._load_job:
+            return
+        self._frame_request = None
+        self.status_label.setText(f"Error plotting dataset: {message}")
+        self.stacked_widget.setCurrentWidget(self.blank_widget)
+
+    def _show_frames(self, image, partial=False, request=None):
+        """Threshold, bin and display loaded frames (frames x rows x cols).
+
+        partial is a prefix of a load still running: the current frame is kept
+        and the auto threshold and autoscale wait for the complete data.
+        """
+        request = request or self._frame_request
+        dataset = self.current_h5_obj
+        start_frame, end_frame = request['start_frame'], request['end_frame']
+
+        # Update threshold values based on actual data statistics (if auto is enabled)
+        # Do this BEFORE applying threshold so values are calculated from raw data
+        if not partial and hasattr(self, 'chk_threshold_auto') and self.chk_threshold_auto.isChecked():
+            self.update_threshold_values_from_data(image)
+        
+        # Apply thresholding if enabled
+        if self.chk_threshold.isChecked():
+            image = self.apply_threshold(image)
+        
+        # Apply downsampling/binning if selected
+        bin_factor = int(self.bin_combo.currentText().split(' ')[0])
+        
+        # Validate bin factor against image dimensions
+        min_dimension = min(image.shape[1], image.shape[2])
+        if bin_factor >= min_dimension:
+            bin_factor = max(1, min_dimension // 2)  # Auto-adjust to max safe value
+            self.bin_combo.setCurrentText(f"{bin_factor}" if bin_factor > 1 else "1 (None)")
+            self.status_label.setText(f"Warning: Bin factor reduced to {bin_factor} to fit image dimensions")
+        
+        if bin_factor > 1:
+            # Simple nearest-neighbor downsampling of every frame
+            # Calculate exact size after downsampling with stride
+            h_binned = len(range(0, image.shape[1], bin_factor))
+            w_binned = len(range(0, image.shape[2], bin_factor))
+            new_shape = (image.shape[0], h_binned, w_binned)
+            
+            self._set_binned_data(np.zeros(new_shape, dtype=image.dtype))
+            for i in range(image.shape[0]):
+                self.binned_data[i] = image[i, ::bin_factor, ::bin_factor]
+            
+            image = self.binned_data
+            self.current_dimensions = (h_binned, w_binned)
+        else:
+            self._set_binned_data(image)
+        
+        # Get pixel dimensions for the title
+        height, width = image.shape[1], image.shape[2]
+        if len(dataset.shape) == 3:
+            original_frames = dataset.shape[0]
+            title = f"Image Dimensions: {width}x{height} pixels (Frames {start_frame}-{end_frame} of {original_frames})"
+        else:
+            title = f"Image Dimensions: {width}x{height} pixels"
+            
+        if self.cropping_applied:
+            orig_height, orig_width = self.original_dimensions
+            crop_text = f" [Cropped from {orig_width}x{orig_height}]"
+            title += crop_text
+            
+        if bin_factor > 1:
+            title += f" [Downsampled {bin_factor}x]"
+        
+        self.image_view.view.setTitle(title)
+
+        # Compute min/max levels
+        min_level, max_level = np.nanmin(image), np.nanmax(image)
+        if self.log_scale_checkbox.isChecked():
+            # Clip negative values to 0 for log1p (log1p requires x > -1)
+            image = np.clip(image, 0, None)
+            image = np.nan_to_num(image, nan=0.0, posinf=0.0, neginf=0.0)
+            image = np.log1p(image)
+            min_level = np.log1p(max(0, min_level)) if not np.isnan(min_level) else 0
+            max_level = np.log1p(max(0, max_level)) if not np.isnan(max_level) else 0
+        
+        # Use vmin/vmax from spin boxes if they are within valid range
+        vmin = self.vmin_spin.value()
+        vmax = self.vmax_spin.value()
+        if vmin < vmax:
+            if self.log_scale_checkbox.isChecked():
+                vmin = np.log1p(max(0, vmin))
+                vmax = np.log1p(max(0, vmax))
+            min_level = vmin
+            max_level = vmax
+
+        # Display the image, staying on the frame being looked at while frames stream in
+        current_idx = self.image_view.currentIndex
+        self.image_view.setImage(image, autoRange=False, autoLevels=False, 
+                                levels=(min_level, max_level), autoHistogramRange=False)
+        if 0 < current_idx < image.shape[0]:
+            self.image_view.setCurrentIndex(current_idx)
+        
+        # Apply colormap (magma is default)
+        self.update_colormap(self.colormap_combo.currentText())
+        if partial:
+            return
+        
+        # Apply autoscale if enabled
+        if self.auto_linear_scale_checkbox.isChecked():
+            self.apply_autoscale()
+        
+        load_info = f"Loaded {image.shape[0]} frames"
+        if self.cropping_applied:
+            load_info += f", cropped to {width}x{height}"
+        if bin_factor > 1:
+            load_info += f", downsampled {bin_factor}x"
+        self.status_label.setText(f"{load_info} from {self.selected_file_path}")
+
     def update_image_levels(self):
         """Update the image display levels based on current vmin/vmax values"""
         if self.stacked_widget.currentWidget() == self.image_view and self.binned_data is not None:
@@ -973,16 +1089,11 @@ class HDF5ImageViewer(QMainWindow):
                 if 0 <= current_idx < self.binned_data.shape[0]:
                     image = self.binned_data[current_idx]
                     
-                    # Flatten the image to get all intensity values
-                    intensities = image.flatten()
+                    # 5th/95th percentiles from a sampled histogram (no full-frame sort)
+                    levels = autoscale_levels(image, 5.0, 95.0)
                     
-                    # Remove any NaN or infinite values
-                    intensities = intensities[np.isfinite(intensities)]
-                    
-                    if len(intensities) > 0:
-                        # Calculate 5th and 95th percentiles
-                        min_percentile = np.percentile(intensities, 5)
-                        max_percentile = np.percentile(intensities, 95)
+                    if levels is not None:
+                        min_percentile, max_percentile = levels
                         
                         # Ensure min < max
                         if min_percentile >= max_percentile:
@@ -1327,22 +1438,42 @@ class HDF5ImageViewer(QMainWindow):
             if self.auto_linear_scale_checkbox.isChecked():
                 self.apply_autoscale()
 
-    def analyze_speckle(self):
+    def _speckle_roi(self):
+        """The drawn ROI as (x, y, w, h), or None after reporting what is missing."""
         if not self.selected_dataset_path or not isinstance(self.current_h5_obj, h5py.Dataset):
             self.status_label.setText("Please select a dataset first.")
-            return
+            return None
         if not self.current_roi:
             self.status_label.setText("Please draw an ROI first.")
-            return
+            return None
         if self.binned_data is None:
             self.status_label.setText("Please load dataset first by double-clicking on it.")
-            return
+            return None
 
         pos = self.current_roi.pos()
         size = self.current_roi.size()
         x, y = int(pos.x()), int(pos.y())
         w, h = int(size.x()), int(size.y())
-        roi = (x, y, w, h)
+        return (x, y, w, h)
+
+    def _set_binned_data(self, data):
+        """Replace the loaded frames, dropping the correlator of the previous ones."""
+        self.binned_data = data
+        self._data_generation += 1
+        self._correlator = None
+        self._correlator_key = None
+
+    def _correlator_key_for(self, roi):
+        return (self._data_generation, roi)
+
+    def _cached_correlator(self, roi):
+        """The TwoTimeCorrelator a Two-Time run left for roi on the current data, else None."""
+        return self._correlator if self._correlator_key == self._correlator_key_for(roi) else None
+
+    def analyze_speckle(self):
+        roi = self._speckle_roi()
+        if roi is None:
+            return
 
         # Get reference and other frame indices
         ref_frame = self.ref_frame_spin.value()
@@ -1364,7 +1495,9 @@ class HDF5ImageViewer(QMainWindow):
                 data=self.binned_data, 
                 ROI=roi,
                 frame_index=ref_frame,
-                compare_frame_index=other_frame  # New parameter for the other frame
+                compare_frame_index=other_frame,  # New parameter for the other frame
+                # Two frames need two FFTs: only reuse spectra a Two-Time run already has
+                correlator=self._cached_correlator(roi)
             )
             speckle_analyzer.plot_report()
             self.status_label.setText(f"Speckle analysis complete: compared frame {ref_frame} with frame {other_frame}")
@@ -1373,6 +1506,74 @@ class HDF5ImageViewer(QMainWindow):
             print(f"Error during speckle analysis: {str(e)}")
             traceback.print_exc()
 
+    def plot_two_time(self):
+        """Compute the two-time correlation C(t1, t2) of the ROI over all loaded frames.
+
+        The frames are transformed and correlated on a worker thread; the plot is
+        drawn by _on_two_time_finished.
+        """
+        roi = self._speckle_roi()
+        if roi is None or self._two_time_job is not None:
+            return
+        if not CROSSCOR_AVAILABLE:
+            self.status_label.setText("Error during two-time correlation: crosscor module is not available")
+            return
+        key = self._correlator_key_for(roi)
+        row_slice, col_slice = _roi_slices(self.binned_data.shape[1:], roi)
+        # Copy the ROI so reloading the dataset cannot change the frames under the worker
+        frames = np.array(self.binned_data[:, row_slice, col_slice])
+        self.status_label.setText(f"Computing two-time correlation of {len(frames)} frames...")
+        self.two_time_button.setEnabled(False)
+
+        thread = QThread()
+        worker = TwoTimeWorker(key, frames)
+        worker.moveToThread(thread)
+        thread.started.connect(worker.run)
+        worker.finished.connect(self._on_two_time_finished)
+        worker.failed.connect(self._on_two_time_failed)
+        worker.finished.connect(thread.quit)
+        worker.failed.connect(thread.quit)
+        self._two_time_job = (thread, worker, roi)
+        thread.start()
+
+    def _end_two_time_job(self):
+        thread, _, roi = self._two_time_job
+        # The queued thread.quit may not have run yet; the worker has returned or is about to
+        thread.quit()
+        thread.wait()
+        self._two_time_job = None
+        self.two_time_button.setEnabled(True)
+        return roi
+
+    def _on_two_time_failed(self, message):
+        if self._two_time_job is None:
+            return
+        self._end_two_time_job()
+        self.status_label.setText(f"Error during two-time correlation: {message}")
+
+    def _on_two_time_finished(self, key, correlator, c2):
+        if self._two_time_job is None:
+            return
+        roi = self._end_two_time_job()
+        if self.binned_data is not None and key == self._correlator_key_for(roi):
+            # Keep the spectra for Analyze Speckle on the same ROI and data
+            self._correlator, self._correlator_key = correlator, key
+        try:
+            fig, ax = plt.subplots(figsize=(7, 6))
+            im = ax.imshow(c2, origin='lower', cmap='viridis', aspect='equal')
+            ax.set_title(f"Two-Time Correlation, ROI {roi}", fontsize=12)
+            ax.set_xlabel("Frame t2", fontsize=10)
+            ax.set_ylabel("Frame t1", fontsize=10)
+            cbar = fig.colorbar(im, ax=ax, format='%.2f')
+            cbar.set_label('C(t1, t2)', fontsize=10)
+            plt.tight_layout()
+            plt.show()
+            self.status_label.setText(f"Two-time correlation complete: {len(c2)} frames")
+        except Exception as e:
+            self.status_label.setText(f"Error during two-time correlation: {str(e)}")
+            print(f"Error during two-time correlation: {str(e)}")
+            traceback.print_exc()
+
     def validate_parameters(self, dataset):
         """Validate and correct loading parameters to prevent errors"""
         if self.enable_crop_checkbox.isChecked():
@@ -1708,8 +1909,6 @@ class HDF5ImageViewer(QMainWindow):
         Shows total intensity, center of mass X, and center of mass Y.
         """
         try:
-            import matplotlib.pyplot as plt
-            
             # Create figure with 2 rows, 3 columns (scatter + contour for each metric)
             fig, axes = plt.subplots(2, 3, figsize=(20, 12))
             fig.suptitle(f'ROI Analysis vs Motor Position - {sample_name}', fontsize=16)
@@ -1779,11 +1978,11 @@ class HDF5ImageViewer(QMainWindow):
                         
                         # Interpolate data to regular grid
                         try:
-                            ZI = griddata((x_positions, y_positions), data, (XI, YI), 
+                            ZI = _interpolate.griddata((x_positions, y_positions), data, (XI, YI), 
                                         method='cubic', fill_value=np.nan)
                         except Exception:
                             # Fallback to linear if cubic fails
-                            ZI = griddata((x_positions, y_positions), data, (XI, YI), 
+                            ZI = _interpolate.griddata((x_positions, y_positions), data, (XI, YI), 
                                         method='linear', fill_value=np.nan)
                         
                         # Get data range for consistent scaling
@@ -1826,6 +2025,11 @@ class HDF5ImageViewer(QMainWindow):
             self.status_label.setText(f"Error generating plots: {str(e)}")
 
     def closeEvent(self, event):
+        self._cancel_load(wait=True)
+        if self._two_time_job is not None:
+            self._two_time_job[0].quit()
+            self._two_time_job[0].wait()
+            self._two_time_job = None
         if self.h5_file is not None:
             self.h5_file.close()
         event.accept()
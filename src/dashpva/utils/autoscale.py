@@ -0,0 +1,120 @@
+"""
+Histogram-based autoscale levels
+
+Percentile display levels without sorting the frame: pixels are sampled on a
+strided grid, binned into a fixed log-spaced histogram, and the requested
+percentiles are read off its CDF. Binning a 64k-pixel sample takes about a
+millisecond whatever the detector size; the CDF lookup takes microseconds.
+
+Bins are uniform in ``t = sign(x) * log10(1 + |x| / scale)`` over a fixed span,
+so the same edges cover dark counts through saturated pixels (and negative
+or log-scaled values) with roughly constant relative resolution. The
+histogram can be blended across frames (``smoothing``) so levels follow
+changing intensity without flicker.
+"""
+
+from typing import Optional, Tuple
+
+import numpy as np
+
+DEFAULT_BINS = 4096
+DEFAULT_MAX_SAMPLES = 1 << 16
+# |t| span of the histogram; 12 decades covers any detector count range
+_T_SPAN = 12.0
+
+
+def _grid_sample(image: np.ndarray, max_samples: int) -> np.ndarray:
+    """Strided view of ``image`` with at most ~max_samples elements (no copy)."""
+    image = np.asarray(image)
+    if image.size <= max_samples or image.ndim == 0:
+        return image
+    stride = int(np.ceil((image.size / max_samples) ** (1.0 / image.ndim)))
+    return image[(slice(None, None, stride),) * image.ndim]
+
+
+class HistogramAutoscale:
+    """Streaming percentile levels from a fixed log-spaced histogram.
+
+    Call ``update(frame)`` for every frame; it returns the (low, high) levels, or
+    None when the frame has no finite pixels. ``smoothing`` in [0, 1) blends each
+    new histogram into the previous one (0 = levels from the current frame only).
+    """
+
+    def __init__(self, low: float = 5.0, high: float = 95.0, bins: int = DEFAULT_BINS,
+                 max_samples: int = DEFAULT_MAX_SAMPLES, smoothing: float = 0.0,
+                 scale: float = 1.0):
+        if not 0.0 <= smoothing < 1.0:
+            raise ValueError("smoothing must be in [0, 1)")
+        self.low = float(low)
+        self.high = float(high)
+        self.bins = int(bins)
+        self.max_samples = int(max_samples)
+        self.smoothing = float(smoothing)
+        self.scale = float(scale)
+        self._width = 2.0 * _T_SPAN / self.bins
+        self._hist = None
+        self._cdf = None
+
+    def reset(self) -> None:
+        """Drop the accumulated histogram (e.g. on channel or display-mode change)."""
+        self._hist = None
+        self._cdf = None
+
+    def _to_t(self, x: np.ndarray) -> np.ndarray:
+        return np.sign(x) * np.log10(1.0 + np.abs(x) / self.scale)
+
+    def _from_t(self, t: float) -> float:
+        return float(np.sign(t) * (10.0 ** abs(t) - 1.0) * self.scale)
+
+    def histogram(self, image: np.ndarray) -> Optional[np.ndarray]:
+        """Counts of the grid-sampled finite pixels of ``image`` per bin, or None."""
+        sample = np.asarray(_grid_sample(image, self.max_samples), dtype=np.float64).ravel()
+        sample = sample[np.isfinite(sample)]
+        if sample.size == 0:
+            return None
+        idx = ((self._to_t(sample) + _T_SPAN) / self._width).astype(np.intp)
+        np.clip(idx, 0, self.bins - 1, out=idx)
+        return np.bincount(idx, minlength=self.bins).astype(np.float64)
+
+    def update(self, image: np.ndarray) -> Optional[Tuple[float, float]]:
+        hist = self.histogram(image)
+        if hist is None:
+            return None
+        hist /= hist.sum()
+        if self._hist is None or self.smoothing == 0.0:
+            self._hist = hist
+        else:
+            self._hist *= self.smoothing
+            self._hist += (1.0 - self.smoothing) * hist
+        self._cdf = np.cumsum(self._hist)
+        return self.levels()
+
+    def percentile(self, q: float) -> Optional[float]:
+        """q-th percentile (0..100) of the accumulated histogram, interpolated within its bin."""
+        if self._cdf is None:
+            return None
+        cdf = self._cdf
+        total = cdf[-1]
+        if total <= 0:
+            return None
+        # Strictly positive so q=0 lands in the first occupied bin, not an empty one
+        target = max(min(max(q, 0.0), 100.0) / 100.0 * total, 1e-12 * total)
+        k = int(np.searchsorted(cdf, target, side='left'))
+        k = min(k, self.bins - 1)
+        before = cdf[k - 1] if k > 0 else 0.0
+        frac = (target - before) / self._hist[k] if self._hist[k] > 0 else 0.0
+        return self._from_t(-_T_SPAN + (k + frac) * self._width)
+
+    def levels(self) -> Optional[Tuple[float, float]]:
+        lo, hi = self.percentile(self.low), self.percentile(self.high)
+        if lo is None or hi is None:
+            return None
+        if hi <= lo:
+            hi = lo + 1.0
+        return lo, hi
+
+
+def autoscale_levels(image: np.ndarray, low: float = 5.0, high: float = 95.0,
+                     max_samples: int = DEFAULT_MAX_SAMPLES) -> Optional[Tuple[float, float]]:
+    """One-shot (low, high) percentile levels for ``image`` via HistogramAutoscale."""
+    return HistogramAutoscale(low, high, max_samples=max_samples).update(image)
@@ -0,0 +1,431 @@
+"""Shared frame cache with playhead-aware background prefetch.
+
+The Workbench used to read the first 100 frames of a 3D dataset eagerly and go
+back to h5py synchronously (reopening the file) for everything else. This
+module replaces that with:
+
+  * ``FrameCache`` — one open read-only handle per file, a byte-budgeted LRU of
+    decoded float32 frames, and a single daemon thread that prefetches frames
+    ahead of (and a few behind) the current playhead.
+  * ``FrameStack`` — a lazy ``(N, H, W)`` stand-in for a numpy volume. Integer
+    indexing returns one frame through the cache and moves the playhead, so
+    playback, scrubbing and per-frame ROI loops all warm the cache for the next
+    access. Slicing materializes only the requested frames.
+  * ``H5FrameStack`` — a ``FrameStack`` backed by an HDF5 dataset.
+
+Sources whose decoding releases the GIL (image files) set ``read_workers > 1``
+and are prefetched on a shared thread pool instead of the single prefetch
+thread.
+
+Frames handed out by the cache are read-only views; copy before modifying.
+"""
+
+import logging
+import os
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Optional, Tuple
+
+import h5py
+import hdf5plugin  # noqa: F401  registers compression filters for detector data
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Values above this are detector overflow/sentinel counts; the Workbench has
+# always zeroed them on load.
+HIGH_VALUE_CUTOFF = 5e6
+
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024  # 1 GiB of decoded frames
+DEFAULT_AHEAD = 32
+DEFAULT_BEHIND = 4
+
+
+def clean_frame(frame) -> np.ndarray:
+    """Return ``frame`` as float32 with overflow values (> 5e6) set to zero."""
+    arr = np.array(frame, dtype=np.float32, copy=True)
+    high = arr > HIGH_VALUE_CUTOFF
+    if np.any(high):
+        arr[high] = 0
+    return arr
+
+
+class FrameStack(ABC):
+    """Lazy ``(N, H, W)`` float32 frame stack served through a ``FrameCache``.
+
+    Subclasses set ``key`` (unique per underlying data), ``shape`` and
+    implement ``read_frame(index)``, which must be safe to call from the
+    prefetch thread(s); a subclass without it cannot be instantiated.
+    ``read_workers`` caps concurrent prefetch decodes.
+    """
+
+    ndim = 3
+    dtype = np.dtype(np.float32)
+    read_workers = 1
+
+    def __init__(self, cache: "FrameCache", key, shape: Tuple[int, int, int]):
+        self.cache = cache
+        self.key = key
+        self.shape = tuple(int(s) for s in shape)
+
+    # --- array-like surface -------------------------------------------------
+    def __len__(self):
+        return self.shape[0]
+
+    @property
+    def size(self) -> int:
+        return int(np.prod(self.shape))
+
+    @property
+    def frame_nbytes(self) -> int:
+        return int(self.shape[1] * self.shape[2] * self.dtype.itemsize)
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the fully materialized stack (not what is held in memory)."""
+        return self.shape[0] * self.frame_nbytes
+
+    def __getitem__(self, item):
+        if isinstance(item, tuple):
+            if not item:
+                return self[:]
+            head, rest = item[0], item[1:]
+            if isinstance(head, (int, np.integer)):
+                return self[head][rest]
+            return self[head][(slice(None),) + rest]
+        if isinstance(item, (int, np.integer)):
+            return self.frame(int(item))
+        if isinstance(item, slice):
+            indices = range(*item.indices(self.shape[0]))
+            return self._stack(indices)
+        if item is Ellipsis:
+            return self[:]
+        indices = np.arange(self.shape[0])[item]
+        if np.ndim(indices) == 0:
+            return self.frame(int(indices))
+        return self._stack(indices)
+
+    def __array__(self, dtype=None, copy=None):
+        arr = self[:]
+        return arr if dtype is None else arr.astype(dtype, copy=False)
+
+    def __repr__(self):
+        return f"{type(self).__name__}(key={self.key!r}, shape={self.shape})"
+
+    # --- frame access -------------------------------------------------------
+    def frame(self, index: int) -> np.ndarray:
+        """Return frame ``index`` (read-only) and move the prefetch playhead to it."""
+        n = self.shape[0]
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError(f"frame index {index} out of range for {n} frames")
+        data = self.cache.get(self, index)
+        self.cache.set_playhead(self, index)
+        return data
+
+    def _stack(self, indices) -> np.ndarray:
+        out = np.empty((len(indices),) + self.shape[1:], dtype=self.dtype)
+        for i, idx in enumerate(indices):
+            out[i] = self.cache.get(self, int(idx))
+        return out
+
+    @abstractmethod
+    def read_frame(self, index: int) -> np.ndarray:
+        """Decode frame ``index`` as float32 (called from the prefetch thread(s))."""
+
+
+class H5FrameStack(FrameStack):
+    """Frames of a 3D HDF5 dataset, read through the cache's shared file handle.
+
+    ``clean=False`` keeps overflow values instead of zeroing them (frames are
+    still converted to float32).
+    """
+
+    def __init__(self, cache: "FrameCache", file_path: str, dataset_path: str, clean: bool = True):
+        self.file_path = str(file_path)
+        self.dataset_path = str(dataset_path)
+        self.clean = bool(clean)
+        dset = cache.file(self.file_path)[self.dataset_path]
+        if not isinstance(dset, h5py.Dataset) or dset.ndim != 3:
+            raise ValueError(f"{dataset_path} is not a 3D dataset")
+        self.source_dtype = dset.dtype
+        super().__init__(cache, (self.file_path, self.dataset_path, self.clean), dset.shape)
+
+    def read_frame(self, index: int) -> np.ndarray:
+        dset = self.cache.file(self.file_path)[self.dataset_path]
+        if self.clean:
+            return clean_frame(dset[index])
+        return np.array(dset[index], dtype=np.float32)
+
+
+class FrameCache:
+    """Byte-budgeted LRU of decoded frames plus a background prefetcher.
+
+    Args:
+        max_bytes: budget for decoded frames held in memory.
+        ahead: frames to prefetch in the direction of travel (wraps at the end
+            so auto-replay stays warm).
+        behind: frames to keep warm behind the playhead for scrubbing back.
+        workers: size of the pool used for sources with ``read_workers > 1``.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, ahead: int = DEFAULT_AHEAD,
+                 behind: int = DEFAULT_BEHIND, workers: Optional[int] = None):
+        self.max_bytes = int(max_bytes)
+        self.ahead = int(ahead)
+        self.behind = int(behind)
+        self.workers = int(workers or min(8, os.cpu_count() or 1))
+
+        self._lock = threading.RLock()
+        self._wake = threading.Condition(self._lock)
+        self._handles = {}
+        self._released = set()
+        self._frames = OrderedDict()  # (source key, index) -> ndarray
+        self._inflight = set()  # keys currently being decoded
+        self._bytes = 0
+        # Bumped whenever frames are dropped; a decode that started before
+        # the bump must not put its (possibly stale) frame back.
+        self._generation = 0
+
+        # Prefetch plan: replaced (not appended to) whenever the playhead moves.
+        self._plan = []
+        self._plan_source: Optional[FrameStack] = None
+        self._last_index = {}
+        self._thread = None
+        self._pool = None
+        self._stopped = False
+
+        self.hits = 0
+        self.misses = 0
+
+    # --- file handles -------------------------------------------------------
+    def file(self, path: str) -> h5py.File:
+        """Return the shared read-only handle for ``path``, opening it once."""
+        path = str(path)
+        with self._lock:
+            if path in self._released:
+                raise OSError(f"{path} is released for writing")
+            h5 = self._handles.get(path)
+            if h5 is None or not h5.id.valid:
+                h5 = h5py.File(path, 'r')
+                self._handles[path] = h5
+            return h5
+
+    def close_file(self, path: str) -> None:
+        """Close the handle for ``path`` and drop its frames from the cache."""
+        path = str(path)
+        with self._lock:
+            self._drop(lambda key: isinstance(key[0], tuple) and key[0] and key[0][0] == path)
+            self._generation += 1
+            if self._plan_source is not None and getattr(self._plan_source, 'file_path', None) == path:
+                self._plan = []
+                self._plan_source = None
+            h5 = self._handles.pop(path, None)
+        if h5 is not None:
+            try:
+                h5.close()
+            except Exception:
+                pass
+
+    @contextmanager
+    def released(self, path: str):
+        """Close ``path`` and keep it closed for the duration of a write.
+
+        HDF5 refuses to open a file for writing while this process holds a
+        read-only handle to it, so writers (e.g. ROI saves into the current
+        file) wrap their ``h5py.File(path, 'a')`` block in this.
+        """
+        path = str(path)
+        with self._lock:
+            self._released.add(path)
+        try:
+            self.close_file(path)
+            yield
+        finally:
+            with self._lock:
+                self._released.discard(path)
+
+    # --- frames -------------------------------------------------------------
+    def get(self, source: FrameStack, index: int) -> np.ndarray:
+        """Return a cached frame, decoding it synchronously on a miss."""
+        key = (source.key, index)
+        with self._lock:
+            # A prefetch decode of this frame is underway: wait for it rather
+            # than decoding the same frame twice.
+            while key in self._inflight:
+                self._wake.wait()
+            data = self._frames.get(key)
+            if data is not None:
+                self._frames.move_to_end(key)
+                self.hits += 1
+                return data
+            self.misses += 1
+        return self._load(source, index)
+
+    def contains(self, source: FrameStack, index: int) -> bool:
+        with self._lock:
+            return (source.key, index) in self._frames
+
+    def _load(self, source: FrameStack, index: int) -> np.ndarray:
+        with self._lock:
+            generation = self._generation
+        data = source.read_frame(index)
+        data.flags.writeable = False
+        with self._lock:
+            key = (source.key, index)
+            existing = self._frames.get(key)
+            if existing is not None:
+                return existing
+            if generation != self._generation:
+                # The file was closed (or the cache cleared) during the read
+                return data
+            self._frames[key] = data
+            self._bytes += data.nbytes
+            self._evict(keep=key)
+        return data
+
+    def _evict(self, keep) -> None:
+        while self._bytes > self.max_bytes and len(self._frames) > 1:
+            key, data = next(iter(self._frames.items()))
+            if key == keep:
+                self._frames.move_to_end(key)
+                continue
+            del self._frames[key]
+            self._bytes -= data.nbytes
+
+    def _drop(self, predicate) -> None:
+        for key in [k for k in self._frames if predicate(k)]:
+            self._bytes -= self._frames.pop(key).nbytes
+
+    def clear(self) -> None:
+        with self._lock:
+            self._frames.clear()
+            self._bytes = 0
+            self._generation += 1
+            self._plan = []
+            self._plan_source = None
+            self._inflight.clear()
+            self._wake.notify_all()
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+    def __len__(self):
+        return len(self._frames)
+
+    # --- prefetch -----------------------------------------------------------
+    def window(self, source: FrameStack, index: int, direction: int = 1):
+        """Indices to keep warm around ``index``, nearest first, within budget."""
+        n = source.shape[0]
+        per_frame = max(1, source.frame_nbytes)
+        # Leave half the budget for frames the user is actually looking at.
+        budget_frames = max(1, (self.max_bytes // 2) // per_frame)
+        ahead = min(self.ahead, budget_frames, n - 1)
+        behind = min(self.behind, max(0, budget_frames - ahead), n - 1)
+        order = []
+        step = 1 if direction >= 0 else -1
+        for k in range(1, max(ahead, behind) + 1):
+            if k <= ahead:
+                order.append((index + step * k) % n)
+            if k <= behind:
+                j = index - step * k
+                if 0 <= j < n:
+                    order.append(j)
+        seen = {index}
+        return [i for i in order if not (i in seen or seen.add(i))]
+
+    def set_playhead(self, source: FrameStack, index: int) -> None:
+        """Move the prefetch window to ``index`` of ``source``."""
+        with self._lock:
+            if self._stopped:
+                return
+            last = self._last_index.get(source.key)
+            direction = -1 if last is not None and index < last and last - index < source.shape[0] // 2 else 1
+            self._last_index[source.key] = index
+            self._plan = [i for i in self.window(source, index, direction)
+                          if (source.key, i) not in self._frames]
+            self._plan_source = source
+            if self._plan:
+                self._ensure_thread()
+                self._wake.notify_all()
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._prefetch_loop, name="FrameCachePrefetch", daemon=True)
+            self._thread.start()
+
+    def _prefetch_loop(self) -> None:
+        while True:
+            with self._lock:
+                while not self._stopped and (
+                        not self._plan
+                        or len(self._inflight) >= max(1, self._plan_source.read_workers)):
+                    self._wake.wait()
+                if self._stopped:
+                    return
+                source = self._plan_source
+                index = self._plan.pop(0)
+                key = (source.key, index)
+                if key in self._frames or key in self._inflight:
+                    continue
+                self._inflight.add(key)
+                pool = None
+                if source.read_workers > 1:
+                    if self._pool is None:
+                        self._pool = ThreadPoolExecutor(max_workers=self.workers,
+                                                        thread_name_prefix="FrameCacheDecode")
+                    pool = self._pool
+            if pool is not None:
+                pool.submit(self._prefetch_one, source, index)
+            else:
+                self._prefetch_one(source, index)
+
+    def _prefetch_one(self, source: FrameStack, index: int) -> None:
+        key = (source.key, index)
+        try:
+            self._load(source, index)
+        except Exception as e:
+            logger.debug(f"Prefetch of frame {index} from {source!r} failed: {e}")
+            with self._lock:
+                if self._plan_source is source:
+                    self._plan = []
+        finally:
+            with self._lock:
+                self._inflight.discard(key)
+                self._wake.notify_all()
+
+    def close(self) -> None:
+        """Stop the prefetcher, close all handles and drop all frames."""
+        with self._lock:
+            self._stopped = True
+            self._wake.notify_all()
+            handles = list(self._handles.values())
+            self._handles.clear()
+        thread = self._thread
+        if thread is not None and thread.is_alive():
+            thread.join(timeout=2.0)
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        for h5 in handles:
+            try:
+                h5.close()
+            except Exception:
+                pass
+        self.clear()
+
+
+_default_cache = None
+
+
+def get_frame_cache() -> FrameCache:
+    """Return the process-wide frame cache shared by Workbench windows."""
+    global _default_cache
+    if _default_cache is None or _default_cache._stopped:
+        _default_cache = FrameCache()
+    return _default_cache
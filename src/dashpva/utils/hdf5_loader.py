@@ -853,31 +853,7 @@ class HDF5Loader(LogMixin):
                 
                 # /entry/data/metadata
                 metadata_grp = data_grp.create_group(self.hdf5_structure['metadata'].split('/')[-1])
-                for key, value in meta.items():
-                    try:
-                        if isinstance(value, (int, float, np.number)):
-                            metadata_grp.create_dataset(key, data=value)
-                        elif isinstance(value, str):
-                            dt = h5py.string_dtype(encoding='utf-8')
-                            metadata_grp.create_dataset(key, data=value, dtype=dt)
-                        elif isinstance(value, (list, tuple, np.ndarray)):
-                            if len(value) > 0:
-                                if all(isinstance(v, (int, float, np.number)) for v in value):
-                                    metadata_grp.create_dataset(key, data=np.array(value))
-                                elif all(isinstance(v, str) for v in value):
-                                    dt = h5py.string_dtype(encoding='utf-8')
-                                    metadata_grp.create_dataset(key, data=np.array(value, dtype=dt))
-                                else:
-                                    dt = h5py.string_dtype(encoding='utf-8')
-                                    metadata_grp.create_dataset(key, data=str(value), dtype=dt)
-                        else:
-                            dt = h5py.string_dtype(encoding='utf-8')
-                            metadata_grp.create_dataset(key, data=str(value), dtype=dt)
-                    except Exception as e:
-                        try:
-                            self.logger.warning(f"Could not save metadata key '{key}': {e}")
-                        except Exception:
-                            pass
+                self.write_metadata_group(metadata_grp, meta)
 
                 # Attributes for quick discovery
                 entry_grp.attrs['data_type'] = meta.get('data_type', inferred_type)
@@ -893,6 +869,40 @@ class HDF5Loader(LogMixin):
             self._handle_saving_error(e, file_path)
             return False
     
+    def write_metadata_group(self, metadata_grp, meta: dict) -> None:
+        """
+        Write a flat metadata dict as datasets under ``metadata_grp``.
+
+        Numbers and numeric sequences are stored natively, strings and string
+        lists as UTF-8, anything else as its string form. Keys that fail are
+        logged and skipped.
+        """
+        for key, value in meta.items():
+            try:
+                if isinstance(value, (int, float, np.number)):
+                    metadata_grp.create_dataset(key, data=value)
+                elif isinstance(value, str):
+                    dt = h5py.string_dtype(encoding='utf-8')
+                    metadata_grp.create_dataset(key, data=value, dtype=dt)
+                elif isinstance(value, (list, tuple, np.ndarray)):
+                    if len(value) > 0:
+                        if all(isinstance(v, (int, float, np.number)) for v in value):
+                            metadata_grp.create_dataset(key, data=np.array(value))
+                        elif all(isinstance(v, str) for v in value):
+                            dt = h5py.string_dtype(encoding='utf-8')
+                            metadata_grp.create_dataset(key, data=np.array(value, dtype=dt))
+                        else:
+                            dt = h5py.string_dtype(encoding='utf-8')
+                            metadata_grp.create_dataset(key, data=str(value), dtype=dt)
+                else:
+                    dt = h5py.string_dtype(encoding='utf-8')
+                    metadata_grp.create_dataset(key, data=str(value), dtype=dt)
+            except Exception as e:
+                try:
+                    self.logger.warning(f"Could not save metadata key '{key}': {e}")
+                except Exception:
+                    pass
+
     def extract_slice(self, file_path: str, points: np.ndarray, intensities: np.ndarray,
                       metadata: Optional[dict] = None, shape: Optional[Tuple[int, int]] = None) -> bool:
         """
@@ -0,0 +1,278 @@
+"""
+Telemetry for the hpcConsumer / hpcCollector processes launched by the workflow
+
+With ``--report-period`` set, every pvapy consumer and collector prints its
+statistics dictionary to stdout (pretty-printed by ``PvaPyPrettyPrinter``,
+one dict per consumer, floats carrying units such as ``9.9000Hz``). The
+workflow already reads that stdout line by line, so this module turns the same
+lines into data instead of text:
+
+- ``StatsBlockParser`` reassembles the multi-line dicts and evaluates them.
+- ``sample_from_stats`` reduces one dict to a flat ``ConsumerSample``
+  (counters, backlog, drops, errors, estimated queue latency).
+- ``TelemetryStore`` keeps a bounded time series per consumer and derives the
+  interval throughput from successive counters (pvapy's own rates are
+  averages since the start of receiving, which hide stalls).
+- ``JsonlRecorder`` appends samples as JSON lines, a machine-readable record
+  of a run that can be tailed or loaded after the fact.
+"""
+
+import ast
+import json
+import logging
+import re
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from dashpva.utils.output_files import output_subdir
+
+logger = logging.getLogger(__name__)
+
+# Samples kept per consumer (about 10 minutes at the default 1 s report period)
+DEFAULT_HISTORY = 600
+# A stats dict longer than this is not a stats dict; stop accumulating
+_MAX_BLOCK_LINES = 400
+
+# FloatWithUnits repr: 9.9000Hz, 12.3000s, 0.0MBps, 25.0fps
+_UNIT_VALUE = re.compile(r"(?<![\w'\".])(-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?)(?:Hz|MBps|fps|s)\b")
+# PrettyPrinter depth limit placeholders
+_ELIDED = re.compile(r"\{\.\.\.\}|\[\.\.\.\]")
+_QUOTED = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"")
+
+SERIES_FIELDS = ('rate', 'processed_rate', 'queued', 'dropped', 'errors', 'latency')
+
+
+def default_telemetry_dir() -> Path:
+    """``<OUTPUT_PATH>/telemetry`` — where the workflow records consumer samples."""
+    return output_subdir('telemetry')
+
+
+class StatsBlockParser:
+    """Reassemble pvapy stats dicts from stdout lines.
+
+    ``feed`` returns the completed dict when ``line`` closes one, else None.
+    Lines outside a dict are ignored; a block that does not evaluate is
+    dropped with a debug message.
+    """
+
+    def __init__(self):
+        self._lines: List[str] = []
+        self._depth = 0
+
+    def reset(self) -> None:
+        self._lines = []
+        self._depth = 0
+
+    def feed(self, line: str) -> Optional[dict]:
+        stripped = line.strip()
+        if not self._lines:
+            if not stripped.startswith('{'):
+                return None
+        self._lines.append(stripped)
+        bare = _QUOTED.sub('', stripped)
+        self._depth += bare.count('{') - bare.count('}')
+        if self._depth > 0:
+            if len(self._lines) > _MAX_BLOCK_LINES:
+                self.reset()
+            return None
+        text = ' '.join(self._lines)
+        self.reset()
+        return parse_stats(text)
+
+
+def parse_stats(text: str) -> Optional[dict]:
+    """Evaluate one pretty-printed pvapy stats dict; unit suffixes are dropped."""
+    text = _ELIDED.sub('None', text)
+    # Only rewrite outside string literals so channel names stay intact
+    parts = []
+    pos = 0
+    for m in _QUOTED.finditer(text):
+        parts.append(_UNIT_VALUE.sub(r'\1', text[pos:m.start()]))
+        parts.append(m.group(0))
+        pos = m.end()
+    parts.append(_UNIT_VALUE.sub(r'\1', text[pos:]))
+    try:
+        value = ast.literal_eval(''.join(parts))
+    except (ValueError, SyntaxError) as e:
+        logger.debug(f"Unparseable stats block ({e}): {text[:120]}")
+        return None
+    return value if isinstance(value, dict) else None
+
+
+@dataclass
+class ConsumerSample:
+    """One stats report of one consumer, reduced to the numbers worth plotting.
+
+    Counters are cumulative as reported by pvapy. ``rate`` is the interval
+    throughput (filled in by ``TelemetryStore``), ``processed_rate`` pvapy's
+    average since receiving started, ``latency`` the estimated time a newly
+    queued frame waits (backlog / throughput).
+    """
+    t: float
+    source: str
+    consumer_id: int
+    channel: str = ''
+    received: int = 0
+    processed: int = 0
+    published: int = 0
+    queued: int = 0
+    dropped: int = 0
+    errors: int = 0
+    processed_rate: float = 0.0
+    rate: float = 0.0
+    latency: float = 0.0
+
+    @property
+    def key(self) -> Tuple[str, int]:
+        return (self.source, self.consumer_id)
+
+    @property
+    def label(self) -> str:
+        return f"{self.source} {self.consumer_id}"
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self), sort_keys=True)
+
+
+def _int(d: dict, key: str) -> int:
+    v = d.get(key) if isinstance(d, dict) else None
+    return int(v) if isinstance(v, (int, float)) else 0
+
+
+def _float(d: dict, key: str) -> float:
+    v = d.get(key) if isinstance(d, dict) else None
+    return float(v) if isinstance(v, (int, float)) else 0.0
+
+
+def sample_from_stats(source: str, stats: dict, t: Optional[float] = None) -> Optional[ConsumerSample]:
+    """Flatten a consumer or collector stats dict; None for anything else (e.g. combined stats)."""
+    t = time.time() if t is None else t
+    processor = stats.get('processorStats') or {}
+    if 'consumerId' in stats:
+        receiver = stats.get('receiverStats') or {}
+        queue = stats.get('queueStats') or {}
+        publisher = stats.get('publisherStats') or {}
+        return ConsumerSample(
+            t=t, source=source, consumer_id=_int(stats, 'consumerId'),
+            channel=str(stats.get('inputChannel') or ''),
+            received=_int(receiver, 'nReceived'),
+            processed=_int(processor, 'nProcessed'),
+            published=_int(publisher, 'nPublished'),
+            queued=_int(queue, 'nQueued'),
+            # Monitor overruns, full-queue rejections and id gaps all lose frames
+            dropped=(_int(receiver, 'nOverruns') + _int(receiver, 'nRejected')
+                     + _int(queue, 'nRejected') + _int(processor, 'nMissed')),
+            errors=_int(receiver, 'nErrors') + _int(processor, 'nErrors') + _int(publisher, 'nErrors'),
+            processed_rate=_float(processor, 'processedRate'),
+        )
+    if 'collectorId' in stats:
+        collector = stats.get('collectorStats') or {}
+        producers = stats.get('producerStats') or {}
+        received = sum(_int(p.get('receiverStats'), 'nReceived')
+                       for p in producers.values() if isinstance(p, dict))
+        return ConsumerSample(
+            t=t, source=source, consumer_id=_int(stats, 'collectorId'),
+            channel=','.join(sorted(k for k in producers)),
+            received=received or _int(collector, 'nCollected'),
+            processed=_int(processor, 'nProcessed'),
+            queued=_int(collector, 'nCached'),
+            dropped=_int(collector, 'nRejected') + _int(collector, 'nMissed'),
+            errors=_int(processor, 'nErrors'),
+            processed_rate=_float(processor, 'processedRate'),
+        )
+    return None
+
+
+class TelemetryStore:
+    """Bounded per-consumer time series of ``ConsumerSample``s."""
+
+    def __init__(self, history: int = DEFAULT_HISTORY):
+        self.history = int(history)
+        self._series: Dict[Tuple[str, int], Deque[ConsumerSample]] = {}
+        self.t0: Optional[float] = None
+
+    def add(self, sample: ConsumerSample) -> ConsumerSample:
+        """Append ``sample`` after deriving its interval rate and latency from the previous one."""
+        if self.t0 is None:
+            self.t0 = sample.t
+        series = self._series.setdefault(sample.key, deque(maxlen=self.history))
+        prev = series[-1] if series else None
+        dt = sample.t - prev.t if prev is not None else 0.0
+        if prev is not None and dt > 0 and sample.processed >= prev.processed:
+            sample.rate = (sample.processed - prev.processed) / dt
+        else:
+            # First report, or the consumer restarted / reset its stats
+            sample.rate = sample.processed_rate
+        throughput = sample.rate or sample.processed_rate
+        sample.latency = sample.queued / throughput if throughput > 0 else 0.0
+        series.append(sample)
+        return sample
+
+    def keys(self) -> List[Tuple[str, int]]:
+        return sorted(self._series)
+
+    def latest(self, key) -> Optional[ConsumerSample]:
+        series = self._series.get(tuple(key))
+        return series[-1] if series else None
+
+    def series(self, key, field: str) -> Tuple[np.ndarray, np.ndarray]:
+        """(seconds since the first sample, values) of ``field`` for one consumer."""
+        if field not in SERIES_FIELDS:
+            raise ValueError(f"Unknown telemetry field {field!r}")
+        samples = self._series.get(tuple(key)) or ()
+        t0 = self.t0 or 0.0
+        t = np.fromiter((s.t - t0 for s in samples), dtype=np.float64, count=len(samples))
+        v = np.fromiter((getattr(s, field) for s in samples), dtype=np.float64, count=len(samples))
+        return t, v
+
+    def clear(self, source: Optional[str] = None) -> None:
+        """Forget every consumer, or only those of ``source``."""
+        if source is None:
+            self._series.clear()
+            self.t0 = None
+            return
+        for key in [k for k in self._series if k[0] == source]:
+            del self._series[key]
+
+
+class JsonlRecorder:
+    """Append samples to a JSON-lines file, one object per line."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._file = None
+
+    def write(self, sample: ConsumerSample) -> None:
+        try:
+            if self._file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = open(self.path, 'a', buffering=1)
+            self._file.write(sample.to_json() + '\n')
+        except OSError as e:
+            logger.warning(f"Could not record telemetry to {self.path}: {e}")
+            self.close()
+
+    def close(self) -> None:
+        if self._file is not None:
+            try:
+                self._file.close()
+            except OSError:
+                pass
+            self._file = None
+
+
+def read_jsonl(path) -> List[ConsumerSample]:
+    """Load samples written by ``JsonlRecorder``; malformed lines are skipped."""
+    out = []
+    with open(path) as f:
+        for line in f:
+            try:
+                out.append(ConsumerSample(**json.loads(line)))
+            except (ValueError, TypeError):
+                continue
+    return out
@@ -8,12 +8,125 @@ import numpy as np
 logger = logging.getLogger(__name__)
 
 
+class PixelStatistics:
+    """
+    Streaming per-pixel statistics over a sequence of detector frames.
+
+    Consumes one 2D frame at a time so dead/hot pixel detection never holds the
+    full (N, H, W) stack in memory:
+
+    - mean/variance: Welford's running update in float64 (variance matches
+      ``np.var(stack, axis=0)``).
+    - negative: running OR of ``frame < 0``.
+    - median: exact for the first ``reservoir_size`` frames, then an approximate
+      median from a uniform reservoir sample of frames (algorithm R, one draw per
+      frame). Only kept when ``track_median`` is True.
+
+    Memory is ~3 float64 frames plus ``reservoir_size`` float32 frames when the
+    median is tracked, independent of the number of frames consumed.
+    """
+
+    DEFAULT_RESERVOIR_SIZE = 31
+
+    def __init__(self, track_median=False, reservoir_size=DEFAULT_RESERVOIR_SIZE, seed=0):
+        self.track_median = bool(track_median)
+        self.reservoir_size = max(1, int(reservoir_size))
+        self.count = 0
+        self.shape = None
+        self._mean = None
+        self._m2 = None
+        self._negative = None
+        self._reservoir = None
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, frame):
+        """Fold one 2D frame into the running statistics."""
+        frame = np.asarray(frame)
+        if frame.ndim != 2:
+            raise ValueError(f"Expected 2D frame, got shape {frame.shape}")
+        if self.shape is None:
+            self.shape = frame.shape
+            self._mean = np.zeros(frame.shape, dtype=np.float64)
+            self._m2 = np.zeros(frame.shape, dtype=np.float64)
+            self._negative = np.zeros(frame.shape, dtype=bool)
+            if self.track_median:
+                self._reservoir = np.empty((self.reservoir_size,) + frame.shape, dtype=np.float32)
+        elif frame.shape != self.shape:
+            raise ValueError(f"Frame shape {frame.shape} does not match {self.shape}")
+
+        self.count += 1
+        x = frame.astype(np.float64)
+        delta = x - self._mean
+        self._mean += delta / self.count
+        self._m2 += delta * (x - self._mean)
+        np.logical_or(self._negative, frame < 0, out=self._negative)
+
+        if self.track_median:
+            if self.count <= self.reservoir_size:
+                self._reservoir[self.count - 1] = frame
+            else:
+                slot = int(self._rng.integers(0, self.count))
+                if slot < self.reservoir_size:
+                    self._reservoir[slot] = frame
+
+    def update_many(self, frames):
+        """Fold an iterable of frames (list, (N, H, W) array, h5py dataset, FrameStack)."""
+        for frame in frames:
+            self.update(frame)
+        return self
+
+    @classmethod
+    def from_h5(cls, file_path, dataset_path='entry/data/data', start=0, stop=None, **kwargs):
+        """Accumulate statistics over frames [start, stop) of a 3D HDF5 dataset, one frame at a time."""
+        import h5py
+        stats = cls(**kwargs)
+        with h5py.File(file_path, 'r') as f:
+            dset = f[dataset_path]
+            if dset.ndim != 3:
+                raise ValueError(f"Expected 3D dataset at {dataset_path}, got shape {dset.shape}")
+            stop = dset.shape[0] if stop is None else min(int(stop), dset.shape[0])
+            for i in range(int(start), stop):
+                stats.update(dset[i])
+        return stats
+
+    @property
+    def mean(self):
+        return self._mean
+
+    @property
+    def variance(self):
+        """Population variance per pixel (ddof=0)."""
+        if self.count == 0:
+            return None
+        return self._m2 / self.count
+
+    @property
+    def negative(self):
+        """True where any frame read below zero.
+
+        Detector intensities are photon/event counts and cannot be physically
+        negative, so a negative value (e.g. the ``-1`` bad-pixel sentinel some
+        detectors emit) marks an unphysical/bad pixel. Zero is intentionally left
+        unmasked — it is a valid reading (notably in dark frames).
+        """
+        return self._negative
+
+    @property
+    def median(self):
+        """Per-pixel median (exact up to reservoir_size frames, sampled beyond)."""
+        if not self.track_median or self.count == 0:
+            return None
+        n = min(self.count, self.reservoir_size)
+        return np.median(self._reservoir[:n], axis=0)
+
+
 class MaskManager:
     """
     Manages detector pixel masks for DashPVA.
 
     Handles loading (.edf, .npy, .tif/.tiff, .json), combining (OR), saving, and applying masks.
-    Also provides temporal-variance-based dead pixel detection.
+    Also provides temporal-variance-based dead pixel detection, streamed through
+    PixelStatistics so frames never need to be stacked.
 
     Convention: True = masked pixel, False = good pixel (matches pyFAI).
     """
@@ -185,23 +298,6 @@ class MaskManager:
         logger.info(f"Saved active mask: {save_path} ({self.num_masked_pixels} masked pixels)")
         return save_path
 
-    @staticmethod
-    def _unphysical_negative_mask(stack):
-        """Flag pixels that read negative in any frame.
-
-        Detector intensities are photon/event counts and cannot be physically
-        negative, so a negative value (e.g. the ``-1`` bad-pixel sentinel some
-        detectors emit) marks an unphysical/bad pixel. Zero is intentionally left
-        unmasked — it is a valid reading (notably in dark frames).
-
-        Args:
-            stack: 3D array (N frames, H, W)
-
-        Returns:
-            boolean mask (True = pixel is negative in at least one frame)
-        """
-        return np.any(stack < 0, axis=0)
-
     def detect_dead_pixels(self, frames, variance_threshold=1.0):
         """
         Detect stuck/dead pixels using temporal variance (illuminated mode).
@@ -211,26 +307,26 @@ class MaskManager:
         read negative (unphysical, e.g. the -1 bad-pixel sentinel) are also masked.
 
         Args:
-            frames: list of 2D numpy arrays (N frames)
+            frames: iterable of 2D numpy arrays (N frames), or a PixelStatistics
+                already accumulated from them
             variance_threshold: pixels with var < this are dead
 
         Returns:
             boolean mask (True = dead pixel)
         """
-        if len(frames) < 3:
+        stats = self._as_statistics(frames, track_median=False)
+        if stats.count < 3:
             logger.warning("Need at least 3 frames for dead pixel detection")
             return None
 
-        stack = np.stack(frames, axis=0).astype(np.float64)
-        pixel_variance = np.var(stack, axis=0)
-        dead_mask = pixel_variance < variance_threshold
+        dead_mask = stats.variance < variance_threshold
         # Also flag unphysical negative pixels (counts can't be < 0).
-        neg_mask = self._unphysical_negative_mask(stack)
+        neg_mask = stats.negative
         dead_mask = dead_mask | neg_mask
         num_dead = int(np.sum(dead_mask))
         logger.info(f"Dead pixel detection (illuminated): {num_dead} pixels masked "
                     f"(variance < {variance_threshold} or negative; "
-                    f"{int(np.sum(neg_mask))} negative, from {len(frames)} frames)")
+                    f"{int(np.sum(neg_mask))} negative, from {stats.count} frames)")
         return dead_mask
 
     def detect_hot_pixels(self, frames, sigma=5.0):
@@ -249,20 +345,22 @@ class MaskManager:
         genuinely stuck/hot pixels.
 
         Args:
-            frames: list of 2D numpy arrays (N dark frames)
+            frames: iterable of 2D numpy arrays (N dark frames), or a
+                PixelStatistics accumulated with track_median=True
             sigma: number of MAD above global median to flag (default: 5)
 
         Returns:
             boolean mask (True = hot pixel)
         """
-        if len(frames) < 3:
+        stats = self._as_statistics(frames, track_median=True)
+        if stats.count < 3:
             logger.warning("Need at least 3 frames for hot pixel detection")
             return None
-
-        stack = np.stack(frames, axis=0).astype(np.float64)
+        if not stats.track_median:
+            raise ValueError("Hot pixel detection needs PixelStatistics(track_median=True)")
 
         # Median across frames — rejects cosmic rays
-        pixel_median = np.median(stack, axis=0)
+        pixel_median = stats.median.astype(np.float64)
 
         # Robust threshold using MAD (Median Absolute Deviation)
         global_median = np.median(pixel_median)
@@ -281,15 +379,22 @@ class MaskManager:
         # Also flag unphysical negative pixels (dark frames may read zero, but
         # never below zero); catches the -1 bad-pixel sentinel that the hot/high
         # threshold above would otherwise miss.
-        neg_mask = self._unphysical_negative_mask(stack)
+        neg_mask = stats.negative
         hot_mask = hot_mask | neg_mask
         num_hot = int(np.sum(hot_mask))
         logger.info(f"Hot pixel detection (dark): {num_hot} pixels masked (above "
                     f"threshold {threshold:.1f} or negative; median={global_median:.1f}, "
                     f"MAD_std={mad_std:.1f}, sigma={sigma}, "
-                    f"{int(np.sum(neg_mask))} negative, from {len(frames)} frames)")
+                    f"{int(np.sum(neg_mask))} negative, from {stats.count} frames)")
         return hot_mask
 
+    @staticmethod
+    def _as_statistics(frames, track_median):
+        """Return frames as a PixelStatistics, streaming them through one if needed."""
+        if isinstance(frames, PixelStatistics):
+            return frames
+        return PixelStatistics(track_median=track_median).update_many(frames)
+
     def apply_to_image(self, image):
         """
         Apply mask to image for display. Returns a copy with masked pixels set to 0.
@@ -1,6 +1,10 @@
+import os
 import shutil
+import time
+from concurrent.futures import as_completed
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List, Optional
+from typing import Callable, Dict, List, Optional
 
 import h5py
 import numpy as np
@@ -8,6 +12,7 @@ import toml
 
 import dashpva.settings as settings
 from dashpva.utils.log_manager import get_default_manager
+from dashpva.utils.worker_pool import spawn_pool
 
 # Use central LogManager rather than local handler configuration
 logger = get_default_manager().get_logger(__name__)
@@ -54,12 +59,54 @@ def _find_dataset_path_by_name(h5_file: h5py.File, base_group_path: str, dataset
     return found_path
 
 
-def resolve_pv_dataset(h5_file: h5py.File, pv: str, base_group: str = "entry/data/metadata"):
+class DatasetIndex:
+    """
+    Leaf-name -> dataset path index for everything under base_group, built with a single visititems walk.
+
+    Replaces the per-PV _find_dataset_path_by_name walk during a conversion: build it once per file,
+    then keep it current with add() as the converter creates datasets. Lookups re-validate the path
+    against the file so datasets deleted after indexing are never returned.
+    """
+
+    def __init__(self, h5_file: h5py.File, base_group: str):
+        self.base_group = base_group
+        self._paths: Dict[str, List[str]] = {}
+        if base_group not in h5_file:
+            return
+
+        def visitor(name, obj):
+            if isinstance(obj, h5py.Dataset):
+                self._paths.setdefault(name.split('/')[-1], []).append(f"{base_group}/{name}")
+
+        h5_file[base_group].visititems(visitor)
+
+    def __len__(self):
+        return sum(len(v) for v in self._paths.values())
+
+    def add(self, path: str):
+        """Record a dataset created after the index was built."""
+        paths = self._paths.setdefault(path.split('/')[-1], [])
+        if path not in paths:
+            paths.append(path)
+
+    def find(self, h5_file: h5py.File, dataset_name: str):
+        """Return the first indexed dataset path with this leaf name that still exists, else None."""
+        for path in self._paths.get(dataset_name, ()):
+            try:
+                if path in h5_file and isinstance(h5_file[path], h5py.Dataset):
+                    return path
+            except Exception:
+                pass
+        return None
+
+
+def resolve_pv_dataset(h5_file: h5py.File, pv: str, base_group: str = "entry/data/metadata", index: Optional[DatasetIndex] = None):
     """
     Resolve a PV string to an existing dataset path inside the saved HDF5 file using known locations.
     - Position PVs -> {base_group}/motor_positions/{pv}
     - Other PVs -> {base_group}/{pv}
     - Fallback: search under base_group for a dataset whose leaf name == pv
+      (uses index when given, otherwise walks the file)
     Returns (resolved_path, dataset_obj) or (None, None) if not found.
     """
     if not isinstance(pv, str):
@@ -74,7 +121,10 @@ def resolve_pv_dataset(h5_file: h5py.File, pv: str, base_group: str = "entry/dat
         if cand in h5_file and isinstance(h5_file[cand], h5py.Dataset):
             return cand, h5_file[cand]
 
-    found = _find_dataset_path_by_name(h5_file, base_group, pv)
+    if index is not None:
+        found = index.find(h5_file, pv)
+    else:
+        found = _find_dataset_path_by_name(h5_file, base_group, pv)
     if found and found in h5_file and isinstance(h5_file[found], h5py.Dataset):
         return found, h5_file[found]
 
@@ -132,13 +182,13 @@ def _derive_axis_from_pv(pv_string: str, axis_lookup: dict) -> "str | None":
         return None
 
 
-def _process_structure(h5_file: h5py.File, current_path: str, mapping_dict: dict, axis_lookup: dict, stats: dict, base_group: str, include: bool):
+def _process_structure(h5_file: h5py.File, current_path: str, mapping_dict: dict, axis_lookup: dict, stats: dict, base_group: str, include: bool, index: Optional[DatasetIndex] = None):
     for key, value in mapping_dict.items():
         new_path = f"{current_path}/{key}"
 
         if isinstance(value, dict):
             h5_file.require_group(new_path)
-            _process_structure(h5_file, new_path, value, axis_lookup, stats, base_group, include)
+            _process_structure(h5_file, new_path, value, axis_lookup, stats, base_group, include, index)
             continue
 
         try:
@@ -152,6 +202,8 @@ def _process_structure(h5_file: h5py.File, current_path: str, mapping_dict: dict
                     name_path = f"{parent_path}/NAME"
                     if axis_name and name_path not in h5_file:
                         h5_file.create_dataset(name_path, data=axis_name)
+                        if index is not None:
+                            index.add(name_path)
                         stats.setdefault("names", 0)
                         stats["names"] += 1
 
@@ -160,7 +212,7 @@ def _process_structure(h5_file: h5py.File, current_path: str, mapping_dict: dict
                 continue
 
             if isinstance(value, str):
-                resolved_path, source_node = resolve_pv_dataset(h5_file, value, base_group)
+                resolved_path, source_node = resolve_pv_dataset(h5_file, value, base_group, index)
                 if source_node is not None:
                     # Special handling for UB matrix: store first 9 values as a flat array
                     if new_path.endswith("HKL/SPEC/UB_MATRIX_VALUE"):
@@ -176,6 +228,8 @@ def _process_structure(h5_file: h5py.File, current_path: str, mapping_dict: dict
                                 del h5_file[new_path]
                             _ensure_parent_group(h5_file, new_path)
                             h5_file.create_dataset(new_path, data=ub9)
+                            if index is not None:
+                                index.add(new_path)
                             stats["created"] += 1
                             continue
                         except Exception:
@@ -184,6 +238,8 @@ def _process_structure(h5_file: h5py.File, current_path: str, mapping_dict: dict
                     # Generic copy for other datasets
                     ok = copy_dataset_like(h5_file, source_node, new_path)
                     if ok:
+                        if index is not None:
+                            index.add(new_path)
                         stats["created"] += 1
                     else:
                         stats["warnings"] += 1
@@ -197,6 +253,8 @@ def _process_structure(h5_file: h5py.File, current_path: str, mapping_dict: dict
                     del h5_file[new_path]
                 _ensure_parent_group(h5_file, new_path)
                 h5_file.create_dataset(new_path, data=value)
+                if index is not None:
+                    index.add(new_path)
                 stats["constants"] += 1
                 continue
 
@@ -207,7 +265,7 @@ def _process_structure(h5_file: h5py.File, current_path: str, mapping_dict: dict
             logger.exception(f"Error processing key '{key}' at path '{new_path}' with value '{value}'")
 
 
-def _rename_motor_positions_and_link_hkl(h5_file: h5py.File, mapping: dict, base_group: str, axis_lookup: dict = None, force: bool = False):
+def _rename_motor_positions_and_link_hkl(h5_file: h5py.File, mapping: dict, base_group: str, axis_lookup: dict = None, force: bool = False, index: Optional[DatasetIndex] = None):
     """
     Rename PV-named datasets under motor_positions to axis labels and link HKL POSITION to them.
 
@@ -332,7 +390,7 @@ def _rename_motor_positions_and_link_hkl(h5_file: h5py.File, mapping: dict, base
 
         print(f"  POSITION PV from TOML: {pv}")
         try:
-            resolved_path, source_node = resolve_pv_dataset(h5_file, pv, base_group)
+            resolved_path, source_node = resolve_pv_dataset(h5_file, pv, base_group, index)
         except Exception:
             logger.exception(f"Error resolving PV '{pv}' for HKL group '{group_key}'.")
             resolved_path, source_node = (None, None)
@@ -378,6 +436,8 @@ def _rename_motor_positions_and_link_hkl(h5_file: h5py.File, mapping: dict, base
             if not ok:
                 logger.warning(f"Failed to copy POSITION data from '{resolved_path}' to '{target_axis_path}'.")
                 continue
+            if index is not None:
+                index.add(target_axis_path)
 
         # Set units attribute
         try:
@@ -424,6 +484,8 @@ def _rename_motor_positions_and_link_hkl(h5_file: h5py.File, mapping: dict, base
             if name_path not in h5_file:
                 _ensure_parent_group(h5_file, name_path)
                 h5_file.create_dataset(name_path, data=axis_label)
+                if index is not None:
+                    index.add(name_path)
         except Exception:
             logger.exception(f"Failed to link HKL POSITION or set NAME for group '{group_key}'.")
 
@@ -476,7 +538,7 @@ def _print_structure(h5_file: h5py.File, base_group: str, label: str):
     print(f"{'='*60}\n")
 
 
-def _convert_single_file(src_file: Path, toml_path: Path, base_group: str, include: bool, in_place: bool, output_dir: Path, dry_run: bool, force: bool = False) -> str:
+def _convert_single_file(src_file: Path, toml_path: Path, base_group: str, include: bool, in_place: bool, output_dir: Path, dry_run: bool, force: bool = False, stats: Optional[dict] = None) -> str:
     mapping = toml.load(str(toml_path))
     axis_lookup = _build_axis_lookup(mapping)
 
@@ -496,17 +558,22 @@ def _convert_single_file(src_file: Path, toml_path: Path, base_group: str, inclu
     if not in_place:
         shutil.copy2(src_file, dst)
 
-    stats = {"created": 0, "constants": 0, "warnings": 0}
+    if stats is None:
+        stats = {}
+    stats.update({"created": 0, "constants": 0, "warnings": 0})
 
     with h5py.File(str(dst), 'r+') as h5_file:
         _print_structure(h5_file, base_group, f"BEFORE conversion: {dst.name}")
 
         # Ensure base group exists
         h5_file.require_group(base_group)
-        _process_structure(h5_file, base_group + "/HKL", mapping.get('HKL', mapping), axis_lookup, stats, base_group, include)
+        # One traversal per file; every PV lookup below reuses it
+        index = DatasetIndex(h5_file, base_group)
+        stats["indexed"] = len(index)
+        _process_structure(h5_file, base_group + "/HKL", mapping.get('HKL', mapping), axis_lookup, stats, base_group, include, index)
         # Post processing: rename motor position datasets and link HKL/POSITION to axis datasets
         try:
-            _rename_motor_positions_and_link_hkl(h5_file, mapping, base_group, axis_lookup=axis_lookup, force=force)
+            _rename_motor_positions_and_link_hkl(h5_file, mapping, base_group, axis_lookup=axis_lookup, force=force, index=index)
         except Exception:
             logger.exception("Failed post-processing to rename motor positions and link HKL POSITION.")
 
@@ -515,6 +582,116 @@ def _convert_single_file(src_file: Path, toml_path: Path, base_group: str, inclu
     return str(dst)
 
 
+@dataclass
+class FileConversionResult:
+    """Outcome of converting one file in a batch."""
+    source: str
+    output: Optional[str] = None
+    ok: bool = False
+    error: Optional[str] = None
+    elapsed: float = 0.0
+    stats: dict = field(default_factory=dict)
+
+
+def _convert_one(src_file: str, toml_path: str, base_group: str, include: bool, in_place: bool, output_dir: str, dry_run: bool, force: bool) -> FileConversionResult:
+    """Convert a single file and report the outcome instead of raising (process pool entry point)."""
+    result = FileConversionResult(source=str(src_file))
+    t0 = time.perf_counter()
+    try:
+        result.output = _convert_single_file(
+            Path(src_file), Path(toml_path), base_group, include, in_place, Path(output_dir), dry_run,
+            force=force, stats=result.stats,
+        )
+        result.ok = True
+    except Exception as e:
+        logger.exception(f"Failed to convert: {src_file}")
+        result.error = f"{type(e).__name__}: {e}"
+    result.elapsed = time.perf_counter() - t0
+    return result
+
+
+def _default_output_dir(output_dir: Optional[str]) -> Path:
+    # Determine output directory default from settings.OUTPUT_PATH when not provided
+    if output_dir is None:
+        base_out = Path(getattr(settings, 'OUTPUT_PATH', './outputs')).expanduser()
+        return base_out.joinpath('conversions')
+    return Path(output_dir)
+
+
+def _collect_files(hdf5_path: str, recursive: bool, pattern: str) -> List[Path]:
+    src = Path(hdf5_path)
+    if src.is_file():
+        return [src]
+    if src.is_dir():
+        files = src.rglob(pattern) if recursive else src.glob(pattern)
+        return sorted(p for p in files if p.is_file())
+    raise FileNotFoundError(f"Path not found: {hdf5_path}")
+
+
+def convert_batch(
+    toml_path: str,
+    hdf5_path: str,
+    base_group: str = "entry/data/metadata",
+    include: bool = False,
+    in_place: bool = False,
+    output_dir: Optional[str] = None,
+    recursive: bool = False,
+    pattern: str = "*.h5",
+    dry_run: bool = False,
+    force: bool = False,
+    workers: Optional[int] = None,
+    progress: Optional[Callable[[FileConversionResult, int, int], None]] = None,
+) -> List[FileConversionResult]:
+    """
+    Convert every matching HDF5 file across a process pool and return one result per file.
+
+    Takes the same options as convert_files_or_dir, plus:
+    - workers: Number of worker processes (default: CPU count, capped at the number of files).
+               workers=1 converts in this process, one file after another.
+    - progress: Optional callback(result, done, total), called in this process as each file finishes.
+
+    Each file is converted independently, so a failure is reported in its result (ok=False, error)
+    without stopping the batch. Results are returned in the input file order; elapsed is the
+    per-file wall time and stats holds the created/constants/warnings counters.
+    """
+    files = _collect_files(hdf5_path, recursive, pattern)
+    out_dir = str(_default_output_dir(output_dir))
+    if not files:
+        return []
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(int(workers), len(files)))
+    args = [(str(f), str(toml_path), base_group, include, in_place, out_dir, dry_run, force) for f in files]
+
+    t0 = time.perf_counter()
+    results: List[Optional[FileConversionResult]] = [None] * len(files)
+    done = 0
+    if workers == 1:
+        for i, a in enumerate(args):
+            results[i] = _convert_one(*a)
+            done += 1
+            if progress is not None:
+                progress(results[i], done, len(files))
+    else:
+        with spawn_pool(workers) as pool:
+            futures = {pool.submit(_convert_one, *a): i for i, a in enumerate(args)}
+            for fut in as_completed(futures):
+                i = futures[fut]
+                try:
+                    results[i] = fut.result()
+                except Exception as e:
+                    # Worker process died (e.g. crashed inside the HDF5 library)
+                    results[i] = FileConversionResult(source=args[i][0], error=f"{type(e).__name__}: {e}")
+                done += 1
+                if progress is not None:
+                    progress(results[i], done, len(files))
+
+    ok = sum(1 for r in results if r.ok)
+    logger.info(f"Converted {ok}/{len(files)} file(s) with {workers} worker(s) in {time.perf_counter() - t0:.2f}s")
+    return results
+
+
 def convert_files_or_dir(
     toml_path: str,
     hdf5_path: str,
@@ -526,6 +703,7 @@ def convert_files_or_dir(
     pattern: str = "*.h5",
     dry_run: bool = False,
     force: bool = False,
+    workers: int = 1,
 ) -> List[str]:
     """
     Convert metadata structure in HDF5 file(s) per TOML mapping.
@@ -544,39 +722,19 @@ def convert_files_or_dir(
     - dry_run: If True, do not perform writes; return the list of planned output file paths.
     - force: If True, bypass the already-formatted guard and rewrite HKL SoftLinks even if they
              already point to the correct target.
+    - workers: Number of worker processes for a directory (default 1, sequential). See convert_batch
+               for per-file results and timing.
 
     Returns:
-    - List of output file paths (planned paths in dry_run mode).
+    - List of output file paths (planned paths in dry_run mode). Files that fail are logged and omitted.
 
     Notes:
     - NAME labels are derived using 'METADATA.CA' section of the TOML mapping, matching motor IDs.
     - UB_MATRIX_VALUE is truncated to the first 9 elements if present when include=True.
     """
-    src = Path(hdf5_path)
-    toml_p = Path(toml_path)
-    # Determine output directory default from settings.OUTPUT_PATH when not provided
-    if output_dir is None:
-        base_out = Path(getattr(settings, 'OUTPUT_PATH', './outputs')).expanduser()
-        out_dir = base_out.joinpath('conversions')
-    else:
-        out_dir = Path(output_dir)
-
-    files: List[Path] = []
-    if src.is_file():
-        files = [src]
-    elif src.is_dir():
-        if recursive:
-            files = [p for p in src.rglob(pattern)]
-        else:
-            files = [p for p in src.glob(pattern)]
-    else:
-        raise FileNotFoundError(f"Path not found: {hdf5_path}")
-
-    outputs: List[str] = []
-    for f in files:
-        try:
-            out = _convert_single_file(f, toml_p, base_group, include, in_place, out_dir, dry_run, force=force)
-            outputs.append(out)
-        except Exception:
-            logger.exception(f"Failed to convert: {f}")
-    return outputs
+    results = convert_batch(
+        toml_path, hdf5_path, base_group=base_group, include=include, in_place=in_place,
+        output_dir=output_dir, recursive=recursive, pattern=pattern, dry_run=dry_run, force=force,
+        workers=workers,
+    )
+    return [r.output for r in results if r.ok]
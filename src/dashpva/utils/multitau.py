@@ -0,0 +1,261 @@
+"""
+Streaming multi-tau intensity autocorrelation (XPCS g2)
+
+Frames are consumed one at a time or in blocks, so the same engine serves a
+live PVA stream and an HDF5 scan read chunk by chunk. Only pixels inside the q
+partitions are kept, and nothing grows with the number of frames.
+
+Multi-tau scheme with ``m`` buffers per level: level 0 correlates lags
+``0 … m-1`` frames; each higher level ``k`` sees the pairwise average of the
+level below and correlates lags ``m/2 … m-1`` of its own frames, i.e. delays
+``j * 2**k``. Per lag the engine keeps a per-pixel running sum over every
+frame pair ``(t, t - tau)`` of its level::
+
+    G += I(t) * I(t - tau)
+
+and per level the pixel sums of all, the first ``m - 1`` and the last ``m - 1``
+frames, from which the matching intensity sums follow without per-lag
+accumulation::
+
+    IF = sum of I(t)       = total - first lag frames
+    IP = sum of I(t - tau) = total - last lag frames
+
+Memory is O(pixels x (lags + levels x m)) with ``lags = m + (levels - 1) * m / 2``
+and does not grow with the number of frames. For a q partition (pixels with the
+same label) the symmetric-normalized correlation is::
+
+    g2(q, tau) = <G / n>_q / (<IP / n>_q * <IF / n>_q)
+
+with ``n`` the number of pairs at that lag. Keeping the per-pixel sums means the
+q partition can be coarsened afterwards with :meth:`MultiTauCorrelator.g2`.
+
+Frames are staged and correlated ``batch`` at a time: each lag is then one
+vectorized product over a (batch x pixels) block, which is what keeps the
+per-frame cost at a gather and a copy.
+
+From a PVA stream, chain the reader's own frame parsing::
+
+    def on_frame(pv):
+        reader.pva_callbackSuccess(pv)
+        correlator.update(reader.image)
+    reader.start_channel_monitor(callback=on_frame)
+
+and from a file, :func:`correlate_hdf5`.
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LEVELS = 10
+DEFAULT_BUFS = 8
+# Frames correlated per vectorized pass
+DEFAULT_BATCH = 64
+
+
+@dataclass
+class G2Result:
+    """g2 of each q partition; ``lags`` are in frames."""
+    q_labels: np.ndarray    # (nq,) label value of each partition
+    lags: np.ndarray        # (nlags,) delay in frames, lags with data only
+    g2: np.ndarray          # (nq, nlags)
+    pairs: np.ndarray       # (nlags,) frame pairs averaged per lag
+    frames: int             # frames consumed
+
+
+def roi_labels(shape: Tuple[int, int], rois: Sequence[Tuple[int, int, int, int]]) -> np.ndarray:
+    """Label image with one partition per ``(x, y, width, height)`` ROI.
+
+    ROIs are numbered from 1 in order; where they overlap the later one wins.
+    """
+    labels = np.zeros(shape, dtype=np.int32)
+    for n, (x, y, w, h) in enumerate(rois, start=1):
+        labels[max(0, y):max(0, y + h), max(0, x):max(0, x + w)] = n
+    return labels
+
+
+class MultiTauCorrelator:
+    """Incremental multi-tau g2 over the labelled pixels of a frame stream.
+
+    ``labels`` has the frame shape; pixels with the same positive label form one
+    q partition and label 0 is ignored.
+    """
+
+    def __init__(self, labels: np.ndarray, num_levels: int = DEFAULT_LEVELS,
+                 num_bufs: int = DEFAULT_BUFS, batch: int = DEFAULT_BATCH):
+        labels = np.asarray(labels)
+        if num_bufs < 2 or num_bufs % 2:
+            raise ValueError(f"num_bufs must be an even number >= 2, got {num_bufs}")
+        if num_levels < 1:
+            raise ValueError(f"num_levels must be >= 1, got {num_levels}")
+        flat = labels.ravel()
+        pixels = np.flatnonzero(flat > 0)
+        if not len(pixels):
+            raise ValueError("labels select no pixels")
+        # Pixels grouped by label so a partition is a contiguous run
+        self._pixels = pixels[np.argsort(flat[pixels], kind='stable')]
+        pixel_labels = flat[self._pixels]
+        self.shape = labels.shape
+        self.q_labels, self._q_starts, self._q_sizes = np.unique(
+            pixel_labels, return_index=True, return_counts=True)
+        self.num_levels = int(num_levels)
+        self.num_bufs = int(num_bufs)
+        self.batch = max(1, int(batch))
+
+        m = self.num_bufs
+        self._level_lags = [np.arange(m)] + [np.arange(m // 2, m)] * (self.num_levels - 1)
+        self._level_rows = np.cumsum([0] + [len(j) for j in self._level_lags])
+        self.lag_steps = np.concatenate(
+            [j * 2 ** k for k, j in enumerate(self._level_lags)])
+        npix = len(self._pixels)
+        self._stage = np.empty((self.batch, npix))
+        self.reset()
+        logger.debug("MultiTauCorrelator: %d pixels in %d partitions, %d lags, %.1f MB",
+                     npix, len(self.q_labels), len(self.lag_steps), self.nbytes / 2**20)
+
+    @property
+    def num_pixels(self) -> int:
+        return len(self._pixels)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the running sums, frame history and staging block."""
+        npix = self.num_pixels
+        per_level = 2 * (self.num_bufs - 1) + 2       # head, history, total, carry
+        return 8 * npix * (len(self.lag_steps) + self.num_levels * per_level + self.batch)
+
+    def reset(self) -> None:
+        """Forget every frame consumed so far."""
+        levels, npix = self.num_levels, self.num_pixels
+        self._G = np.zeros((len(self.lag_steps), npix))
+        self._total = np.zeros((levels, npix))
+        self._counts = np.zeros(levels, dtype=np.int64)
+        self._head = [np.empty((0, npix)) for _ in range(levels)]
+        self._history = [np.empty((0, npix)) for _ in range(levels)]
+        self._carry = [np.empty((0, npix)) for _ in range(levels)]
+        self._staged = 0
+        self.frames = 0
+
+    # ------------------------------------------------------------------ input
+    def update(self, frames: np.ndarray) -> None:
+        """Consume one frame (frame shape) or a block of frames (n x frame shape)."""
+        frames = np.asarray(frames)
+        if frames.shape == self.shape:
+            frames = frames[None]
+        elif frames.shape[1:] != self.shape:
+            raise ValueError(f"frame shape {frames.shape[1:] or frames.shape} "
+                             f"does not match labels {self.shape}")
+        data = frames.reshape(len(frames), -1)
+        for start in range(0, len(data), self.batch):
+            block = data[start:start + self.batch]
+            if not self._staged and len(block) == self.batch:
+                # Whole blocks skip the staging copy
+                self._correlate(0, np.asarray(block[:, self._pixels], dtype=float))
+            else:
+                self._stage_rows(block)
+        self.frames += len(data)
+
+    def _stage_rows(self, block: np.ndarray) -> None:
+        while len(block):
+            n = min(len(block), self.batch - self._staged)
+            self._stage[self._staged:self._staged + n] = block[:n, self._pixels]
+            self._staged += n
+            block = block[n:]
+            if self._staged == self.batch:
+                self.flush()
+
+    def flush(self) -> None:
+        """Correlate frames still waiting in the staging block."""
+        if self._staged:
+            n, self._staged = self._staged, 0
+            self._correlate(0, self._stage[:n].copy())
+
+    def _correlate(self, level: int, new: np.ndarray) -> None:
+        history = self._history[level]
+        h = len(history)
+        frames = np.concatenate([history, new]) if h else new
+        n = len(frames)
+        first = self._level_rows[level]
+        for row, lag in enumerate(self._level_lags[level], start=first):
+            start = max(h, lag)
+            if start < n:
+                self._G[row] += np.einsum('ij,ij->j', frames[start:], frames[start - lag:n - lag])
+        keep = self.num_bufs - 1
+        self._history[level] = frames[max(0, n - keep):].copy()
+        head = self._head[level]
+        if len(head) < keep:
+            self._head[level] = np.concatenate([head, new[:keep - len(head)]])
+        self._total[level] += new.sum(axis=0)
+        self._counts[level] += len(new)
+
+        if level + 1 < self.num_levels:
+            carry = self._carry[level]
+            pending = np.concatenate([carry, new]) if len(carry) else new
+            npairs = len(pending) // 2
+            self._carry[level] = pending[2 * npairs:].copy()
+            if npairs:
+                averaged = (pending[0:2 * npairs:2] + pending[1:2 * npairs:2]) / 2
+                self._correlate(level + 1, averaged)
+
+    # ----------------------------------------------------------------- output
+    def g2(self, labels: Optional[np.ndarray] = None) -> G2Result:
+        """g2 of every q partition from the frames consumed so far.
+
+        ``labels`` optionally regroups the engine's pixels into coarser
+        partitions (same frame shape; only pixels the engine tracks count).
+        """
+        self.flush()
+        level_of_row = np.repeat(np.arange(self.num_levels), np.diff(self._level_rows))
+        lag_of_row = np.concatenate(self._level_lags)
+        pairs = self._counts[level_of_row] - lag_of_row
+        valid = pairs > 0
+        pairs = pairs[valid]
+        lags = self.lag_steps[valid]
+        if labels is None:
+            order, q_labels, starts, sizes = None, self.q_labels, self._q_starts, self._q_sizes
+        else:
+            sub = np.asarray(labels).ravel()[self._pixels]
+            order = np.flatnonzero(sub > 0)
+            order = order[np.argsort(sub[order], kind='stable')]
+            q_labels, starts, sizes = np.unique(sub[order], return_index=True, return_counts=True)
+        if not len(lags) or not len(q_labels):
+            return G2Result(q_labels, lags, np.empty((len(q_labels), len(lags))), pairs, self.frames)
+
+        sum_if = np.empty((len(lags), self.num_pixels))
+        sum_ip = np.empty_like(sum_if)
+        for i, row in enumerate(np.flatnonzero(valid)):
+            level, lag = level_of_row[row], lag_of_row[row]
+            history = self._history[level]
+            sum_if[i] = self._total[level] - self._head[level][:lag].sum(axis=0)
+            sum_ip[i] = self._total[level] - history[len(history) - lag:].sum(axis=0)
+
+        def q_mean(sums):
+            per_pair = sums / pairs[:, None]
+            if order is not None:
+                per_pair = per_pair[:, order]
+            return np.add.reduceat(per_pair, starts, axis=1) / sizes
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            g2 = q_mean(self._G[valid]) / (q_mean(sum_ip) * q_mean(sum_if))
+        return G2Result(q_labels, lags, g2.T, pairs, self.frames)
+
+
+def correlate_hdf5(path: str, dataset: str, labels: np.ndarray, chunk: int = 256,
+                   start: int = 0, stop: Optional[int] = None, **kwargs) -> G2Result:
+    """Multi-tau g2 of frames ``start:stop`` of an HDF5 image stack, read in chunks.
+
+    ``kwargs`` go to :class:`MultiTauCorrelator`.
+    """
+    import h5py
+
+    correlator = MultiTauCorrelator(labels, **kwargs)
+    with h5py.File(path, 'r') as h5:
+        data = h5[dataset]
+        stop = len(data) if stop is None else min(stop, len(data))
+        for first in range(start, stop, chunk):
+            correlator.update(data[first:min(first + chunk, stop)])
+    return correlator.g2()
@@ -0,0 +1,42 @@
+"""
+Where DashPVA keeps generated files, and how it writes them.
+
+Caches and recordings live in named subdirectories of ``settings.OUTPUT_PATH``
+(``./outputs`` when unset). ``atomic_write`` is used for files that another
+process may read while they are being replaced.
+"""
+
+import os
+from contextlib import contextmanager
+from pathlib import Path
+
+import dashpva.settings as settings
+
+
+def output_subdir(name: str) -> Path:
+    """``<OUTPUT_PATH>/<name>`` (not created)."""
+    return Path(getattr(settings, 'OUTPUT_PATH', './outputs') or './outputs').expanduser() / name
+
+
+@contextmanager
+def atomic_write(path: Path):
+    """
+    Yield a temporary path next to ``path``; once the block succeeds it replaces ``path``.
+
+    A concurrent reader sees either the old file or the complete new one, never a
+    partial write. The parent directory is created; on error the temporary file is
+    removed and the exception propagates. The temporary name keeps ``path``'s
+    suffix, so writers that append one (``np.savez``) write where expected.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.stem}.{os.getpid()}.tmp{path.suffix}")
+    try:
+        yield tmp
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+        raise
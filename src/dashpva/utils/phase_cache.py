@@ -0,0 +1,210 @@
+"""
+Persistent reflection cache and parallel loader for CIF phase libraries
+
+Loading a phase means parsing its CIF and running pymatgen's XRD calculator,
+tens to hundreds of milliseconds per phase, and the phase fitter used to redo
+this serially for the whole library every time phases were (re)loaded or the
+wavelength changed.
+
+``ReflectionCache`` stores each computed phase (structure + reflections) on
+disk under a key made of the CIF *content* hash, the calculation wavelength,
+the 2θ range the reflections cover and the calculator versions, so renaming or
+copying a CIF still hits and editing one misses. ``load_phase_library`` serves
+hits straight from the cache and computes only the misses, across a process
+pool when there are several.
+"""
+
+import hashlib
+import logging
+import os
+import pickle
+import time
+from concurrent.futures import as_completed
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, List, Optional
+
+from dashpva.utils.output_files import atomic_write, output_subdir
+from dashpva.utils.worker_pool import spawn_pool
+
+logger = logging.getLogger(__name__)
+
+_CACHE_VERSION = 1
+# PhaseModel.calculate_peaks always covers the full 2θ range
+DEFAULT_TWO_THETA_RANGE = (0.0, 180.0)
+# Wavelengths closer than this (Å) share cache entries
+_WAVELENGTH_DIGITS = 6
+
+
+def default_cache_dir() -> Path:
+    """``<OUTPUT_PATH>/phase_cache`` — where the phase fitter keeps computed phases."""
+    return output_subdir('phase_cache')
+
+
+def cif_digest(path) -> str:
+    """sha256 of the CIF file's bytes."""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _calculator_versions() -> str:
+    from importlib.metadata import PackageNotFoundError, version
+    out = []
+    for dist in ('ssrl_xrd_tools', 'pymatgen'):
+        try:
+            out.append(f"{dist}={version(dist)}")
+        except PackageNotFoundError:
+            out.append(f"{dist}=?")
+    return ';'.join(out)
+
+
+class ReflectionCache:
+    """Content-addressed on-disk store of computed phases (one pickle per entry)."""
+
+    def __init__(self, cache_dir, two_theta_range=DEFAULT_TWO_THETA_RANGE):
+        self.cache_dir = Path(cache_dir)
+        self.two_theta_range = tuple(float(v) for v in two_theta_range)
+        self._versions = _calculator_versions()
+
+    def key(self, digest: str, wavelength: float) -> str:
+        desc = (f"v{_CACHE_VERSION}|{digest}|{round(float(wavelength), _WAVELENGTH_DIGITS)!r}"
+                f"|{self.two_theta_range!r}|{self._versions}")
+        return hashlib.sha256(desc.encode()).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key[:2]}" / f"{key}.pkl"
+
+    def get(self, key: str):
+        """The cached phase for ``key``, or None on a miss or unreadable entry."""
+        path = self._path(key)
+        if not path.exists():
+            return None
+        try:
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable phase cache entry {path}: {e}")
+            return None
+
+    def put(self, key: str, phase) -> None:
+        path = self._path(key)
+        try:
+            with atomic_write(path) as tmp, open(tmp, 'wb') as f:
+                pickle.dump(phase, f, protocol=pickle.HIGHEST_PROTOCOL)
+        except (OSError, pickle.PicklingError) as e:
+            logger.warning(f"Could not write phase cache entry {path}: {e}")
+
+
+@dataclass
+class PhaseLoadResult:
+    """Outcome of loading one CIF."""
+    path: str
+    phase: object = None
+    error: Optional[str] = None
+    cached: bool = False
+    elapsed: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.phase is not None
+
+
+def calculate_phase(cif_path: str, wavelength: float):
+    """Parse ``cif_path`` and compute its reflections at ``wavelength`` (Å)."""
+    from ssrl_xrd_tools.analysis.phase import PhaseModel
+    phase = PhaseModel.from_cif(cif_path)
+    phase.calculate_peaks(wavelength=wavelength)
+    return phase
+
+
+def _calculate_one(cif_path: str, wavelength: float, calculate: Callable) -> PhaseLoadResult:
+    """Compute one phase and report the outcome instead of raising (process pool entry point)."""
+    t0 = time.perf_counter()
+    try:
+        return PhaseLoadResult(path=cif_path, phase=calculate(cif_path, wavelength),
+                               elapsed=time.perf_counter() - t0)
+    except Exception as e:
+        return PhaseLoadResult(path=cif_path, error=f"{type(e).__name__}: {e}",
+                               elapsed=time.perf_counter() - t0)
+
+
+def load_phase_library(
+    cif_files,
+    wavelength: float,
+    cache: Optional[ReflectionCache] = None,
+    workers: Optional[int] = None,
+    progress: Optional[Callable[[PhaseLoadResult, int, int], None]] = None,
+    calculate: Callable = calculate_phase,
+) -> List[PhaseLoadResult]:
+    """
+    Load every CIF at ``wavelength``, from ``cache`` where possible, and return one result per file.
+
+    - workers: Processes used for cache misses (default: CPU count, capped at the number of
+               misses). workers=1 computes them in this process, one after another.
+    - progress: Optional callback(result, done, total), called in this process as each file
+                finishes; cache hits are reported first.
+    - calculate: Top-level (picklable) callable(cif_path, wavelength) -> phase.
+
+    Each phase is named after its file's stem, whatever name the cached copy carried.
+    Results are returned in the input order; a failed CIF has ok=False and an error message.
+    """
+    files = [str(f) for f in cif_files]
+    total = len(files)
+    results: List[Optional[PhaseLoadResult]] = [None] * total
+    keys: List[Optional[str]] = [None] * total
+    done = 0
+
+    def _finish(i, result):
+        nonlocal done
+        if result.ok:
+            try:
+                result.phase.name = Path(files[i]).stem
+            except AttributeError:
+                pass
+        results[i] = result
+        done += 1
+        if progress is not None:
+            progress(result, done, total)
+
+    misses = []
+    for i, path in enumerate(files):
+        if cache is not None:
+            try:
+                keys[i] = cache.key(cif_digest(path), wavelength)
+            except OSError as e:
+                _finish(i, PhaseLoadResult(path=path, error=f"{type(e).__name__}: {e}"))
+                continue
+            t0 = time.perf_counter()
+            phase = cache.get(keys[i])
+            if phase is not None:
+                _finish(i, PhaseLoadResult(path=path, phase=phase, cached=True,
+                                           elapsed=time.perf_counter() - t0))
+                continue
+        misses.append(i)
+
+    def _store(i, result):
+        if cache is not None and result.ok:
+            cache.put(keys[i], result.phase)
+        _finish(i, result)
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(int(workers), len(misses)))
+    if workers == 1:
+        for i in misses:
+            _store(i, _calculate_one(files[i], wavelength, calculate))
+    elif misses:
+        with spawn_pool(workers) as pool:
+            futures = {pool.submit(_calculate_one, files[i], wavelength, calculate): i for i in misses}
+            for fut in as_completed(futures):
+                i = futures[fut]
+                try:
+                    result = fut.result()
+                except Exception as e:
+                    # Worker process died or the phase could not be pickled back
+                    result = PhaseLoadResult(path=files[i], error=f"{type(e).__name__}: {e}")
+                _store(i, result)
+    return results
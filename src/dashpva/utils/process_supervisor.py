@@ -0,0 +1,317 @@
+"""
+Supervisor for the workflow's streaming chain (sim server -> associator -> collector -> analysis)
+
+Each process is registered with a ``ProcessSpec`` holding its exact command
+line and its rank in the chain. ``ProcessSupervisor.poll`` (called
+periodically, e.g. from a QTimer) checks every process in chain order:
+
+- **Liveness** — a process that exits with a non-zero code (or a signal) is
+  restarted with the same command after an exponential backoff.
+- **Progress** — frame counters are reported through ``report_progress``
+  (the workflow does it from the parsed pvapy stats; the default launcher does
+  it itself). A process whose counters have not advanced for ``stall_timeout``
+  seconds is terminated and restarted the same way if it has stopped
+  reporting altogether (pvapy reports every period, frames or not) or if the
+  process upstream of it is still advancing. Without the upstream condition
+  an idle source would get every consumer restarted. Processes that never
+  report stats are checked for liveness only.
+
+Restarts keep the chain's launch order: a process is not relaunched while a
+process upstream of it is still waiting for its own restart. The backoff
+resets once a process has stayed up for ``healthy_after`` seconds.
+"""
+
+import logging
+import os
+import signal
+import subprocess
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from dashpva.utils.hpc_telemetry import StatsBlockParser, sample_from_stats
+
+logger = logging.getLogger(__name__)
+
+PENDING = 'pending'
+RUNNING = 'running'
+BACKOFF = 'backoff'
+EXITED = 'exited'
+FAILED = 'failed'
+
+
+@dataclass
+class ProcessSpec:
+    """How to (re)start one process of the chain.
+
+    - order: Rank in the chain; lower starts first and counts as upstream.
+    - stall_timeout: Seconds without counter progress before the process
+      counts as stalled (see the module docstring); None checks liveness only.
+    - restart_on_exit: Also restart after a clean (code 0) exit.
+    """
+    name: str
+    cmd: List[str]
+    order: int = 0
+    stall_timeout: Optional[float] = None
+    restart_on_exit: bool = False
+    env: Optional[Dict[str, str]] = None
+    cwd: Optional[str] = None
+
+
+@dataclass
+class SupervisedProcess:
+    """Runtime state of one supervised process."""
+    spec: ProcessSpec
+    process: object = None
+    state: str = PENDING
+    restarts: int = 0
+    failures: int = 0
+    started_at: float = 0.0
+    next_start: float = 0.0
+    last_progress: Optional[float] = None
+    last_report: Optional[float] = None
+    counters: Dict[object, int] = field(default_factory=dict)
+    last_exit: Optional[int] = None
+    reason: str = ''
+
+    @property
+    def name(self) -> str:
+        return self.spec.name
+
+    @property
+    def pid(self) -> Optional[int]:
+        return getattr(self.process, 'pid', None)
+
+
+def unbuffered_env(extra: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """Environment for Python children whose stdout is a pipe: line-timely stats output."""
+    env = dict(os.environ)
+    env['PYTHONUNBUFFERED'] = '1'
+    if extra:
+        env.update(extra)
+    return env
+
+
+def terminate_process(process, timeout: float = 5.0) -> None:
+    """SIGTERM the process group of ``process`` (started with setsid), SIGKILL if it lingers."""
+    if process is None or process.poll() is not None:
+        return
+    try:
+        os.killpg(os.getpgid(process.pid), signal.SIGTERM)
+    except (ProcessLookupError, PermissionError):
+        return
+    try:
+        process.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        try:
+            os.killpg(os.getpgid(process.pid), signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+        process.wait()
+
+
+class ProcessSupervisor:
+    """Keep a chain of processes alive and progressing; see the module docstring.
+
+    - launch: callable(spec) -> Popen-like (``poll``, ``pid``). The default
+      starts ``spec.cmd`` in its own session and reads its stdout on a thread,
+      reporting progress from pvapy stats and passing lines to ``on_output``.
+    - terminate: callable(SupervisedProcess) used for stalled processes and
+      ``stop_all`` (default: ``terminate_process``).
+    - on_event: callable(name, message) for starts, failures and restarts.
+    - clock: monotonic time source (injectable for tests).
+    """
+
+    def __init__(self, launch: Optional[Callable] = None, terminate: Optional[Callable] = None,
+                 backoff_initial: float = 1.0, backoff_factor: float = 2.0,
+                 backoff_max: float = 30.0, healthy_after: float = 30.0,
+                 max_restarts: Optional[int] = None,
+                 on_event: Optional[Callable[[str, str], None]] = None,
+                 on_output: Optional[Callable[[str, str], None]] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self._launch = launch or self._default_launch
+        self._terminate = terminate or (lambda entry: terminate_process(entry.process))
+        self.backoff_initial = float(backoff_initial)
+        self.backoff_factor = float(backoff_factor)
+        self.backoff_max = float(backoff_max)
+        self.healthy_after = float(healthy_after)
+        self.max_restarts = max_restarts
+        self.on_event = on_event
+        self.on_output = on_output
+        self.clock = clock
+        self._entries: Dict[str, SupervisedProcess] = {}
+        self._lock = threading.RLock()
+
+    # ------------------------------------------------------------ registration
+    def add(self, spec: ProcessSpec, process=None) -> SupervisedProcess:
+        """Register ``spec``; adopt ``process`` if it was already started by the caller."""
+        with self._lock:
+            entry = SupervisedProcess(spec=spec)
+            self._entries[spec.name] = entry
+            if process is not None:
+                self._mark_started(entry, process)
+            return entry
+
+    def remove(self, name: str, terminate: bool = False) -> Optional[SupervisedProcess]:
+        """Stop supervising ``name`` (e.g. the user stopped it); optionally terminate it."""
+        with self._lock:
+            entry = self._entries.pop(name, None)
+        if entry is not None and terminate:
+            self._terminate(entry)
+        return entry
+
+    def get(self, name: str) -> Optional[SupervisedProcess]:
+        return self._entries.get(name)
+
+    def entries(self) -> List[SupervisedProcess]:
+        """Supervised processes in chain order."""
+        with self._lock:
+            return sorted(self._entries.values(), key=lambda e: e.spec.order)
+
+    # ---------------------------------------------------------------- lifecycle
+    def start_all(self) -> None:
+        """Launch every process that is not running, in chain order."""
+        for entry in self.entries():
+            if entry.state in (PENDING, EXITED, FAILED, BACKOFF):
+                entry.failures = 0
+                self._start(entry)
+
+    def stop_all(self) -> None:
+        """Terminate every process, downstream first, and forget them."""
+        for entry in reversed(self.entries()):
+            self.remove(entry.name, terminate=True)
+
+    def report_progress(self, name: str, counter: int, source=0) -> None:
+        """Record a frame counter of ``name`` (one per ``source``, e.g. consumer id)."""
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None or entry.state != RUNNING:
+                return
+            now = self.clock()
+            prev = entry.counters.get(source, 0)
+            entry.counters[source] = int(counter)
+            entry.last_report = now
+            if counter > prev:
+                entry.last_progress = now
+
+    def poll(self) -> None:
+        """Check liveness and progress of every process and run due restarts."""
+        with self._lock:
+            now = self.clock()
+            chain = self.entries()
+            for i, entry in enumerate(chain):
+                upstream = chain[i - 1] if i > 0 else None
+                if entry.state == RUNNING:
+                    self._check_running(entry, upstream, now)
+                elif entry.state == BACKOFF and now >= entry.next_start:
+                    # Keep launch order: upstream restarts first
+                    if any(e.state == BACKOFF for e in chain[:i]):
+                        continue
+                    entry.restarts += 1
+                    self._start(entry)
+
+    # ----------------------------------------------------------------- internals
+    def _check_running(self, entry: SupervisedProcess, upstream, now: float) -> None:
+        code = entry.process.poll()
+        if code is not None:
+            entry.last_exit = code
+            if code == 0 and not entry.spec.restart_on_exit:
+                entry.state = EXITED
+                self._emit(entry, 'exited')
+                return
+            self._schedule_restart(entry, now, f'exited with code {code}')
+            return
+        timeout = entry.spec.stall_timeout
+        if timeout and self._stalled(entry, upstream, now, timeout):
+            self._terminate(entry)
+            self._schedule_restart(entry, now, f'no progress for {timeout:g} s')
+            return
+        if entry.failures and now - entry.started_at >= self.healthy_after:
+            entry.failures = 0
+
+    def _stalled(self, entry, upstream, now, timeout) -> bool:
+        since = entry.last_progress if entry.last_progress is not None else entry.started_at
+        if now - since < timeout or entry.last_report is None:
+            # Progressing, or not reporting stats at all (liveness only)
+            return False
+        if now - entry.last_report >= timeout:
+            # Stats are printed every report period, frames or not: silence means hung
+            return True
+        if upstream is None:
+            # Idle source or stuck process cannot be told apart
+            return False
+        if upstream.state != RUNNING:
+            return False
+        if not upstream.counters:
+            # Upstream does not report progress (e.g. the sim server): an idle source
+            # looks the same as a stuck consumer, so rely on liveness only
+            return False
+        return upstream.last_progress is not None and now - upstream.last_progress < timeout
+
+    def _schedule_restart(self, entry: SupervisedProcess, now: float, reason: str) -> None:
+        entry.reason = reason
+        if self.max_restarts is not None and entry.restarts >= self.max_restarts:
+            entry.state = FAILED
+            self._emit(entry, f'{reason}; giving up after {entry.restarts} restarts')
+            return
+        entry.failures += 1
+        delay = min(self.backoff_max,
+                    self.backoff_initial * self.backoff_factor ** (entry.failures - 1))
+        entry.state = BACKOFF
+        entry.next_start = now + delay
+        self._emit(entry, f'{reason}; restarting in {delay:g} s')
+
+    def _start(self, entry: SupervisedProcess) -> None:
+        try:
+            process = self._launch(entry.spec)
+        except Exception as e:
+            logger.exception(f"Could not launch {entry.name}")
+            self._schedule_restart(entry, self.clock(), f'launch failed ({e})')
+            return
+        self._mark_started(entry, process)
+        self._emit(entry, f'started (PID {entry.pid})' if not entry.restarts
+                   else f'restarted (PID {entry.pid}, restart {entry.restarts})')
+
+    def _mark_started(self, entry: SupervisedProcess, process) -> None:
+        entry.process = process
+        entry.state = RUNNING
+        entry.started_at = self.clock()
+        entry.last_progress = None
+        entry.last_report = None
+        entry.counters = {}
+
+    def _emit(self, entry: SupervisedProcess, message: str) -> None:
+        logger.info(f"{entry.name}: {message}")
+        if self.on_event is not None:
+            self.on_event(entry.name, message)
+
+    def _default_launch(self, spec: ProcessSpec):
+        process = subprocess.Popen(
+            spec.cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            preexec_fn=os.setsid,
+            universal_newlines=True,
+            env=unbuffered_env(spec.env),
+            cwd=spec.cwd,
+        )
+        thread = threading.Thread(target=self._read_output, args=(spec.name, process), daemon=True)
+        thread.start()
+        return process
+
+    def _read_output(self, name: str, process) -> None:
+        parser = StatsBlockParser()
+        for line in process.stdout:
+            line = line.rstrip('\n')
+            stats = parser.feed(line)
+            sample = sample_from_stats(name, stats) if stats is not None else None
+            if sample is not None:
+                with self._lock:
+                    # Only count output of the current incarnation
+                    entry = self._entries.get(name)
+                    current = entry is not None and entry.process is process
+                if current:
+                    self.report_progress(name, sample.processed, sample.consumer_id)
+            if self.on_output is not None:
+                self.on_output(name, line)
@@ -0,0 +1,269 @@
+"""
+Integral-image ROI statistics
+
+Builds summed-area tables of I, I^2 and the two first moments once per frame so
+the total, mean, sigma and centroid of any number of rectangular ROIs come out
+in O(1) each. Rotated ROIs fall back to a cached list of the pixel indices they
+cover. Min/max are not expressible as sums; they are reduced over the ROI's
+slice (a view, no copy) or its index list.
+
+Building the tables costs roughly ten direct reductions of the whole frame, so
+they are built lazily: only when a frame's rectangular ROIs together cover more
+than ``break_even`` frames' worth of pixels. Below that, rectangles are reduced
+directly from their slice with identical results.
+
+Coordinates are array indices: axis 0 / axis 1 of the frame, a pixel ``i``
+spanning ``[i, i + 1)``, and centroids reported as intensity-weighted index
+means (the same convention as ``sub.sum(axis) @ arange``).
+"""
+
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+# Angles closer than this (in the ROI -> data transform) count as axis-aligned.
+_ALIGN_EPS = 1e-9
+
+
+# Total rectangle area (in frames) above which the integral tables are built.
+DEFAULT_BREAK_EVEN = 8.0
+
+
+def _integral(values: np.ndarray) -> np.ndarray:
+    """Zero-padded cumulative sum over the first two axes: out[i, j] == values[:i, :j].sum((0, 1))."""
+    out = np.zeros((values.shape[0] + 1, values.shape[1] + 1) + values.shape[2:], dtype=np.float64)
+    inner = out[1:, 1:]
+    np.cumsum(values, axis=0, out=inner)
+    np.cumsum(inner, axis=1, out=inner)
+    return out
+
+
+def _box(table: np.ndarray, a0: int, a1: int, b0: int, b1: int):
+    return table[a1, b1] - table[a0, b1] - table[a1, b0] + table[a0, b0]
+
+
+class RoiIntegralStats:
+    """Per-frame summed-area tables plus O(1) rectangle and cached index-list queries.
+
+    Call ``set_frame`` once per new frame, then ``roi_stats_many`` (or
+    ``rect_stats`` / ``index_stats``) as many times as needed. NaN/inf pixels are
+    excluded from every statistic, matching the nan-aware per-ROI reductions.
+    """
+
+    def __init__(self, break_even: float = DEFAULT_BREAK_EVEN):
+        self.break_even = float(break_even)
+        self.frame = None
+        self.shape = None
+        self._tables = None     # (H+1, W+1, 4): I, I^2, i*I, j*I
+        self._count = None      # (H+1, W+1) finite-pixel counts; None when all finite
+        self._has_bad = False
+        self._index_cache: Dict[object, np.ndarray] = {}
+
+    def set_frame(self, frame: np.ndarray) -> None:
+        frame = np.asarray(frame)
+        if frame.ndim != 2:
+            raise ValueError(f"Expected 2D frame, got shape {frame.shape}")
+        if frame.shape != self.shape:
+            self._index_cache.clear()
+        self.frame = frame
+        self.shape = frame.shape
+        self._tables = None
+        self._count = None
+        self._has_bad = frame.dtype.kind in 'fc' and not bool(np.isfinite(frame).all())
+
+    @property
+    def has_tables(self) -> bool:
+        return self._tables is not None
+
+    def build_tables(self) -> None:
+        """Build the integral tables for the current frame (no-op if already built)."""
+        if self._tables is not None or self.frame is None:
+            return
+        h, w = self.shape
+        values = np.empty((h, w, 4), dtype=np.float64)
+        values[..., 0] = self.frame
+        if self._has_bad:
+            finite = np.isfinite(values[..., 0])
+            values[..., 0][~finite] = 0.0
+            self._count = _integral(finite.astype(np.float64))
+        intensity = values[..., 0]
+        np.multiply(intensity, intensity, out=values[..., 1])
+        np.multiply(intensity, np.arange(h, dtype=np.float64)[:, None], out=values[..., 2])
+        np.multiply(intensity, np.arange(w, dtype=np.float64)[None, :], out=values[..., 3])
+        self._tables = _integral(values)
+
+    # ------------------------------------------------------------------ queries
+    def rect_stats(self, a0: int, a1: int, b0: int, b1: int) -> dict:
+        """Stats over frame[a0:a1, b0:b1] (clipped to the frame); {} if empty/all-NaN."""
+        if self.frame is None:
+            return {}
+        a0, a1 = max(0, int(a0)), min(self.shape[0], int(a1))
+        b0, b1 = max(0, int(b0)), min(self.shape[1], int(b1))
+        if a0 >= a1 or b0 >= b1:
+            return {}
+        view = self.frame[a0:a1, b0:b1]
+        if self._tables is None:
+            return self._direct_stats(view, a0, b0)
+        if self._count is None:
+            n = float((a1 - a0) * (b1 - b0))
+            lo, hi = view.min(), view.max()
+        else:
+            n = float(_box(self._count, a0, a1, b0, b1))
+            if n <= 0:
+                return {}
+            finite = view[np.isfinite(view)]
+            lo, hi = finite.min(), finite.max()
+        s, sumsq, m0, m1 = (float(v) for v in _box(self._tables, a0, a1, b0, b1))
+        return self._finish(n, s, sumsq, m0, m1, lo, hi)
+
+    def _direct_stats(self, view: np.ndarray, a0: int, b0: int) -> dict:
+        """Same statistics reduced straight from the ROI slice."""
+        vals = view.astype(np.float64)
+        if self._has_bad:
+            finite = np.isfinite(vals)
+            if not finite.any():
+                return {}
+            vals = np.where(finite, vals, 0.0)
+            n = float(finite.sum())
+            lo, hi = view[finite].min(), view[finite].max()
+        else:
+            n = float(vals.size)
+            lo, hi = view.min(), view.max()
+        rows, cols = vals.sum(axis=1), vals.sum(axis=0)
+        s = float(rows.sum())
+        flat = vals.ravel()
+        return self._finish(n, s, float(flat.dot(flat)),
+                            float(rows @ np.arange(a0, a0 + vals.shape[0], dtype=np.float64)),
+                            float(cols @ np.arange(b0, b0 + vals.shape[1], dtype=np.float64)),
+                            lo, hi)
+
+    def index_stats(self, flat_index: np.ndarray) -> dict:
+        """Stats over an arbitrary set of pixels given as flat (C-order) indices."""
+        if self.frame is None or flat_index is None or flat_index.size == 0:
+            return {}
+        vals = np.take(self.frame, flat_index).astype(np.float64)
+        finite = np.isfinite(vals)
+        if not finite.all():
+            vals, flat_index = vals[finite], flat_index[finite]
+        if vals.size == 0:
+            return {}
+        i0, i1 = np.divmod(flat_index, self.shape[1])
+        s = float(vals.sum())
+        return self._finish(float(vals.size), s, float(vals.dot(vals)),
+                            float(vals @ i0), float(vals @ i1), vals.min(), vals.max())
+
+    @staticmethod
+    def _finish(n, s, sumsq, m0, m1, lo, hi) -> dict:
+        mean = s / n
+        var = max(sumsq / n - mean * mean, 0.0)
+        com0 = m0 / s if s > 0 else 0.0
+        com1 = m1 / s if s > 0 else 0.0
+        return {'n': int(round(n)), 'total': s, 'min': float(lo), 'max': float(hi),
+                'mean': mean, 'sigma': var ** 0.5, 'com0': com0, 'com1': com1}
+
+    # -------------------------------------------------------- pyqtgraph ROIs
+    def roi_stats_many(self, rois, image_item) -> list:
+        """Stats for each pyqtgraph ROI drawn over ``image_item`` (which displays the frame).
+
+        Axis-aligned ROIs are rectangles (integral tables once their combined area
+        passes the break-even); rotated ones use their cached pixel index list. A
+        pixel belongs to an ROI when its centre lies inside it.
+        """
+        footprints = [self.footprint(roi, image_item) for roi in rois]
+        if self.frame is not None and self._tables is None:
+            area = 0
+            for fp in footprints:
+                if fp is not None and fp[0] == 'rect':
+                    a0, a1, b0, b1 = fp[1]
+                    area += max(0, min(a1, self.shape[0]) - max(a0, 0)) * max(0, min(b1, self.shape[1]) - max(b0, 0))
+            if area > self.break_even * self.frame.size:
+                self.build_tables()
+        out = []
+        for fp in footprints:
+            if fp is None:
+                out.append({})
+            elif fp[0] == 'rect':
+                out.append(self.rect_stats(*fp[1]))
+            else:
+                out.append(self.index_stats(fp[1]))
+        return out
+
+    def roi_stats(self, roi, image_item) -> dict:
+        """Stats for a single pyqtgraph ROI (see roi_stats_many)."""
+        return self.roi_stats_many([roi], image_item)[0]
+
+    def footprint(self, roi, image_item) -> Optional[Tuple[str, object]]:
+        """('rect', (a0, a1, b0, b1)) or ('index', flat_indices) for the ROI, or None."""
+        if self.frame is None:
+            return None
+        tr = _roi_to_data_transform(roi, image_item, self.shape)
+        if tr is None:
+            return None
+        # Affine map ROI-local (x, y) -> data (axis 0, axis 1)
+        m = np.array([[tr.m11(), tr.m21(), tr.dx()],
+                      [tr.m12(), tr.m22(), tr.dy()]], dtype=np.float64)
+        if getattr(image_item, 'axisOrder', 'col-major') == 'row-major':
+            m = m[::-1]
+        size = roi.size()
+        w, h = float(size[0]), float(size[1])
+        corners = m @ np.array([[0, w, 0, w], [0, 0, h, h], [1, 1, 1, 1]], dtype=np.float64)
+
+        aligned = abs(m[0, 1]) < _ALIGN_EPS and abs(m[1, 0]) < _ALIGN_EPS
+        swapped = abs(m[0, 0]) < _ALIGN_EPS and abs(m[1, 1]) < _ALIGN_EPS
+        if aligned or swapped:
+            # Pixel i is inside when its centre i + 0.5 is in [lo, hi)
+            lo, hi = corners.min(axis=1), corners.max(axis=1)
+            a0, b0 = np.ceil(lo - 0.5).astype(int)
+            a1, b1 = np.ceil(hi - 0.5).astype(int)
+            return 'rect', (int(a0), int(a1), int(b0), int(b1))
+
+        key = (id(roi), tuple(np.round(m.ravel(), 9)), w, h, self.shape)
+        index = self._index_cache.get(key)
+        if index is None:
+            index = _rotated_indices(m, w, h, corners, self.shape)
+            # Keep only the latest footprint per ROI
+            for k in [k for k in self._index_cache if k[0] == id(roi)]:
+                del self._index_cache[k]
+            self._index_cache[key] = index
+        return 'index', index
+
+    def forget(self, roi) -> None:
+        """Drop cached index lists for a removed ROI."""
+        for k in [k for k in self._index_cache if k[0] == id(roi)]:
+            del self._index_cache[k]
+
+
+def _roi_to_data_transform(roi, image_item, shape):
+    """QTransform from ROI-local coordinates to the image item's pixel coordinates."""
+    try:
+        from pyqtgraph import functions as fn
+        tr = roi.sceneTransform() * fn.invertQTransform(image_item.sceneTransform())
+    except Exception:
+        return None
+    # ImageItem local coordinates are pixels unless the image was rescaled via setRect
+    try:
+        width, height = float(image_item.width()), float(image_item.height())
+        if getattr(image_item, 'axisOrder', 'col-major') == 'row-major':
+            sx, sy = shape[1] / width, shape[0] / height
+        else:
+            sx, sy = shape[0] / width, shape[1] / height
+        if sx != 1.0 or sy != 1.0:
+            tr.scale(sx, sy)
+    except Exception:
+        pass
+    return tr
+
+
+def _rotated_indices(m, w, h, corners, shape) -> np.ndarray:
+    """Flat indices of pixels whose centres fall inside the rotated ROI rectangle."""
+    lo = np.clip(np.floor(corners.min(axis=1)).astype(int), 0, shape)
+    hi = np.clip(np.ceil(corners.max(axis=1)).astype(int), 0, shape)
+    if lo[0] >= hi[0] or lo[1] >= hi[1]:
+        return np.empty(0, dtype=np.intp)
+    a, b = np.meshgrid(np.arange(lo[0], hi[0]), np.arange(lo[1], hi[1]), indexing='ij')
+    pts = np.stack([a.ravel() + 0.5, b.ravel() + 0.5])
+    # Back into ROI-local coordinates
+    lin, off = m[:, :2], m[:, 2:]
+    local = np.linalg.solve(lin, pts - off)
+    inside = (local[0] >= 0) & (local[0] < w) & (local[1] >= 0) & (local[1] < h)
+    return (a.ravel()[inside] * shape[1] + b.ravel()[inside]).astype(np.intp)
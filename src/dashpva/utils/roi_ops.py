@@ -9,6 +9,8 @@ from typing import Any, Dict, Tuple
 
 import numpy as np
 
+from dashpva.utils.frame_cache import FrameStack
+
 
 def _extract_roi_subarray(frame: np.ndarray, roi, image_item) -> np.ndarray:
     """
@@ -77,7 +79,7 @@ def extract_roi_stack(main_window, roi) -> np.ndarray:
     if data is None:
         return None
 
-    if isinstance(data, np.ndarray) and data.ndim == 3:
+    if isinstance(data, (np.ndarray, FrameStack)) and data.ndim == 3:
         T = int(data.shape[0])
         samples = []
         # Determine a default ROI box size for zero-fallbacks
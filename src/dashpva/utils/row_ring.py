@@ -0,0 +1,122 @@
+"""
+Fixed-capacity ring of 1D profiles for live waterfall displays
+
+Each new row is written in place, log-scaled once on insertion and its min/max
+recorded, so appending costs O(width) however deep the ring is and display
+levels never need a pass over the history. ``segments`` returns the stored rows
+oldest-first as at most two views (before/after the write pointer), which a
+display can show as two image items without building a reordered copy.
+"""
+
+import numpy as np
+
+# Floor applied before log10 so zero/negative intensities stay finite.
+LOG_FLOOR = 1e-10
+
+
+class RowRing:
+    """Fixed-capacity ring of equal-length float32 rows, oldest overwritten first.
+
+    Keeps the raw rows and their log10 alongside per-row min/max so both display
+    modes and their levels are available without touching the whole history.
+    Storage is allocated on the first append, when the row width is known.
+    """
+
+    def __init__(self, capacity: int):
+        self._capacity = int(capacity)
+        self._raw = None
+        self._log = None
+        self._lo = None   # per-row [raw_min, log_min]
+        self._hi = None   # per-row [raw_max, log_max]
+        self._next = 0    # slot the next row is written to
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @property
+    def width(self):
+        return None if self._raw is None else int(self._raw.shape[1])
+
+    def clear(self) -> None:
+        """Forget all rows (storage is dropped so the next row may change width)."""
+        self._raw = self._log = self._lo = self._hi = None
+        self._next = 0
+        self._count = 0
+
+    def append(self, row: np.ndarray) -> None:
+        row = np.asarray(row, dtype=np.float32).ravel()
+        if self._raw is None:
+            shape = (self._capacity, row.size)
+            self._raw = np.empty(shape, dtype=np.float32)
+            self._log = np.empty(shape, dtype=np.float32)
+            self._lo = np.full((self._capacity, 2), np.nan, dtype=np.float64)
+            self._hi = np.full((self._capacity, 2), np.nan, dtype=np.float64)
+        elif row.size != self._raw.shape[1]:
+            raise ValueError(f"Row width {row.size} does not match {self._raw.shape[1]}")
+        i = self._next
+        self._raw[i] = row
+        np.log10(np.clip(row, LOG_FLOOR, None), out=self._log[i])
+        for k, arr in enumerate((self._raw[i], self._log[i])):
+            finite = arr[np.isfinite(arr)]
+            if finite.size:
+                self._lo[i, k] = finite.min()
+                self._hi[i, k] = finite.max()
+            else:
+                self._lo[i, k] = self._hi[i, k] = np.nan
+        self._next = (i + 1) % self._capacity
+        self._count = min(self._count + 1, self._capacity)
+
+    def rows(self, log: bool = False) -> np.ndarray:
+        """All rows oldest-first as a single array (copies once the ring has wrapped)."""
+        segs = self.segments(log)
+        return segs[0] if len(segs) == 1 else np.concatenate(segs, axis=0)
+
+    def segments(self, log: bool = False) -> list:
+        """Oldest-first views into storage: one block, or two once the ring has wrapped."""
+        if self._count == 0:
+            return []
+        data = self._log if log else self._raw
+        if self._count < self._capacity or self._next == 0:
+            return [data[:self._count]]
+        return [data[self._next:], data[:self._next]]
+
+    def levels(self, log: bool = False):
+        """(min, max) over the stored rows, or None if nothing finite is stored."""
+        if self._count == 0:
+            return None
+        k = 1 if log else 0
+        lo = self._lo[:, k] if self._count == self._capacity else self._lo[:self._count, k]
+        hi = self._hi[:, k] if self._count == self._capacity else self._hi[:self._count, k]
+        if np.all(np.isnan(lo)):
+            return None
+        return float(np.nanmin(lo)), float(np.nanmax(hi))
+
+    def resize(self, capacity: int) -> None:
+        """Change capacity, keeping the most recent rows."""
+        capacity = int(capacity)
+        if capacity == self._capacity:
+            return
+        if self._raw is None:
+            self._capacity = capacity
+            return
+        order = np.arange(self._count)
+        if self._count == self._capacity:
+            order = (order + self._next) % self._capacity
+        keep = order[-capacity:]
+        raw, log = self._raw[keep], self._log[keep]
+        lo, hi = self._lo[keep], self._hi[keep]
+        width = self._raw.shape[1]
+        self._capacity = capacity
+        self._raw = np.empty((capacity, width), dtype=np.float32)
+        self._log = np.empty((capacity, width), dtype=np.float32)
+        self._lo = np.full((capacity, 2), np.nan, dtype=np.float64)
+        self._hi = np.full((capacity, 2), np.nan, dtype=np.float64)
+        n = len(keep)
+        self._raw[:n], self._log[:n], self._lo[:n], self._hi[:n] = raw, log, lo, hi
+        self._count = n
+        self._next = n % capacity
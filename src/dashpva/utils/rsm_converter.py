@@ -2,7 +2,11 @@ from typing import Optional
 
 import h5py
 import numpy as np
-import xrayutilities as xu
+
+from dashpva.utils.startup import lazy_module
+
+# Imported on first conversion rather than with the viewers that hold a converter
+xu = lazy_module('xrayutilities')
 
 """Utilities for converting detector frames into reciprocal space (RSM).
 This module provides a concise RSMConverter focused on the essential
@@ -0,0 +1,177 @@
+"""Incremental HDF5 writer for analysis scans.
+
+Frames and their per-point analysis values are appended while the scan runs,
+into chunked, compressed datasets that grow along the first axis. Rows are
+buffered and written in blocks; every ``flush_every`` frames or
+``flush_interval`` seconds the block is written and the file flushed, so a
+crash leaves a readable file holding every flushed point and the end-of-scan
+save only has to write what is still buffered plus the metadata.
+
+Layout (same as the one-shot analysis writer)::
+
+    /data/images                (N, H, W)  one chunk per frame, Blosc lz4
+    /data/scan_pos/x_positions  (N,)
+    /data/scan_pos/y_positions  (N,)
+    /analysis/total_intensity   (N,)
+    /analysis/com_x             (N,)
+    /analysis/com_y             (N,)
+    /metadata, /attributes      scan-level values as group attributes
+
+Per-point series are only created once a value for them arrives; whole arrays
+(e.g. vectorized analysis maps) can be written at close instead.
+"""
+
+import logging
+import time
+from typing import Dict, Optional
+
+import h5py
+import hdf5plugin
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+IMAGES = '/data/images'
+# Per-point series: append() keyword -> dataset path
+SERIES = {
+    'x': '/data/scan_pos/x_positions',
+    'y': '/data/scan_pos/y_positions',
+    'intensity': '/analysis/total_intensity',
+    'com_x': '/analysis/com_x',
+    'com_y': '/analysis/com_y',
+}
+DEFAULT_FLUSH_EVERY = 64
+DEFAULT_FLUSH_INTERVAL = 2.0
+SERIES_CHUNK = 4096
+
+
+class AnalysisScanWriter:
+    """Appends an analysis scan to ``file_path`` frame by frame.
+
+    Not thread-safe: one thread appends and closes (see ``HDF5WriterThread``).
+    """
+
+    def __init__(self, file_path: str, compress: bool = True,
+                 flush_every: int = DEFAULT_FLUSH_EVERY,
+                 flush_interval: float = DEFAULT_FLUSH_INTERVAL):
+        self.file_path = str(file_path)
+        self.compress = bool(compress)
+        self.flush_every = max(1, int(flush_every))
+        self.flush_interval = float(flush_interval)
+        self._h5 = h5py.File(self.file_path, 'w')
+        self._h5.create_group('/data/scan_pos')
+        self._h5.create_group('/analysis')
+        self._images = []
+        self._series = {key: [] for key in SERIES}
+        self._seen = set()  # series that have received a value
+        self.frame_shape = None
+        self._flushed_at = time.monotonic()
+        self.frames = 0     # frames appended
+        self.written = 0    # frames on disk
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def closed(self) -> bool:
+        return self._h5 is None
+
+    def append(self, image: np.ndarray, **values) -> None:
+        """Append one frame with its per-point values (keys of ``SERIES``).
+
+        ``image`` is written later; it must not be modified after the call.
+        Missing values are stored as NaN.
+        """
+        self.extend(np.asarray(image)[np.newaxis], **{k: [v] for k, v in values.items()})
+
+    def extend(self, images: np.ndarray, **values) -> None:
+        """Append a block of frames ``(n, H, W)`` and per-point arrays of length n."""
+        if self._h5 is None:
+            raise ValueError(f"{self.file_path} is closed")
+        unknown = set(values) - set(SERIES)
+        if unknown:
+            raise ValueError(f"unknown per-point values: {sorted(unknown)}")
+        images = np.asarray(images)
+        if self.frame_shape is None:
+            self.frame_shape = images.shape[1:]
+        elif images.shape[1:] != self.frame_shape:
+            raise ValueError(f"frame shape {images.shape[1:]} does not match {self.frame_shape}")
+        n = len(images)
+        columns = {}
+        for key, column in values.items():
+            columns[key] = np.asarray(column, dtype=np.float64).ravel()
+            if len(columns[key]) != n:
+                raise ValueError(f"{key} has {len(columns[key])} values for {n} frames")
+        for key, buffered in self._series.items():
+            if key in columns:
+                buffered.append(columns[key])
+                self._seen.add(key)
+            else:
+                buffered.append(np.full(n, np.nan))
+        self._images.append(images)
+        self.frames += n
+        if (self.frames - self.written >= self.flush_every
+                or time.monotonic() - self._flushed_at >= self.flush_interval):
+            self.flush()
+
+    def _grow(self, path: str, blocks: list, chunks) -> None:
+        """Append the buffered blocks to ``path``, creating it on first use."""
+        first = blocks[0]
+        dset = self._h5.get(path)
+        if dset is None:
+            kwargs = hdf5plugin.Blosc(cname='lz4', clevel=5, shuffle=True) if self.compress else {}
+            # Points before the first value of this series are NaN
+            dset = self._h5.create_dataset(path, shape=(self.written,) + first.shape[1:],
+                                           maxshape=(None,) + first.shape[1:], dtype=first.dtype,
+                                           chunks=chunks, fillvalue=np.nan if first.dtype.kind == 'f' else 0,
+                                           **kwargs)
+        start = len(dset)
+        dset.resize(start + sum(len(b) for b in blocks), axis=0)
+        # Block by block: no concatenated copy of the buffered frames
+        for block in blocks:
+            dset[start:start + len(block)] = block
+            start += len(block)
+
+    def flush(self) -> None:
+        """Write buffered frames and values and flush the file to disk."""
+        if self._h5 is None or not self._images:
+            return
+        self._grow(IMAGES, self._images, chunks=(1,) + self.frame_shape)
+        for key, path in SERIES.items():
+            if key in self._seen:
+                self._grow(path, [np.concatenate(self._series[key])], chunks=(SERIES_CHUNK,))
+            self._series[key] = []
+        self._images = []
+        self.written = self.frames
+        self._h5.flush()
+        self._flushed_at = time.monotonic()
+
+    def close(self, metadata: Optional[dict] = None, attributes: Optional[dict] = None,
+              datasets: Optional[Dict[str, np.ndarray]] = None) -> None:
+        """Write what is buffered, the scan-level values and close the file.
+
+        ``metadata`` and ``attributes`` become attributes of ``/metadata`` and
+        ``/attributes``; ``datasets`` maps extra dataset paths to whole arrays.
+        """
+        if self._h5 is None:
+            return
+        try:
+            self.flush()
+            for path, array in (datasets or {}).items():
+                if path in self._h5:
+                    raise ValueError(f"{path} was already written point by point")
+                self._h5.create_dataset(path, data=np.asarray(array))
+            for group, values in (('/metadata', metadata), ('/attributes', attributes)):
+                grp = self._h5.require_group(group)
+                for key, value in (values or {}).items():
+                    try:
+                        grp.attrs[key] = value
+                    except (TypeError, ValueError) as e:
+                        logger.debug(f"Skipping {group} attribute {key!r}: {e}")
+            self._h5.attrs['frames'] = self.written
+        finally:
+            self._h5.close()
+            self._h5 = None
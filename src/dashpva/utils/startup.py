@@ -0,0 +1,355 @@
+"""
+Startup profiling and deferred imports for the DashPVA entry points
+
+Every ``DashPVA`` command runs its viewer in a fresh interpreter, so import
+time is paid again on each launch. This module holds the pieces used to
+measure and cut that cost (stdlib only, so importing it is free):
+
+- ``lazy_module(name)`` — a module proxy that imports ``name`` on first
+  attribute access. Viewers bind heavy, rarely needed stacks this way
+  (``xu = lazy_module('xrayutilities')``) instead of importing them at the top.
+- ``when_imported(name, callback)`` — runs ``callback`` right after ``name``
+  is first imported, so a side-effect import (hdf5plugin registering its
+  filters with h5py) happens only in processes that use the library.
+- ``profile_imports(module)`` — runs ``python -X importtime -c 'import module'``
+  in a child and returns an ``ImportReport`` (per-module self / cumulative
+  times, totals per top-level package).
+- First-window probe — when ``DASHPVA_STARTUP_PROBE`` names a file,
+  ``configure_app`` installs an event filter that writes the wall-clock time
+  at which the first top-level window is shown. ``measure_first_window(cmd)``
+  launches a command with the probe set and returns the time-to-first-window.
+
+``DashPVA startup`` (see cli.py) runs both over the entry points and the
+launcher registry.
+"""
+
+import importlib
+import importlib.util
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import types
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence
+
+PROBE_ENV = 'DASHPVA_STARTUP_PROBE'
+
+_lazy_lock = threading.RLock()
+
+
+# ------------------------------------------------------------------ lazy imports
+class LazyModule(types.ModuleType):
+    """Stands in for module ``name`` until an attribute is first read.
+
+    ``on_load(module)`` runs once after the real import (e.g. to apply
+    matplotlib rcParams only when pyplot is actually used).
+    """
+
+    def __init__(self, name: str, on_load: Optional[Callable] = None):
+        super().__init__(name)
+        self.__dict__['_lazy_on_load'] = on_load
+        self.__dict__['_lazy_target'] = None
+
+    def _lazy_load(self):
+        target = self.__dict__['_lazy_target']
+        if target is not None:
+            return target
+        with _lazy_lock:
+            target = self.__dict__['_lazy_target']
+            if target is None:
+                target = importlib.import_module(self.__name__)
+                on_load = self.__dict__['_lazy_on_load']
+                if on_load is not None:
+                    on_load(target)
+                self.__dict__['_lazy_target'] = target
+        return target
+
+    def __getattr__(self, attr):
+        return getattr(self._lazy_load(), attr)
+
+    def __dir__(self):
+        return dir(self._lazy_load())
+
+    def __repr__(self):
+        state = 'loaded' if self.__dict__['_lazy_target'] is not None else 'not loaded'
+        return f"<lazy module {self.__name__!r} ({state})>"
+
+
+def lazy_module(name: str, on_load: Optional[Callable] = None):
+    """``name`` itself if it is already imported, else a ``LazyModule`` proxy."""
+    module = sys.modules.get(name)
+    if module is not None:
+        if on_load is not None:
+            on_load(module)
+        return module
+    return LazyModule(name, on_load)
+
+
+def is_loaded(module) -> bool:
+    """Whether ``module`` (a module or ``LazyModule``) has been imported for real."""
+    if isinstance(module, LazyModule):
+        return module.__dict__['_lazy_target'] is not None
+    return True
+
+
+class _PostImportLoader:
+    """Delegates to the real loader, then runs the callback on the loaded module."""
+
+    def __init__(self, loader, callback: Callable):
+        self._loader = loader
+        self._callback = callback
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        self._loader.exec_module(module)
+        # Hand the module its real loader back before anyone else sees it
+        module.__loader__ = self._loader
+        if module.__spec__ is not None:
+            module.__spec__.loader = self._loader
+        self._callback(module)
+
+    def __getattr__(self, attr):
+        return getattr(self._loader, attr)
+
+
+class _PostImportFinder:
+    """One-shot meta path hook wrapping the loader of module ``name``."""
+
+    def __init__(self, name: str, callback: Callable):
+        self.name = name
+        self.callback = callback
+
+    def find_spec(self, fullname, path=None, target=None):
+        if fullname != self.name:
+            return None
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+        spec = importlib.util.find_spec(fullname)   # the remaining finders
+        if spec is not None and spec.loader is not None:
+            spec.loader = _PostImportLoader(spec.loader, self.callback)
+        return spec
+
+
+def when_imported(name: str, callback: Callable) -> None:
+    """Call ``callback(module)`` once top-level module ``name`` is imported (now, if it is)."""
+    module = sys.modules.get(name)
+    if module is not None:
+        callback(module)
+        return
+    sys.meta_path.insert(0, _PostImportFinder(name, callback))
+
+
+# ------------------------------------------------------------- import profiling
+@dataclass
+class ImportRecord:
+    """One line of ``-X importtime`` output (times in seconds)."""
+    name: str
+    self_time: float
+    cumulative: float
+    depth: int
+
+
+@dataclass
+class ImportReport:
+    """Import-time report of one entry point module."""
+    module: str
+    records: List[ImportRecord] = field(default_factory=list)
+    wall_time: float = 0.0
+    error: str = ''
+
+    @property
+    def total(self) -> float:
+        """Cumulative import time of the entry module itself."""
+        for rec in self.records:
+            if rec.name == self.module:
+                return rec.cumulative
+        return sum(rec.self_time for rec in self.records)
+
+    def slowest(self, n: int = 15) -> List[ImportRecord]:
+        """The ``n`` modules with the largest self time."""
+        return sorted(self.records, key=lambda r: r.self_time, reverse=True)[:n]
+
+    def by_package(self) -> Dict[str, float]:
+        """Self time summed per top-level package, largest first."""
+        totals: Dict[str, float] = {}
+        for rec in self.records:
+            root = rec.name.split('.')[0]
+            totals[root] = totals.get(root, 0.0) + rec.self_time
+        return dict(sorted(totals.items(), key=lambda kv: kv[1], reverse=True))
+
+    def to_dict(self) -> dict:
+        d = asdict(self)
+        d['total'] = self.total
+        d['by_package'] = self.by_package()
+        return d
+
+
+def parse_importtime(text: str) -> List[ImportRecord]:
+    """Parse ``python -X importtime`` stderr; other lines are ignored."""
+    records = []
+    for line in text.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        parts = line[len('import time:'):].split('|')
+        if len(parts) != 3:
+            continue
+        try:
+            self_us, cum_us = int(parts[0]), int(parts[1])
+        except ValueError:
+            continue   # header line
+        name = parts[2]
+        stripped = name.lstrip(' ')
+        depth = max(0, (len(name) - len(stripped) - 1) // 2)
+        records.append(ImportRecord(stripped.strip(), self_us / 1e6, cum_us / 1e6, depth))
+    return records
+
+
+def _child_env(extra: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    env = dict(os.environ)
+    env.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    env.pop(PROBE_ENV, None)
+    if extra:
+        env.update(extra)
+    return env
+
+
+def profile_imports(module: str, python: str = sys.executable, timeout: float = 120.0) -> ImportReport:
+    """Import ``module`` in a fresh interpreter under ``-X importtime``."""
+    cmd = [python, '-X', 'importtime', '-c', f'import {module}']
+    t0 = time.perf_counter()
+    try:
+        proc = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout, env=_child_env())
+    except subprocess.TimeoutExpired:
+        return ImportReport(module, error=f'timed out after {timeout:g} s')
+    report = ImportReport(module, parse_importtime(proc.stderr), time.perf_counter() - t0)
+    if proc.returncode != 0:
+        lines = [ln for ln in proc.stderr.splitlines() if not ln.startswith('import time:')]
+        report.error = lines[-1] if lines else f'exit code {proc.returncode}'
+    return report
+
+
+def format_import_report(report: ImportReport, top: int = 10) -> str:
+    """Plain-text summary: totals, heaviest packages and modules."""
+    lines = [f"{report.module}: {report.total * 1e3:.0f} ms import, "
+             f"{report.wall_time * 1e3:.0f} ms interpreter wall time"]
+    if report.error:
+        lines.append(f"  ERROR: {report.error}")
+    lines.append("  packages (self time):")
+    for name, t in list(report.by_package().items())[:top]:
+        lines.append(f"    {t * 1e3:8.1f} ms  {name}")
+    lines.append("  modules (self / cumulative):")
+    for rec in report.slowest(top):
+        lines.append(f"    {rec.self_time * 1e3:8.1f} / {rec.cumulative * 1e3:8.1f} ms  {rec.name}")
+    return '\n'.join(lines)
+
+
+# ---------------------------------------------------------- time-to-first-window
+def install_first_window_probe(app) -> None:
+    """Write the time the first top-level window is shown to ``$DASHPVA_STARTUP_PROBE``.
+
+    Called by ``configure_app``; a no-op unless the variable is set.
+    """
+    path = os.environ.get(PROBE_ENV)
+    if not path or getattr(app, '_dashpva_startup_probe', None) is not None:
+        return
+    from PyQt5.QtCore import QEvent, QObject, Qt, QTimer
+
+    class _FirstWindowProbe(QObject):
+        def eventFilter(self, obj, event):
+            if (event.type() == QEvent.Show and obj.isWidgetType() and obj.isWindow()
+                    and obj.windowType() not in (Qt.ToolTip, Qt.Popup)):
+                app.removeEventFilter(self)
+                title = obj.windowTitle()
+                # After the show event is processed, i.e. once the window can paint
+                QTimer.singleShot(0, lambda: self._write(time.time(), title))
+            return False
+
+        def _write(self, shown_at, title):
+            try:
+                with open(path, 'w') as f:
+                    json.dump({'shown_at': shown_at, 'title': title, 'pid': os.getpid()}, f)
+            except OSError:
+                pass
+
+    probe = _FirstWindowProbe()
+    app.installEventFilter(probe)
+    app._dashpva_startup_probe = probe
+
+
+@dataclass
+class FirstWindowResult:
+    """Time-to-first-window of one command over ``repeat`` launches (seconds)."""
+    name: str
+    cmd: List[str]
+    times: List[float] = field(default_factory=list)
+    title: str = ''
+    error: str = ''
+
+    @property
+    def median(self) -> Optional[float]:
+        return statistics.median(self.times) if self.times else None
+
+
+def measure_first_window(cmd: Sequence[str], name: str = '', repeat: int = 1,
+                         timeout: float = 60.0, spawn: Optional[Callable] = None) -> FirstWindowResult:
+    """Launch ``cmd`` ``repeat`` times and time each until its first window is shown.
+
+    The command and everything it spawns are terminated as soon as the window
+    appears (or after ``timeout``). ``spawn(cmd, env=, stdout=, stderr=)``
+    replaces ``Popen`` (e.g. the launcher's viewer host); returning None
+    falls back to it.
+    """
+    from dashpva.utils.process_supervisor import terminate_process
+
+    result = FirstWindowResult(name or ' '.join(cmd[-2:]), list(cmd))
+    for _ in range(repeat):
+        fd, probe = tempfile.mkstemp(prefix='dashpva_probe_', suffix='.json')
+        os.close(fd)
+        os.unlink(probe)
+        # A file, not a pipe: a chatty viewer must not block on a full pipe
+        stderr = tempfile.TemporaryFile()
+        t0 = time.time()
+        env = _child_env({PROBE_ENV: probe})
+        proc = spawn(list(cmd), env=env, stdout=subprocess.DEVNULL, stderr=stderr) if spawn else None
+        if proc is None:
+            proc = subprocess.Popen(list(cmd), stdout=subprocess.DEVNULL, stderr=stderr,
+                                    env=env, start_new_session=True)
+        try:
+            shown = _wait_for_probe(proc, probe, timeout)
+            if shown is None:
+                exited = proc.poll() is not None
+                stderr.seek(0)
+                tail = stderr.read().decode(errors='replace').strip().splitlines()
+                result.error = (tail[-1] if exited and tail
+                                else f'no window within {timeout:g} s')
+                break
+            result.times.append(shown['shown_at'] - t0)
+            result.title = shown.get('title', '')
+        finally:
+            terminate_process(proc)
+            stderr.close()
+            if os.path.exists(probe):
+                os.unlink(probe)
+    return result
+
+
+def _wait_for_probe(proc, path: str, timeout: float) -> Optional[dict]:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if os.path.exists(path):
+            try:
+                with open(path) as f:
+                    return json.load(f)
+            except (OSError, ValueError):
+                pass   # being written
+        if proc.poll() is not None and not os.path.exists(path):
+            return None
+        time.sleep(0.02)
+    return None
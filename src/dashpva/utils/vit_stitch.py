@@ -1,14 +1,23 @@
 """
 LiveStitch-style patching/stitching for vit:1:input_phase.
 Produces five panels: transmission, diffraction, beam position, NN prediction, NN stitched.
-Used by PVAReader when subscribing to vit:1:input_phase.
+process_frame/process_frames_batch stitch frame by frame as they arrive;
+process_stream stitches a recorded scan in one pipelined pass (stitch_hdf5,
+``DashPVA vit-stitch``).
 Works with or without PyTorch (numpy fallback when torch unavailable).
 """
 import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from math import pi
 
 import numpy as np
 
+from dashpva.utils.worker_pool import spawn_pool
+
 try:
     import torch
     from torch import Tensor
@@ -205,6 +214,155 @@ if _USE_TORCH:
         return image
 
 
+# ---------- Pipelined batch stitching ----------
+#
+# Every accumulation step is pixel-local: the buffer is clamped to 1, the patch
+# and a ones-patch are added over the patch footprint, and the prediction is
+# divided by max(buffer, 1), which is 1 everywhere the footprint did not touch.
+# So each step only needs to touch its footprint, and the canvas can be split
+# into tiles that see the same frames in the same order. The expensive part,
+# the sub-pixel Fourier shift of each patch, does not depend on the canvas at
+# all and runs ahead in worker processes.
+
+DEFAULT_PIPELINE_CHUNK = 16
+DEFAULT_TILE = 256
+
+
+def _prepare_chunk(streams: np.ndarray, positions: np.ndarray, edge_crop: int, pad: int) -> tuple:
+    """Worker stage: shifted, cropped patches + their canvas offsets for a chunk of frames.
+
+    streams: (n, 512, 256) float32; positions: (n, 2) canvas (y, x) of the patch centres.
+    Returns (offsets (n, 2) int64, patches (n, ph, pw) float32, diff_sums (n,), elapsed_s).
+    """
+    t0 = time.perf_counter()
+    streams = np.asarray(streams, dtype=np.float32)
+    patches = streams[:, DIFF_ROWS + edge_crop : streams.shape[1] - edge_crop, edge_crop : streams.shape[2] - edge_crop]
+    # Summed per frame exactly as process_frame does (float32 pairwise sum)
+    diff_sums = np.array([float(np.sum(d)) for d in np.maximum(streams[:, :DIFF_ROWS, :], 0.0)])
+    ph, pw = patches.shape[-2:]
+    start = positions - np.array([(ph - 1.0) / 2.0, (pw - 1.0) / 2.0])
+    floor = np.floor(start)
+    frac = start - floor
+    # Same per-frame rule as _place_patches_fourier_shift_np: exact positions are not shifted
+    shifted = np.ascontiguousarray(patches)
+    moving = ~np.all(np.isclose(frac, 0.0, atol=1e-7), axis=1)
+    if moving.any():
+        shifted = shifted.copy()
+        shifted[moving] = _fourier_shift_np(shifted[moving], frac[moving])
+    cropped = np.ascontiguousarray(shifted[:, pad : ph - pad, pad : pw - pad])
+    offsets = floor.astype(np.int64) + pad
+    return offsets, cropped, diff_sums, time.perf_counter() - t0
+
+
+class _TiledCanvas:
+    """Prediction/coverage canvas stored as tile x tile shards, allocated on first touch."""
+
+    def __init__(self, shape: tuple, tile: int = DEFAULT_TILE):
+        self.shape = tuple(int(v) for v in shape)
+        self.tile = int(tile)
+        self._pred = {}
+        self._buffer = {}
+
+    def _tile(self, ty: int, tx: int) -> tuple:
+        key = (ty, tx)
+        if key not in self._pred:
+            h = min(self.tile, self.shape[0] - ty * self.tile)
+            w = min(self.tile, self.shape[1] - tx * self.tile)
+            self._pred[key] = np.zeros((h, w), dtype=np.float32)
+            self._buffer[key] = np.zeros((h, w), dtype=np.float32)
+        return self._pred[key], self._buffer[key]
+
+    def clear(self) -> None:
+        self._pred.clear()
+        self._buffer.clear()
+
+    def load(self, pred: np.ndarray, buffer: np.ndarray) -> None:
+        """Split existing full-canvas arrays into shards (all-zero tiles stay unallocated)."""
+        self.clear()
+        t = self.tile
+        for y in range(0, self.shape[0], t):
+            for x in range(0, self.shape[1], t):
+                p, b = pred[y : y + t, x : x + t], buffer[y : y + t, x : x + t]
+                if p.any() or b.any():
+                    tp, tb = self._tile(y // t, x // t)
+                    tp[...] = p
+                    tb[...] = b
+
+    def place(self, y0: int, x0: int, patch: np.ndarray) -> None:
+        """Accumulate one patch with its top-left corner at canvas (y0, x0)."""
+        ph, pw = patch.shape
+        ya, yb = max(y0, 0), min(y0 + ph, self.shape[0])
+        xa, xb = max(x0, 0), min(x0 + pw, self.shape[1])
+        t = self.tile
+        for ty in range(ya // t, (yb - 1) // t + 1) if ya < yb else ():
+            for tx in range(xa // t, (xb - 1) // t + 1) if xa < xb else ():
+                # Footprint ∩ tile, in canvas coordinates
+                cy0, cy1 = max(ya, ty * t), min(yb, (ty + 1) * t)
+                cx0, cx1 = max(xa, tx * t), min(xb, (tx + 1) * t)
+                pred, buf = self._tile(ty, tx)
+                sl = (slice(cy0 - ty * t, cy1 - ty * t), slice(cx0 - tx * t, cx1 - tx * t))
+                b = buf[sl]
+                np.minimum(b, 1.0, out=b)
+                b += 1.0
+                p = pred[sl]
+                p += patch[cy0 - y0 : cy1 - y0, cx0 - x0 : cx1 - x0]
+                p /= b
+
+    def merge(self) -> tuple:
+        """Full-canvas (prediction, coverage) arrays assembled from the shards."""
+        pred = np.zeros(self.shape, dtype=np.float32)
+        buffer = np.zeros(self.shape, dtype=np.float32)
+        t = self.tile
+        for (ty, tx), p in self._pred.items():
+            pred[ty * t : ty * t + p.shape[0], tx * t : tx * t + p.shape[1]] = p
+            buffer[ty * t : ty * t + p.shape[0], tx * t : tx * t + p.shape[1]] = self._buffer[(ty, tx)]
+        return pred, buffer
+
+
+@dataclass
+class StitchStats:
+    """Throughput and queue-depth report for a pipelined stitch."""
+    frames: int = 0
+    chunks: int = 0
+    elapsed: float = 0.0
+    load_s: float = 0.0       # time spent pulling frames from the source
+    prepare_s: float = 0.0    # summed worker time (Fourier shifts), across all workers
+    place_s: float = 0.0      # time spent accumulating into the canvas shards
+    resets: int = 0
+    max_queue: int = 0        # most chunks waiting between loader and placement
+    queue_sum: int = 0
+
+    @property
+    def fps(self) -> float:
+        return self.frames / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def mean_queue(self) -> float:
+        return self.queue_sum / self.chunks if self.chunks else 0.0
+
+    def summary(self) -> str:
+        return (f"{self.frames} frames in {self.elapsed:.2f} s ({self.fps:.1f} fps); "
+                f"load {self.load_s:.2f} s, prepare {self.prepare_s:.2f} s (workers), "
+                f"place {self.place_s:.2f} s; queue mean {self.mean_queue:.1f} / max {self.max_queue}")
+
+
+def _as_stream(stream) -> np.ndarray:
+    """Input frame as a (512, 256) float32 array (flattened/odd-shaped values are reshaped)."""
+    stream = np.asarray(stream, dtype=np.float32)
+    if stream.shape != STREAM_SHAPE:
+        stream = np.broadcast_to(
+            stream.ravel()[: np.prod(STREAM_SHAPE)].reshape(STREAM_SHAPE),
+            STREAM_SHAPE,
+        ).copy()
+    return stream
+
+
+def _to_numpy(arr) -> np.ndarray:
+    if _USE_TORCH and isinstance(arr, torch.Tensor):
+        return arr.detach().cpu().numpy()
+    return np.asarray(arr)
+
+
 def _parse_int_env(name: str, default: int) -> int:
     v = os.environ.get(name)
     if v is None:
@@ -669,12 +827,7 @@ class VitStitcher:
         Returns (composite, panels): panels [transmission, diffraction, beam_position, nn_prediction, nn_stitched].
         If positions not loaded, returns 5 panels with zeros where needed.
         """
-        stream = np.asarray(stream_512_256, dtype=np.float32)
-        if stream.shape != STREAM_SHAPE:
-            stream = np.broadcast_to(
-                stream.ravel()[: np.prod(STREAM_SHAPE)].reshape(STREAM_SHAPE),
-                STREAM_SHAPE,
-            ).copy()
+        stream = _as_stream(stream_512_256)
         diff = np.maximum(stream[:DIFF_ROWS, :], 0.0).astype(np.float32)
         data = stream[DIFF_ROWS:, :]
 
@@ -727,7 +880,10 @@ class VitStitcher:
             self._pred_ph = self._pred_ph / np.clip(self._buffer, 1.0, None)
             acc_np = self._pred_ph.copy()
 
-        single_np = patch.copy()
+        return self._build_panels(diff, patch, acc_np, uid)
+
+    def _build_panels(self, diff: np.ndarray, patch: np.ndarray, acc_np: np.ndarray, uid: int) -> tuple:
+        """(composite, [transmission, diffraction, beam_position, nn_prediction, nn_stitched]) for one frame."""
         cc = self._center_crop_display
         acc_panel = acc_np
         if cc > 0:
@@ -735,7 +891,7 @@ class VitStitcher:
             if h > 2 * cc and w > 2 * cc:
                 acc_panel = acc_np[cc:-cc, cc:-cc].copy()
         diff_panel = diff.copy()
-        single_panel = single_np
+        single_panel = patch.copy()
 
         transmission_panel = self._accu_int.data.astype(np.float32).copy() if self._accu_int is not None else np.zeros((self._fly_ny or 2, self._fly_nx or 2), dtype=np.float32)
         beam_panel = self._beam_panel_for_uid(uid)
@@ -743,6 +899,204 @@ class VitStitcher:
         panels = [transmission_panel, diff_panel, beam_panel, single_panel, acc_panel]
         return transmission_panel, panels
 
+    def _record_transmission(self, uid: int, diff_sum: float) -> None:
+        if self._accu_int is not None:
+            row, col = uid // self._fly_nx, uid % self._fly_nx
+            if 0 <= row < self._fly_ny and 0 <= col < self._fly_nx:
+                self._accu_int.data[row, col] = float(diff_sum)
+                self._accu_int.mask[row, col] = False
+
+    def process_stream(
+        self,
+        frames,
+        workers: int = None,
+        chunk: int = DEFAULT_PIPELINE_CHUNK,
+        max_queue: int = None,
+        tile: int = DEFAULT_TILE,
+        progress=None,
+    ) -> tuple:
+        """
+        Pipelined equivalent of calling process_frame for every (stream, unique_id) in ``frames``.
+
+        A loader thread pulls frames from the iterable (list, generator, file reader) and
+        submits them in chunks to ``workers`` processes (default: CPU count - 1) that compute
+        the sub-pixel shifted patches. This thread accumulates the results, in frame order,
+        into a tiled canvas that is merged back into the stitcher at the end. At most
+        ``max_queue`` chunks (default: 2 per worker) are in flight, so memory stays bounded
+        however long the scan is. ``progress(stats)`` is called after each placed chunk.
+        Returns (composite, panels, stats); composite and panels are those of the last frame.
+
+        Panels are only produced once the iterable is exhausted, so this is for offline
+        (file or replayed) scans; live display keeps using process_frame.
+        """
+        if not self._ready:
+            raise ValueError("Positions not loaded; pipelined stitching needs a position table")
+        if workers is None:
+            workers = max(1, (os.cpu_count() or 2) - 1)
+        workers = max(1, int(workers))
+        chunk = max(1, int(chunk))
+        max_queue = max(1, int(max_queue) if max_queue else 2 * workers)
+        npos = len(self._pos_x_pix)
+        ec = self._patch_edge_crop
+        origin = np.asarray(_to_numpy(self._pos_origin_coords), dtype=np.float64)
+
+        canvas = _TiledCanvas(self._object_size, tile)
+        canvas.load(_to_numpy(self._pred_ph), _to_numpy(self._buffer))
+        stats = StitchStats()
+        pending = queue.Queue(maxsize=max_queue)
+        stop = threading.Event()
+        errors = []
+        done_marker = object()
+        if workers > 1:
+            pool = spawn_pool(workers)
+        else:
+            pool = ThreadPoolExecutor(max_workers=1)
+
+        def _load():
+            try:
+                streams, ids = [], []
+                source = iter(frames)
+                while not stop.is_set():
+                    t0 = time.perf_counter()
+                    item = next(source, None)
+                    stats.load_s += time.perf_counter() - t0
+                    if item is not None:
+                        streams.append(_as_stream(item[0]))
+                        ids.append(int(item[1]))
+                    if streams and (item is None or len(streams) == chunk):
+                        ids_arr = np.asarray(ids, dtype=np.int64)
+                        uids = (ids_arr - self._id_offset) % npos if npos else np.zeros_like(ids_arr)
+                        positions = np.column_stack([self._pos_y_pix[uids], self._pos_x_pix[uids]]) + origin
+                        batch = np.stack(streams)
+                        future = pool.submit(_prepare_chunk, batch, positions, ec, PAD)
+                        # Blocks while max_queue chunks are outstanding (backpressure)
+                        pending.put((ids_arr, uids, batch[-1], future))
+                        streams, ids = [], []
+                    if item is None:
+                        break
+            except BaseException as e:
+                errors.append(e)
+            finally:
+                pending.put(done_marker)
+
+        t_start = time.perf_counter()
+        loader = threading.Thread(target=_load, name="vit-stitch-loader", daemon=True)
+        loader.start()
+        last = None
+        try:
+            while True:
+                depth = pending.qsize()
+                entry = pending.get()
+                if entry is done_marker:
+                    break
+                ids, uids, last_stream, future = entry
+                offsets, patches, diff_sums, prepare_s = future.result()
+                t0 = time.perf_counter()
+                for k in range(len(ids)):
+                    if self._reset_period > 0 and (int(ids[k]) - self._id_offset) % self._reset_period == 0:
+                        canvas.clear()
+                        if self._accu_int is not None:
+                            self._accu_int.data[...] = 0
+                            self._accu_int.mask[...] = True
+                        stats.resets += 1
+                    self._record_transmission(int(uids[k]), diff_sums[k])
+                    canvas.place(int(offsets[k, 0]), int(offsets[k, 1]), patches[k])
+                stats.place_s += time.perf_counter() - t0
+                stats.prepare_s += prepare_s
+                stats.frames += len(ids)
+                stats.chunks += 1
+                stats.queue_sum += depth
+                stats.max_queue = max(stats.max_queue, depth)
+                stats.elapsed = time.perf_counter() - t_start
+                last = (last_stream, int(uids[-1]))
+                if progress is not None:
+                    progress(stats)
+        finally:
+            stop.set()
+            # Unblock a loader waiting on a full queue, then wait for it to finish
+            while loader.is_alive():
+                try:
+                    pending.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            pool.shutdown(wait=True, cancel_futures=True)
+        if errors:
+            raise errors[0]
+        stats.elapsed = time.perf_counter() - t_start
+
+        pred, buffer = canvas.merge()
+        if _USE_TORCH:
+            self._pred_ph, self._buffer = torch.from_numpy(pred), torch.from_numpy(buffer)
+        else:
+            self._pred_ph, self._buffer = pred, buffer
+        if last is None:
+            return None, None, stats
+        last_stream, uid = last
+        diff = np.maximum(last_stream[:DIFF_ROWS, :], 0.0).astype(np.float32)
+        patch = last_stream[DIFF_ROWS + ec : -ec, ec:-ec].astype(np.float32)
+        composite, panels = self._build_panels(diff, patch, pred, uid)
+        return composite, panels, stats
+
+
+PANEL_NAMES = ("transmission", "diffraction", "beam_position", "nn_prediction", "nn_stitched")
+
+
+def iter_hdf5_frames(path: str, dataset: str = "/entry/data/data", ids_dataset: str = None,
+                     first_id: int = 0):
+    """
+    Yield (stream, unique_id) for every frame of a recorded scan.
+
+    Frames are read one at a time, so the file is never loaded whole. Without
+    ``ids_dataset`` frame k gets unique_id ``first_id + k``.
+    """
+    if h5py is None:
+        raise ImportError("h5py is required to read recorded scans")
+    with h5py.File(path, "r") as h5:
+        if dataset not in h5:
+            raise KeyError(f"{dataset!r} not found in {path}")
+        data = h5[dataset]
+        ids = np.asarray(h5[ids_dataset]).astype(np.int64).ravel() if ids_dataset else None
+        if ids is not None and len(ids) != len(data):
+            raise ValueError(f"{ids_dataset!r} has {len(ids)} ids for {len(data)} frames")
+        for k in range(len(data)):
+            yield data[k], int(ids[k]) if ids is not None else first_id + k
+
+
+def stitch_hdf5(
+    path: str,
+    dataset: str = "/entry/data/data",
+    ids_dataset: str = None,
+    first_id: int = None,
+    positions_csv_path: str = None,
+    positions_npz_path: str = None,
+    positions_hdf5_path: str = None,
+    patch_edge_crop: int = None,
+    center_crop_display: int = None,
+    workers: int = None,
+    chunk: int = DEFAULT_PIPELINE_CHUNK,
+    progress=None,
+) -> tuple:
+    """
+    Stitch a recorded scan with process_stream on a new VitStitcher.
+
+    The stitcher is private to this call, so it never shares canvas state with the
+    live ``get_stitcher`` instance. ``first_id`` defaults to the stitcher's id offset,
+    i.e. the first frame sits at the first scan position.
+    Returns (panels, stats); panels follow PANEL_NAMES (None for an empty scan).
+    """
+    stitcher = VitStitcher(
+        positions_hdf5_path=positions_hdf5_path,
+        positions_npz_path=positions_npz_path,
+        positions_csv_path=positions_csv_path,
+        patch_edge_crop=patch_edge_crop,
+        center_crop_display=center_crop_display,
+    )
+    if first_id is None:
+        first_id = stitcher._id_offset
+    frames = iter_hdf5_frames(path, dataset, ids_dataset, first_id)
+    _, panels, stats = stitcher.process_stream(frames, workers=workers, chunk=chunk, progress=progress)
+    return panels, stats
+
 
 # Module-level singleton for PVAReader (one channel = one stitcher)
 _stitcher = None
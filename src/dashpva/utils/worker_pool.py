@@ -0,0 +1,14 @@
+"""
+Process pools for DashPVA's parallel batch jobs.
+
+Workers are started with the ``spawn`` method rather than ``fork``, so a child
+never inherits the parent's open HDF5 handles, PVA channels or Qt state.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+
+def spawn_pool(workers: int) -> ProcessPoolExecutor:
+    """A ``ProcessPoolExecutor`` of ``workers`` spawned (not forked) processes."""
+    return ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn"))
@@ -1,22 +1,45 @@
 
-import h5py
+import logging
+import os
+import queue
+import time
+
 import numpy as np
 import pyqtgraph as pg
 from PyQt5 import uic
-from PyQt5.QtCore import QThread, QTimer, pyqtSignal
+from PyQt5.QtCore import Qt, QThread, QTimer, pyqtSignal
 from PyQt5.QtWidgets import QMainWindow
 
 from dashpva.gui import ui_path
+from dashpva.utils.scan_writer import AnalysisScanWriter
+
+logger = logging.getLogger(__name__)
+
+# Frames the writer thread may fall behind before append_point() blocks
+WRITER_QUEUE_SIZE = 256
 
 
 class HDF5WriterThread(QThread):
     """
-    A class that writes the image data to an HDF5 file using PyQt5.
+    A class that writes an analysis scan to an HDF5 file using PyQt5.
+
+    Frames are streamed: call append_point() for every frame while the scan
+    runs and finish() at the end. The thread appends them to chunked,
+    compressed datasets (see dashpva.utils.scan_writer) and flushes
+    periodically, so the scan never has to be held in RAM and finishing only
+    writes what is still buffered.
+
+    Passing images_cache keeps the one-shot behaviour: the arrays are written
+    as one block and the thread finishes by itself.
+
+    If writing fails the error is kept in ``error``, write_failed is emitted
+    and later frames are dropped (counted in ``frames_dropped``) instead of
+    blocking the caller on a queue nobody empties.
 
     Keyword Args:
         file_written (pyqtSignal) -- A signal to indicate when the file is written.
         filename (str) -- Filename of the saved image file.
-        images_cache (numpy.ndarray) -- A 3D numpy array that holds the images.
+        images_cache (numpy.ndarray) -- A 3D numpy array that holds the images (one-shot only).
         scan_pos (dict) -- A dictionary of x and y positions of the image.
         metadata (dict) -- A dictionary of metadata.
         attributes (dict) -- A dictionary of attributes.
@@ -27,47 +50,89 @@ class HDF5WriterThread(QThread):
     # Signal to notify when writing is done
     # Has to be class level so PyQt can distinguish between signals and class attributes
     file_written = pyqtSignal()  
+    write_failed = pyqtSignal(str)
     
-    def __init__(self, filename, images_cache, scan_pos, metadata, attributes, intensity_values, com_x_matrix, com_y_matrix):
+    def __init__(self, filename, images_cache=None, scan_pos=None, metadata=None, attributes=None,
+                 intensity_values=None, com_x_matrix=None, com_y_matrix=None, compress=True):
         super(HDF5WriterThread, self).__init__()
         self.filename = filename
-        self.images_cache = images_cache
-        self.scan_pos = scan_pos
-        self.metadata = metadata
-        self.attributes = attributes
-        self.intensity_values = intensity_values
-        self.com_x_matrix = com_x_matrix
-        self.com_y_matrix = com_y_matrix
+        self.compress = compress
+        self.frames_written = 0
+        self.frames_dropped = 0
+        self.error = None
+        self._queue = queue.Queue(maxsize=WRITER_QUEUE_SIZE)
+        if images_cache is not None:
+            self._queue.put(('block', np.asarray(images_cache), {}))
+            scan_pos = scan_pos or {}
+            self.finish(metadata, attributes, {
+                '/data/scan_pos/x_positions': scan_pos.get('x_positions'),
+                '/data/scan_pos/y_positions': scan_pos.get('y_positions'),
+                '/analysis/total_intensity': intensity_values,
+                '/analysis/com_x': com_x_matrix,
+                '/analysis/com_y': com_y_matrix,
+            })
+
+    def append_point(self, image, intensity=None, com_x=None, com_y=None, x=None, y=None) -> None:
+        """
+        Queue one frame and its analysis values; safe to call from any thread.
+
+        Blocks when the writer is WRITER_QUEUE_SIZE frames behind; drops the
+        frame once writing has failed.
+        """
+        if self.error is not None:
+            self.frames_dropped += 1
+            return
+        values = {'intensity': intensity, 'com_x': com_x, 'com_y': com_y, 'x': x, 'y': y}
+        self._queue.put(('point', image, {k: v for k, v in values.items() if v is not None}))
+
+    def finish(self, metadata=None, attributes=None, datasets=None) -> None:
+        """
+        Close the file once the queued frames are written, adding scan-level values.
+
+        Args:
+            metadata (dict): stored as attributes of /metadata.
+            attributes (dict): stored as attributes of /attributes.
+            datasets (dict): extra dataset path -> whole array (None values are skipped).
+        """
+        if self.error is not None:
+            return
+        datasets = {path: value for path, value in (datasets or {}).items() if value is not None}
+        self._queue.put(('finish', None, (metadata, attributes, datasets)))
 
     def run(self) -> None:
         """
-        This function runs the thread which creates and saves the HDF5 file.
+        This function runs the thread which creates and fills the HDF5 file.
         """
         try:
-            with h5py.File(self.filename, 'w') as h5file:
-                #data
-                h5file.create_group('/data')
-                h5file.create_dataset('/data/images', data=self.images_cache)
-                #scan pos
-                h5file.create_group('/data/scan_pos')
-                h5file.create_dataset('/data/scan_pos/x_positions', data=self.scan_pos['x_positions'])
-                h5file.create_dataset('/data/scan_pos/y_positions', data=self.scan_pos['y_positions'])
-                #save all metadata and attributes too. Expecting dictionaries
-                h5file.create_group('/metadata')
-                for key, value in self.metadata.items():
-                    h5file['/metadata'].attrs[key] = value
-                h5file.create_group('/attributes')
-                for key, value in self.attributes.items():
-                    h5file['/attributes'].attrs[key] = value
-                #Analysis data 
-                h5file.create_group('/analysis')
-                h5file.create_dataset('/analysis/total_intensity', data=self.intensity_values)
-                h5file.create_dataset('/analysis/com_x', data=self.com_x_matrix)
-                h5file.create_dataset('/analysis/com_y', data=self.com_y_matrix)
-                # Emit signal when file writing is done
-                self.file_written.emit()  
+            with AnalysisScanWriter(self.filename, compress=self.compress) as writer:
+                while True:
+                    try:
+                        kind, image, payload = self._queue.get(timeout=writer.flush_interval)
+                    except queue.Empty:
+                        # Scan paused: get what is buffered onto disk
+                        writer.flush()
+                        continue
+                    if kind == 'point':
+                        writer.append(image, **payload)
+                    elif kind == 'block':
+                        writer.extend(image, **payload)
+                    else:
+                        writer.close(*payload)
+                        break
+                    self.frames_written = writer.written
+                self.frames_written = writer.written
+            # Emit signal when file writing is done
+            self.file_written.emit()  
         except Exception as e:
-            print(e)
+            logger.exception(f"Writing {self.filename} failed")
+            self.error = e
+            # Release callers blocked on a full queue; later frames are dropped
+            while True:
+                try:
+                    self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            self.write_failed.emit(str(e))
 
 
 
@@ -112,6 +177,9 @@ class AnalysisWindow(QMainWindow):
         self.xpos_path = None
         self.ypos_path = None
         self.save_path = None
+        # streams the scan to HDF5 while recording
+        self.writer_thread = None
+        self._finishing_writers = []
         # for if widget is a ImageView
         self.view_intensity = None
         self.view_comx = None
@@ -434,6 +502,76 @@ class AnalysisWindow(QMainWindow):
         self.view_comy.view.getAxis('left').setLabel('Scan Position Rows')
         self.view_comy.view.getAxis('bottom').setLabel('Scan Position Cols')
 
+    def start_recording(self, filename=None) -> None:
+        """
+        Streams every new frame and its analysis values to an HDF5 file.
+
+        Args:
+            filename (str): Output file; defaults to a timestamped file in save_path.
+        """
+        self.stop_recording()
+        if filename is None:
+            filename = os.path.join(self.save_path or '.', f'analysis_scan_{time.strftime("%Y%m%d_%H%M%S")}.h5')
+        self.writer_thread = HDF5WriterThread(filename)
+        self.writer_thread.file_written.connect(self.recording_written)
+        self.writer_thread.write_failed.connect(self.recording_failed)
+        self.writer_thread.finished.connect(self._prune_writers)
+        self.writer_thread.start()
+        # Direct connection: the frame is queued from the reader's thread, before the next one replaces it
+        self.parent.reader.reader_new_frame.connect(self.record_frame, Qt.DirectConnection)
+        self.status_text.setText(f'Recording to {filename}')
+
+    def record_frame(self) -> None:
+        """
+        Queues the reader's current frame and analysis point for the writer thread.
+        """
+        writer, reader = self.writer_thread, self.parent.reader
+        if writer is None or reader.image is None:
+            return
+        values = {}
+        if self.consumer_mode == "continuous" and reader.analysis_index is not None:
+            point = reader.attributes[reader.analysis_index]["value"][0]["value"]
+            values = {'intensity': point.get("Intensity"), 'com_x': point.get("ComX"), 'com_y': point.get("ComY"),
+                      'x': point.get("Axis1"), 'y': point.get("Axis2")}
+        writer.append_point(reader.image, **values)
+
+    def stop_recording(self) -> None:
+        """
+        Stops recording; the writer thread closes the file once the queued frames are written.
+        """
+        writer = self.writer_thread
+        if writer is None:
+            return
+        try:
+            self.parent.reader.reader_new_frame.disconnect(self.record_frame)
+        except TypeError:
+            pass
+        self.writer_thread = None
+        datasets = {}
+        if self.consumer_mode == "vectorized" and self.analysis_index is not None:
+            # Vectorized consumers publish whole maps, written once at the end
+            maps = self.parent.reader.attributes[self.analysis_index]["value"][0]["value"]
+            intensity = np.asarray(maps.get("Intensity", []))
+            size = int(np.sqrt(intensity.size))
+            if size and size * size == intensity.size:
+                datasets = {f'/analysis/{name}': np.reshape(maps.get(key), (size, size))
+                            for name, key in (('total_intensity', 'Intensity'), ('com_x', 'ComX'), ('com_y', 'ComY'))}
+        writer.finish(datasets=datasets)
+        # Keep the thread referenced until it has written the rest
+        self._finishing_writers.append(writer)
+
+    def recording_written(self) -> None:
+        self.status_text.setText('Recording saved')
+
+    def recording_failed(self, message) -> None:
+        writer = self.writer_thread
+        if writer is not None and writer.error is not None:
+            self.stop_recording()
+        self.status_text.setText(f'Recording failed: {message}')
+
+    def _prune_writers(self) -> None:
+        self._finishing_writers = [w for w in self._finishing_writers if not w.isFinished()]
+
     def closeEvent(self, event):
         """
         Handles cleanup operations when the analysis window is closed.
@@ -441,6 +579,7 @@ class AnalysisWindow(QMainWindow):
         Args:
             event (QCloseEvent): The close event triggered when the window is closed.
         """
+        self.stop_recording()
         self.parent.start_timers()
         del self.parent.analysis_window
         event.accept()
@@ -6,7 +6,6 @@ import time
 
 import numpy as np
 import pyqtgraph as pg
-import xrayutilities as xu
 from epics import PV, ca, caget, camonitor
 from PyQt5 import uic
 from PyQt5.QtCore import (
@@ -40,8 +39,10 @@ from pyqtgraph.colormap import get as get_colormap
 from dashpva.gui import configure_app, ui_path
 from dashpva.gui.theme_colors import ROI_COLORS
 from dashpva.utils import HDF5Writer, PVAReader, rotation_cycle
-from dashpva.utils.mask_manager import MaskManager
-from dashpva.utils.roi_ops import _extract_roi_subarray
+from dashpva.utils.autoscale import HistogramAutoscale
+from dashpva.utils.mask_manager import MaskManager, PixelStatistics
+from dashpva.utils.roi_integral import RoiIntegralStats
+from dashpva.utils.startup import lazy_module
 from dashpva.viewer.area_det.docks import (
     AnalysisDock,
     BeamFitDock,
@@ -56,6 +57,9 @@ from dashpva.viewer.core.base_window import BaseWindow
 from dashpva.viewer.mask_viewer import MaskViewerWindow
 from dashpva.viewer.roi_stats_panel import RoiStatsPanel
 
+# Only the HKL geometry setup uses xrayutilities (~1 s to import)
+xu = lazy_module('xrayutilities')
+
 rot_gen = rotation_cycle(1,5)
 
 _PERF_TIMER_INTERVAL_MS = 1000
@@ -211,6 +215,7 @@ class DiffractionImageWindow(BaseWindow):
         self.manual_rois = []            # [{roi, label, n, key}]
         self._manual_roi_last_frame = -1
         self._manual_roi_source = None
+        self._manual_roi_engine = RoiIntegralStats()
         self._manual_pva_server = None
         self._manual_pv_obj = None
         self._manual_pv_channel = None
@@ -225,16 +230,15 @@ class DiffractionImageWindow(BaseWindow):
         # Mask management
         self.mask_manager = MaskManager()
         self.mask_viewer = None
-        self._dead_px_frames = []
+        self._dead_px_stats = None
         self._dead_px_collecting = False
         self._dead_px_target = 50
         self._dead_px_last_frame = 0
         self._dead_px_mode = 'illuminated'
 
-        # Live autoscale is throttled (not per-frame) so large frames stay swift;
-        # while the box is checked, levels re-fit at most every AUTOSCALE_INTERVAL_S.
-        self.AUTOSCALE_INTERVAL_S = 2.0
-        self._last_autoscale_ts = 0.0
+        # Live autoscale runs every frame: 5/95 % levels come from a sampled,
+        # log-binned histogram blended across frames (no full-frame sort).
+        self._autoscaler = HistogramAutoscale(low=5.0, high=95.0, smoothing=0.5)
 
         # Initializing but not starting timers so they can be reached by different functions
         self.timer_labels = QTimer()
@@ -739,7 +743,8 @@ class DiffractionImageWindow(BaseWindow):
         else:
             return
 
-        self._dead_px_frames = []
+        # Frames are folded into running statistics as they arrive instead of being kept
+        self._dead_px_stats = PixelStatistics(track_median=(self._dead_px_mode == 'dark'))
         self._dead_px_collecting = True
         self._dead_px_last_frame = getattr(self.reader, 'frames_received', 0)
         self.btn_detect_dead.setText(f'Collecting 0/{self._dead_px_target}...')
@@ -758,24 +763,30 @@ class DiffractionImageWindow(BaseWindow):
             return
         self._dead_px_last_frame = current_frames
 
-        self._dead_px_frames.append(self.reader.image.copy())
+        try:
+            self._dead_px_stats.update(self.reader.image)
+        except ValueError as e:
+            # Detector shape changed mid-collection; start over at the new shape
+            print(f"[Area Detector] Dead pixel collection restarted: {e}")
+            self._dead_px_stats = PixelStatistics(track_median=self._dead_px_stats.track_median)
+            self._dead_px_stats.update(self.reader.image)
         self.btn_detect_dead.setText(
-            f'Collecting {len(self._dead_px_frames)}/{self._dead_px_target}...')
+            f'Collecting {self._dead_px_stats.count}/{self._dead_px_target}...')
 
-        if len(self._dead_px_frames) >= self._dead_px_target:
+        if self._dead_px_stats.count >= self._dead_px_target:
             self._dead_px_collecting = False
             mode = getattr(self, '_dead_px_mode', 'illuminated')
 
             if mode == 'dark':
                 result_mask = self.mask_manager.detect_hot_pixels(
-                    self._dead_px_frames, sigma=5.0)
+                    self._dead_px_stats, sigma=5.0)
                 label = 'hot'
             else:
                 result_mask = self.mask_manager.detect_dead_pixels(
-                    self._dead_px_frames, variance_threshold=1.0)
+                    self._dead_px_stats, variance_threshold=1.0)
                 label = 'stuck'
 
-            self._dead_px_frames = []
+            self._dead_px_stats = None
             self.btn_detect_dead.setText('Detect Dead Px')
             self.btn_detect_dead.setEnabled(True)
 
@@ -1384,6 +1395,7 @@ class DiffractionImageWindow(BaseWindow):
         except Exception:
             pass
         self.manual_rois.remove(entry)
+        self._manual_roi_engine.forget(entry['roi'])
         prefix = self.reader.pva_prefix if self.reader is not None else None
         if prefix:
             for field in (*self.STATS_FIELDS, *self._MANUAL_COM_FIELDS):
@@ -1521,56 +1533,27 @@ class DiffractionImageWindow(BaseWindow):
         self._clear_manual_roi_overlays()
         self._restore_manual_rois(new_prefix)
 
-    @staticmethod
-    def _roi_stats(sub) -> dict:
-        """Five stats in one compact float64 pass (derive mean/std from n/sum/sumsq,
-        no rescans) plus the intensity-weighted centroid as ROI-local axis-index means
-        (_com_ax0/_com_ax1); the caller maps those to absolute detector pixels.
-        Returns {} if empty/all-NaN."""
-        a = np.asarray(sub)
-        has_nan = a.dtype.kind == 'f' and bool(np.isnan(a).any())
-        if a.ndim == 2 and a.shape[0] and a.shape[1]:
-            sum0 = np.nansum(a, axis=1) if has_nan else a.sum(axis=1)   # per axis-0 index
-            sum1 = np.nansum(a, axis=0) if has_nan else a.sum(axis=0)   # per axis-1 index
-        else:
-            sum0 = sum1 = None
-        flat = np.ravel(a)
-        if has_nan:
-            flat = flat[np.isfinite(flat)]
-        if flat.size == 0:
-            return {}
-        flat = flat.astype(np.float64, copy=False)
-        n = flat.size
-        s = float(flat.sum())
-        mean = s / n
-        var = max(float(flat.dot(flat)) / n - mean * mean, 0.0)
-        ax0 = ax1 = 0.0
-        if sum0 is not None and s > 0:   # sum(sum0) == sum(sum1) == s
-            ax0 = float(sum0.astype(np.float64) @ np.arange(sum0.shape[0])) / s
-            ax1 = float(sum1.astype(np.float64) @ np.arange(sum1.shape[0])) / s
-        return {'Total_RBV': s, 'MinValue_RBV': float(flat.min()),
-                'MaxValue_RBV': float(flat.max()), 'MeanValue_RBV': mean,
-                'Sigma_RBV': var ** 0.5, '_com_ax0': ax0, '_com_ax1': ax1}
+    # Engine field -> stats_data field for manual ROIs
+    _MANUAL_STATS_FIELDS = {'total': 'Total_RBV', 'min': 'MinValue_RBV', 'max': 'MaxValue_RBV',
+                            'mean': 'MeanValue_RBV', 'sigma': 'Sigma_RBV'}
 
     @staticmethod
-    def _roi_com_to_image(roi, ax0, ax1):
-        """Map an ROI-local centroid (sub axis-0/axis-1 index means) to absolute
-        detector-pixel coordinates on the displayed axes, honoring the ROI's position
-        and rotation. Returns (x, y)."""
+    def _data_to_image(image_item, ax0, ax1):
+        """Map a centroid in frame-array indices (axis 0, axis 1) to the displayed
+        view coordinates, honoring the image item's axis order and transform.
+        Returns (x, y)."""
+        x, y = (ax1, ax0) if getattr(image_item, 'axisOrder', 'col-major') == 'row-major' else (ax0, ax1)
         try:
-            p = roi.mapToParent(QPointF(float(ax0), float(ax1)))
+            p = image_item.mapToParent(QPointF(float(x), float(y)))
             return float(p.x()), float(p.y())
         except Exception:
-            try:
-                pos = roi.pos()
-                return float(pos.x()) + float(ax0), float(pos.y()) + float(ax1)
-            except Exception:
-                return float(ax0), float(ax1)
+            return float(x), float(y)
 
     def _update_manual_roi_stats(self, force: bool = False) -> None:
         """Frame-guarded local stats for every manual ROI -> stats_data['{prefix}:
-        Manual{k}:{field}'] (+ broadcast). One vectorized pass per ROI; the ~<=5
-        loop is negligible. Hard early-out when no manual ROI exists."""
+        Manual{k}:{field}'] (+ broadcast). Statistics come from RoiIntegralStats,
+        which switches to summed-area tables when many/large ROIs make them
+        cheaper than per-ROI reductions. Hard early-out when no manual ROI exists."""
         if not self.manual_rois or self.reader is None:
             return
         image_item = self.image_view.getImageItem()
@@ -1583,22 +1566,23 @@ class DiffractionImageWindow(BaseWindow):
         source = self._manual_roi_source
         if source is None:
             source = np.asarray(image_item.image)
+        # One engine pass per frame: integral images (built once the ROIs cover
+        # enough area to pay for them) make each rectangle an O(1) lookup, and
+        # rotated ROIs reuse a cached pixel index list.
+        self._manual_roi_engine.set_frame(source)
+        all_stats = self._manual_roi_engine.roi_stats_many(
+            [entry['roi'] for entry in self.manual_rois], image_item)
         prefix = self.reader.pva_prefix
-        for entry in self.manual_rois:
-            sub = _extract_roi_subarray(source, entry['roi'], image_item)
-            if sub is None:
-                continue
-            stats = self._roi_stats(sub)
+        for entry, stats in zip(self.manual_rois, all_stats):
             if not stats:
                 continue
-            # COM comes back as ROI-local axis indices; report it in absolute detector
-            # pixels (displayed axes) so it lines up with the image and future q axes.
-            ax0 = stats.pop('_com_ax0', 0.0)
-            ax1 = stats.pop('_com_ax1', 0.0)
-            stats['ComX_RBV'], stats['ComY_RBV'] = self._roi_com_to_image(
-                entry['roi'], ax0, ax1)
-            for field, val in stats.items():
-                self.stats_data[f"{prefix}:{entry['key']}:{field}"] = val
+            for name, field in self._MANUAL_STATS_FIELDS.items():
+                self.stats_data[f"{prefix}:{entry['key']}:{field}"] = stats[name]
+            # Report COM in absolute detector pixels (displayed axes) so it lines up
+            # with the image and future q axes.
+            comx, comy = self._data_to_image(image_item, stats['com0'], stats['com1'])
+            self.stats_data[f"{prefix}:{entry['key']}:ComX_RBV"] = comx
+            self.stats_data[f"{prefix}:{entry['key']}:ComY_RBV"] = comy
         if self._manual_pva_server is not None:
             self._publish_manual_stats(frame_id)
 
@@ -1711,6 +1695,8 @@ class DiffractionImageWindow(BaseWindow):
         Resets the `first_plot` flag, ensuring the next plot behaves as the first one.
         """
         self.first_plot = True
+        # Linear/log switch changes the value scale; don't blend across it.
+        self._autoscaler.reset()
 
     def rotation_count(self) -> None:
         """
@@ -2327,12 +2313,7 @@ class DiffractionImageWindow(BaseWindow):
                                                 autoLevels=False,
                                                 autoHistogramRange=False)
                     if self.chk_autoscale.isChecked():
-                        # Throttled: recompute levels at most every few seconds,
-                        # not every frame (percentile over a 16 MP array is costly).
-                        now = time.monotonic()
-                        if now - self._last_autoscale_ts >= self.AUTOSCALE_INTERVAL_S:
-                            self.apply_autoscale()
-                            self._last_autoscale_ts = now
+                        self.apply_autoscale()
                 # Separate image update for horizontal average plot
                 self.horizontal_avg_plot.plot(x=np.mean(self.image, axis=0),
                                             y=np.arange(self.image.shape[1]),
@@ -2355,20 +2336,17 @@ class DiffractionImageWindow(BaseWindow):
 
     def autoscale_checked(self) -> None:
         if self.chk_autoscale.isChecked() and self.image is not None:
+            self._autoscaler.reset()   # fit the current frame, not stale history
             self.apply_autoscale()
             self._fit_histogram_range(force=True)
-            self._last_autoscale_ts = time.monotonic()   # restart the throttle clock
 
     def apply_autoscale(self) -> None:
         if self.image is None:
             return
-        intensities = self.image.flatten()
-        intensities = intensities[np.isfinite(intensities)]
-        if len(intensities) == 0:
+        levels = self._autoscaler.update(self.image)
+        if levels is None:
             return
-        min_pct, max_pct = np.percentile(intensities, [5, 95])
-        min_pct = float(min_pct)
-        max_pct = float(max_pct)
+        min_pct, max_pct = levels
         self.min_setting_val.blockSignals(True)
         self.max_setting_val.blockSignals(True)
         self.min_setting_val.setValue(min_pct)
@@ -2386,10 +2364,13 @@ class DiffractionImageWindow(BaseWindow):
         if self.image is None:
             return
         try:
-            finite = self.image[np.isfinite(self.image)]
-            if finite.size == 0:
-                return
-            lo, hi = float(np.min(finite)), float(np.max(finite))
+            # nanmin/nanmax avoid copying the finite pixels out of a large frame
+            lo, hi = float(np.nanmin(self.image)), float(np.nanmax(self.image))
+            if not (np.isfinite(lo) and np.isfinite(hi)):
+                finite = self.image[np.isfinite(self.image)]
+                if finite.size == 0:
+                    return
+                lo, hi = float(np.min(finite)), float(np.max(finite))
             if hi <= lo:
                 hi = lo + 1.0
             vb = self.image_view.ui.histogram.vb
@@ -19,9 +19,12 @@ The averaged region comes from one of two sources, selected in the dock:
 Pixel extraction is delegated to the shared, transform-aware helper
 ``dashpva.utils.roi_ops._extract_roi_subarray`` (pyqtgraph ``getArrayRegion``
 with a pixel-slice fallback), the same routine the workbench ROI tools use.
-"""
 
-from collections import deque
+Rows live in a preallocated ring (``dashpva.utils.row_ring.RowRing``): each new
+profile is written in place, log-scaled once on insertion, and its min/max
+recorded, so appending costs O(width) however deep the waterfall is. The ring is displayed as two image items
+(the rows before and after the write pointer) so no reordered copy is built.
+"""
 
 import numpy as np
 import pyqtgraph as pg
@@ -42,6 +45,7 @@ from PyQt5.QtWidgets import (
 from pyqtgraph.colormap import get as get_colormap
 
 from dashpva.utils.roi_ops import _extract_roi_subarray
+from dashpva.utils.row_ring import RowRing
 from dashpva.viewer.core.docks.base_dock import BaseDock
 
 _SEGMENT = "other"
@@ -66,10 +70,9 @@ class WaterfallDock(BaseDock):
         super().__init__(title="Waterfall", main_window=main_window,
                          segment_name=_SEGMENT, dock_area=Qt.RightDockWidgetArea,
                          show=show)
-        # Ring buffer of 1D profiles plus the current profile length so we can
-        # detect when the ROI/averaging change resizes the row and reset.
-        self._buffer: deque[np.ndarray] = deque(maxlen=_DEFAULT_DEPTH)
-        self._row_len = None
+        # Ring buffer of 1D profiles; its width tracks the current profile length
+        # so an ROI/averaging change that resizes the row restarts the stack.
+        self._buffer = RowRing(_DEFAULT_DEPTH)
         # Frame counter of the most recently stacked row. The plot timer can fire
         # faster than frames arrive, so we only append when this changes — this
         # stops the waterfall from piling duplicate rows when no new frame is in.
@@ -135,13 +138,18 @@ class WaterfallDock(BaseDock):
         self.plot_widget.setMinimumHeight(160)
         self.plot_widget.getAxis('bottom').setLabel(text='ROI position [px]')
         self.plot_widget.getAxis('left').setLabel(text='Frame (time →)')
+        # Two items show the ring without reordering it: waterfall_img holds the
+        # oldest block, _wrap_img the rows written after the ring wrapped.
         self.waterfall_img = pg.ImageItem()
-        self.waterfall_img.setOpts(axisOrder='row-major')
-        try:
-            self.waterfall_img.setLookupTable(get_colormap('viridis').getLookupTable())
-        except Exception:
-            pass
-        self.plot_widget.addItem(self.waterfall_img)
+        self._wrap_img = pg.ImageItem()
+        for item in (self.waterfall_img, self._wrap_img):
+            item.setOpts(axisOrder='row-major')
+            try:
+                item.setLookupTable(get_colormap('viridis').getLookupTable())
+            except Exception:
+                pass
+            self.plot_widget.addItem(item)
+        self.chk_log.toggled.connect(self._render)
         outer.addWidget(self.plot_widget, stretch=1)
 
         self.btn_clear = QPushButton("Clear")
@@ -213,16 +221,17 @@ class WaterfallDock(BaseDock):
 
     def _on_depth_changed(self, value: int) -> None:
         # Preserve the most recent rows when resizing the ring buffer.
-        self._buffer = deque(self._buffer, maxlen=int(value))
+        self._buffer.resize(int(value))
+        self._render()
 
     def _on_clear(self) -> None:
         self._reset_buffer()
 
     def _reset_buffer(self) -> None:
         self._buffer.clear()
-        self._row_len = None
         self._last_frame_id = _UNSET
         self.waterfall_img.clear()
+        self._wrap_img.clear()
 
     # ------------------------------------------------------------- manual ROI
     def _ensure_manual_roi(self) -> None:
@@ -419,23 +428,37 @@ class WaterfallDock(BaseDock):
         return getattr(reader, "frames_received", None)
 
     def _append_row(self, row: np.ndarray) -> None:
-        if self._row_len is None:
-            self._row_len = int(row.size)
-        elif int(row.size) != self._row_len:
+        width = self._buffer.width
+        if width is not None and int(row.size) != width:
             # ROI resized/rotated to a new output length -> restart the stack.
             self._buffer.clear()
-            self._row_len = int(row.size)
         self._buffer.append(row)
         self._render()
 
-    def _render(self) -> None:
-        if not self._buffer:
+    def _render(self, *_args) -> None:
+        segments = self._buffer.segments(log=self.chk_log.isChecked())
+        if not segments:
             return
-        stack = np.vstack(self._buffer)  # shape (n_frames, n_bins) == (y, x)
-        if self.chk_log.isChecked():
-            stack = np.log10(np.clip(stack, 1e-10, None))
         autoscale = self.chk_autoscale.isChecked()
-        self.waterfall_img.setImage(stack, autoLevels=autoscale)
+        levels = self._buffer.levels(log=self.chk_log.isChecked()) if autoscale else None
+        if levels is None:
+            # Keep the current levels (or let the first image pick them).
+            current = self.waterfall_img.levels if self.waterfall_img.image is not None else None
+            levels = None if current is None else (float(current[0]), float(current[1]))
+        if levels is not None and levels[0] == levels[1]:
+            levels = (levels[0], levels[0] + 1.0)
+        opts = {'autoLevels': True} if levels is None else {'levels': levels}
+        offset = 0
+        for item, seg in zip((self.waterfall_img, self._wrap_img), segments + [None]):
+            if seg is None or len(seg) == 0:
+                item.clear()
+                continue
+            # Frame index runs along y, oldest at the bottom.
+            item.setImage(seg, **opts)
+            # Both blocks share one colour scale.
+            opts = {'levels': item.levels}
+            item.setPos(0, offset)
+            offset += len(seg)
         if autoscale:
             # Re-assert auto-range every render so the view keeps fitting as the
             # buffer fills (30 -> max frames) and so an accidental zoom or the
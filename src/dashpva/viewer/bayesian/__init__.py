@@ -12,6 +12,8 @@ blop_adapter   – DashPVA-owned adapter around ``blop.ax.Agent``: config
                  suggest/move/read/ingest optimization plan.
 bayesian_viewer – PyQt5 GUI: scalable DOF/objective tables (with GUI-editable
                  limits) and live optimization plots.
+benchmark       – Headless closed-loop throughput benchmark (``DashPVA
+                 optbench``): evaluations/s and time per loop phase.
 bluesky_compat  – Compatibility layer for importing bluesky/ophyd/blop from a
                  beamline conda environment.
 """
@@ -53,6 +53,7 @@ from dashpva.viewer.bayesian.blop_adapter import (
     DOFSpec,
     ObjectiveSpec,
     OptimizerConfig,
+    SurfacePredictor,
 )
 
 logger = logging.getLogger(__name__)
@@ -167,7 +168,7 @@ class ScanWorker(QThread):
             # otherwise build a fresh one.
             agent = self._existing_agent or build_agent(self.config, actuators)
             # Expose the agent so the GUI can keep it for resume + model surfaces
-            # (used only after the scan; never while this worker mutates it).
+            # (mid-scan queries are serialized with suggest/ingest by model_lock).
             self.agent_ready.emit(agent)
         except Exception as exc:  # noqa: BLE001
             logger.error("blop setup failed:\n%s", traceback.format_exc())
@@ -227,13 +228,18 @@ class _MoveWorker(QThread):
 
 
 class _SurfaceWorker(QThread):
-    """Computes a single-objective model surface off the GUI thread (GP compute)."""
+    """Computes a single-objective model surface off the GUI thread (GP compute).
 
-    done = pyqtSignal(object)   # surface payload dict
+    Emits a coarse preview through ``partial`` before the full grid (``done``)
+    unless the surface is already cached.
+    """
+
+    partial = pyqtSignal(object)  # coarse surface payload dict
+    done = pyqtSignal(object)     # surface payload dict
     failed = pyqtSignal(str)
 
     def __init__(self, agent, config, x_name, y_name, *,
-                 fixed_overrides=None, objective=None, parent=None):
+                 fixed_overrides=None, objective=None, predictor=None, parent=None):
         super().__init__(parent)
         self._agent = agent
         self._config = config
@@ -241,14 +247,23 @@ class _SurfaceWorker(QThread):
         self._y = y_name
         self._fixed = fixed_overrides
         self._objective = objective
+        self._predictor = predictor
 
     def run(self) -> None:
         try:
-            from dashpva.viewer.bayesian.blop_adapter import predict_surface
+            from dashpva.viewer.bayesian.blop_adapter import (
+                iter_refinement,
+                predict_surface,
+            )
 
-            payload = predict_surface(
-                self._agent, self._config, self._x, self._y,
-                fixed_overrides=self._fixed, objective=self._objective)
+            payloads = iter_refinement(
+                predict_surface, self._agent, self._config, self._x, self._y,
+                fixed_overrides=self._fixed, objective=self._objective,
+                predictor=self._predictor)
+            payload = next(payloads)
+            for refined in payloads:
+                self.partial.emit(payload)
+                payload = refined
             self.done.emit(payload)
         except Exception as exc:  # noqa: BLE001
             logger.error("Surface prediction failed:\n%s", traceback.format_exc())
@@ -258,25 +273,34 @@ class _SurfaceWorker(QThread):
 class _SurfaceMultiWorker(QThread):
     """Computes all optimized objectives over a 2-D grid (for the RGB phase map)."""
 
-    done = pyqtSignal(object)   # multi-surface payload dict
+    partial = pyqtSignal(object)  # coarse multi-surface payload dict
+    done = pyqtSignal(object)     # multi-surface payload dict
     failed = pyqtSignal(str)
 
     def __init__(self, agent, config, x_name, y_name, *,
-                 fixed_overrides=None, parent=None):
+                 fixed_overrides=None, predictor=None, parent=None):
         super().__init__(parent)
         self._agent = agent
         self._config = config
         self._x = x_name
         self._y = y_name
         self._fixed = fixed_overrides
+        self._predictor = predictor
 
     def run(self) -> None:
         try:
-            from dashpva.viewer.bayesian.blop_adapter import predict_surface_multi
+            from dashpva.viewer.bayesian.blop_adapter import (
+                iter_refinement,
+                predict_surface_multi,
+            )
 
-            payload = predict_surface_multi(
-                self._agent, self._config, self._x, self._y,
-                fixed_overrides=self._fixed)
+            payloads = iter_refinement(
+                predict_surface_multi, self._agent, self._config, self._x, self._y,
+                fixed_overrides=self._fixed, predictor=self._predictor)
+            payload = next(payloads)
+            for refined in payloads:
+                self.partial.emit(payload)
+                payload = refined
             self.done.emit(payload)
         except Exception as exc:  # noqa: BLE001
             logger.error("Phase-map prediction failed:\n%s", traceback.format_exc())
@@ -289,19 +313,22 @@ class _SliceWorker(QThread):
     done = pyqtSignal(object)   # slice payload dict
     failed = pyqtSignal(str)
 
-    def __init__(self, agent, config, x_name, *, fixed_overrides=None, parent=None):
+    def __init__(self, agent, config, x_name, *, fixed_overrides=None, predictor=None,
+                 parent=None):
         super().__init__(parent)
         self._agent = agent
         self._config = config
         self._x = x_name
         self._fixed = fixed_overrides
+        self._predictor = predictor
 
     def run(self) -> None:
         try:
             from dashpva.viewer.bayesian.blop_adapter import predict_slice_1d
 
             payload = predict_slice_1d(
-                self._agent, self._config, self._x, fixed_overrides=self._fixed)
+                self._agent, self._config, self._x, fixed_overrides=self._fixed,
+                predictor=self._predictor)
             self.done.emit(payload)
         except Exception as exc:  # noqa: BLE001
             logger.error("Slice prediction failed:\n%s", traceback.format_exc())
@@ -1321,6 +1348,8 @@ class BayesianViewer(QtWidgets.QMainWindow):
         # demand (the agent persists once the scan worker has finished).
         self._agent = None
         self._agent_config: Optional[OptimizerConfig] = None
+        self._model_has_data = False   # the agent has ingested at least one round
+        self._predictor = SurfacePredictor()   # model predictions per model version
         self._surface_worker: Optional[_SurfaceWorker] = None
         self._surface_multi_worker: Optional[_SurfaceMultiWorker] = None
         self._slice_worker: Optional[_SliceWorker] = None
@@ -1667,7 +1696,7 @@ class BayesianViewer(QtWidgets.QMainWindow):
         discovered: List[str] = []
         try:
             from dashpva.viewer.bayesian.pva_signal import PvaSignal
-            val = PvaSignal(channel).get()
+            val = PvaSignal(channel, monitor=False).get()
             if isinstance(val, dict):
                 discovered = [k for k, v in val.items()
                               if isinstance(v, (int, float))]
@@ -2034,7 +2063,11 @@ class BayesianViewer(QtWidgets.QMainWindow):
 
         self._persist_local_state()
         self._stopping = False
-        self._plots.set_update_enabled(False)  # can't query the model mid-scan
+        # A resumed model can be queried mid-scan; a fresh one after its first round.
+        self._model_has_data = resuming
+        if not resuming:
+            self._predictor.clear()
+        self._refresh_update_enabled()
 
         self._worker = ScanWorker(
             config=run_cfg,
@@ -2079,6 +2112,8 @@ class BayesianViewer(QtWidgets.QMainWindow):
         self._stopping = False
         self._agent = None
         self._agent_config = None
+        self._model_has_data = False
+        self._predictor.clear()
         self._original_positions = None
         self._plots.reset([], minimize=False, obj_names=[])  # clear plots, surface, axes
         self._plots.set_update_enabled(False)
@@ -2094,6 +2129,10 @@ class BayesianViewer(QtWidgets.QMainWindow):
 
     def _on_point(self, payload: dict) -> None:
         self._plots.add_point(payload)
+        # The first round is ingested before the next round's first point is taken.
+        if not self._model_has_data and payload["index"] > self._n_points.value():
+            self._model_has_data = True
+            self._refresh_update_enabled()
         total = self._iterations.value() * self._n_points.value()
         self._status_lbl.setText(f"Status: Measuring… ({payload['index']}/{total})")
         self._refresh_best_label()
@@ -2216,7 +2255,8 @@ class BayesianViewer(QtWidgets.QMainWindow):
         self._status_lbl.setStyleSheet(status_style(ERROR))
         self._reset_buttons()
         # Surfaces can be computed if a model was built before the failure.
-        self._plots.set_update_enabled(self._agent is not None)
+        self._model_has_data = self._agent is not None
+        self._refresh_update_enabled()
         QtWidgets.QMessageBox.critical(
             self, "Scan Error",
             f"The optimization encountered an error:\n\n{msg}\n\n"
@@ -2232,115 +2272,115 @@ class BayesianViewer(QtWidgets.QMainWindow):
             self._status_lbl.setStyleSheet(status_style(SUCCESS))
         self._stopping = False
         self._reset_buttons()
-        # Model is settled and no longer being mutated -> allow surface compute.
-        self._plots.set_update_enabled(self._agent is not None)
+        self._model_has_data = self._agent is not None
+        self._refresh_update_enabled()
 
     # ------------------------------------------------------------------
     # Model-surface slots (2-D projection)
     # ------------------------------------------------------------------
 
-    def _on_surface_requested(self, x_name: str, y_name: str) -> None:
+    def _prediction_running(self) -> bool:
+        return any(w is not None and w.isRunning() for w in (
+            self._surface_worker, self._surface_multi_worker, self._slice_worker))
+
+    def _refresh_update_enabled(self) -> None:
+        # The model can be queried once it has data (also mid-scan: the adapter
+        # serializes predictions with suggest/ingest), one computation at a time.
+        self._plots.set_update_enabled(
+            self._agent is not None and self._model_has_data
+            and not self._prediction_running())
+
+    def _set_prediction_status(self, text: str, style: str) -> None:
+        # While a scan runs the status line tracks its progress; leave it alone.
         if self._worker is not None and self._worker.isRunning():
-            QtWidgets.QMessageBox.information(
-                self, "Optimization running",
-                "Wait for the current run to finish before computing a surface.")
             return
-        if self._agent is None or self._agent_config is None:
+        self._status_lbl.setText(text)
+        self._status_lbl.setStyleSheet(status_style(style))
+
+    def _check_model_ready(self) -> bool:
+        if self._agent is None or self._agent_config is None or not self._model_has_data:
             QtWidgets.QMessageBox.information(
                 self, "No model yet",
                 "Run an optimization first, then click “Update surface”.")
-            return
+            return False
+        return True
+
+    def _start_prediction(self, worker: QThread, done, failed, partial=None) -> None:
         self._plots.set_update_enabled(False)
-        self._status_lbl.setText("Status: Computing surface…")
-        self._status_lbl.setStyleSheet(status_style(WARNING))
+        if partial is not None:
+            worker.partial.connect(partial)
+        worker.done.connect(done)
+        worker.failed.connect(failed)
+        worker.finished.connect(self._refresh_update_enabled)
+        worker.start()
+
+    def _on_surface_requested(self, x_name: str, y_name: str) -> None:
+        if not self._check_model_ready():
+            return
+        self._set_prediction_status("Status: Computing surface…", WARNING)
         self._surface_worker = _SurfaceWorker(
             self._agent, self._agent_config, x_name, y_name,
             fixed_overrides=self._plots.fixed_overrides(),
-            objective=self._plots.current_objective())
-        self._surface_worker.done.connect(self._on_surface_done)
-        self._surface_worker.failed.connect(self._on_surface_failed)
-        self._surface_worker.start()
+            objective=self._plots.current_objective(),
+            predictor=self._predictor)
+        self._start_prediction(self._surface_worker, self._on_surface_done,
+                               self._on_surface_failed, self._on_surface_partial)
+
+    def _on_surface_partial(self, payload: dict) -> None:
+        self._plots.set_surface(payload)
+        self._set_prediction_status("Status: Refining surface…", WARNING)
 
     def _on_surface_done(self, payload: dict) -> None:
         self._plots.set_surface(payload)
-        self._plots.set_update_enabled(True)
-        self._status_lbl.setText("Status: Surface updated ✓")
-        self._status_lbl.setStyleSheet(status_style(SUCCESS))
+        self._set_prediction_status("Status: Surface updated ✓", SUCCESS)
 
     def _on_surface_failed(self, msg: str) -> None:
-        self._plots.set_update_enabled(True)
-        self._status_lbl.setText("Status: Surface failed")
-        self._status_lbl.setStyleSheet(status_style(ERROR))
+        self._set_prediction_status("Status: Surface failed", ERROR)
         QtWidgets.QMessageBox.warning(
             self, "Surface error",
             f"Could not compute the model surface:\n\n{msg}")
 
     def _on_surface_multi_requested(self, x_name: str, y_name: str) -> None:
-        if self._worker is not None and self._worker.isRunning():
-            QtWidgets.QMessageBox.information(
-                self, "Optimization running",
-                "Wait for the current run to finish before computing a phase map.")
-            return
-        if self._agent is None or self._agent_config is None:
-            QtWidgets.QMessageBox.information(
-                self, "No model yet",
-                "Run an optimization first, then click “Update surface”.")
+        if not self._check_model_ready():
             return
-        self._plots.set_update_enabled(False)
-        self._status_lbl.setText("Status: Computing phase map…")
-        self._status_lbl.setStyleSheet(status_style(WARNING))
+        self._set_prediction_status("Status: Computing phase map…", WARNING)
         self._surface_multi_worker = _SurfaceMultiWorker(
             self._agent, self._agent_config, x_name, y_name,
-            fixed_overrides=self._plots.fixed_overrides())
-        self._surface_multi_worker.done.connect(self._on_surface_multi_done)
-        self._surface_multi_worker.failed.connect(self._on_surface_multi_failed)
-        self._surface_multi_worker.start()
+            fixed_overrides=self._plots.fixed_overrides(),
+            predictor=self._predictor)
+        self._start_prediction(self._surface_multi_worker, self._on_surface_multi_done,
+                               self._on_surface_multi_failed, self._on_surface_multi_partial)
+
+    def _on_surface_multi_partial(self, payload: dict) -> None:
+        self._plots.set_surface_multi(payload)
+        self._set_prediction_status("Status: Refining phase map…", WARNING)
 
     def _on_surface_multi_done(self, payload: dict) -> None:
         self._plots.set_surface_multi(payload)
-        self._plots.set_update_enabled(True)
-        self._status_lbl.setText("Status: Phase map updated ✓")
-        self._status_lbl.setStyleSheet(status_style(SUCCESS))
+        self._set_prediction_status("Status: Phase map updated ✓", SUCCESS)
 
     def _on_surface_multi_failed(self, msg: str) -> None:
-        self._plots.set_update_enabled(True)
-        self._status_lbl.setText("Status: Phase map failed")
-        self._status_lbl.setStyleSheet(status_style(ERROR))
+        self._set_prediction_status("Status: Phase map failed", ERROR)
         QtWidgets.QMessageBox.warning(
             self, "Phase map error",
             f"Could not compute the phase map:\n\n{msg}")
 
     def _on_slice_requested(self, x_name: str) -> None:
-        if self._worker is not None and self._worker.isRunning():
-            QtWidgets.QMessageBox.information(
-                self, "Optimization running",
-                "Wait for the current run to finish before computing a slice.")
-            return
-        if self._agent is None or self._agent_config is None:
-            QtWidgets.QMessageBox.information(
-                self, "No model yet",
-                "Run an optimization first, then click “Update surface”.")
+        if not self._check_model_ready():
             return
-        self._plots.set_update_enabled(False)
-        self._status_lbl.setText("Status: Computing slice…")
-        self._status_lbl.setStyleSheet(status_style(WARNING))
+        self._set_prediction_status("Status: Computing slice…", WARNING)
         self._slice_worker = _SliceWorker(
             self._agent, self._agent_config, x_name,
-            fixed_overrides=self._plots.fixed_overrides())
-        self._slice_worker.done.connect(self._on_slice_done)
-        self._slice_worker.failed.connect(self._on_slice_failed)
-        self._slice_worker.start()
+            fixed_overrides=self._plots.fixed_overrides(),
+            predictor=self._predictor)
+        self._start_prediction(self._slice_worker, self._on_slice_done, self._on_slice_failed)
 
     def _on_slice_done(self, payload: dict) -> None:
         self._plots.set_slice(payload)
-        self._plots.set_update_enabled(True)
-        self._status_lbl.setText("Status: Slice updated ✓")
-        self._status_lbl.setStyleSheet(status_style(SUCCESS))
+        self._set_prediction_status("Status: Slice updated ✓", SUCCESS)
 
     def _on_slice_failed(self, msg: str) -> None:
-        self._plots.set_update_enabled(True)
-        self._status_lbl.setText("Status: Slice failed")
-        self._status_lbl.setStyleSheet(status_style(ERROR))
+        self._set_prediction_status("Status: Slice failed", ERROR)
         QtWidgets.QMessageBox.warning(
             self, "Slice error",
             f"Could not compute the model slice:\n\n{msg}")
@@ -2380,6 +2420,7 @@ class BayesianViewer(QtWidgets.QMainWindow):
         # into a destroyed widget if the window is closed mid "Update surface".
         if self._surface_worker is not None and self._surface_worker.isRunning():
             try:
+                self._surface_worker.partial.disconnect()
                 self._surface_worker.done.disconnect()
                 self._surface_worker.failed.disconnect()
             except (TypeError, RuntimeError):
@@ -2394,6 +2435,7 @@ class BayesianViewer(QtWidgets.QMainWindow):
             self._slice_worker.wait(2000)
         if self._surface_multi_worker is not None and self._surface_multi_worker.isRunning():
             try:
+                self._surface_multi_worker.partial.disconnect()
                 self._surface_multi_worker.done.disconnect()
                 self._surface_multi_worker.failed.disconnect()
             except (TypeError, RuntimeError):
@@ -0,0 +1,392 @@
+"""
+benchmark.py
+============
+Headless closed-loop throughput benchmark for the blop optimizer.
+
+Runs complete optimization campaigns through :func:`blop_optimize_plan` — the
+same suggest → move → read → ingest loop the viewer drives — for a grid of DOF
+and objective counts, and reports how many evaluations per second the loop
+sustains and where the time goes:
+
+* ``fit``         — GP model fitting inside ``agent.suggest``,
+* ``acquisition`` — the rest of ``agent.suggest`` (acquisition optimization),
+* ``move``        — ``bps.mv`` of every DOF until settled,
+* ``commit``      — the optional commit step (not used by the benchmark devices),
+* ``read``        — ``trigger_and_read`` of the objectives,
+* ``tell``        — ``agent.ingest`` of a round's outcomes.
+
+``fit`` is separated from ``acquisition`` by timing Ax's generator ``fit``
+while a campaign runs; with an Ax version that has none of the hooked classes
+the whole of ``suggest`` is reported as ``acquisition`` (``fit_timed`` is
+False).
+
+Transports
+----------
+``sim``  the ``ophyd.sim`` motors and synthetic peak readables of the viewer's
+         simulation mode (:func:`~.blop_adapter._build_sim_devices`).
+``pva``  over local PVAccess: the benchmark serves one writable NTScalar per
+         DOF and starts ``probe_sim_server`` with ``--truth-pvs``; objectives
+         read its ground-truth channels through :class:`PvaSignal`.  The
+         objective values do not depend on the DOFs, so this measures transport
+         and model cost, not convergence.
+
+Usage
+-----
+    DashPVA optbench --dofs 1,2,4 --objectives 1,2 --iterations 20
+    DashPVA optbench --transport pva --dofs 2 --json bench.json
+"""
+
+from __future__ import annotations
+
+import importlib
+import logging
+import statistics
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+from dashpva.viewer.bayesian.blop_adapter import DOFSpec, ObjectiveSpec, OptimizerConfig
+
+logger = logging.getLogger(__name__)
+
+PHASES = ("fit", "acquisition", "move", "commit", "read", "tell")
+TRANSPORTS = ("sim", "pva")
+
+PROBE_MODULE = "dashpva.consumers.caIOC_servers.probe_sim_server"
+# Ground-truth channels of probe_sim_server (``<channel>:<key>``), one per objective.
+PROBE_TRUTH_KEYS = ("true_amp", "true_cx", "true_cy", "true_fwhm_x", "true_fwhm_y")
+DEFAULT_PREFIX = "dashpva:optbench:"
+
+# Ax classes whose ``fit`` is the model fit of a generation step (newest first).
+_FIT_HOOKS = (
+    ("ax.generation_strategy.generator_spec", "GeneratorSpec"),
+    ("ax.modelbridge.model_spec", "GeneratorSpec"),
+    ("ax.modelbridge.model_spec", "ModelSpec"),
+)
+
+
+@dataclass
+class BenchmarkCase:
+    """One campaign: ``n_dofs`` motors, ``n_objectives`` maximized objectives."""
+
+    n_dofs: int
+    n_objectives: int = 1
+    iterations: int = 20
+    n_points: int = 1
+    transport: str = "sim"
+
+    @property
+    def label(self) -> str:
+        return (f"{self.n_dofs} DOF x {self.n_objectives} obj, "
+                f"{self.iterations}x{self.n_points} ({self.transport})")
+
+    def validate(self) -> Optional[str]:
+        if self.transport not in TRANSPORTS:
+            return f"transport must be one of {', '.join(TRANSPORTS)}"
+        if self.n_dofs < 1 or self.n_objectives < 1:
+            return "need at least one DOF and one objective"
+        if self.transport == "pva" and self.n_objectives > len(PROBE_TRUTH_KEYS):
+            return f"the pva transport has {len(PROBE_TRUTH_KEYS)} objective channels"
+        return None
+
+    def config(self, prefix: str = DEFAULT_PREFIX,
+               probe_channel: str = f"{DEFAULT_PREFIX}probe") -> OptimizerConfig:
+        """The :class:`OptimizerConfig` of this campaign (PVs used by ``pva`` only)."""
+        dofs = [DOFSpec(name=f"x{i}", pv=f"pva://{prefix}x{i}", lo=-1.0, hi=1.0)
+                for i in range(self.n_dofs)]
+        objectives = [ObjectiveSpec(name=f"obj{i}",
+                                    pv=f"pva://{probe_channel}:{PROBE_TRUTH_KEYS[i % len(PROBE_TRUTH_KEYS)]}")
+                      for i in range(self.n_objectives)]
+        return OptimizerConfig(dofs=dofs, objectives=objectives,
+                               iterations=self.iterations, n_points=self.n_points)
+
+
+@dataclass
+class BenchmarkResult:
+    """Timings of one campaign; ``rounds`` holds per-round seconds per phase."""
+
+    case: BenchmarkCase
+    evaluations: int = 0
+    wall_time: float = 0.0
+    rounds: List[Dict[str, float]] = field(default_factory=list)
+    fit_timed: bool = False
+    error: str = ""
+
+    @property
+    def evals_per_s(self) -> float:
+        return self.evaluations / self.wall_time if self.wall_time > 0 else 0.0
+
+    def phase_totals(self) -> Dict[str, float]:
+        return {p: sum(r.get(p, 0.0) for r in self.rounds) for p in PHASES}
+
+    def per_evaluation(self) -> Dict[str, float]:
+        """Mean seconds per evaluation for each phase."""
+        n = max(1, self.evaluations)
+        return {p: t / n for p, t in self.phase_totals().items()}
+
+    def overhead(self) -> float:
+        """Wall time not attributed to a phase (RunEngine, documents, callbacks)."""
+        return max(0.0, self.wall_time - sum(self.phase_totals().values()))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "case": asdict(self.case),
+            "evaluations": self.evaluations,
+            "wall_time": self.wall_time,
+            "evals_per_s": self.evals_per_s,
+            "fit_timed": self.fit_timed,
+            "per_evaluation": self.per_evaluation(),
+            "overhead": self.overhead(),
+            "rounds": self.rounds,
+            "error": self.error,
+        }
+
+
+class PhaseRecorder:
+    """``on_phase`` callback for :func:`blop_optimize_plan` that groups timings per round.
+
+    Model fits reported through :meth:`fit` while a ``suggest`` runs are split
+    off its time, the remainder is the acquisition step.
+    """
+
+    def __init__(self):
+        self.rounds: List[Dict[str, float]] = []
+        self._fit = 0.0
+
+    def fit(self, seconds: float) -> None:
+        self._fit += seconds
+
+    def __call__(self, phase: str, seconds: float) -> None:
+        if phase == "suggest" or not self.rounds:
+            self.rounds.append(dict.fromkeys(PHASES, 0.0))
+        current = self.rounds[-1]
+        if phase == "suggest":
+            fit = min(self._fit, seconds)
+            current["fit"] += fit
+            current["acquisition"] += seconds - fit
+            self._fit = 0.0
+        elif phase == "ingest":
+            current["tell"] += seconds
+        else:
+            current[phase] = current.get(phase, 0.0) + seconds
+
+
+@contextmanager
+def time_model_fits(record: Callable[[float], None]) -> Iterator[bool]:
+    """Report the duration of every Ax model fit to ``record`` while active.
+
+    Yields whether a fit method was found to hook.
+    """
+    patched = []
+    for module_name, class_name in _FIT_HOOKS:
+        try:
+            cls = getattr(importlib.import_module(module_name), class_name)
+        except (ImportError, AttributeError):
+            continue
+        original = cls.__dict__.get("fit")
+        if original is None or any(cls is c for c, _ in patched):
+            continue
+
+        def fit(self, *args, _original=original, **kwargs):
+            t0 = time.perf_counter()
+            try:
+                return _original(self, *args, **kwargs)
+            finally:
+                record(time.perf_counter() - t0)
+
+        cls.fit = fit
+        patched.append((cls, original))
+    try:
+        yield bool(patched)
+    finally:
+        for cls, original in patched:
+            cls.fit = original
+
+
+def missing_dependencies(transport: str = "sim") -> List[str]:
+    """Modules the benchmark needs that are not installed."""
+    from importlib.util import find_spec
+
+    required = ["blop", "bluesky", "ophyd"]
+    if transport == "pva":
+        required.append("pvaccess")
+    return [name for name in required if find_spec(name) is None]
+
+
+def _seed(seed: Optional[int]) -> None:
+    if seed is None:
+        return
+    import numpy as np
+
+    np.random.seed(seed)
+    try:
+        import torch
+
+        torch.manual_seed(seed)
+    except ImportError:
+        pass
+
+
+def _devices(cfg: OptimizerConfig, transport: str):
+    from dashpva.viewer.bayesian import blop_adapter
+
+    if transport == "sim":
+        return blop_adapter._build_sim_devices(cfg.active_dofs(), cfg.active_objectives())
+    actuators = {d.name: blop_adapter._make_dof_device(d) for d in cfg.active_dofs()}
+    return actuators, blop_adapter._make_objective_readables(cfg.active_objectives())
+
+
+def run_case(case: BenchmarkCase, *, seed: Optional[int] = 0,
+             prefix: str = DEFAULT_PREFIX,
+             probe_channel: str = f"{DEFAULT_PREFIX}probe") -> BenchmarkResult:
+    """Run one campaign and time it; errors are returned in ``result.error``."""
+    result = BenchmarkResult(case=case)
+    err = case.validate()
+    if err:
+        result.error = err
+        return result
+    try:
+        from bluesky import RunEngine
+
+        from dashpva.viewer.bayesian.blop_adapter import blop_optimize_plan, build_agent
+
+        cfg = case.config(prefix, probe_channel)
+        actuators, readables = _devices(cfg, case.transport)
+        _seed(seed)
+        agent = build_agent(cfg, actuators)
+        recorder = PhaseRecorder()
+        points: List[dict] = []
+        # context_managers=[]: no SIGINT handler, so this also works off the main thread
+        RE = RunEngine(context_managers=[])
+        with time_model_fits(recorder.fit) as fit_timed:
+            t0 = time.perf_counter()
+            try:
+                RE(blop_optimize_plan(agent, actuators, readables, cfg,
+                                      on_point=points.append, on_phase=recorder))
+            finally:
+                result.wall_time = time.perf_counter() - t0
+        result.fit_timed = fit_timed
+        result.evaluations = len(points)
+        result.rounds = recorder.rounds
+    except Exception as exc:  # noqa: BLE001 - reported per case
+        logger.debug("benchmark case %s failed", case.label, exc_info=True)
+        result.error = f"{type(exc).__name__}: {exc}"
+    return result
+
+
+def _wait_for_channel(name: str, timeout: float) -> bool:
+    import pvaccess as pva
+
+    deadline = time.monotonic() + timeout
+    channel = pva.Channel(name, pva.PVA)
+    while time.monotonic() < deadline:
+        try:
+            channel.get("")
+            return True
+        except Exception:  # noqa: BLE001 - not up yet
+            time.sleep(0.2)
+    return False
+
+
+@contextmanager
+def pva_environment(n_dofs: int, *, prefix: str = DEFAULT_PREFIX,
+                    probe_channel: str = f"{DEFAULT_PREFIX}probe",
+                    timeout: float = 30.0) -> Iterator[None]:
+    """Serve ``n_dofs`` writable DOF PVs and run ``probe_sim_server`` for the objectives."""
+    import pvaccess as pva
+
+    from dashpva.utils.process_supervisor import terminate_process
+
+    server = pva.PvaServer()
+    for i in range(n_dofs):
+        record = pva.NtScalar(pva.DOUBLE)
+        record["value"] = 0.0
+        server.addRecord(f"{prefix}x{i}", record, None)
+    server.start()
+    cmd = [sys.executable, "-u", "-m", PROBE_MODULE, "-cn", probe_channel, "--truth-pvs",
+           "-nx", "64", "-ny", "64", "-fps", "50", "-rp", "0"]
+    probe = subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                             stderr=subprocess.DEVNULL, start_new_session=True)
+    try:
+        if not _wait_for_channel(f"{probe_channel}:{PROBE_TRUTH_KEYS[0]}", timeout):
+            raise RuntimeError(f"probe_sim_server did not serve {probe_channel!r} "
+                               f"within {timeout:.0f} s")
+        yield
+    finally:
+        terminate_process(probe)
+        server.stop()
+
+
+def run_benchmark(cases: Sequence[BenchmarkCase], *, seed: Optional[int] = 0,
+                  on_result: Optional[Callable[[BenchmarkResult], None]] = None) -> List[BenchmarkResult]:
+    """Run ``cases`` in order, bringing up the PVA environment once if any needs it."""
+    results: List[BenchmarkResult] = []
+
+    def _run(selected):
+        for case in selected:
+            result = run_case(case, seed=seed)
+            results.append(result)
+            if on_result is not None:
+                on_result(result)
+
+    sim_cases = [c for c in cases if c.transport != "pva"]
+    pva_cases = [c for c in cases if c.transport == "pva"]
+    _run(sim_cases)
+    if pva_cases:
+        try:
+            with pva_environment(max(c.n_dofs for c in pva_cases)):
+                _run(pva_cases)
+        except RuntimeError as exc:
+            for case in pva_cases[len(results) - len(sim_cases):]:
+                result = BenchmarkResult(case=case, error=str(exc))
+                results.append(result)
+                if on_result is not None:
+                    on_result(result)
+    return results
+
+
+def format_results(results: Sequence[BenchmarkResult]) -> str:
+    """Table of throughput and mean milliseconds per evaluation for each phase."""
+    shown = [p for p in PHASES
+             if p != "commit" or any(r.phase_totals()["commit"] for r in results)]
+    header = (f"{'case':<34}{'evals':>6}{'evals/s':>9}"
+              + "".join(f"{p[:5]:>8}" for p in shown) + f"{'other':>8}{'last rnd':>10}")
+    lines = [header, "-" * len(header)]
+    untimed = False
+    for r in results:
+        if r.error:
+            lines.append(f"{r.case.label:<34}  error: {r.error}")
+            continue
+        per = r.per_evaluation()
+        last = r.rounds[-1] if r.rounds else {}
+        # model cost of the final round: what a longer campaign grows towards
+        last_model = last.get("fit", 0.0) + last.get("acquisition", 0.0)
+        untimed = untimed or not r.fit_timed
+        lines.append(f"{r.case.label:<34}{r.evaluations:>6}{r.evals_per_s:>9.2f}"
+                     + "".join(f"{per[p] * 1e3:>8.1f}" for p in shown)
+                     + f"{r.overhead() / max(1, r.evaluations) * 1e3:>8.1f}"
+                     + f"{last_model * 1e3:>10.1f}")
+    lines.append("(ms per evaluation; 'last rnd' = fit + acquisition of the final round, ms)")
+    if untimed:
+        lines.append("(model fit could not be timed separately; it is included in 'acqui')")
+    return "\n".join(lines)
+
+
+def campaign_grid(dofs: Sequence[int], objectives: Sequence[int], *, iterations: int,
+                  n_points: int, transport: str) -> List[BenchmarkCase]:
+    """Every (DOF count, objective count) combination as a :class:`BenchmarkCase`."""
+    return [BenchmarkCase(n_dofs=d, n_objectives=o, iterations=iterations,
+                          n_points=n_points, transport=transport)
+            for d in dofs for o in objectives]
+
+
+def summarize(results: Sequence[BenchmarkResult]) -> Dict[str, Any]:
+    """Median throughput over successful cases plus every case's details (for JSON)."""
+    ok = [r.evals_per_s for r in results if not r.error]
+    return {
+        "median_evals_per_s": statistics.median(ok) if ok else 0.0,
+        "results": [r.to_dict() for r in results],
+    }
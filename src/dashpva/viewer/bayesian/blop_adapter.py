@@ -40,9 +40,13 @@ functions that need them so merely importing this module is cheap and safe.
 
 from __future__ import annotations
 
+import itertools
 import logging
+import threading
+import time
+from collections import OrderedDict
 from dataclasses import dataclass, field
-from typing import Any, Callable, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
 import numpy as np
 
@@ -517,6 +521,11 @@ def _make_dof_device(d: "DOFSpec"):
     return EpicsSignal(bare, name=d.name, put_complete=True)
 
 
+# Seconds a PVA objective read waits, after a move/commit, for a monitor update
+# that follows it before falling back to a get.
+OBJECTIVE_FRESH_TIMEOUT = 2.0
+
+
 def _make_objective_readables(objectives: List["ObjectiveSpec"]) -> Dict[str, Any]:
     """Map each objective name -> a readable device.
 
@@ -524,7 +533,10 @@ def _make_objective_readables(objectives: List["ObjectiveSpec"]) -> Dict[str, An
     channel share ONE cached :class:`PvaSignal` (field=None), so the channel is
     read once per point; a structure is reported as one scalar data_key per field
     (``{channel}_{field}``) and each objective selects its field by name
-    downstream (see :func:`_objective_reading_value`).
+    downstream (see :func:`_objective_reading_value`).  PVA objectives are
+    served from their channel monitor, but only from an update received after
+    the point's move/commit (waiting up to :data:`OBJECTIVE_FRESH_TIMEOUT`, then
+    a ``get``), so a read never returns the value from before the commit.
     """
     from ophyd import EpicsSignalRO
 
@@ -537,7 +549,8 @@ def _make_objective_readables(objectives: List["ObjectiveSpec"]) -> Dict[str, An
             if dev is None:
                 from dashpva.viewer.bayesian.pva_signal import PvaSignal
                 # name by channel so a shared reading has stable per-field keys.
-                dev = PvaSignal(bare, name=bare, field=None)
+                dev = PvaSignal(bare, name=bare, field=None,
+                                fresh_timeout=OBJECTIVE_FRESH_TIMEOUT)
                 pva_cache[bare] = dev
             reads[o.name] = dev
         else:
@@ -778,6 +791,7 @@ def blop_optimize_plan(
     readables: Dict[str, Any],
     config: OptimizerConfig,
     on_point: Optional[Callable[[dict], None]] = None,
+    on_phase: Optional[Callable[[str, float], None]] = None,
 ):
     """Bluesky plan that runs the blop optimization loop.
 
@@ -805,10 +819,17 @@ def blop_optimize_plan(
              "index": int}            # 1-based running count
 
         Use it to drive live plots (bridge to Qt via a queued signal).
+    on_phase : callable, optional
+        Called (in the RunEngine thread) as ``on_phase(phase, seconds)`` after
+        each step of the loop: ``"suggest"`` (model fit + acquisition),
+        ``"move"``, ``"commit"``, ``"read"`` and ``"ingest"``.  Used by
+        :mod:`~dashpva.viewer.bayesian.benchmark`.
     """
     import bluesky.plan_stubs as bps
     import bluesky.preprocessors as bpp
 
+    from dashpva.viewer.bayesian.pva_signal import PvaSignal, note_commit
+
     active_dofs = config.active_dofs()
     objectives = config.active_objectives()
     optimized = [o for o in objectives if o.optimized]
@@ -840,12 +861,19 @@ def blop_optimize_plan(
 
     state = {"index": 0}
 
+    def _timed(phase: str, t0: float) -> None:
+        if on_phase is not None:
+            on_phase(phase, time.perf_counter() - t0)
+
     @bpp.run_decorator(md=_md)
     def _inner():
         for it in range(config.iterations):
             yield from bps.checkpoint()
 
-            suggestions = agent.suggest(config.n_points)
+            t0 = time.perf_counter()
+            with model_lock(agent):
+                suggestions = agent.suggest(config.n_points)
+            _timed("suggest", t0)
             outcomes = []
             for sug in suggestions:
                 # Move every motor to its suggested position.
@@ -855,16 +883,27 @@ def blop_optimize_plan(
                     pos = float(np.clip(pos, d.lo, d.hi))  # safety clamp
                     moves += [actuators[d.name], pos]
                 # BARRIER: bps.mv waits every DOF's Status -> all DOFs settled.
+                t0 = time.perf_counter()
                 yield from bps.mv(*moves)
+                _timed("move", t0)
 
                 # Optional commit step AFTER the move, BEFORE the read.  Its
                 # put-completion (or done-counter barrier) is what guarantees the
                 # applied change is complete and a fresh result is available,
                 # i.e. move -> commit -> read ordering.
                 if commit_dev is not None:
+                    t0 = time.perf_counter()
                     yield from bps.mv(commit_dev, config.commit_value)
-
+                    _timed("commit", t0)
+                # PvaSignal.set marks its own completion; mark CA/namespace
+                # barriers here so monitored objectives wait for a newer update.
+                barrier = [commit_dev] if commit_dev is not None else moves[::2]
+                if not all(isinstance(dev, PvaSignal) for dev in barrier):
+                    note_commit()
+
+                t0 = time.perf_counter()
                 reading = yield from bps.trigger_and_read(read_devices, name="primary")
+                _timed("read", t0)
 
                 outcome = {"_id": sug["_id"]}
                 obj_values: Dict[str, float] = {}
@@ -891,7 +930,11 @@ def blop_optimize_plan(
                         }
                     )
 
-            agent.ingest(outcomes)
+            t0 = time.perf_counter()
+            with model_lock(agent):
+                agent.ingest(outcomes)
+                note_model_updated(agent)
+            _timed("ingest", t0)
 
     yield from _inner()
 
@@ -903,33 +946,77 @@ def blop_optimize_plan(
 # Confidence multiplier for the Upper-Confidence-Bound acquisition view.
 _ACQ_KAPPA = 2.0
 
+# Full grid sizes of the model views, and the coarse preview drawn first.
+SURFACE_GRID_N = 40
+SLICE_GRID_N = 60
+COARSE_GRID_N = 10
+
+_MODEL_VERSIONS = itertools.count(1)
+_MODEL_LOCK_GUARD = threading.Lock()
+
+
+def model_lock(agent) -> threading.RLock:
+    """The lock serializing access to ``agent``'s model.
+
+    The scan thread holds it around ``suggest``/``ingest`` and the prediction
+    workers around ``ax_client.predict``, so model views can be computed while
+    an optimization is running.
+    """
+    lock = getattr(agent, "_dashpva_model_lock", None)
+    if lock is None:
+        with _MODEL_LOCK_GUARD:
+            lock = getattr(agent, "_dashpva_model_lock", None)
+            if lock is None:
+                lock = threading.RLock()
+                agent._dashpva_model_lock = lock
+    return lock
+
+
+def model_version(agent) -> int:
+    """Token identifying the current state of ``agent``'s model.
+
+    Unique across agents and bumped by :func:`note_model_updated` whenever new
+    data is ingested, so it keys cached predictions.
+    """
+    version = getattr(agent, "_dashpva_model_version", None)
+    if version is None:
+        note_model_updated(agent)
+        version = agent._dashpva_model_version
+    return version
+
+
+def note_model_updated(agent) -> None:
+    """Mark ``agent``'s model as changed (invalidates its cached predictions)."""
+    agent._dashpva_model_version = next(_MODEL_VERSIONS)
+
 
 def _best_params(agent) -> Dict[str, Any]:
     """Best parameterization from the Ax client, or ``{}`` if none yet."""
     try:
-        result = agent.ax_client.get_best_parameterization()
+        with model_lock(agent):
+            result = agent.ax_client.get_best_parameterization()
         return dict(result[0])  # (parameters, metrics, ...)
     except Exception:  # noqa: BLE001 - fall back to midpoints
         return {}
 
 
-def _grid_points_2d(
+def _grid_points(
     config: OptimizerConfig,
-    x_name: str,
-    y_name: str,
+    axes: Tuple[str, ...],
     grid_n: int,
     best_params: Dict[str, Any],
     fixed_overrides: Optional[Dict[str, Any]] = None,
-) -> Tuple[Any, Any, List[dict], Dict[str, Any]]:
-    """Build the (xi, yi, points, fixed) for a 2-D DOF slice.
+) -> Tuple[List[Any], List[dict], Dict[str, Any]]:
+    """Build the (ticks, points, fixed) for a 1-D or 2-D DOF slice.
 
     Non-axis DOFs are fixed at ``fixed_overrides[name]`` when provided, else the
-    best point, else the range midpoint.  ``points`` is row-major (y outer, x
-    inner) so a reshape to ``(grid_n, grid_n)`` is (ny, nx).
+    best point, else the range midpoint.  ``points`` is row-major (last axis
+    outer, first axis inner) so for ``axes=(x, y)`` a reshape to
+    ``(grid_n, grid_n)`` is (ny, nx).
     """
     dofs = config.active_dofs()
     by_name = {d.name: d for d in dofs}
-    xd, yd = by_name[x_name], by_name[y_name]
+    axis_dofs = [by_name[name] for name in axes]
     overrides = fixed_overrides or {}
 
     def _coerce(d: DOFSpec, v: float):
@@ -937,7 +1024,7 @@ def _grid_points_2d(
 
     fixed: Dict[str, Any] = {}
     for d in dofs:
-        if d.name in (x_name, y_name):
+        if d.name in axes:
             continue
         if d.name in overrides:
             val = overrides[d.name]
@@ -945,16 +1032,105 @@ def _grid_points_2d(
             val = best_params.get(d.name, 0.5 * (d.lo + d.hi))
         fixed[d.name] = _coerce(d, val)
 
-    xi = np.linspace(xd.lo, xd.hi, grid_n)
-    yi = np.linspace(yd.lo, yd.hi, grid_n)
+    ticks = [np.linspace(d.lo, d.hi, grid_n) for d in axis_dofs]
     points = []
-    for yv in yi:                       # y outer, x inner -> row-major (ny, nx)
-        for xv in xi:
-            p = dict(fixed)
-            p[x_name] = _coerce(xd, xv)
-            p[y_name] = _coerce(yd, yv)
-            points.append(p)
-    return xi, yi, points, fixed
+    for values in itertools.product(*reversed(ticks)):   # y outer, x inner
+        p = dict(fixed)
+        for d, v in zip(reversed(axis_dofs), values):
+            p[d.name] = _coerce(d, v)
+        points.append(p)
+    return ticks, points, fixed
+
+
+class SurfacePredictor:
+    """Caches model predictions over DOF grids for the model views.
+
+    One ``ax_client.predict`` call per (model version, axes, fixed DOF values,
+    grid size) predicts every optimized objective at once.  The single-objective
+    surface, its uncertainty and acquisition views, and the RGB phase map are
+    all derived from that entry, so switching view or objective costs nothing
+    until the model changes.  Thread-safe; ``max_entries=0`` disables caching.
+    """
+
+    def __init__(self, max_entries: int = 16):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[tuple, dict]" = OrderedDict()
+        self._best: Tuple[Optional[int], Dict[str, Any]] = (None, {})
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._best = (None, {})
+
+    def _best_params(self, agent, version: int) -> Dict[str, Any]:
+        cached_version, params = self._best
+        if cached_version != version:
+            params = _best_params(agent)
+            self._best = (version, params)
+        return params
+
+    def _key(self, agent, config, axes, grid_n, fixed_overrides):
+        version = model_version(agent)
+        ticks, points, fixed = _grid_points(
+            config, tuple(axes), grid_n, self._best_params(agent, version), fixed_overrides)
+        key = (version, tuple(axes), grid_n, tuple(sorted(fixed.items())))
+        return key, ticks, points, fixed
+
+    def is_cached(self, agent, config, axes, grid_n, fixed_overrides=None) -> bool:
+        key = self._key(agent, config, axes, grid_n, fixed_overrides)[0]
+        with self._lock:
+            return key in self._entries
+
+    def grid(
+        self,
+        agent,
+        config: OptimizerConfig,
+        axes: Tuple[str, ...],
+        grid_n: int,
+        fixed_overrides: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Predicted mean/sem of every optimized objective over a DOF grid.
+
+        Returns ``{"ticks": [ndarray per axis], "fixed": {...}, "objectives":
+        {name: (mean, sem)}}`` with grids shaped ``(grid_n,) * len(axes)``
+        (row-major, last axis first).  Objectives the model does not know yet
+        are left out.  Treat the arrays as read-only; they are shared.
+        """
+        key, ticks, points, fixed = self._key(agent, config, axes, grid_n, fixed_overrides)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        with model_lock(agent):
+            preds = agent.ax_client.predict(points)   # list of {metric: (mean, sem)}
+        shape = (grid_n,) * len(axes)
+        objectives: Dict[str, Any] = {}
+        for o in config.optimized_objectives():
+            try:
+                mean = np.array([pt[o.name][0] for pt in preds], dtype=float).reshape(shape)
+                sem = np.array([pt[o.name][1] for pt in preds], dtype=float).reshape(shape)
+            except (KeyError, TypeError):
+                continue  # metric not modeled yet
+            objectives[o.name] = (mean, sem)
+
+        entry = {"ticks": ticks, "fixed": fixed, "objectives": objectives}
+        with self._lock:
+            if self.max_entries > 0:
+                self._entries[key] = entry
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return entry
+
+
+def _predictor(predictor: Optional[SurfacePredictor]) -> SurfacePredictor:
+    return predictor if predictor is not None else SurfacePredictor(max_entries=0)
 
 
 def predict_surface(
@@ -963,10 +1139,11 @@ def predict_surface(
     x_name: str,
     y_name: str,
     *,
-    grid_n: int = 40,
+    grid_n: int = SURFACE_GRID_N,
     kappa: float = _ACQ_KAPPA,
     fixed_overrides: Optional[Dict[str, Any]] = None,
     objective: Optional[str] = None,
+    predictor: Optional[SurfacePredictor] = None,
 ) -> Dict[str, Any]:
     """Evaluate the agent's model over a 2-D grid for the primary objective.
 
@@ -981,26 +1158,23 @@ def predict_surface(
       (``mean + kappa*sem`` when maximizing, ``mean - kappa*sem`` when minimizing),
       i.e. the optimistic estimate the optimizer is drawn toward.
 
-    Intended to run off the GUI thread (it does GP compute) and only when a scan
-    is **not** actively mutating the agent.
+    Intended to run off the GUI thread (it does GP compute).  Pass a
+    :class:`SurfacePredictor` to reuse predictions of an unchanged model.
 
     Returns
     -------
     dict with keys: ``x_name, y_name, xi, yi, x_lo, x_hi, y_lo, y_hi, mean, sem,
-    acq, objective, minimize, kappa, fixed``.
+    acq, objective, minimize, kappa, fixed, grid_n``.
     """
     by_name = {d.name: d for d in config.active_dofs()}
     xd, yd = by_name[x_name], by_name[y_name]
     opt = config.optimized_objectives()
     obj = next((o for o in opt if o.name == objective), opt[0])
 
-    xi, yi, points, fixed = _grid_points_2d(
-        config, x_name, y_name, grid_n, _best_params(agent), fixed_overrides)
-
-    preds = agent.ax_client.predict(points)   # list of {metric: (mean, sem)}
+    grid = _predictor(predictor).grid(agent, config, (x_name, y_name), grid_n, fixed_overrides)
+    xi, yi = grid["ticks"]
     name = obj.name
-    mean = np.array([pt[name][0] for pt in preds], dtype=float).reshape(grid_n, grid_n)
-    sem = np.array([pt[name][1] for pt in preds], dtype=float).reshape(grid_n, grid_n)
+    mean, sem = grid["objectives"][name]
     acq = (mean - kappa * sem) if obj.minimize else (mean + kappa * sem)
 
     return {
@@ -1018,7 +1192,8 @@ def predict_surface(
         "objective": name,
         "minimize": obj.minimize,
         "kappa": kappa,
-        "fixed": fixed,
+        "fixed": grid["fixed"],
+        "grid_n": grid_n,
     }
 
 
@@ -1028,8 +1203,9 @@ def predict_surface_multi(
     x_name: str,
     y_name: str,
     *,
-    grid_n: int = 40,
+    grid_n: int = SURFACE_GRID_N,
     fixed_overrides: Optional[Dict[str, Any]] = None,
+    predictor: Optional[SurfacePredictor] = None,
 ) -> Dict[str, Any]:
     """Predict every optimized objective over a 2-D DOF grid (for the RGB map).
 
@@ -1039,25 +1215,20 @@ def predict_surface_multi(
 
     Returns
     -------
-    dict with keys ``x_name, y_name, xi, yi, x_lo, x_hi, y_lo, y_hi, fixed`` and
-    ``objectives``: ``{name: {"mean": (ny,nx), "sem": (ny,nx), "minimize": bool}}``.
+    dict with keys ``x_name, y_name, xi, yi, x_lo, x_hi, y_lo, y_hi, fixed,
+    grid_n`` and ``objectives``:
+    ``{name: {"mean": (ny,nx), "sem": (ny,nx), "minimize": bool}}``.
     """
     by_name = {d.name: d for d in config.active_dofs()}
     xd, yd = by_name[x_name], by_name[y_name]
 
-    xi, yi, points, fixed = _grid_points_2d(
-        config, x_name, y_name, grid_n, _best_params(agent), fixed_overrides)
-    preds = agent.ax_client.predict(points)
-
+    grid = _predictor(predictor).grid(agent, config, (x_name, y_name), grid_n, fixed_overrides)
+    xi, yi = grid["ticks"]
     objectives: Dict[str, Any] = {}
     for o in config.optimized_objectives():
-        name = o.name
-        try:
-            mean = np.array([pt[name][0] for pt in preds], dtype=float).reshape(grid_n, grid_n)
-            sem = np.array([pt[name][1] for pt in preds], dtype=float).reshape(grid_n, grid_n)
-        except (KeyError, TypeError):
-            continue
-        objectives[name] = {"mean": mean, "sem": sem, "minimize": o.minimize}
+        if o.name in grid["objectives"]:
+            mean, sem = grid["objectives"][o.name]
+            objectives[o.name] = {"mean": mean, "sem": sem, "minimize": o.minimize}
 
     return {
         "x_name": x_name,
@@ -1068,8 +1239,9 @@ def predict_surface_multi(
         "x_hi": xd.hi,
         "y_lo": yd.lo,
         "y_hi": yd.hi,
-        "fixed": fixed,
+        "fixed": grid["fixed"],
         "objectives": objectives,
+        "grid_n": grid_n,
     }
 
 
@@ -1078,9 +1250,10 @@ def predict_slice_1d(
     config: OptimizerConfig,
     x_name: str,
     *,
-    grid_n: int = 60,
+    grid_n: int = SLICE_GRID_N,
     kappa: float = _ACQ_KAPPA,
     fixed_overrides: Optional[Dict[str, Any]] = None,
+    predictor: Optional[SurfacePredictor] = None,
 ) -> Dict[str, Any]:
     """Predict every optimized objective along a 1-D slice of one DOF.
 
@@ -1096,55 +1269,49 @@ def predict_slice_1d(
 
     Returns
     -------
-    dict with keys ``x_name, xi, x_lo, x_hi, fixed, kappa`` and ``objectives``:
-    a mapping ``{obj_name: {"mean": ndarray, "sem": ndarray, "minimize": bool}}``.
+    dict with keys ``x_name, xi, x_lo, x_hi, fixed, kappa, grid_n`` and
+    ``objectives``: a mapping
+    ``{obj_name: {"mean": ndarray, "sem": ndarray, "minimize": bool}}``.
     """
-    dofs = config.active_dofs()
-    by_name = {d.name: d for d in dofs}
-    xd = by_name[x_name]
-    opt_objs = config.optimized_objectives()
-    overrides = fixed_overrides or {}
-
-    best_params = _best_params(agent)
-
-    def _coerce(d: DOFSpec, v: float):
-        return int(round(v)) if d.kind == "int" else float(v)
-
-    # Fix non-x DOFs at an override, else the best point, else the midpoint.
-    fixed: Dict[str, Any] = {}
-    for d in dofs:
-        if d.name == x_name:
-            continue
-        if d.name in overrides:
-            val = overrides[d.name]
-        else:
-            val = best_params.get(d.name, 0.5 * (d.lo + d.hi))
-        fixed[d.name] = _coerce(d, val)
-
-    xi = np.linspace(xd.lo, xd.hi, grid_n)
-    points = []
-    for xv in xi:
-        p = dict(fixed)
-        p[x_name] = _coerce(xd, xv)
-        points.append(p)
+    xd = next(d for d in config.active_dofs() if d.name == x_name)
 
-    preds = agent.ax_client.predict(points)   # list of {metric: (mean, sem)}
+    grid = _predictor(predictor).grid(agent, config, (x_name,), grid_n, fixed_overrides)
     objectives: Dict[str, Any] = {}
-    for o in opt_objs:
-        name = o.name
-        try:
-            mean = np.array([pt[name][0] for pt in preds], dtype=float)
-            sem = np.array([pt[name][1] for pt in preds], dtype=float)
-        except (KeyError, TypeError):
-            continue  # metric not modeled yet; skip its curve
-        objectives[name] = {"mean": mean, "sem": sem, "minimize": o.minimize}
+    for o in config.optimized_objectives():
+        if o.name in grid["objectives"]:
+            mean, sem = grid["objectives"][o.name]
+            objectives[o.name] = {"mean": mean, "sem": sem, "minimize": o.minimize}
 
     return {
         "x_name": x_name,
-        "xi": xi,
+        "xi": grid["ticks"][0],
         "x_lo": xd.lo,
         "x_hi": xd.hi,
-        "fixed": fixed,
+        "fixed": grid["fixed"],
         "kappa": kappa,
         "objectives": objectives,
+        "grid_n": grid_n,
     }
+
+
+def iter_refinement(
+    predict: Callable[..., Dict[str, Any]],
+    agent,
+    config: OptimizerConfig,
+    *axes: str,
+    grid_n: int = SURFACE_GRID_N,
+    coarse_n: int = COARSE_GRID_N,
+    predictor: Optional[SurfacePredictor] = None,
+    **kwargs: Any,
+) -> Iterator[Dict[str, Any]]:
+    """Yield ``predict``'s payload coarse-to-fine: a ``coarse_n`` grid, then ``grid_n``.
+
+    ``predict`` is one of the ``predict_*`` functions above, ``axes`` its DOF
+    names.  The coarse preview is skipped when the full grid is already cached
+    (or no finer than it), so an unchanged model answers in one step.
+    """
+    fixed_overrides = kwargs.get("fixed_overrides")
+    predictor = _predictor(predictor)
+    if coarse_n < grid_n and not predictor.is_cached(agent, config, axes, grid_n, fixed_overrides):
+        yield predict(agent, config, *axes, grid_n=coarse_n, predictor=predictor, **kwargs)
+    yield predict(agent, config, *axes, grid_n=grid_n, predictor=predictor, **kwargs)
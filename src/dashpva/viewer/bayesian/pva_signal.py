@@ -39,6 +39,24 @@ structure once; a *field* selects the scalar.
   return just that scalar under ``name`` (handy for a DOF or single-objective
   channel).
 
+Monitored reads
+---------------
+After the first ``get`` a signal subscribes to its channel (``monitor=True``,
+the default) and serves ``get()``/``read()`` from the latest monitored value,
+so an optimization loop reading many objectives per point does not pay a
+network round trip per signal.  One monitor per channel is shared by every
+signal on it.  A read falls back to a fresh ``get`` while the monitor is
+disconnected, right after the signal's own ``put`` (read-your-writes), or,
+with ``max_age``, when the last update is older than that.
+
+A monitor says nothing about ordering against *other* channels, so a readable
+that must reflect a move or commit on a different channel (the optimizer's
+objectives) is built with ``fresh_timeout``: every completed :meth:`PvaSignal.set`
+(or :func:`note_commit`) leaves a mark, and the next read waits up to
+``fresh_timeout`` for an update received after it, falling back to a ``get``.
+A commit ``done_channel`` is monitored the same way: :meth:`PvaSignal.set`
+waits for the counter's update event instead of polling it.
+
 This module imports ``pvaccess`` lazily so merely importing it is cheap and does
 not require the PVA stack to be present (e.g. on a dev laptop).
 """
@@ -47,8 +65,9 @@ from __future__ import annotations
 
 import logging
 import numbers
+import threading
 import time
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -225,6 +244,147 @@ def _dtype_and_shape(v: Any) -> tuple:
     return "string", []
 
 
+def _counter_value(value: Any) -> Optional[int]:
+    """A done-counter value as int (first numeric field of a structure)."""
+    if isinstance(value, dict):
+        for v in value.values():
+            if isinstance(v, (int, float)):
+                return int(v)
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class _ChannelMonitor:
+    """Latest value of one PVA channel, kept current by a pvaccess monitor.
+
+    Updates arrive on a pvaccess thread; readers take :meth:`snapshot` or block
+    in :meth:`wait_for`.  Shared per channel through :func:`_shared_monitor`.
+    Connection state is polled with ``isConnected()`` rather than a connection
+    callback: pvaccess fires that callback while the interpreter shuts down,
+    which aborts the process.
+    """
+
+    _SUBSCRIBER = "dashpva_pva_signal"
+
+    def __init__(self, channel):
+        self._channel = channel
+        self._cond = threading.Condition()
+        self.updates = 0
+        self._value: Any = None
+        self._timestamp = 0.0      # wall-clock receipt time (event timestamp)
+        self._received = 0.0       # monotonic receipt time (for max_age)
+        channel.subscribe(self._SUBSCRIBER, self._on_update)
+        channel.startMonitor("")
+
+    @property
+    def connected(self) -> bool:
+        try:
+            return bool(self._channel.isConnected())
+        except Exception:  # noqa: BLE001
+            return False
+
+    def _on_update(self, pv_object) -> None:
+        try:
+            value = _pv_to_pydict(pv_object)
+        except Exception:  # noqa: BLE001 - never raise into pvaccess
+            logger.debug("could not convert monitor update", exc_info=True)
+            return
+        with self._cond:
+            self._value = value
+            self._timestamp = time.time()
+            self._received = time.monotonic()
+            self.updates += 1
+            self._cond.notify_all()
+
+    def snapshot(self, max_age: Optional[float] = None) -> Optional[Tuple[Any, float]]:
+        """``(value, timestamp)`` if connected and fresh enough, else ``None``."""
+        if not self.connected:
+            return None
+        with self._cond:
+            if not self.updates:
+                return None
+            if max_age is not None and time.monotonic() - self._received > max_age:
+                return None
+            return self._value, self._timestamp
+
+    def wait_for(self, predicate: Callable[[Any], bool], timeout: float) -> bool:
+        """Block until a monitored value satisfies ``predicate`` (False on timeout)."""
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: self.updates > 0 and predicate(self._value), timeout)
+
+    def wait_newer(self, mark: float, timeout: float) -> bool:
+        """Block until an update received after monotonic time ``mark`` (False on timeout)."""
+        with self._cond:
+            return self._cond.wait_for(lambda: self.updates > 0 and self._received > mark, timeout)
+
+    @property
+    def received(self) -> float:
+        """Monotonic receipt time of the latest update (0.0 before the first)."""
+        with self._cond:
+            return self._received
+
+    def close(self) -> None:
+        try:
+            self._channel.stopMonitor()
+            self._channel.unsubscribe(self._SUBSCRIBER)
+        except Exception:  # noqa: BLE001
+            pass
+
+
+# Monotonic time the latest move/commit finished (see note_commit)
+_COMMIT_MARK = 0.0
+_COMMIT_LOCK = threading.Lock()
+
+
+def note_commit(when: Optional[float] = None) -> None:
+    """Record that a move/commit finished at ``when`` (monotonic; default now).
+
+    Signals with ``fresh_timeout`` serve their next read only from a monitor
+    update received after the latest mark.  :meth:`PvaSignal.set` marks by
+    itself; call this after a barrier on a non-PVA device (e.g. a CA commit).
+    """
+    global _COMMIT_MARK
+    when = time.monotonic() if when is None else when
+    with _COMMIT_LOCK:
+        _COMMIT_MARK = max(_COMMIT_MARK, when)
+
+
+def last_commit() -> float:
+    """Monotonic time of the latest :func:`note_commit` (0.0 if none)."""
+    with _COMMIT_LOCK:
+        return _COMMIT_MARK
+
+
+_MONITORS: Dict[Tuple[str, str], _ChannelMonitor] = {}
+_MONITORS_LOCK = threading.Lock()
+
+
+def _shared_monitor(pv: str, provider=None) -> _ChannelMonitor:
+    """The process-wide monitor of ``pv`` (started on first use)."""
+    import pvaccess as pva
+
+    prov = provider or pva.PVA
+    key = (pv, str(prov))
+    with _MONITORS_LOCK:
+        mon = _MONITORS.get(key)
+        if mon is None:
+            mon = _MONITORS[key] = _ChannelMonitor(pva.Channel(pv, prov))
+        return mon
+
+
+def stop_monitors() -> None:
+    """Stop every shared channel monitor (signals fall back to gets until re-read)."""
+    with _MONITORS_LOCK:
+        monitors = list(_MONITORS.values())
+        _MONITORS.clear()
+    for mon in monitors:
+        mon.close()
+
+
 class PvaSignal:
     """Ophyd-like signal over a single PVAccess channel.
 
@@ -252,6 +412,18 @@ class PvaSignal:
         (pvapy processes put callbacks asynchronously).
     done_timeout : float
         Max seconds to wait for ``done_channel`` to advance.
+    monitor : bool
+        Serve reads from a channel monitor started by the first ``get``
+        (default).  ``False`` issues a fresh ``get`` for every read.
+    max_age : float, optional
+        Freshness limit for monitored reads: a value whose last update is older
+        than this many seconds is re-read with ``get``.  ``None`` trusts the
+        monitor for as long as it is connected (a quiet channel is unchanged).
+    fresh_timeout : float, optional
+        After a move/commit (see :func:`note_commit`), wait up to this many
+        seconds for a monitor update received after it before serving the
+        monitored value; a ``get`` is issued if none arrives.  ``None`` does not
+        wait (the monitor is trusted as is).
     """
 
     def __init__(
@@ -266,6 +438,9 @@ class PvaSignal:
         provider: Optional[str] = None,
         done_channel: Optional[str] = None,
         done_timeout: float = 130.0,
+        monitor: bool = True,
+        max_age: Optional[float] = None,
+        fresh_timeout: Optional[float] = None,
     ):
         _, bare = split_protocol(pv, default="pva")
         self.pv = bare
@@ -278,8 +453,15 @@ class PvaSignal:
         self.done_channel = (split_protocol(done_channel, default="pva")[1]
                              if done_channel else None)
         self.done_timeout = done_timeout
+        self.monitor = monitor
+        self.max_age = max_age
+        self.fresh_timeout = fresh_timeout
+        self._fresh_mark = 0.0          # latest commit mark a read has honoured
         self._done_ch = None            # lazy pvaccess.Channel for done_channel
         self._channel = None            # lazy pvaccess.Channel
+        self._mon: Optional[_ChannelMonitor] = None       # started by the first get
+        self._done_mon: Optional[_ChannelMonitor] = None
+        self._put_mark: Optional[int] = None   # monitor update count at our last put
         self.parent = None
         # Ophyd reads ``.hints`` on hinted readables.
         self.hints = {"fields": [self.name]}
@@ -301,19 +483,62 @@ class PvaSignal:
             raise TimeoutError(f"PVA channel {self.pv!r} not connected: {exc}")
 
     # -- reads ------------------------------------------------------------
-    def _raw_get(self):
-        return self._ch().get("")
+    def _start_monitor(self, pv: str) -> Optional[_ChannelMonitor]:
+        try:
+            return _shared_monitor(pv, self._provider)
+        except Exception:  # noqa: BLE001 - keep reading with gets
+            logger.debug("could not monitor %s", pv, exc_info=True)
+            return None
 
-    def get(self) -> Any:
-        """Return the current value (scalar, dict of fields, or selected field)."""
-        val = _pv_to_pydict(self._raw_get())
+    def _raw_get(self):
+        obj = self._ch().get("")
+        # The channel answered: from now on follow it with a monitor.
+        if self.monitor and self._mon is None:
+            self._mon = self._start_monitor(self.pv)
+        return obj
+
+    def _value(self) -> Tuple[Any, float]:
+        """``(whole value, timestamp)`` from the monitor when fresh, else a ``get``."""
+        mon = self._mon
+        if mon is not None:
+            # Read-your-writes: after our own put, trust the monitor only once
+            # it has delivered a newer update.
+            if self._put_mark is not None and mon.updates > self._put_mark:
+                self._put_mark = None
+            if self._put_mark is None and self._fresh_after_commit(mon):
+                snap = mon.snapshot(self.max_age)
+                if snap is not None:
+                    return snap
+        value = _pv_to_pydict(self._raw_get()), time.time()
+        if self.fresh_timeout is not None:
+            # A get is as fresh as the server: it honours every commit so far
+            self._fresh_mark = last_commit()
+        return value
+
+    def _fresh_after_commit(self, mon: _ChannelMonitor) -> bool:
+        """False if a commit finished since the monitor's last update and none follows in time."""
+        if self.fresh_timeout is None:
+            return True
+        mark = last_commit()
+        if mark <= self._fresh_mark:
+            return True
+        if mon.wait_newer(mark, self.fresh_timeout):
+            self._fresh_mark = mark
+            return True
+        return False
+
+    def _select(self, val: Any) -> Any:
         if self.field is not None and isinstance(val, dict):
             return val.get(self.field)
         return val
 
+    def get(self) -> Any:
+        """Return the current value (scalar, dict of fields, or selected field)."""
+        return self._select(self._value()[0])
+
     def read(self) -> Dict[str, Dict[str, Any]]:
-        val = self.get()
-        ts = time.time()
+        val, ts = self._value()
+        val = self._select(val)
         if self.field is None and isinstance(val, dict):
             # A multi-field structure: report each field as its own scalar key
             # (Bluesky has no dict dtype).  One get() -> one atomic snapshot.
@@ -355,6 +580,9 @@ class PvaSignal:
         correctly.
         """
         ch = self._ch()
+        # The monitor may not have delivered this write yet: re-read with gets.
+        if self._mon is not None:
+            self._put_mark = self._mon.updates
         try:
             ch.put(value)                       # coerces int/float/str/bool
         except Exception:  # noqa: BLE001 - fall back to explicit typed puts
@@ -371,23 +599,42 @@ class PvaSignal:
                 raise
 
     def _read_done_counter(self) -> Optional[int]:
+        # Always a real get: a monitored value could still lag behind the server,
+        # and the "before" snapshot must not (see set()).
         if self._done_ch is None:
             import pvaccess as pva
             self._done_ch = pva.Channel(self.done_channel,
                                         self._provider or pva.PVA)
         try:
-            obj = self._done_ch.get("")
-            d = _pv_to_pydict(obj)
-            if isinstance(d, dict):
-                # take first numeric leaf
-                for v in d.values():
-                    if isinstance(v, (int, float)):
-                        return int(v)
-                return None
-            return int(d)
+            value = _counter_value(_pv_to_pydict(self._done_ch.get("")))
         except Exception as exc:  # noqa: BLE001
             logger.debug("done-counter read failed on %s: %s", self.done_channel, exc)
             return None
+        if self.monitor and self._done_mon is None:
+            self._done_mon = self._start_monitor(self.done_channel)
+        return value
+
+    def _wait_done(self, before: int) -> bool:
+        """Wait until the done counter exceeds ``before``; False on timeout."""
+        def _advanced(value: Any) -> bool:
+            cur = _counter_value(value)
+            return cur is not None and cur > before
+
+        mon = self._done_mon
+        if mon is not None and mon.connected:
+            if not mon.wait_for(_advanced, self.done_timeout):
+                return False
+            # Mark from the counter's arrival, so an objective update racing it still counts
+            note_commit(mon.received)
+            return True
+        deadline = time.time() + self.done_timeout
+        while time.time() < deadline:
+            cur = self._read_done_counter()
+            if cur is not None and cur > before:
+                note_commit()
+                return True
+            time.sleep(0.1)
+        return False
 
     def set(self, value: Any):
         """Ophyd movable contract: put, then return a Status once settled.
@@ -399,29 +646,27 @@ class PvaSignal:
         block until the counter advances (the downstream server increments it
         only after the full effect — e.g. flash + fresh fit — is done).  This is
         the true move->fire->read barrier; it does not depend on put-completion
-        timing.
+        timing.  The snapshot is a ``get``; the advance is awaited on the
+        counter's monitor events (polled only when ``monitor=False``).
         """
         try:
             if self.done_channel:
                 before = self._read_done_counter()
                 self.put(value)
                 if before is not None:
-                    deadline = time.time() + self.done_timeout
-                    while time.time() < deadline:
-                        cur = self._read_done_counter()
-                        if cur is not None and cur > before:
-                            break
-                        time.sleep(0.1)
-                    else:
+                    if not self._wait_done(before):
                         raise TimeoutError(
                             f"done channel {self.done_channel!r} did not advance "
                             f"past {before} within {self.done_timeout}s")
-                elif self.settle_time:
-                    time.sleep(self.settle_time)
+                else:
+                    if self.settle_time:
+                        time.sleep(self.settle_time)
+                    note_commit()
             else:
                 self.put(value)
                 if self.settle_time:
                     time.sleep(self.settle_time)
+                note_commit()
             return _status(done=True)
         except Exception as exc:  # noqa: BLE001
             logger.exception("PvaSignal.set(%r) failed on %s", value, self.pv)
@@ -31,6 +31,7 @@ from dashpva.gui.theme_colors import (
     status_style,
 )
 
+from . import viewer_host
 from .registry import get_views
 
 
@@ -53,6 +54,14 @@ class LauncherDialog(QDialog):
 
         self.processes = {}
         self._next_proc_id = 1
+        # Optional pre-warmed host that forks viewers (DashPVA run --prewarm);
+        # it warms up in the background, launches use Popen until it is ready
+        self._host = None
+        if viewer_host.enabled():
+            try:
+                self._host = viewer_host.ViewerHostClient.start()
+            except Exception as e:
+                print(f'Viewer host not started: {e}', file=sys.stderr)
         self._process_manager = None
         self._launch_buttons: dict = {}
         self._timer = QTimer(self)
@@ -218,7 +227,11 @@ class LauncherDialog(QDialog):
         kwargs['env'] = env
 
         try:
-            p = subprocess.Popen(cmd, start_new_session=True, **kwargs)
+            p = None
+            if self._host is not None and self._host.ready():
+                p = self._host.spawn(cmd, env=env, stdout=kwargs.get('stdout'), stderr=kwargs.get('stderr'))
+            if p is None:
+                p = subprocess.Popen(cmd, start_new_session=True, **kwargs)
         except Exception as e:
             if btn is not None:
                 btn.setEnabled(True)
@@ -505,6 +518,8 @@ class LauncherDialog(QDialog):
     def closeEvent(self, event):
         if self._confirm_exit():
             self.shutdown_all()
+            if self._host is not None:
+                self._host.close()
             event.accept()
         else:
             event.ignore()
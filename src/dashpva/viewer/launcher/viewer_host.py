@@ -0,0 +1,473 @@
+"""
+Pre-warmed viewer host for the launcher (Linux)
+
+Starting a viewer with ``subprocess.Popen`` pays interpreter start, PyQt /
+pyqtgraph / numpy / pvapy imports and settings + database load every time.
+The viewer host is a resident process that does that work once and then
+forks a child per viewer on request:
+
+- The launcher starts ``python -m dashpva.viewer.launcher.viewer_host
+  --socket PATH`` and talks to it over a Unix socket (one JSON request per
+  connection). The socket is bound only after the preload finished, so a
+  successful ``ping`` means the host is warm.
+- ``spawn`` forks. The child starts its own session, takes over the client's
+  stdin/stdout/stderr (passed as file descriptors), environment and working
+  directory, re-reads settings and runs the command in the warmed
+  interpreter: ``python -m module ...`` through runpy, with
+  ``python -m dashpva.cli COMMAND`` resolved to the viewer module it would
+  start (see ``cli._run``). Each viewer is its own process, so a crash only
+  takes down that viewer.
+- ``status`` returns a child's exit code once the host has reaped it.
+  ``HostedProcess`` wraps that in the ``Popen`` subset the launcher uses
+  (``pid``, ``poll``, ``wait``, ``kill``).
+
+The host never creates a QApplication and stays single-threaded, so forking
+it is safe. Commands that are not ``python -m``/script invocations of this
+interpreter are refused and the launcher falls back to ``Popen``. macOS and
+Windows are not supported (fork with Cocoa loaded is unsafe; no fork on
+Windows).
+"""
+
+import argparse
+import json
+import logging
+import os
+import runpy
+import select
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import traceback
+import warnings
+from typing import Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Set in hosted children running dashpva.cli: the command runs its module in-process
+CHILD_ENV = 'DASHPVA_VIEWER_HOST_CHILD'
+# Set (to 1) to have the launcher start and use a viewer host
+ENABLE_ENV = 'DASHPVA_VIEWER_HOST'
+
+DEFAULT_PRELOAD = (
+    'numpy',
+    'PyQt5.QtCore',
+    'PyQt5.QtGui',
+    'PyQt5.QtWidgets',
+    'PyQt5.uic',
+    'pyqtgraph',
+    'h5py',
+    'pvaccess',
+    'dashpva.settings',
+    'dashpva.database',
+    'dashpva.gui',
+    'dashpva.cli',
+    'dashpva.utils.pva_reader',
+    'dashpva.viewer.core.base_window',
+    # standalone tier (workbench, HKL 3D); skipped when not installed
+    'pyvistaqt',
+    'xrayutilities',
+)
+
+_MAX_EXIT_CODES = 1000
+
+
+def supported() -> bool:
+    """Whether a viewer host can run on this platform."""
+    return sys.platform.startswith('linux') and hasattr(socket, 'send_fds')
+
+
+def enabled() -> bool:
+    return os.environ.get(ENABLE_ENV, '').lower() in ('1', 'true', 'yes', 'on') and supported()
+
+
+# ------------------------------------------------------------------ commands
+def _split_command(cmd: Sequence[str]):
+    """('module' | 'path', target, argv) for a command of this interpreter, else None."""
+    if not cmd or os.path.realpath(cmd[0]) != os.path.realpath(sys.executable):
+        return None
+    rest = list(cmd[1:])
+    while rest and rest[0] == '-u':     # stdio goes to the passed descriptors anyway
+        rest.pop(0)
+    if len(rest) >= 2 and rest[0] == '-m':
+        return 'module', rest[1], rest[2:]
+    if rest and not rest[0].startswith('-'):
+        return 'path', rest[0], rest[1:]
+    return None
+
+
+def runnable(cmd: Sequence[str]) -> bool:
+    return _split_command(cmd) is not None
+
+
+def run_in_process(cmd: Sequence[str]) -> Optional[int]:
+    """Run ``cmd`` in this interpreter as ``python`` would; its exit code.
+
+    Returns None if ``cmd`` is not a command of this interpreter.
+    """
+    split = _split_command(cmd)
+    if split is None:
+        return None
+    kind, target, args = split
+    try:
+        with warnings.catch_warnings():
+            # runpy warns when the module was preloaded by the host
+            warnings.filterwarnings('ignore', category=RuntimeWarning, module='runpy')
+            if kind == 'module':
+                sys.argv = [target] + list(args)
+                runpy.run_module(target, run_name='__main__', alter_sys=True)
+            else:
+                sys.argv = [target] + list(args)
+                runpy.run_path(target, run_name='__main__')
+    except SystemExit as e:
+        if e.code is None or isinstance(e.code, int):
+            return e.code or 0
+        print(e.code, file=sys.stderr)
+        return 1
+    return 0
+
+
+# ---------------------------------------------------------------------- host
+class ViewerHost:
+    """The resident, pre-warmed process; ``serve_forever`` forks viewers on request."""
+
+    def __init__(self, socket_path: str, preload: Sequence[str] = DEFAULT_PRELOAD,
+                 parent_pid: Optional[int] = None):
+        self.socket_path = socket_path
+        self.preload = tuple(preload)
+        self.parent_pid = parent_pid
+        self.exit_codes: Dict[int, int] = {}
+        self.children = set()
+        self._sock = None
+
+    def warm_up(self) -> Dict[str, float]:
+        """Import the preload modules; seconds per module (missing ones skipped)."""
+        import importlib
+        times = {}
+        for name in self.preload:
+            t0 = time.perf_counter()
+            try:
+                importlib.import_module(name)
+            except Exception as e:
+                logger.info(f"viewer host: not preloading {name} ({e})")
+                continue
+            times[name] = time.perf_counter() - t0
+        return times
+
+    def bind(self) -> None:
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.bind(self.socket_path)
+        os.chmod(self.socket_path, 0o600)
+        self._sock.listen(16)
+
+    def serve_forever(self) -> None:
+        signal.signal(signal.SIGCHLD, self._reap)
+        signal.signal(signal.SIGTERM, lambda *_: self._shutdown())
+        try:
+            while True:
+                if self.parent_pid is not None and os.getppid() != self.parent_pid:
+                    logger.info("viewer host: launcher is gone, exiting")
+                    return
+                readable, _, _ = select.select([self._sock], [], [], 1.0)
+                if readable:
+                    conn, _ = self._sock.accept()
+                    with conn:
+                        self._handle(conn)
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+    def _shutdown(self):
+        raise SystemExit(0)
+
+    def _reap(self, *_):
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            self.children.discard(pid)
+            self.exit_codes[pid] = os.waitstatus_to_exitcode(status)
+            if len(self.exit_codes) > _MAX_EXIT_CODES:
+                self.exit_codes.pop(next(iter(self.exit_codes)))
+
+    def _handle(self, conn) -> None:
+        conn.settimeout(5.0)
+        try:
+            data, fds, _, _ = socket.recv_fds(conn, 1 << 16, 3)
+            while True:   # the client shuts down its side after the request
+                chunk = conn.recv(1 << 16)
+                if not chunk:
+                    break
+                data += chunk
+            request = json.loads(data.decode())
+        except (OSError, ValueError) as e:
+            logger.warning(f"viewer host: bad request ({e})")
+            return
+        try:
+            op = request.get('op')
+            if op == 'ping':
+                reply = {'ok': True, 'pid': os.getpid()}
+            elif op == 'status':
+                pid = int(request['pid'])
+                if pid in self.exit_codes:
+                    reply = {'ok': True, 'returncode': self.exit_codes[pid]}
+                elif pid in self.children:
+                    reply = {'ok': True, 'returncode': None}
+                else:
+                    reply = {'ok': False, 'error': f'unknown pid {pid}'}
+            elif op == 'spawn':
+                reply = self._spawn(request, fds, conn)
+            else:
+                reply = {'ok': False, 'error': f'unknown op {op!r}'}
+        finally:
+            for fd in fds:
+                os.close(fd)
+        try:
+            conn.sendall(json.dumps(reply).encode() + b'\n')
+        except OSError:
+            pass
+
+    def _spawn(self, request, fds, conn) -> dict:
+        cmd = request.get('cmd') or []
+        if not runnable(cmd) or len(fds) != 3:
+            return {'ok': False, 'error': 'not a command of this interpreter'}
+        sys.stdout.flush()
+        sys.stderr.flush()
+        pid = os.fork()
+        if pid == 0:
+            conn.close()
+            self._run_child(request, fds)   # never returns
+        if pid not in self.exit_codes:   # may already have been reaped
+            self.children.add(pid)
+        return {'ok': True, 'pid': pid}
+
+    def _run_child(self, request, fds) -> None:
+        code = 1
+        try:
+            signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            self._sock.close()
+            os.setsid()
+            for target, fd in zip((0, 1, 2), fds):
+                os.dup2(fd, target)
+            for fd in set(fds) - {0, 1, 2}:
+                os.close(fd)
+            os.environ.clear()
+            os.environ.update(request.get('env') or {})
+            if _split_command(request['cmd'])[1] == 'dashpva.cli':
+                os.environ[CHILD_ENV] = '1'   # the command's own hop stays in-process
+            if request.get('cwd'):
+                os.chdir(request['cwd'])
+            _refresh_settings()
+            code = run_in_process(request['cmd'])
+        except BaseException:
+            traceback.print_exc()
+        finally:
+            try:
+                sys.stdout.flush()
+                sys.stderr.flush()
+            finally:
+                os._exit(code if isinstance(code, int) else 1)
+
+
+def _refresh_settings() -> None:
+    """The host loaded settings at start-up; pick up changes made since."""
+    settings = sys.modules.get('dashpva.settings')
+    if settings is not None:
+        try:
+            settings.reload()
+        except Exception:
+            logger.exception("viewer host child: settings reload failed")
+
+
+# -------------------------------------------------------------------- client
+class HostedProcess:
+    """``Popen``-like handle for a viewer forked by the host."""
+
+    def __init__(self, client: 'ViewerHostClient', pid: int, cmd: Sequence[str]):
+        self.client = client
+        self.pid = pid
+        self.args = list(cmd)
+        self.returncode: Optional[int] = None
+
+    def poll(self) -> Optional[int]:
+        if self.returncode is not None:
+            return self.returncode
+        reply = self.client.request({'op': 'status', 'pid': self.pid})
+        if reply is not None and reply.get('ok'):
+            self.returncode = reply.get('returncode')
+            return self.returncode
+        # Host gone (its orphans are reaped by init): fall back to existence
+        try:
+            os.kill(self.pid, 0)
+        except ProcessLookupError:
+            self.returncode = -1
+        except PermissionError:
+            pass
+        return self.returncode
+
+    def wait(self, timeout: Optional[float] = None) -> int:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.poll() is None:
+            if deadline is not None and time.monotonic() >= deadline:
+                raise subprocess.TimeoutExpired(self.args, timeout)
+            time.sleep(0.02)
+        return self.returncode
+
+    def send_signal(self, sig) -> None:
+        if self.poll() is None:
+            try:
+                os.kill(self.pid, sig)
+            except ProcessLookupError:
+                pass
+
+    def terminate(self) -> None:
+        self.send_signal(signal.SIGTERM)
+
+    def kill(self) -> None:
+        self.send_signal(signal.SIGKILL)
+
+
+class ViewerHostClient:
+    """Starts, talks to and stops one viewer host."""
+
+    def __init__(self, socket_path: str, process=None):
+        self.socket_path = socket_path
+        self.process = process
+
+    @classmethod
+    def start(cls, preload: Sequence[str] = ()) -> 'ViewerHostClient':
+        """Launch a host for this process in the background (it warms up on its own)."""
+        socket_path = os.path.join(tempfile.gettempdir(),
+                                   f'dashpva-viewer-host-{os.getuid()}-{os.getpid()}.sock')
+        cmd = [sys.executable, '-m', 'dashpva.viewer.launcher.viewer_host',
+               '--socket', socket_path, '--parent-pid', str(os.getpid())]
+        for name in preload:
+            cmd += ['--preload', name]
+        process = subprocess.Popen(cmd, start_new_session=True, stdin=subprocess.DEVNULL)
+        return cls(socket_path, process)
+
+    def request(self, message: dict, fds: Sequence[int] = (), timeout: float = 5.0) -> Optional[dict]:
+        """Send one request; the reply, or None if the host is not reachable."""
+        if not os.path.exists(self.socket_path):
+            return None
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.settimeout(timeout)
+                sock.connect(self.socket_path)
+                socket.send_fds(sock, [json.dumps(message).encode()], list(fds))
+                sock.shutdown(socket.SHUT_WR)
+                data = b''
+                while not data.endswith(b'\n'):
+                    chunk = sock.recv(65536)
+                    if not chunk:
+                        break
+                    data += chunk
+            return json.loads(data.decode()) if data else None
+        except (OSError, ValueError):
+            return None
+
+    def ready(self) -> bool:
+        """Whether the host is up and warmed (never blocks for long)."""
+        if self.process is not None and self.process.poll() is not None:
+            return False
+        reply = self.request({'op': 'ping'}, timeout=0.5)
+        return bool(reply and reply.get('ok'))
+
+    def wait_ready(self, timeout: float = 60.0) -> bool:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.ready():
+                return True
+            if self.process is not None and self.process.poll() is not None:
+                return False
+            time.sleep(0.05)
+        return False
+
+    def spawn(self, cmd: Sequence[str], env: Optional[Dict[str, str]] = None,
+              cwd: Optional[str] = None, stdin=None, stdout=None, stderr=None) -> Optional[HostedProcess]:
+        """Fork ``cmd`` in the host; None if it cannot (caller falls back to Popen).
+
+        ``stdin`` / ``stdout`` / ``stderr`` are None (this process's own),
+        ``subprocess.DEVNULL``, a file descriptor or a file object.
+        """
+        if not runnable(cmd):
+            return None
+        opened: List[int] = []
+        fds = []
+        for default, stream in ((0, stdin), (1, stdout), (2, stderr)):
+            if stream is None:
+                fds.append(default)
+            elif stream == subprocess.DEVNULL:
+                fd = os.open(os.devnull, os.O_RDWR)
+                opened.append(fd)
+                fds.append(fd)
+            elif isinstance(stream, int):
+                fds.append(stream)
+            else:
+                fds.append(stream.fileno())
+        try:
+            reply = self.request({
+                'op': 'spawn',
+                'cmd': list(cmd),
+                'env': dict(os.environ if env is None else env),
+                'cwd': cwd or os.getcwd(),
+            }, fds)
+        finally:
+            for fd in opened:
+                os.close(fd)
+        if not reply or not reply.get('ok'):
+            if reply:
+                logger.warning(f"viewer host refused {cmd}: {reply.get('error')}")
+            return None
+        return HostedProcess(self, int(reply['pid']), cmd)
+
+    def close(self) -> None:
+        """Stop the host (viewers it started keep running)."""
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=3)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        if os.path.exists(self.socket_path):
+            try:
+                os.unlink(self.socket_path)
+            except OSError:
+                pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Pre-warmed DashPVA viewer host')
+    parser.add_argument('--socket', required=True, help='Unix socket path to listen on')
+    parser.add_argument('--parent-pid', type=int, default=None,
+                        help='Exit when this process (the launcher) goes away')
+    parser.add_argument('--preload', action='append', default=[],
+                        help='Extra module to import up front (repeatable)')
+    args = parser.parse_args(argv)
+    if not supported():
+        parser.error('the viewer host needs Linux')
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s viewer-host %(message)s')
+    host = ViewerHost(args.socket, DEFAULT_PRELOAD + tuple(args.preload), args.parent_pid)
+    t0 = time.perf_counter()
+    host.warm_up()
+    logger.info(f"warmed up in {time.perf_counter() - t0:.2f} s")
+    host.bind()
+    host.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
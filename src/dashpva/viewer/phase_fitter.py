@@ -70,13 +70,15 @@ from ssrl_xrd_tools.analysis.fitting import (
 )
 
 # --- ssrl_xrd_tools ---
-from ssrl_xrd_tools.analysis.phase import PhaseModel
-from ssrl_xrd_tools.integrate import integrate_1d, load_poni, poni_to_integrator
+from ssrl_xrd_tools.integrate import load_poni, poni_to_integrator
 from ssrl_xrd_tools.io.image import load_mask, read_image
 
 import dashpva.settings as app_settings
 from dashpva.gui import configure_app
+from dashpva.utils.azimuthal_csr import CsrIntegrator, default_cache_dir
 from dashpva.utils.fast_phase_fit import fast_fit, fast_fit_sequence
+from dashpva.utils.phase_cache import ReflectionCache, load_phase_library
+from dashpva.utils.phase_cache import default_cache_dir as default_phase_cache_dir
 
 # --- pvaccess (optional, for live mode) ---
 try:
@@ -276,22 +278,27 @@ class PhaseLoadWorker(QThread):
 
     def run(self):
         cif_files = sorted(self.cif_dir.glob('*.cif'))
-        phases = []
         calc_wl = max(self.wavelength_A, self.MIN_CALC_WAVELENGTH)
         if calc_wl != self.wavelength_A:
             print(f"[Phase Fitter] Clamping calculation wavelength "
                   f"from {self.wavelength_A:.4f} to {calc_wl} Å "
                   f"(peak generation too slow below {self.MIN_CALC_WAVELENGTH} Å)")
-        for i, cif_path in enumerate(cif_files):
-            self.progress.emit(i, len(cif_files), cif_path.stem)
-            try:
-                ph = PhaseModel.from_cif(cif_path)
-                ph.calculate_peaks(wavelength=calc_wl)
-                phases.append(ph)
-                print(f"  [{i+1}/{len(cif_files)}] Loaded {ph.name}: "
-                      f"{len(ph.peaks)} peaks")
-            except Exception as e:
-                print(f"  [{i+1}/{len(cif_files)}] FAILED {cif_path.name}: {e}")
+
+        def _progress(result, done, total):
+            name = Path(result.path).stem
+            self.progress.emit(done - 1, total, name)
+            if result.ok:
+                source = "cached" if result.cached else f"{result.elapsed:.2f} s"
+                print(f"  [{done}/{total}] Loaded {name}: "
+                      f"{len(result.phase.peaks)} peaks ({source})")
+            else:
+                print(f"  [{done}/{total}] FAILED {Path(result.path).name}: {result.error}")
+
+        # Cached phases come straight off disk; misses are computed in parallel
+        results = load_phase_library(cif_files, calc_wl,
+                                     cache=ReflectionCache(default_phase_cache_dir()),
+                                     progress=_progress)
+        phases = [r.phase for r in results if r.ok]
         self.done.emit(phases, self.wavelength_A)
 
 
@@ -326,8 +333,13 @@ class IntegrationWorker(QThread):
                 self.error.emit(f"No TIF files matching '{self.tif_pattern}' in {data_dir}")
                 return
 
-            mask = load_mask(self.mask_file, threshold=self.threshold,
-                             data=read_image(tif_files[0]))
+            first = read_image(tif_files[0])
+            mask = load_mask(self.mask_file, threshold=self.threshold, data=first)
+            # One CSR matrix for every frame (and the substrate); cached on disk
+            # so re-running on the same PONI + mask skips the setup
+            engine = CsrIntegrator(ai, first.shape, npt=self.npt, mask=mask,
+                                   unit='q_A^-1', radial_range=self.q_range,
+                                   cache_dir=default_cache_dir())
 
             samz_groups = OrderedDict()
             for f in tif_files:
@@ -347,25 +359,10 @@ class IntegrationWorker(QThread):
             for idx, pos in enumerate(samz_positions):
                 self.progress.emit(idx, total)
                 frames = samz_groups[pos]
-                frame_results = []
-                for f in frames:
-                    img = read_image(f)
-                    r = integrate_1d(
-                        img, ai, npt=self.npt, unit='q_A^-1',
-                        mask=mask, radial_range=self.q_range,
-                        error_model='poisson',
-                    )
-                    frame_results.append(r)
-
-                q = frame_results[0].radial
-                I_stack = np.array([r.intensity for r in frame_results])
+                stack = np.stack([read_image(f) for f in frames])
+                q, I_stack, sig_stack = engine.integrate_stack(stack)
                 I_avg = I_stack.mean(axis=0)
-
-                if frame_results[0].sigma is not None:
-                    sig_stack = np.array([r.sigma for r in frame_results])
-                    sig_avg = np.sqrt((sig_stack ** 2).sum(axis=0)) / len(frame_results)
-                else:
-                    sig_avg = None
+                sig_avg = np.sqrt((sig_stack ** 2).sum(axis=0)) / len(frames)
 
                 patterns.append((q, I_avg, sig_avg))
                 labels.append(str(pos))
@@ -375,18 +372,9 @@ class IntegrationWorker(QThread):
                 sub_dir = Path(self.substrate_dir)
                 sub_tifs = natsorted(sub_dir.glob('*.tif'))
                 if sub_tifs:
-                    sub_results = []
-                    for f in sub_tifs:
-                        img = read_image(f)
-                        r = integrate_1d(
-                            img, ai, npt=self.npt, unit='q_A^-1',
-                            mask=mask, radial_range=self.q_range,
-                            error_model='poisson',
-                        )
-                        sub_results.append(r)
-                    q_t = sub_results[0].radial
-                    I_t = np.mean([r.intensity for r in sub_results], axis=0)
-                    template = (q_t, I_t)
+                    stack = np.stack([read_image(f) for f in sub_tifs])
+                    q_t, I_sub, _ = engine.integrate_stack(stack, error_model=None)
+                    template = (q_t, I_sub.mean(axis=0))
 
             self.progress.emit(total, total)
             self.done.emit(patterns, labels, template)
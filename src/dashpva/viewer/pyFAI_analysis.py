@@ -35,10 +35,10 @@ import time
 import fabio  # for mask loading if needed
 import h5py
 import pvaccess as pva
+import pyqtgraph as pg
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.colors import LogNorm
 from matplotlib.figure import Figure
-from PyQt5.QtCore import QThread, pyqtSignal
+from PyQt5.QtCore import QRectF, QThread, pyqtSignal
 from PyQt5.QtWidgets import (
     QApplication,
     QComboBox,
@@ -60,6 +60,8 @@ from skimage.transform import resize
 
 import dashpva.settings as app_settings
 from dashpva.gui import configure_app
+from dashpva.utils.azimuthal_csr import CsrIntegrator, default_cache_dir
+from dashpva.utils.row_ring import RowRing
 
 # Compression libraries for handling compressed PVA data
 try:
@@ -138,8 +140,8 @@ class SaveWorker(QThread):
             intensity_array = np.array(intensity_arrays) if intensity_arrays else None
             sigma_array = np.array(sigma_arrays) if sigma_arrays else None
             
-            # Get waterfall data as 2D array
-            waterfall_array = np.array(self.waterfall_data) if self.waterfall_data else None
+            # Waterfall rows arrive as a 2D (frames x q_points) snapshot, oldest first
+            waterfall_array = self.waterfall_data if self.waterfall_data is not None and len(self.waterfall_data) else None
             
             # Create HDF5 file with standard structure
             with h5py.File(self.filename, 'w') as h5f:
@@ -263,14 +265,15 @@ class PyFAIAnalysisWindow(QMainWindow):
             self.ai = None        # Calibration object (loaded from PONI file)
             self.poni_file = None  # PONI file path string
             self.mask = None      # Optional mask (if used)
+            self._csr = None      # CsrIntegrator for the current geometry/mask/shape
             self.paused = False   # Pause flag for image updates
             self._latest_image = None
             self.frame_count = 0  # Initialize frame counter
 
             # Initialize data storage for waterfall plot
-            self.waterfall_data = []  # Will store intensity data for each frame
-            self.q_values = None      # Will store Q values (x-axis)
             self.max_frames = 100     # Maximum number of frames to show in waterfall
+            self.waterfall_data = RowRing(self.max_frames)  # Intensity row per frame, oldest overwritten
+            self.q_values = None      # Will store Q values (x-axis)
             
             # Initialize data storage for saving all data
             self.image_cache = []  # Will store raw diffraction images (cached based on max_frames)
@@ -427,14 +430,23 @@ class PyFAIAnalysisWindow(QMainWindow):
         waterfall_widget = QWidget()
         waterfall_layout = QHBoxLayout(waterfall_widget)
         
-        # Create waterfall plot
-        self.waterfall_figure = Figure(figsize=(6, 2))
-        self.waterfall_canvas = FigureCanvas(self.waterfall_figure)
-        self.waterfall_ax = self.waterfall_figure.add_subplot(111)
-        self.waterfall_ax.set_xlabel("Q (Å⁻¹)")
-        self.waterfall_ax.set_ylabel("Frame Number")
-        self.waterfall_image = None
-        waterfall_layout.addWidget(self.waterfall_canvas)
+        # Create waterfall plot: the ring is shown as two image items (rows before
+        # and after its write pointer), stretched onto the q axis with setRect
+        self.waterfall_plot = pg.PlotWidget()
+        self.waterfall_plot.setLabel('bottom', "Q (Å⁻¹)")
+        self.waterfall_plot.setLabel('left', "Frame Number")
+        self.waterfall_plot.setMinimumHeight(160)
+        waterfall_cmap = pg.colormap.get('magma')
+        self.waterfall_image = pg.ImageItem(axisOrder='row-major')
+        self._waterfall_wrap_image = pg.ImageItem(axisOrder='row-major')
+        for item in (self.waterfall_image, self._waterfall_wrap_image):
+            item.setColorMap(waterfall_cmap)
+            self.waterfall_plot.addItem(item)
+        self.waterfall_colorbar = pg.ColorBarItem(colorMap=waterfall_cmap, interactive=False,
+                                                  label='log10 Intensity')
+        self.waterfall_colorbar.setImageItem([self.waterfall_image, self._waterfall_wrap_image],
+                                             insert_in=self.waterfall_plot.getPlotItem())
+        waterfall_layout.addWidget(self.waterfall_plot)
         
         # Add waterfall plot to main layout
         main_layout.addWidget(waterfall_widget)
@@ -664,7 +676,7 @@ class PyFAIAnalysisWindow(QMainWindow):
             filename,
             list(self.image_cache),  # Make copies to avoid thread issues
             list(self.integration_data),
-            list(self.waterfall_data),
+            self.waterfall_data.rows().copy() if len(self.waterfall_data) else None,
             self.q_values.copy() if self.q_values is not None else None,
             self.pv_address,
             dict(self.pv_metadata),
@@ -1079,10 +1091,12 @@ class PyFAIAnalysisWindow(QMainWindow):
                 logger.debug(f"Switched to generic detector with pixel sizes: pixel1={p1}, pixel2={p2}")
             # =================================================================
 
-            # Perform azimuthal integration with pyFAI
-            result = self.ai.integrate1d(image, 1000, mask=mask, unit="q_A^-1",
-                                         method='bbox', error_model='poisson')
-            q, intensity, sigma = result.radial, result.intensity, result.sigma
+            # Perform azimuthal integration with pyFAI's CSR matrix, rebuilt (or
+            # loaded from the disk cache) only when geometry, mask or shape change
+            if self._csr is None or not self._csr.matches(self.ai, image.shape, 1000, mask):
+                self._csr = CsrIntegrator(self.ai, image.shape, 1000, mask=mask, unit="q_A^-1",
+                                          cache_dir=default_cache_dir())
+            q, intensity, sigma = self._csr.integrate(image, error_model='poisson')
             logger.debug(f"Azimuthal integration successful. Q range: {q.min()} to {q.max()}, "
                          f"Intensity range: {intensity.min()} to {intensity.max()}")
 
@@ -1237,60 +1251,42 @@ Current Status:
             logger.error(f"Could not save configuration: {e}")
 
     def update_waterfall_plot(self, q, intensity):
-        """Updates the waterfall plot with new intensity data."""
-        if self.q_values is None:
-            self.q_values = q
-            
-        # Add new intensity data
+        """Appends the new intensity profile to the waterfall ring and redraws it."""
+        if self.q_values is None or len(q) != len(self.q_values) or not np.array_equal(q, self.q_values):
+            # New radial axis (geometry or binning changed): restart the stack
+            self.q_values = np.array(q, dtype=np.float64)
+            self.waterfall_data.clear()
         self.waterfall_data.append(intensity)
-        
-        # Keep only the last max_frames
-        if len(self.waterfall_data) > self.max_frames:
-            self.waterfall_data.pop(0)
-            
-        # Convert data to 2D array for plotting
-        data_array = np.array(self.waterfall_data)
-        
-        # Clear previous plot
-        self.waterfall_ax.clear()
-        
-        # Create the contour plot
-        if len(self.waterfall_data) > 1:
-            frame_numbers = np.arange(len(self.waterfall_data))
-            X, Y = np.meshgrid(self.q_values, frame_numbers)
-            
-            # Create contour plot with log scale for better visualization
-            # Guard against invalid LogNorm: vmin must be > 0 and < vmax
-            dmin = float(data_array.min())
-            dmax = float(data_array.max())
-            if dmin <= 0 or not np.isfinite(dmin):
-                dmin = 1e-10
-            if dmax <= dmin or not np.isfinite(dmax):
-                dmax = dmin * 10
-            self.waterfall_image = self.waterfall_ax.pcolormesh(
-                X, Y, data_array,
-                shading='auto',
-                cmap='magma',
-                norm=LogNorm(vmin=dmin, vmax=dmax)
-            )
-            
-            # Set labels and title
-            self.waterfall_ax.set_xlabel("Q (Å⁻¹)")
-            self.waterfall_ax.set_ylabel("Frame Number")
-            
-            # Add colorbar if it doesn't exist
-            if not hasattr(self, 'waterfall_colorbar'):
-                self.waterfall_colorbar = self.waterfall_figure.colorbar(
-                    self.waterfall_image, 
-                    ax=self.waterfall_ax
-                )
-                self.waterfall_colorbar.set_label('Intensity')
-        
-        self.waterfall_canvas.draw_idle()
+        self._render_waterfall()
+
+    def _render_waterfall(self):
+        """Pushes the ring's log10 rows and incremental levels to the image items."""
+        segments = self.waterfall_data.segments(log=True)
+        if not segments or self.q_values is None:
+            return
+        q = self.q_values
+        # pyFAI bins are uniform in q; pixel k covers q[k] -/+ dq/2
+        dq = float(q[-1] - q[0]) / (len(q) - 1) if len(q) > 1 else 1.0
+        x0 = float(q[0]) - dq / 2
+        offset = 0
+        for item, seg in zip((self.waterfall_image, self._waterfall_wrap_image), segments + [None]):
+            if seg is None:
+                item.clear()
+                continue
+            # Frame index runs along y, oldest at the bottom
+            item.setImage(seg, autoLevels=False)
+            item.setRect(QRectF(x0, offset, dq * seg.shape[1], len(seg)))
+            offset += len(seg)
+        levels = self.waterfall_data.levels(log=True)
+        if levels is not None:
+            lo, hi = levels
+            self.waterfall_colorbar.setLevels((lo, hi if hi > lo else lo + 1.0))
 
     def update_max_frames(self):
         """Updates the max_frames attribute with the value from the spinbox."""
         self.max_frames = self.max_frames_spinbox.value()
+        self.waterfall_data.resize(self.max_frames)
+        self._render_waterfall()
     
     def closeEvent(self, event):
         """
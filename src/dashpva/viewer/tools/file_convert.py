@@ -1,13 +1,22 @@
+import os
 import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List, Tuple
+from typing import Callable, List, Optional, Tuple
 
+import h5py
 import numpy as np
 from PyQt5 import uic
+from PyQt5.QtCore import QObject, QThread, pyqtSignal, pyqtSlot
 from PyQt5.QtWidgets import QApplication, QDialog, QFileDialog, QMessageBox
 
 import dashpva.settings as settings
 from dashpva.gui import configure_app, ui_path
+from dashpva.utils.frame_cache import FrameCache, FrameStack
 from dashpva.utils.hdf5_loader import HDF5Loader
 
 
@@ -68,6 +77,279 @@ def stack_images(paths: List[Path], log: callable) -> Tuple[np.ndarray, Tuple[in
     return (vol, shape_hw, used)
 
 
+@dataclass
+class ConversionResult:
+    """Outcome of one ``convert_images_to_h5`` call."""
+
+    out_path: Path
+    frames_written: int = 0
+    skipped: List[str] = field(default_factory=list)
+    complete: bool = False
+    resumed_from: int = 0   # source images already converted before this call
+    elapsed: float = 0.0
+
+
+def _compression_kwargs(compression: Optional[str]) -> dict:
+    if compression == 'bitshuffle':
+        import hdf5plugin
+        return dict(hdf5plugin.Bitshuffle(cname='lz4'))
+    if compression == 'gzip':
+        return {'compression': 'gzip', 'compression_opts': 4, 'shuffle': True}
+    return {}
+
+
+def convert_images_to_h5(paths: List[Path], out_path: Path, *, names: Optional[List[str]] = None,
+                         metadata: Optional[dict] = None, log: Callable = print,
+                         progress: Optional[Callable[[int, int], None]] = None,
+                         cancel: Optional[Callable[[], bool]] = None, resume: bool = False,
+                         workers: Optional[int] = None, window: Optional[int] = None,
+                         compression: Optional[str] = 'bitshuffle', flush_every: int = 64) -> ConversionResult:
+    """Stream images into ``/entry/data/data`` of ``out_path`` without stacking them in memory.
+
+    Images are decoded on a thread pool and appended in order to a chunked
+    (one frame per chunk), compressed, resizable float32 dataset; at most
+    ``window`` decoded frames are held at once. Images that fail to load or
+    do not match the first image's shape are skipped, as in ``stack_images``.
+
+    Progress is recorded in ``/entry/data/conversion`` and flushed every
+    ``flush_every`` frames. If ``cancel()`` returns True the file is left
+    resumable; calling again with ``resume=True`` and the same source list
+    continues where it stopped. On completion the conversion group is removed
+    and metadata is written as ``HDF5Loader.save_vol_to_h5`` does.
+
+    Args:
+        paths: source images, in output order.
+        names: labels stored in ``file_list`` (default: file names).
+        metadata: extra entries for ``/entry/data/metadata``.
+        compression: 'bitshuffle' (LZ4), 'gzip' or None.
+    """
+    t0 = time.perf_counter()
+    paths = [Path(p) for p in paths]
+    names = list(names) if names is not None else [p.name for p in paths]
+    out_path = Path(out_path)
+    result = ConversionResult(out_path=out_path)
+    workers = int(workers or min(8, os.cpu_count() or 1))
+    window = int(window or 2 * workers)
+    cancel = cancel or (lambda: False)
+    total = len(paths)
+
+    h5f = None
+    start = 0
+    if resume and out_path.exists():
+        try:
+            h5f = h5py.File(out_path, 'a')
+            conv = h5f.get('entry/data/conversion')
+            if conv is None:
+                # No progress record: either complete or not ours
+                if 'entry/data/data' in h5f:
+                    result.frames_written = int(h5f['entry/data/data'].shape[0])
+                    result.complete = True
+                    log(f"Already converted: {out_path}")
+                    h5f.close()
+                    return result
+                raise ValueError("no conversion progress recorded")
+            if list(conv['sources'].asstr()[()]) != names:
+                raise ValueError("source images changed since the partial conversion")
+            start = int(conv.attrs['next_source'])
+            # After a crash (rather than a cancel) rows written after the last
+            # checkpoint may be on disk; drop them so they are not appended twice
+            source_index = conv['source_index']
+            keep = int(np.searchsorted(source_index[()], start))
+            if h5f['entry/data/data'].shape[0] < keep:
+                raise ValueError("fewer frames on disk than the checkpoint records")
+            if keep < source_index.shape[0] or keep < h5f['entry/data/data'].shape[0]:
+                log(f"Discarding {h5f['entry/data/data'].shape[0] - keep} frame(s) written after the last checkpoint")
+                h5f['entry/data/data'].resize(keep, axis=0)
+                source_index.resize(keep, axis=0)
+            result.resumed_from = start
+            log(f"Resuming {out_path} at image {start} of {total}")
+        except Exception as e:
+            log(f"Cannot resume {out_path} ({e}); starting over")
+            if h5f is not None:
+                h5f.close()
+            h5f = None
+            start = 0
+
+    dset = conv = None
+    if h5f is not None:
+        dset = h5f['entry/data/data']
+        conv = h5f['entry/data/conversion']
+        shape_hw = tuple(int(x) for x in dset.shape[1:])
+    else:
+        shape_hw = None
+
+    def _checkpoint(next_source):
+        conv.attrs['next_source'] = int(next_source)
+        h5f.flush()
+
+    pending = deque()
+    next_submit = start
+    done = start
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ImageConvert") as pool:
+            while done < total:
+                while next_submit < total and len(pending) < window:
+                    pending.append(pool.submit(load_image, paths[next_submit]))
+                    next_submit += 1
+                if cancel():
+                    log(f"Conversion interrupted at image {done} of {total}")
+                    break
+                fut = pending.popleft()
+                p = paths[done]
+                try:
+                    arr = fut.result()
+                except Exception as e:
+                    log(f"Skip (failed to load): {p} — {e}")
+                    result.skipped.append(names[done])
+                    arr = None
+                if arr is not None and shape_hw is None:
+                    shape_hw = (int(arr.shape[0]), int(arr.shape[1]))
+                    h5f = h5py.File(out_path, 'w')
+                    data_grp = h5f.require_group('entry/data')
+                    dset = data_grp.create_dataset(
+                        'data', shape=(0,) + shape_hw, maxshape=(None,) + shape_hw,
+                        chunks=(1,) + shape_hw, dtype=np.float32, **_compression_kwargs(compression))
+                    conv = data_grp.create_group('conversion')
+                    conv.create_dataset('sources', data=np.array(names, dtype=h5py.string_dtype(encoding='utf-8')))
+                    conv.create_dataset('source_index', shape=(0,), maxshape=(None,), dtype=np.int64, chunks=(4096,))
+                if arr is not None and arr.shape != shape_hw:
+                    log(f"Skip (size mismatch): {p} — got {arr.shape}, expected {shape_hw}")
+                    result.skipped.append(names[done])
+                    arr = None
+                if arr is not None:
+                    n = dset.shape[0]
+                    dset.resize(n + 1, axis=0)
+                    dset[n] = arr
+                    idx = conv['source_index']
+                    idx.resize(n + 1, axis=0)
+                    idx[n] = done
+                done += 1
+                if conv is not None and (done - start) % flush_every == 0:
+                    _checkpoint(done)
+                if progress is not None:
+                    progress(done, total)
+            for fut in pending:
+                fut.cancel()
+
+        if h5f is None:
+            return result
+        result.frames_written = int(dset.shape[0])
+        if done < total:
+            _checkpoint(done)
+            return result
+
+        # Complete: replace the progress record with standard metadata
+        data_grp = h5f['entry/data']
+        used = [names[int(i)] for i in conv['source_index'][()]]
+        del data_grp['conversion']
+        meta = dict(metadata or {})
+        meta.setdefault('file_list', used)
+        meta.setdefault('num_images', len(used))
+        meta.setdefault('original_shape', [int(shape_hw[0]), int(shape_hw[1])])
+        meta.setdefault('data_type', 'volume')
+        meta.setdefault('creation_timestamp', str(np.datetime64('now')))
+        meta.setdefault('volume_shape', tuple(int(x) for x in dset.shape))
+        if 'metadata' in data_grp:
+            del data_grp['metadata']
+        HDF5Loader().write_metadata_group(data_grp.create_group('metadata'), meta)
+        h5f['entry'].attrs['data_type'] = meta['data_type']
+        data_grp.attrs['array_rank'] = 3
+        data_grp.attrs['array_shape'] = np.array(dset.shape, dtype=np.int64)
+        result.complete = True
+        return result
+    finally:
+        if h5f is not None:
+            h5f.close()
+        result.elapsed = time.perf_counter() - t0
+
+
+class ImageFolderStack(FrameStack):
+    """Lazy (N,H,W) float32 stack over image files, decoded on demand.
+
+    Nothing is decoded up front except the first readable image, which fixes
+    the frame shape. Other frames are decoded when requested (and prefetched on
+    the frame cache's thread pool around the playhead). A file that fails to
+    load or has a different shape is served as a zero frame and recorded in
+    ``bad_files`` the first time it is read, instead of being skipped up front
+    as ``stack_images`` does.
+    """
+
+    def __init__(self, cache: FrameCache, paths: List[Path], read_workers: Optional[int] = None):
+        self.paths = [Path(p) for p in paths]
+        self.bad_files = {}
+        first = None
+        for p in self.paths:
+            try:
+                first = load_image(p)
+                break
+            except Exception as e:
+                self.bad_files[p] = f"failed to load — {e}"
+        if first is None:
+            raise ValueError("No readable images")
+        names = tuple(str(p) for p in self.paths)
+        super().__init__(cache, ('images', names[0], len(names), hash(names)),
+                         (len(self.paths), int(first.shape[0]), int(first.shape[1])))
+        self.read_workers = int(read_workers or cache.workers)
+
+    @classmethod
+    def from_folder(cls, cache: FrameCache, src: Path, patterns: List[str], recursive: bool = False):
+        """Index the images in ``src`` (natural order, see ``list_images``)."""
+        return cls(cache, list_images(Path(src), patterns, recursive))
+
+    def read_frame(self, index: int) -> np.ndarray:
+        p = self.paths[index]
+        try:
+            arr = load_image(p)
+        except Exception as e:
+            self.bad_files[p] = f"failed to load — {e}"
+            return np.zeros(self.shape[1:], dtype=np.float32)
+        if arr.shape != self.shape[1:]:
+            self.bad_files[p] = f"size mismatch — got {arr.shape}, expected {self.shape[1:]}"
+            return np.zeros(self.shape[1:], dtype=np.float32)
+        return arr
+
+
+@dataclass
+class ConvertJob:
+    paths: List[Path]
+    out_path: Path
+    names: List[str]
+    metadata: dict
+
+
+class ConvertWorker(QObject):
+    """Runs ``convert_images_to_h5`` for a list of jobs off the GUI thread."""
+
+    log = pyqtSignal(str)
+    progress = pyqtSignal(int, int)
+    finished = pyqtSignal(object)  # List[ConversionResult]
+
+    def __init__(self, jobs: List[ConvertJob], resume: bool = False):
+        super().__init__()
+        self.jobs = jobs
+        self.resume = resume
+        self._stop = threading.Event()
+
+    def stop(self):
+        self._stop.set()
+
+    @pyqtSlot()
+    def run(self):
+        results = []
+        for job in self.jobs:
+            if self._stop.is_set():
+                break
+            self.log.emit(f"Converting {len(job.paths)} image(s) to: {job.out_path}")
+            try:
+                results.append(convert_images_to_h5(
+                    job.paths, job.out_path, names=job.names, metadata=job.metadata,
+                    log=self.log.emit, progress=self.progress.emit, cancel=self._stop.is_set,
+                    resume=self.resume))
+            except Exception as e:
+                self.log.emit(f"Error writing {job.out_path}: {e}")
+        self.finished.emit(results)
+
+
 class FileConvertDialog(QDialog):
     def __init__(self):
         super().__init__()
@@ -82,6 +364,9 @@ class FileConvertDialog(QDialog):
             self.btn_browse_output_dir.clicked.connect(self._browse_output_dir)
         if hasattr(self, 'btn_convert'):
             self.btn_convert.clicked.connect(self._convert)
+        if hasattr(self, 'btn_stop'):
+            self.btn_stop.clicked.connect(self._stop)
+            self.btn_stop.setEnabled(False)
         if hasattr(self, 'btn_close'):
             self.btn_close.clicked.connect(self.close)
 
@@ -203,84 +488,119 @@ class FileConvertDialog(QDialog):
 
     # ---------- Conversion ----------
     def _convert(self):
+        if getattr(self, '_convert_thread', None) is not None:
+            return
         src_dir, recursive, per_sub, out_file, out_dir = self._validate()
         if not src_dir:
             return
         patterns = self._patterns_for_filter()
+        resume = bool(self.chk_resume.isChecked()) if hasattr(self, 'chk_resume') else False
         self._append_log(f"Source: {src_dir}")
         self._append_log(f"Recursive: {recursive}")
         self._append_log(f"Mode: {'per-subfolder' if per_sub else 'single file'}")
         self._append_log(f"Filter: {patterns}")
 
-        try:
-            if per_sub:
-                # Ensure output directory exists
-                try:
-                    out_dir.mkdir(parents=True, exist_ok=True)
-                except Exception as e:
-                    QMessageBox.critical(self, 'Output Error', f'Failed to create output directory:\n{out_dir}\n\n{e}')
-                    return
-                subdirs = [d for d in src_dir.iterdir() if d.is_dir()]
-                if not subdirs:
-                    self._append_log('No subfolders found under source directory.')
-                total_written = 0
-                for sub in sorted(subdirs, key=lambda p: natural_key(p.name)):
-                    files = list_images(sub, patterns, recursive=False)  # immediate subdirectory only
-                    if not files:
-                        self._append_log(f"Skip (no images): {sub}")
-                        continue
-                    self._append_log(f"Converting {len(files)} image(s) from: {sub}")
-                    vol, shape_hw, used = stack_images(files, self._append_log)
-                    if vol.size == 0:
-                        self._append_log(f"Skip (no usable images): {sub}")
-                        continue
-                    out_path = out_dir / f"{sub.name}.h5"
-                    md = {
-                        'source_folder': str(sub),
-                        'file_list': [p.name for p in used],
-                        'num_images': int(vol.shape[0]),
-                        'original_shape': [int(shape_hw[0]), int(shape_hw[1])],
-                    }
-                    ok = HDF5Loader().save_vol_to_h5(str(out_path), vol, metadata=md)
-                    if ok:
-                        total_written += 1
-                        self._append_log(f"Wrote: {out_path}")
-                    else:
-                        self._append_log(f"Error writing: {out_path}")
-                summary = f"Per-subfolder: wrote {total_written} file(s)."
-                self._append_log(summary)
-                QMessageBox.information(self, 'Conversion Summary', summary)
-            else:
-                files = list_images(src_dir, patterns, recursive=recursive)
+        jobs = []
+        if per_sub:
+            # Ensure output directory exists
+            try:
+                out_dir.mkdir(parents=True, exist_ok=True)
+            except Exception as e:
+                QMessageBox.critical(self, 'Output Error', f'Failed to create output directory:\n{out_dir}\n\n{e}')
+                return
+            subdirs = [d for d in src_dir.iterdir() if d.is_dir()]
+            if not subdirs:
+                self._append_log('No subfolders found under source directory.')
+            for sub in sorted(subdirs, key=lambda p: natural_key(p.name)):
+                files = list_images(sub, patterns, recursive=False)  # immediate subdirectory only
                 if not files:
-                    QMessageBox.warning(self, 'No Images Found', 'No images matching the selected filter were found.')
-                    return
-                self._append_log(f"Converting {len(files)} image(s) from: {src_dir}")
-                vol, shape_hw, used = stack_images(files, self._append_log)
-                if vol.size == 0:
-                    QMessageBox.warning(self, 'No Usable Images', 'No images with a consistent shape could be loaded.')
-                    return
-                # Ensure parent directory exists
-                try:
-                    Path(out_file).parent.mkdir(parents=True, exist_ok=True)
-                except Exception:
-                    pass
-                md = {
-                    'source_folder': str(src_dir),
-                    'file_list': [str(p.relative_to(src_dir)) for p in used],
-                    'num_images': int(vol.shape[0]),
-                    'original_shape': [int(shape_hw[0]), int(shape_hw[1])],
-                }
-                ok = HDF5Loader().save_vol_to_h5(str(out_file), vol, metadata=md)
-                if ok:
-                    self._append_log(f"Wrote: {out_file}")
-                    QMessageBox.information(self, 'Conversion Summary', f"Wrote: {out_file}")
-                else:
-                    self._append_log(f"Error writing: {out_file}")
-                    QMessageBox.critical(self, 'Write Failed', f"Failed to write HDF5: {out_file}")
-        except Exception as e:
-            self._append_log(f"Error: {e}")
-            QMessageBox.critical(self, 'Conversion Error', str(e))
+                    self._append_log(f"Skip (no images): {sub}")
+                    continue
+                jobs.append(ConvertJob(files, out_dir / f"{sub.name}.h5", [p.name for p in files],
+                                       {'source_folder': str(sub)}))
+        else:
+            files = list_images(src_dir, patterns, recursive=recursive)
+            if not files:
+                QMessageBox.warning(self, 'No Images Found', 'No images matching the selected filter were found.')
+                return
+            # Ensure parent directory exists
+            try:
+                Path(out_file).parent.mkdir(parents=True, exist_ok=True)
+            except Exception:
+                pass
+            jobs.append(ConvertJob(files, Path(out_file), [str(p.relative_to(src_dir)) for p in files],
+                                   {'source_folder': str(src_dir)}))
+        if not jobs:
+            QMessageBox.information(self, 'Conversion Summary', 'Nothing to convert.')
+            return
+
+        self._convert_thread = QThread()
+        self._convert_worker = ConvertWorker(jobs, resume=resume)
+        self._convert_worker.moveToThread(self._convert_thread)
+        self._convert_thread.started.connect(self._convert_worker.run)
+        self._convert_worker.log.connect(self._append_log)
+        self._convert_worker.progress.connect(self._on_convert_progress)
+        self._convert_worker.finished.connect(self._on_convert_finished)
+        self._set_converting(True)
+        self._convert_thread.start()
+
+    def _stop(self):
+        worker = getattr(self, '_convert_worker', None)
+        if worker is not None:
+            self._append_log('Stopping after the current image…')
+            worker.stop()
+
+    def _set_converting(self, running: bool):
+        if hasattr(self, 'btn_convert'):
+            self.btn_convert.setEnabled(not running)
+        if hasattr(self, 'btn_stop'):
+            self.btn_stop.setEnabled(running)
+        if running and hasattr(self, 'progress_bar'):
+            self.progress_bar.setValue(0)
+
+    def _on_convert_progress(self, done: int, total: int):
+        if hasattr(self, 'progress_bar'):
+            self.progress_bar.setMaximum(max(1, total))
+            self.progress_bar.setValue(done)
+
+    def closeEvent(self, event):
+        # Stop a running conversion (the file stays resumable) before the
+        # dialog and its worker go away
+        thread = getattr(self, '_convert_thread', None)
+        if thread is not None:
+            worker = self._convert_worker
+            worker.finished.disconnect(self._on_convert_finished)
+            worker.stop()
+            thread.quit()
+            thread.wait()
+            self._convert_thread = None
+            self._convert_worker = None
+        super().closeEvent(event)
+
+    def _on_convert_finished(self, results):
+        self._set_converting(False)
+        try:
+            self._convert_thread.quit()
+            self._convert_thread.wait()
+        except Exception:
+            pass
+        self._convert_thread = None
+        self._convert_worker = None
+        written = [r for r in results if r.complete]
+        partial = [r for r in results if not r.complete and r.frames_written > 0]
+        empty = [r for r in results if not r.complete and r.frames_written == 0]
+        for r in written:
+            rate = r.frames_written / r.elapsed if r.elapsed > 0 else 0.0
+            self._append_log(f"Wrote: {r.out_path} ({r.frames_written} frames, {rate:.1f} frames/s)")
+        for r in partial:
+            self._append_log(f"Partial (resumable): {r.out_path} ({r.frames_written} frames)")
+        for r in empty:
+            self._append_log(f"Skip (no usable images): {r.out_path}")
+        summary = f"Wrote {len(written)} file(s)."
+        if partial:
+            summary += f" {len(partial)} partial file(s) can be resumed."
+        self._append_log(summary)
+        QMessageBox.information(self, 'Conversion Summary', summary)
 
 
 def main():
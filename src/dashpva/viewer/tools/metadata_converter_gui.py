@@ -6,7 +6,7 @@ from PyQt5 import uic
 from PyQt5.QtWidgets import QApplication, QDialog, QFileDialog, QMessageBox
 
 from dashpva.gui import configure_app, ui_path
-from dashpva.utils.metadata_converter import convert_files_or_dir
+from dashpva.utils.metadata_converter import convert_batch, convert_files_or_dir
 
 
 class MetadataConverterDialog(QDialog):
@@ -55,6 +55,13 @@ class MetadataConverterDialog(QDialog):
         if hasattr(self, 'txt_log'):
             self.txt_log.append(text)
 
+    def _on_file_converted(self, result, done: int, total: int):
+        if result.ok:
+            self._append_log(f"[{done}/{total}] Converted: {result.source} ({result.elapsed:.2f}s)")
+        else:
+            self._append_log(f"[{done}/{total}] Error converting {result.source}: {result.error}")
+        QApplication.processEvents()
+
     def _validate_inputs(self) -> tuple:
         hdf5_path = self.txt_hdf5_path.text().strip() if hasattr(self, 'txt_hdf5_path') else ''
         toml_path = self.txt_toml_path.text().strip() if hasattr(self, 'txt_toml_path') else ''
@@ -98,25 +105,26 @@ class MetadataConverterDialog(QDialog):
                     errors.append(f"{src}: {e}")
                     self._append_log(f"Error converting {src}: {e}")
             elif src.is_dir():
-                files = list(src.rglob('*.h5'))
-                if not files:
+                results = convert_batch(
+                    toml_path=toml_path,
+                    hdf5_path=str(src),
+                    base_group=base_group,
+                    include=include,
+                    in_place=in_place,
+                    recursive=True,
+                    force=force,
+                    progress=self._on_file_converted,
+                )
+                if not results:
                     self._append_log('No .h5 files found in directory.')
-                for f in files:
-                    try:
-                        outputs = convert_files_or_dir(
-                            toml_path=toml_path,
-                            hdf5_path=str(f),
-                            base_group=base_group,
-                            include=include,
-                            in_place=in_place,
-                            recursive=False,
-                            force=force,
-                        )
-                        converted_count += 1 if outputs else 0
-                        self._append_log(f"Converted: {f}")
-                    except Exception as e:
-                        errors.append(f"{f}: {e}")
-                        self._append_log(f"Error converting {f}: {e}")
+                for r in results:
+                    if r.ok:
+                        converted_count += 1
+                    else:
+                        errors.append(f"{r.source}: {r.error}")
+                if results:
+                    total = sum(r.elapsed for r in results)
+                    self._append_log(f"Per-file conversion time: {total / len(results):.2f}s average")
             else:
                 QMessageBox.critical(self, 'Invalid Path', 'The selected HDF5 path is not a file or directory.')
                 return
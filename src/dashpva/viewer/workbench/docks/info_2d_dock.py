@@ -3,6 +3,7 @@ from typing import Optional
 import numpy as np
 from PyQt5.QtCore import Qt
 
+from dashpva.utils.frame_cache import FrameStack
 from dashpva.viewer.workbench.docks.information_dock_base import InformationDockBase
 
 
@@ -86,17 +87,25 @@ class Info2DDock(InformationDockBase):
         high_val = None
         try:
             data = getattr(mw, 'current_2d_data', None)
+            values = None
             if isinstance(data, np.ndarray):
+                values = data
+            elif isinstance(data, FrameStack):
+                # Lazy stack: intensity range of the current frame only, read
+                # through the frame cache rather than materializing the stack
+                if hasattr(mw, 'get_current_frame_data'):
+                    values = mw.get_current_frame_data()
+            if values is not None:
                 # total points
                 total = int(data.size)
                 points_str = f"{total:,}"
                 # intensity low/high across dataset
                 try:
-                    low_val = float(np.min(data))
+                    low_val = float(np.min(values))
                 except Exception:
                     low_val = None
                 try:
-                    high_val = float(np.max(data))
+                    high_val = float(np.max(values))
                 except Exception:
                     high_val = None
         except Exception:
@@ -33,6 +33,7 @@ from PyQt5.QtWidgets import (
     QWidget,
 )
 
+from dashpva.utils.frame_cache import get_frame_cache
 from dashpva.utils.roi_ops import align_stacks, extract_roi_stack, per_frame_mean
 from dashpva.viewer.core.docks.base_dock import BaseDock
 
@@ -681,7 +682,7 @@ class ROICalcDock(BaseDock):
 
             arr = np.asarray(data, dtype=np.float32)
             try:
-                with h5py.File(save_path, 'a') as h5f:
+                with get_frame_cache().released(save_path), h5py.File(save_path, 'a') as h5f:
                     entry = h5f.require_group('entry')
                     data_grp = entry.require_group('data')
                     # Replace existing 'result' dataset
@@ -29,6 +29,7 @@ from PyQt5.QtWidgets import (
     QWidget,
 )
 
+from dashpva.utils.frame_cache import FrameStack
 from dashpva.viewer.workbench.rois.roi_plot_dock import (
     AXIS_LABELS,
     METRIC_OPTIONS,
@@ -323,7 +324,7 @@ class ROI2DPlotDock(QDockWidget):
 
     def _compute_series(self):
         data = getattr(self.main, 'current_2d_data', None)
-        if data is None or not isinstance(data, np.ndarray):
+        if data is None or not isinstance(data, (np.ndarray, FrameStack)):
             self.series = {m: np.array([0.0], dtype=float) for m in METRIC_OPTIONS}
             self.series['time'] = np.array([0], dtype=int)
             self._update_plot()
@@ -28,6 +28,7 @@ from PyQt5.QtWidgets import (
 )
 
 from dashpva.gui.theme_colors import BORDER
+from dashpva.utils.frame_cache import FrameStack, get_frame_cache
 
 
 class ContextRectROI(pg.RectROI):
@@ -381,7 +382,7 @@ class ROIManager:
 
             # Delete the first existing candidate
             try:
-                with h5py.File(file_path, 'a') as h5f:
+                with get_frame_cache().released(file_path), h5py.File(file_path, 'a') as h5f:
                     for p in candidates:
                         try:
                             if p in h5f and isinstance(h5f[p], h5py.Dataset):
@@ -503,7 +504,7 @@ class ROIManager:
 
             # Build ROI stack across frames (or single frame for 2D data)
             # Build ROI-only stack: shape is (num_frames, h, w) for 3D data, or (h, w) for 2D
-            if isinstance(data, np.ndarray) and data.ndim == 3:
+            if isinstance(data, (np.ndarray, FrameStack)) and data.ndim == 3:
                 num_frames = int(data.shape[0])
                 samples = []
                 for i in range(num_frames):
@@ -531,7 +532,7 @@ class ROIManager:
 
             # Write to HDF5 under /entry/data/rois
             try:
-                with h5py.File(file_path, 'a') as h5f:
+                with get_frame_cache().released(file_path), h5py.File(file_path, 'a') as h5f:
                     entry = h5f.require_group('entry')
                     data_grp = entry.get('data')
                     if data_grp is None or not isinstance(data_grp, h5py.Group):
@@ -26,6 +26,8 @@ from PyQt5.QtWidgets import (
     QWidget,
 )
 
+from dashpva.utils.frame_cache import FrameStack
+
 METRIC_OPTIONS = ["time", "sum", "min", "max", "comx", "comy"]
 SINGLE_FRAME_Y_OPTIONS = ["proj_x", "proj_y"]
 # Human-readable display names shown in dropdowns (key → label)
@@ -211,7 +213,7 @@ class ROIPlotDock(QDockWidget):
     def _compute_time_series(self):
         """Compute per-frame ROI metrics: sum, min, max, std, and time (index)."""
         data = getattr(self.main, 'current_2d_data', None)
-        if data is None or not isinstance(data, np.ndarray):
+        if data is None or not isinstance(data, (np.ndarray, FrameStack)):
             # No data
             self.series = {m: np.array([0.0], dtype=float) for m in METRIC_OPTIONS}
             self.series['time'] = np.array([0], dtype=int)
@@ -33,6 +33,7 @@ from PyQt5.QtWidgets import (
 )
 
 from dashpva.gui import configure_app
+from dashpva.utils.frame_cache import FrameStack, H5FrameStack, get_frame_cache
 from dashpva.utils.hdf5_loader import HDF5Loader
 from dashpva.utils.log_manager import get_default_manager
 
@@ -1697,61 +1698,65 @@ class WorkbenchWindow(BaseWindow):
 
     # Async dataset loader to prevent UI freeze
     class DatasetLoader(QObject):
-        loaded = pyqtSignal(object)  # numpy array
+        loaded = pyqtSignal(object)  # numpy array or lazy FrameStack
         failed = pyqtSignal(str)
 
-        def __init__(self, file_path, dataset_path, max_frames=100):
+        def __init__(self, file_path, dataset_path):
             super().__init__()
             self.file_path = file_path
             self.dataset_path = dataset_path
-            self.max_frames = max_frames
 
         @pyqtSlot()
         def run(self):
             try:
                 import h5py
                 import numpy as np
-                with h5py.File(self.file_path, 'r') as h5file:
-                    if self.dataset_path not in h5file:
-                        self.failed.emit("Dataset not found")
-                        return
-                    dset = h5file[self.dataset_path]
-                    if not isinstance(dset, h5py.Dataset):
-                        self.failed.emit("Selected item is not a dataset")
-                        return
+                # Shared read-only handle; stays open for frame streaming.
+                h5file = get_frame_cache().file(self.file_path)
+                if self.dataset_path not in h5file:
+                    self.failed.emit("Dataset not found")
+                    return
+                dset = h5file[self.dataset_path]
+                if not isinstance(dset, h5py.Dataset):
+                    self.failed.emit("Selected item is not a dataset")
+                    return
 
-                    # Efficient loading to avoid blocking on huge datasets
-                    if len(dset.shape) == 3:
-                        max_frames = min(self.max_frames, dset.shape[0])
-                        data = dset[:max_frames]
-                    else:
-                        # Guard against extremely large 2D datasets by center cropping
-                        try:
-                            estimated_size = dset.size * dset.dtype.itemsize
-                        except Exception:
-                            estimated_size = 0
-                        if len(dset.shape) == 2 and estimated_size > 512 * 1024 * 1024:  # >512MB
-                            h, w = dset.shape
-                            ch = min(h, 2048)
-                            cw = min(w, 2048)
-                            y0 = max(0, (h - ch) // 2)
-                            x0 = max(0, (w - cw) // 2)
-                            data = dset[y0:y0+ch, x0:x0+cw]
-                        else:
-                            data = dset[...]
+                # 3D stacks stay on disk: frames stream through the shared
+                # frame cache, which prefetches around the playhead.
+                if len(dset.shape) == 3:
+                    stack = H5FrameStack(get_frame_cache(), self.file_path, self.dataset_path)
+                    if stack.shape[0] > 0:
+                        stack[0]  # decode the first frame before handing over
+                    self.loaded.emit(stack)
+                    return
 
-                    data = np.asarray(data, dtype=np.float32)
-                    # Clean high values
-                    high_mask = data > 5e6
-                    if np.any(high_mask):
-                        data[high_mask] = 0
+                # Guard against extremely large 2D datasets by center cropping
+                try:
+                    estimated_size = dset.size * dset.dtype.itemsize
+                except Exception:
+                    estimated_size = 0
+                if len(dset.shape) == 2 and estimated_size > 512 * 1024 * 1024:  # >512MB
+                    h, w = dset.shape
+                    ch = min(h, 2048)
+                    cw = min(w, 2048)
+                    y0 = max(0, (h - ch) // 2)
+                    x0 = max(0, (w - cw) // 2)
+                    data = dset[y0:y0+ch, x0:x0+cw]
+                else:
+                    data = dset[...]
 
-                    # 1D handling: emit raw 1D data for dedicated 1D view
-                    if data.ndim == 1:
-                        # keep as 1D; no failure
-                        pass
+                data = np.asarray(data, dtype=np.float32)
+                # Clean high values
+                high_mask = data > 5e6
+                if np.any(high_mask):
+                    data[high_mask] = 0
+
+                # 1D handling: emit raw 1D data for dedicated 1D view
+                if data.ndim == 1:
+                    # keep as 1D; no failure
+                    pass
 
-                    self.loaded.emit(data)
+                self.loaded.emit(data)
             except Exception as e:
                 self.failed.emit(f"Error loading dataset: {e}")
 
@@ -1770,11 +1775,11 @@ class WorkbenchWindow(BaseWindow):
 
             # Load the data
             if len(dataset.shape) == 3:
-                # For 3D datasets, load a reasonable number of frames (limit to 100 for memory)
-                max_frames = min(100, dataset.shape[0])
-                if max_frames < dataset.shape[0]:
-                    self.update_status(f"Loading first {max_frames} frames of {dataset.shape[0]} total frames")
-                data = dataset[:max_frames]
+                # 3D datasets stream frames through the shared frame cache
+                # (cleaned of values > 5e6 per frame as they are decoded).
+                stack = H5FrameStack(get_frame_cache(), dataset.file.filename, dataset.name)
+                self.update_status(f"Streaming {stack.shape[0]} frames from {dataset.name}")
+                return stack
             else:
                 # For 2D datasets, load all data
                 data = dataset[...]
@@ -1844,8 +1849,16 @@ class WorkbenchWindow(BaseWindow):
                 if not valid:
                     self.update_status(f"HDF5 validation failed: {self.h5loader.get_last_error()}")
                     return
-                volume, vol_shape = self.h5loader.load_h5_volume_3d(self.current_file_path)
-                print(f"[DEBUG] HDF5Loader.load_h5_volume_3d shape={getattr(volume,'shape',None)}")
+                volume = None
+                try:
+                    if get_frame_cache().file(self.current_file_path)['/entry/data/data'].ndim == 3:
+                        # Stream frame stacks instead of reading the whole volume
+                        volume = H5FrameStack(get_frame_cache(), self.current_file_path, '/entry/data/data', clean=False)
+                except Exception:
+                    volume = None
+                if volume is None:
+                    volume, vol_shape = self.h5loader.load_h5_volume_3d(self.current_file_path)
+                print(f"[DEBUG] image volume shape={getattr(volume,'shape',None)}")
                 if volume is None or volume.size == 0:
                     self.update_status("No data in /entry/data/data")
                     return
@@ -1961,22 +1974,25 @@ class WorkbenchWindow(BaseWindow):
                 info_lines.append(f"Dataset: {self.selected_dataset_path}")
                 # Read original shape/dtype quickly
                 try:
-                    with h5py.File(self.current_file_path, 'r') as h5file:
-                        dset = h5file[self.selected_dataset_path]
-                        info_lines.append(f"Original Shape: {dset.shape}")
-                        info_lines.append(f"Original Type: {dset.dtype}")
+                    dset = get_frame_cache().file(self.current_file_path)[self.selected_dataset_path]
+                    info_lines.append(f"Original Shape: {dset.shape}")
+                    info_lines.append(f"Original Type: {dset.dtype}")
                 except Exception:
                     pass
                 info_lines.append(f"Loaded Shape: {data.shape}")
                 info_lines.append(f"Data Type: {data.dtype}")
                 info_lines.append(f"Size: {data.size:,} elements")
-                info_lines.append("\nData Statistics:")
-                info_lines.append(f"Min: {np.min(data):.6f}")
-                info_lines.append(f"Max: {np.max(data):.6f}")
-                info_lines.append(f"Mean: {np.mean(data):.6f}")
-                info_lines.append(f"Std: {np.std(data):.6f}")
-                # Memory usage
-                mem_size = data.size * data.dtype.itemsize
+                # Streamed stacks: statistics of the first frame only (reading
+                # every frame here would defeat lazy loading)
+                streamed = isinstance(data, FrameStack)
+                sample = data[0] if streamed else data
+                info_lines.append("\nData Statistics (frame 0):" if streamed else "\nData Statistics:")
+                info_lines.append(f"Min: {np.min(sample):.6f}")
+                info_lines.append(f"Max: {np.max(sample):.6f}")
+                info_lines.append(f"Mean: {np.mean(sample):.6f}")
+                info_lines.append(f"Std: {np.std(sample):.6f}")
+                # Memory usage (streamed stacks hold at most the cache budget)
+                mem_size = get_frame_cache().nbytes if streamed else data.size * data.dtype.itemsize
                 if mem_size < 1024:
                     mem_str = f"{mem_size} bytes"
                 elif mem_size < 1024 * 1024:
@@ -1985,7 +2001,7 @@ class WorkbenchWindow(BaseWindow):
                     mem_str = f"{mem_size / (1024 * 1024):.1f} MB"
                 else:
                     mem_str = f"{mem_size / (1024 * 1024 * 1024):.1f} GB"
-                info_lines.append(f"\nMemory Usage: {mem_str}")
+                info_lines.append(f"\nMemory Usage: {mem_str}" + (" (frame cache)" if streamed else ""))
                 info_text = "\n".join(info_lines)
                 if hasattr(self, 'dataset_info_text'):
                     self.dataset_info_text.setPlainText(info_text)
@@ -2180,10 +2196,9 @@ class WorkbenchWindow(BaseWindow):
                     fp = getattr(self, 'current_file_path', None)
                     if fp and os.path.exists(fp):
                         try:
-                            with h5py.File(fp, 'r') as h5f:
-                                arr = self._find_motor_positions(h5f, num_frames)
-                                if arr is not None and 0 <= idx < arr.size:
-                                    motor_val = float(arr[idx])
+                            arr = self._find_motor_positions(get_frame_cache().file(fp), num_frames)
+                            if arr is not None and 0 <= idx < arr.size:
+                                motor_val = float(arr[idx])
                         except Exception:
                             motor_val = None
                     if motor_val is not None:
@@ -3886,10 +3901,13 @@ class WorkbenchWindow(BaseWindow):
             menu.exec_(self.tree_data.mapToGlobal(position))
 
     def _play_folder_section_stack(self, item):
-        """Stack all supported images within the folder section and play them in the 2D viewer.
+        """Play all supported images within the folder section in the 2D viewer.
 
         Supported formats: .tif, .tiff, .png, .jpg, .jpeg, .bmp
         Search is non-recursive (immediate files only) for the first iteration.
+        Images are indexed, not loaded: frames are decoded on demand through the
+        shared frame cache (thread pool + read-ahead), so playback starts at once
+        and memory stays bounded by the cache budget.
         """
         try:
             # Resolve folder path and name
@@ -3901,7 +3919,10 @@ class WorkbenchWindow(BaseWindow):
 
             # Import on demand to avoid unnecessary startup overhead
             try:
-                from dashpva.viewer.tools.file_convert import list_images, stack_images
+                from dashpva.viewer.tools.file_convert import (
+                    ImageFolderStack,
+                    list_images,
+                )
             except Exception:
                 QMessageBox.critical(self, "Play Images", "Required image utilities are unavailable.")
                 return
@@ -3917,24 +3938,18 @@ class WorkbenchWindow(BaseWindow):
                     pass
                 return
 
-            # Stack images; skip size mismatches internally
-            vol, shape_hw, used = stack_images(files, log=lambda msg: self.update_status(str(msg)))
-            if vol.size == 0:
-                QMessageBox.information(self, "No Usable Images", "No images with a consistent shape could be loaded.")
+            # Index images; shapes are validated as frames are decoded
+            try:
+                vol = ImageFolderStack(get_frame_cache(), files)
+            except ValueError:
+                QMessageBox.information(self, "No Usable Images", "None of the images in the folder could be loaded.")
                 try:
-                    self.update_status("No usable images (size mismatches)", level='warning')
+                    self.update_status("No usable images in folder", level='warning')
                 except Exception:
                     pass
                 return
-
-            # Safety: warn if very large memory footprint (>1 GB); proceed (no cancel) for initial iteration
-            try:
-                if getattr(vol, 'nbytes', 0) > 1_000_000_000:
-                    sz_gb = vol.nbytes / (1024 * 1024 * 1024)
-                    QMessageBox.warning(self, "Large Stack", f"Stack size is large: {sz_gb:.2f} GB. Playback may impact performance.")
-                    self.update_status("Warning: Large stack loaded into memory")
-            except Exception:
-                pass
+            for p, reason in vol.bad_files.items():
+                self.update_status(f"Skip ({reason}): {p}")
 
             # Display data in 2D viewer; enables frame controls and shows "Frame 0 of N"
             self.display_2d_data(vol)
@@ -3952,13 +3967,14 @@ class WorkbenchWindow(BaseWindow):
                 pass
             try:
                 if hasattr(self, 'dataset_info_text') and self.dataset_info_text is not None:
-                    h, w = (int(shape_hw[0]), int(shape_hw[1])) if isinstance(shape_hw, tuple) and len(shape_hw) == 2 else (int(vol.shape[1]), int(vol.shape[2]))
+                    h, w = int(vol.shape[1]), int(vol.shape[2])
                     info_lines = [
                         f"Folder path: {folder_path}",
                         f"Frame count: {int(vol.shape[0])}",
                         f"Frame shape (H,W): ({h}, {w})",
                         f"Dtype: {vol.dtype}",
                         f"Total elements: {int(vol.size):,}",
+                        "Frames are decoded on demand (mismatched or unreadable images show as blank frames)",
                     ]
                     self.dataset_info_text.setPlainText("\n".join(info_lines))
             except Exception:
@@ -3990,7 +4006,7 @@ class WorkbenchWindow(BaseWindow):
         Args:
             item: QTreeWidgetItem representing the file root to remove
         """
-        item.data(0, Qt.UserRole + 1)
+        file_path = item.data(0, Qt.UserRole + 1)
         file_name = item.text(0)
 
         # Confirm removal
@@ -4006,6 +4022,9 @@ class WorkbenchWindow(BaseWindow):
             # Remove the item from the tree
             root = self.tree_data.invisibleRootItem()
             root.removeChild(item)
+            # Release the shared read handle and any cached frames
+            if file_path:
+                get_frame_cache().close_file(file_path)
 
             self.update_status(f"Removed file: {file_name}")
 
@@ -7,25 +7,34 @@ import subprocess
 import sys
 import threading
 from datetime import datetime
+from functools import partial
 
+import pyqtgraph as pg
 import toml
 from PyQt5 import QtGui, QtWidgets, uic
-from PyQt5.QtCore import QObject, Qt, pyqtSignal
+from PyQt5.QtCore import QObject, Qt, QTimer, pyqtSignal
 from PyQt5.QtWidgets import (
     QAbstractItemView,
     QButtonGroup,
+    QCheckBox,
     QDialog,
     QDialogButtonBox,
     QFileDialog,
     QFormLayout,
+    QHBoxLayout,
     QHeaderView,
     QInputDialog,
+    QLabel,
     QLineEdit,
     QMessageBox,
+    QPushButton,
+    QSpinBox,
     QTableWidget,
     QTableWidgetItem,
     QTextEdit,
     QTreeWidgetItem,
+    QVBoxLayout,
+    QWidget,
 )
 
 import dashpva.settings as app_settings
@@ -34,13 +43,28 @@ from dashpva.gui import configure_app
 from dashpva.gui.theme_colors import (
     ERROR,
     FONT_CAPTION,
+    ROI_COLORS,
     SUCCESS,
     TEXT_MUTED,
     TEXT_PRIMARY,
     WARNING,
     status_style,
 )
+from dashpva.utils.hpc_telemetry import (
+    JsonlRecorder,
+    StatsBlockParser,
+    TelemetryStore,
+    default_telemetry_dir,
+    sample_from_stats,
+)
 from dashpva.utils.log_manager import LogMixin
+from dashpva.utils.process_supervisor import (
+    RUNNING,
+    ProcessSpec,
+    ProcessSupervisor,
+    terminate_process,
+    unbuffered_env,
+)
 
 
 class Worker(QObject):
@@ -450,6 +474,22 @@ class Workflow(QDialog, LogMixin):
         self._load_collector_last()
         self._load_analysis_last()
 
+        # Consumer telemetry (parsed from the same stdout the output panes show)
+        self._telemetry = TelemetryStore()
+        self._telemetry_parsers = {}
+        self._telemetry_recorder = JsonlRecorder(
+            default_telemetry_dir() / f"workflow_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl")
+        self._telemetry_dirty = False
+        self._build_telemetry_tab()
+        self._supervisor = ProcessSupervisor(
+            launch=self._relaunch_supervised,
+            terminate=lambda entry: terminate_process(entry.process),
+            on_event=self._on_supervisor_event)
+        self._telemetry_timer = QTimer(self)
+        self._telemetry_timer.timeout.connect(self._refresh_telemetry)
+        self._telemetry_timer.timeout.connect(self._poll_supervisor)
+        self._telemetry_timer.start(1000)
+
     # ------------------------------------------------------------------ #
     # DB availability check
     # ------------------------------------------------------------------ #
@@ -2100,21 +2140,7 @@ class Workflow(QDialog, LogMixin):
             cmd.extend(['-mpv', metadata_output_pvs])
 
         try:
-            process = subprocess.Popen(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                preexec_fn=os.setsid,
-                universal_newlines=True
-            )
-            self.processes['sim_server'] = process
-            worker = Worker(process)
-            worker.output_signal.connect(self.textEditSimServerOutput.appendPlainText)
-            worker.output_signal.connect(self._on_sim_server_output)
-            thread = threading.Thread(target=worker.run)
-            thread.daemon = True
-            thread.start()
-            self.workers['sim_server'] = (worker, thread)
+            process = self._start_supervised('sim_server', cmd)
             self.buttonRunSimServer.setEnabled(False)
             self.buttonStopSimServer.setEnabled(True)
             self.labelStatusSimServer.setText(f'Process ID: {process.pid}')
@@ -2123,6 +2149,7 @@ class Workflow(QDialog, LogMixin):
 
     def stop_sim_server(self):
         if 'sim_server' in self.processes:
+            self._supervisor.remove('sim_server')
             self.workers['sim_server'][0].stop()
             self.processes['sim_server'].wait()
             del self.processes['sim_server']
@@ -2479,20 +2506,7 @@ class Workflow(QDialog, LogMixin):
         self._associator_metadata_channels = metadata_pvs
 
         try:
-            process = subprocess.Popen(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                preexec_fn=os.setsid,
-                universal_newlines=True
-            )
-            self.processes['associator_consumers'] = process
-            worker = Worker(process)
-            worker.output_signal.connect(self._format_associator_output)
-            thread = threading.Thread(target=worker.run)
-            thread.daemon = True
-            thread.start()
-            self.workers['associator_consumers'] = (worker, thread)
+            process = self._start_supervised('associator_consumers', cmd)
             self.buttonRunAssociatorConsumers.setEnabled(False)
             self.buttonStopAssociatorConsumers.setEnabled(True)
             self.labelStatusAssociatorConsumers.setText(f'Process ID: {process.pid}')
@@ -2503,6 +2517,7 @@ class Workflow(QDialog, LogMixin):
 
     def stop_associator_consumers(self):
         if 'associator_consumers' in self.processes:
+            self._supervisor.remove('associator_consumers')
             self.workers['associator_consumers'][0].stop()
             self.processes['associator_consumers'].wait()
             del self.processes['associator_consumers']
@@ -2642,20 +2657,7 @@ class Workflow(QDialog, LogMixin):
             cmd.extend(['--metadata-channels', roi_pvs])
 
         try:
-            process = subprocess.Popen(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                preexec_fn=os.setsid,
-                universal_newlines=True
-            )
-            self.processes['collector'] = process
-            worker = Worker(process)
-            worker.output_signal.connect(self.textEditCollectorOutput.appendPlainText)
-            thread = threading.Thread(target=worker.run)
-            thread.daemon = True
-            thread.start()
-            self.workers['collector'] = (worker, thread)
+            process = self._start_supervised('collector', cmd)
             self.buttonRunCollector.setEnabled(False)
             self.buttonStopCollector.setEnabled(True)
             self.labelStatusCollector.setText(f'Process ID: {process.pid}')
@@ -2664,6 +2666,7 @@ class Workflow(QDialog, LogMixin):
 
     def stop_collector(self):
         if 'collector' in self.processes:
+            self._supervisor.remove('collector')
             self.workers['collector'][0].stop()
             self.processes['collector'].wait()
             del self.processes['collector']
@@ -2703,20 +2706,7 @@ class Workflow(QDialog, LogMixin):
             cmd.extend(['--processor-args', '{"path": "%s"}' % config_path])
 
         try:
-            process = subprocess.Popen(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                preexec_fn=os.setsid,
-                universal_newlines=True
-            )
-            self.processes['analysis_consumer'] = process
-            worker = Worker(process)
-            worker.output_signal.connect(self.textEditAnalysisConsumerOutput.appendPlainText)
-            thread = threading.Thread(target=worker.run)
-            thread.daemon = True
-            thread.start()
-            self.workers['analysis_consumer'] = (worker, thread)
+            process = self._start_supervised('analysis_consumer', cmd)
             self.buttonRunAnalysisConsumer.setEnabled(False)
             self.buttonStopAnalysisConsumer.setEnabled(True)
             self.labelStatusAnalysisConsumer.setText(f'Process ID: {process.pid}')
@@ -2725,6 +2715,7 @@ class Workflow(QDialog, LogMixin):
 
     def stop_analysis_consumer(self):
         if 'analysis_consumer' in self.processes:
+            self._supervisor.remove('analysis_consumer')
             self.workers['analysis_consumer'][0].stop()
             self.processes['analysis_consumer'].wait()
             del self.processes['analysis_consumer']
@@ -2735,6 +2726,201 @@ class Workflow(QDialog, LogMixin):
             self.textEditAnalysisConsumerOutput.appendPlainText('Analysis Consumer stopped.')
             print(f"Analysis Stopped @ {datetime.now().strftime('%Y/%d/%m %H:%S:%f')[:-3]}")
 
+    # ------------------------------------------------------------------ #
+    # Process launch & supervision
+    # ------------------------------------------------------------------ #
+
+    # Chain order: upstream first. Also the restart order.
+    _CHAIN_KEYS = ['sim_server', 'associator_consumers', 'collector', 'analysis_consumer']
+    _TELEMETRY_SOURCES = {'associator_consumers': 'associator', 'collector': 'collector',
+                          'analysis_consumer': 'analysis'}
+    _STATUS_LABELS = {'sim_server': 'labelStatusSimServer',
+                      'associator_consumers': 'labelStatusAssociatorConsumers',
+                      'collector': 'labelStatusCollector',
+                      'analysis_consumer': 'labelStatusAnalysisConsumer'}
+    _OUTPUT_PANES = {'sim_server': 'textEditSimServerOutput',
+                     'associator_consumers': 'textEditAssociatorConsumersOutput',
+                     'collector': 'textEditCollectorOutput',
+                     'analysis_consumer': 'textEditAnalysisConsumerOutput'}
+
+    def _spawn(self, key: str, cmd: list) -> subprocess.Popen:
+        """Start ``cmd`` as workflow process ``key`` and route its output to the UI."""
+        process = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            preexec_fn=os.setsid,
+            universal_newlines=True,
+            env=unbuffered_env()
+        )
+        self.processes[key] = process
+        worker = Worker(process)
+        self._wire_output(key, worker)
+        thread = threading.Thread(target=worker.run)
+        thread.daemon = True
+        thread.start()
+        self.workers[key] = (worker, thread)
+        return process
+
+    def _wire_output(self, key: str, worker: Worker) -> None:
+        if key == 'sim_server':
+            worker.output_signal.connect(self.textEditSimServerOutput.appendPlainText)
+            worker.output_signal.connect(self._on_sim_server_output)
+        elif key == 'associator_consumers':
+            worker.output_signal.connect(self._format_associator_output)
+        else:
+            worker.output_signal.connect(getattr(self, self._OUTPUT_PANES[key]).appendPlainText)
+        if key in self._TELEMETRY_SOURCES:
+            self._connect_telemetry(worker, self._TELEMETRY_SOURCES[key])
+
+    def _start_supervised(self, key: str, cmd: list) -> subprocess.Popen:
+        """Launch ``key`` and register its exact command line with the supervisor."""
+        process = self._spawn(key, cmd)
+        stall = self.spinBoxStallTimeout.value() if key in self._TELEMETRY_SOURCES else 0
+        self._supervisor.add(ProcessSpec(
+            name=key, cmd=list(cmd), order=self._CHAIN_KEYS.index(key),
+            stall_timeout=float(stall) or None), process=process)
+        return process
+
+    def _relaunch_supervised(self, spec: ProcessSpec) -> subprocess.Popen:
+        old = self.workers.get(spec.name)
+        if old is not None:
+            old[0].stop()
+        return self._spawn(spec.name, spec.cmd)
+
+    def _poll_supervisor(self) -> None:
+        if self.checkBoxAutoRestart.isChecked():
+            self._supervisor.poll()
+
+    def _on_supervisor_event(self, key: str, message: str) -> None:
+        """Surface exits and restarts in the process's status label and output pane."""
+        entry = self._supervisor.get(key)
+        if entry is None:
+            return
+        self.logger.warning(f'{key}: {message}')
+        label = getattr(self, self._STATUS_LABELS[key])
+        if entry.state == RUNNING:
+            label.setText(f'Process ID: {entry.pid} (restarts: {entry.restarts})')
+        else:
+            label.setText(f'Supervisor: {message}')
+        self._format_and_append_output(f'[Supervisor] {message}', getattr(self, self._OUTPUT_PANES[key]))
+
+    # ------------------------------------------------------------------ #
+    # Telemetry
+    # ------------------------------------------------------------------ #
+
+    _TELEMETRY_COLUMNS = ['Consumer', 'Channel', 'Rate (Hz)', 'Backlog', 'Dropped', 'Errors', 'Latency (s)']
+
+    def _build_telemetry_tab(self) -> None:
+        """Add a tab with live per-consumer throughput and backlog charts."""
+        tab = QWidget()
+        layout = QVBoxLayout(tab)
+
+        header = QHBoxLayout()
+        self.labelTelemetryHint = QLabel(
+            'Live consumer statistics (requires a report period > 0). '
+            f'Samples are recorded to {self._telemetry_recorder.path.parent}')
+        self.labelTelemetryHint.setStyleSheet(f'color: {TEXT_MUTED}; font-size: {FONT_CAPTION};')
+        header.addWidget(self.labelTelemetryHint, 1)
+        self.checkBoxAutoRestart = QCheckBox('Restart crashed or stalled processes')
+        self.checkBoxAutoRestart.setChecked(True)
+        self.checkBoxAutoRestart.setToolTip(
+            'Relaunch a process with its original arguments when it exits with an error, or when '
+            'its frame counters stop while the process upstream of it is still delivering.')
+        header.addWidget(self.checkBoxAutoRestart)
+        header.addWidget(QLabel('Stall timeout:'))
+        self.spinBoxStallTimeout = QSpinBox()
+        self.spinBoxStallTimeout.setRange(0, 3600)
+        self.spinBoxStallTimeout.setValue(30)
+        self.spinBoxStallTimeout.setSuffix(' s')
+        self.spinBoxStallTimeout.setSpecialValueText('off')
+        self.spinBoxStallTimeout.setToolTip('Applies to processes started after the change; 0 checks liveness only.')
+        header.addWidget(self.spinBoxStallTimeout)
+        self.buttonClearTelemetry = QPushButton('Clear')
+        self.buttonClearTelemetry.clicked.connect(self._clear_telemetry)
+        header.addWidget(self.buttonClearTelemetry)
+        layout.addLayout(header)
+
+        self.plotTelemetryRate = pg.PlotWidget()
+        self.plotTelemetryRate.setLabel('left', 'Throughput', units='Hz')
+        self.plotTelemetryRate.showGrid(x=True, y=True, alpha=0.3)
+        self.plotTelemetryRate.addLegend(offset=(10, 10))
+        self.plotTelemetryBacklog = pg.PlotWidget()
+        self.plotTelemetryBacklog.setLabel('left', 'Backlog', units='frames')
+        self.plotTelemetryBacklog.setLabel('bottom', 'Time', units='s')
+        self.plotTelemetryBacklog.showGrid(x=True, y=True, alpha=0.3)
+        self.plotTelemetryBacklog.setXLink(self.plotTelemetryRate)
+        layout.addWidget(self.plotTelemetryRate, 3)
+        layout.addWidget(self.plotTelemetryBacklog, 2)
+
+        self.tableTelemetry = QTableWidget(0, len(self._TELEMETRY_COLUMNS))
+        self.tableTelemetry.setHorizontalHeaderLabels(self._TELEMETRY_COLUMNS)
+        self.tableTelemetry.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.tableTelemetry.verticalHeader().setVisible(False)
+        self.tableTelemetry.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.tableTelemetry.horizontalHeader().setStretchLastSection(True)
+        layout.addWidget(self.tableTelemetry, 1)
+
+        self._telemetry_curves = {}
+        self.tabWidget.addTab(tab, 'Telemetry')
+
+    def _connect_telemetry(self, worker: Worker, source: str) -> None:
+        """Feed ``worker``'s stdout lines for ``source`` into the telemetry store."""
+        self._telemetry_parsers[source] = StatsBlockParser()
+        worker.output_signal.connect(partial(self._on_telemetry_line, source))
+
+    def _on_telemetry_line(self, source: str, line: str) -> None:
+        parser = self._telemetry_parsers.get(source)
+        stats = parser.feed(line) if parser is not None else None
+        if stats is None:
+            return
+        sample = sample_from_stats(source, stats)
+        if sample is None:
+            return
+        self._telemetry.add(sample)
+        self._telemetry_recorder.write(sample)
+        self._telemetry_dirty = True
+        key = next((k for k, v in self._TELEMETRY_SOURCES.items() if v == source), None)
+        if key is not None:
+            self._supervisor.report_progress(key, sample.processed, sample.consumer_id)
+
+    def _clear_telemetry(self) -> None:
+        self._telemetry.clear()
+        for rate_curve, backlog_curve in self._telemetry_curves.values():
+            self.plotTelemetryRate.removeItem(rate_curve)
+            self.plotTelemetryBacklog.removeItem(backlog_curve)
+        self._telemetry_curves = {}
+        self.tableTelemetry.setRowCount(0)
+
+    def _refresh_telemetry(self) -> None:
+        """Redraw charts and the summary table when new samples arrived."""
+        if not self._telemetry_dirty:
+            return
+        self._telemetry_dirty = False
+        keys = self._telemetry.keys()
+        self.tableTelemetry.setRowCount(len(keys))
+        for row, key in enumerate(keys):
+            curves = self._telemetry_curves.get(key)
+            if curves is None:
+                pen = pg.mkPen(ROI_COLORS[len(self._telemetry_curves) % len(ROI_COLORS)], width=2)
+                label = f'{key[0]} {key[1]}'
+                curves = (self.plotTelemetryRate.plot(pen=pen, name=label),
+                          self.plotTelemetryBacklog.plot(pen=pen, name=label))
+                self._telemetry_curves[key] = curves
+            curves[0].setData(*self._telemetry.series(key, 'rate'))
+            curves[1].setData(*self._telemetry.series(key, 'queued'))
+
+            last = self._telemetry.latest(key)
+            values = [last.label, last.channel, f'{last.rate:.1f}', str(last.queued),
+                      str(last.dropped), str(last.errors), f'{last.latency:.2f}']
+            for col, text in enumerate(values):
+                item = QTableWidgetItem(text)
+                if col == 4 and last.dropped:
+                    item.setForeground(QtGui.QColor(WARNING))
+                elif col == 5 and last.errors:
+                    item.setForeground(QtGui.QColor(ERROR))
+                self.tableTelemetry.setItem(row, col, item)
+
     # ------------------------------------------------------------------ #
     # Close
     # ------------------------------------------------------------------ #
@@ -2754,10 +2940,13 @@ class Workflow(QDialog, LogMixin):
             if result == QMessageBox.Save:
                 self._on_apply_save()
         for key in list(self.processes.keys()):
+            self._supervisor.remove(key)
             self.workers[key][0].stop()
             self.processes[key].wait()
             del self.processes[key]
             del self.workers[key]
+        self._telemetry_timer.stop()
+        self._telemetry_recorder.close()
         event.accept()
 
 
@@ -0,0 +1,54 @@
+"""End-to-end runs of the optimizer throughput benchmark (dashpva.viewer.bayesian.benchmark).
+
+The campaigns need blop / bluesky / ophyd and are skipped without them; the PVA
+environment test only needs pvaccess::
+
+    pytest tests/integration/test_optimizer_benchmark.py -v
+"""
+
+import pytest
+
+from dashpva.viewer.bayesian.benchmark import (
+    BenchmarkCase,
+    pva_environment,
+    run_benchmark,
+    run_case,
+)
+
+
+def _needs_blop():
+    pytest.importorskip("blop.ax")
+    pytest.importorskip("ophyd")
+    pytest.importorskip("bluesky")
+
+
+def test_sim_campaign_reports_every_phase():
+    _needs_blop()
+    result = run_case(BenchmarkCase(2, iterations=6, n_points=2))
+    assert not result.error, result.error
+    assert result.evaluations == 12 and len(result.rounds) == 6
+    per = result.per_evaluation()
+    assert per["move"] > 0 and per["read"] > 0 and per["tell"] > 0
+    assert per["fit"] + per["acquisition"] > 0
+    assert result.evals_per_s > 0
+
+
+def test_multi_objective_pva_campaign():
+    _needs_blop()
+    pytest.importorskip("pvaccess")
+    results = run_benchmark([BenchmarkCase(2, 2, iterations=4, transport="pva")])
+    assert not results[0].error, results[0].error
+    assert results[0].evaluations == 4
+
+
+def test_pva_environment_serves_dofs_and_objectives():
+    pytest.importorskip("pvaccess")
+    from dashpva.viewer.bayesian.pva_signal import PvaSignal
+
+    cfg = BenchmarkCase(2, 2, transport="pva").config()
+    with pva_environment(2):
+        dof = PvaSignal(cfg.dofs[1].pv, name="x1")
+        dof.set(0.25)
+        assert dof.get() == pytest.approx(0.25)
+        value = PvaSignal(cfg.objectives[0].pv, name="obj0").read()["obj0"]["value"]
+        assert value > 0
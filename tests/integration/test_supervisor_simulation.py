@@ -0,0 +1,100 @@
+"""End-to-end supervisor tests against the local area detector simulator.
+
+The chain is the workflow's first two links, run as real processes:
+``ad_sim_server_modified`` publishing frames on a private PVA channel and a
+``pvapy.cli.hpcConsumer`` reading it with stats reporting on. The supervisor
+reads the consumer's stats from stdout and must
+
+- restart the consumer after it is killed, and
+- detect a frozen (SIGSTOPped) consumer from its stalled frame counters and
+  replace it, while the simulator keeps running untouched.
+
+Skipped when pvapy is not installed (``uv pip install -e '.[area-det]'``).
+Each test takes ~20-30 s.
+"""
+
+import os
+import pathlib
+import signal
+import sys
+import time
+
+import pytest
+
+pytest.importorskip("pvaccess")
+pytest.importorskip("pvapy")
+
+from dashpva.utils.process_supervisor import (  # noqa: E402
+    RUNNING,
+    ProcessSpec,
+    ProcessSupervisor,
+)
+
+SIM_SERVER = (pathlib.Path(__file__).resolve().parents[2]
+              / 'src' / 'dashpva' / 'consumers' / 'caIOC_servers' / 'ad_sim_server_modified.py')
+
+
+@pytest.fixture()
+def supervised_chain(tmp_path):
+    channel = f'dashpva:test:{os.getpid()}:image'
+    sim = ProcessSpec('sim_server', [
+        sys.executable, '-u', str(SIM_SERVER), '-cn', channel, '-nx', '32', '-ny', '32',
+        '-fps', '20', '-nf', '4', '-rt', '120', '-std', '1', '-shd', '0', '-dc',
+    ], order=0, cwd=str(tmp_path))   # the simulator writes its scan positions to cwd
+    consumer = ProcessSpec('analysis_consumer', [
+        sys.executable, '-m', 'pvapy.cli.hpcConsumer', '--input-channel', channel,
+        '--processor-class', 'pvapy.hpc.adImageProcessor.AdImageProcessor',
+        '--report-period', '1', '-dc',
+    ], order=1, stall_timeout=4.0, cwd=str(tmp_path))
+    sup = ProcessSupervisor(backoff_initial=0.5, backoff_max=2.0)
+    sup.add(sim)
+    sup.add(consumer)
+    sup.start_all()
+    yield sup
+    sup.stop_all()
+
+
+def _wait_for(sup, predicate, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        sup.poll()
+        if predicate():
+            return True
+        time.sleep(0.2)
+    return False
+
+
+def _progressing(entry, minimum=20):
+    return lambda: entry.state == RUNNING and sum(entry.counters.values()) >= minimum
+
+
+def test_killed_consumer_is_restarted(supervised_chain):
+    sup = supervised_chain
+    consumer = sup.get('analysis_consumer')
+    assert _wait_for(sup, _progressing(consumer), 30), 'consumer never received frames'
+    first_pid = consumer.pid
+    sim_pid = sup.get('sim_server').pid
+
+    os.kill(first_pid, signal.SIGKILL)
+    assert _wait_for(sup, lambda: consumer.restarts == 1 and consumer.pid != first_pid, 10)
+    assert consumer.last_exit == -signal.SIGKILL
+    assert _wait_for(sup, _progressing(consumer), 30), 'restarted consumer not progressing'
+    assert sup.get('sim_server').pid == sim_pid
+
+
+def test_frozen_consumer_is_replaced(supervised_chain):
+    sup = supervised_chain
+    consumer = sup.get('analysis_consumer')
+    assert _wait_for(sup, _progressing(consumer), 30), 'consumer never received frames'
+    frozen_pid = consumer.pid
+    os.kill(frozen_pid, signal.SIGSTOP)
+    try:
+        assert _wait_for(sup, lambda: consumer.restarts == 1, 20), 'stall not detected'
+        assert 'no progress' in consumer.reason
+        assert _wait_for(sup, _progressing(consumer), 30), 'replacement not progressing'
+        assert sup.get('sim_server').restarts == 0
+    finally:
+        try:
+            os.kill(frozen_pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
@@ -0,0 +1,145 @@
+"""Tests for the replay mode of the area detector simulator (ad_sim_server_modified)."""
+
+import h5py
+import numpy as np
+import pvaccess as pva
+import pytest
+from pvapy.utility.adImageUtility import AdImageUtility
+
+from dashpva.consumers.caIOC_servers.ad_sim_server_modified import (
+    AdSimServer,
+    FrameGenerator,
+    ReplayFramePool,
+    ReplayTiming,
+)
+
+FRAME = (12, 10)
+
+
+@pytest.fixture()
+def images():
+    return np.random.default_rng(1).integers(0, 3000, (7,) + FRAME, dtype=np.uint16)
+
+
+@pytest.fixture()
+def scan(tmp_path, images):
+    """A NeXus-layout DashPVA scan with one CA metadata series and one motor."""
+    path = tmp_path / 'scan.h5'
+    with h5py.File(path, 'w') as h5:
+        h5['/entry/data/data'] = images
+        ca = h5.create_group('/entry/data/metadata/ca')
+        ca['energy'] = np.linspace(8.0, 8.6, len(images))
+        ca['energy'].attrs['pv_name'] = '6idb:energy'
+        h5['/entry/data/metadata/motor_positions/eta'] = np.arange(len(images)) * 0.5
+        h5['/entry/data/metadata/motor_positions/ub'] = np.eye(3).ravel()  # not per frame
+        h5['/entry/analysis/intensity'] = np.ones(len(images))            # not metadata
+    return path
+
+
+def attributes(ntnda):
+    return {a['name']: a['value'][0]['value'] for a in ntnda['attribute']}
+
+
+def test_constant_and_burst_schedules():
+    np.testing.assert_allclose(ReplayTiming(100).offsets(5), [0, 0.01, 0.02, 0.03, 0.04])
+    burst = ReplayTiming(100, 'burst', burstSize=4).offsets(10)
+    np.testing.assert_allclose(burst, [0] * 4 + [0.04] * 4 + [0.08] * 2)
+    # Non-positive rates publish as fast as possible
+    assert not ReplayTiming(0).offsets(3).any()
+
+
+def test_jitter_schedule_is_seeded_and_bounded():
+    timing = ReplayTiming(50, 'jitter', jitter=0.4, seed=3)
+    offsets = timing.offsets(5000)
+    np.testing.assert_array_equal(offsets, timing.offsets(5000))
+    assert not np.array_equal(offsets, ReplayTiming(50, 'jitter', jitter=0.4, seed=4).offsets(5000))
+    nominal = np.arange(5000) * 0.02
+    assert np.abs(offsets - nominal).max() <= 0.4 * 0.02 + 1e-12
+    assert offsets.min() >= 0 and (np.diff(offsets) >= 0).all()
+    assert abs(np.mean(np.diff(offsets)) - 0.02) < 1e-5
+
+
+@pytest.mark.parametrize("kwargs", [
+    dict(profile='sawtooth'), dict(profile='jitter', jitter=0.6), dict(profile='burst', burstSize=0),
+])
+def test_timing_rejects_bad_settings(kwargs):
+    with pytest.raises(Exception, match="[Rr]eplay"):
+        ReplayTiming(10, **kwargs)
+
+
+@pytest.mark.parametrize("codec", ['lz4', 'bslz4'])
+def test_pool_from_scan_precompresses_frames(scan, images, codec):
+    pool = ReplayFramePool.fromHdfScan(str(scan), None, 5, codec)
+    assert len(pool) == 5 and (pool.rows, pool.cols, pool.dtype) == FRAME + (np.uint16,)
+    assert pool.getUncompressedFrameSize() == images[0].nbytes
+    decompress = AdImageUtility.getDecompressor(codec)
+    for frameId in range(5):
+        ntnda, values = pool[frameId]
+        assert ntnda['codec']['name'] == codec
+        data = np.asarray(ntnda['value'][0]['ubyteValue'])
+        frame = decompress(data, pva.USHORT, ntnda['uncompressedSize']).reshape(FRAME)
+        np.testing.assert_array_equal(frame, images[frameId])
+        # Attributes carry the same values the metadata PVs are set to
+        assert values == pytest.approx({'6idb:energy': 8.0 + 0.1 * frameId, 'eta': 0.5 * frameId})
+        assert attributes(ntnda) == pytest.approx({'ColorMode': 0, **values})
+
+
+def test_pool_from_generators(images):
+    fg = FrameGenerator()
+    fg.frames = images
+    pool = ReplayFramePool.fromGenerators([fg, fg], 10, metadataValues=lambda frameId: {'x': frameId})
+    assert len(pool) == 10 and pool.codec is None
+    ntnda, values = pool[8]
+    assert values == {'x': 8} and attributes(ntnda)['x'] == 8
+    np.testing.assert_array_equal(np.reshape(ntnda['value'][0]['ushortValue'], FRAME), images[1])
+
+    fg.compressorName = 'lz4'
+    with pytest.raises(Exception, match="uncompressed"):
+        ReplayFramePool.fromGenerators([fg], 10)
+
+
+def test_pool_rejects_bad_input(scan, tmp_path):
+    with pytest.raises(Exception, match="Invalid replay codec"):
+        ReplayFramePool('zstd')
+    with h5py.File(tmp_path / 'empty.h5', 'w') as h5:
+        h5['other'] = np.zeros(3)
+    with pytest.raises(Exception, match="No image dataset"):
+        ReplayFramePool.fromHdfScan(str(tmp_path / 'empty.h5'), None, 5)
+    pool = ReplayFramePool()
+    pool.addFrame(np.zeros(FRAME, dtype=np.uint16))
+    with pytest.raises(Exception, match="does not match"):
+        pool.addFrame(np.zeros((3, 3), dtype=np.uint16))
+
+
+class _Server:
+    """Records what the simulator publishes instead of serving it."""
+
+    def __init__(self):
+        self.updates = []
+
+    def updateUnchecked(self, name, pvObject):
+        if name == 'replay:image':
+            self.updates.append((name, pvObject['uniqueId'], attributes(pvObject)))
+        else:
+            self.updates.append((name, pvObject['value']))
+
+
+def test_replay_publisher_follows_schedule(scan):
+    server = AdSimServer(
+        inputDirectory=None, inputFile=None, mmapMode=False, hdfDataset=None, hdfCompressionMode=False,
+        cfgFile=None, frameRate=200, nFrames=0, cacheSize=4, nx=0, ny=0, colorMode=0, datatype='uint16',
+        minimum=None, maximum=None, runtime=0.1, channelName='replay:image', notifyPv=None,
+        notifyPvValue=None, metadataPv='pva://eta', startDelay=0, shutdownDelay=0, reportPeriod=0,
+        disableCurses=True, replayFile=str(scan), replayCodec='lz4')
+    assert server.replayMode and len(server.framePool) == 4 and server.nInputFrames == 4
+    server.pvaServer = _Server()
+    server.replayPublisher()
+    assert server.isDone and server.nPublishedFrames == 21   # offsets 0, 5, ..., 100 ms
+
+    frames = [u for u in server.pvaServer.updates if u[0] == 'replay:image']
+    eta = [u[1] for u in server.pvaServer.updates if u[0] == 'eta']
+    assert [f[1] for f in frames] == list(range(1, 22))
+    # The pool is replayed in order; each frame's metadata PV update matches its attributes
+    assert [f[2]['eta'] for f in frames] == [0.5 * (i % 4) for i in range(21)]
+    assert eta == [f[2]['eta'] for f in frames]
+    assert 0 <= server.replayLagMax < 0.05
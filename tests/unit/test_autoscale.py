@@ -0,0 +1,62 @@
+"""Tests for dashpva.utils.autoscale — histogram percentile levels."""
+
+import numpy as np
+import pytest
+
+from dashpva.utils.autoscale import HistogramAutoscale, autoscale_levels
+
+
+class TestHistogramAutoscale:
+
+    @pytest.mark.parametrize("make", [
+        lambda rng: rng.poisson(200, (512, 512)).astype(np.float32),
+        lambda rng: rng.exponential(1000.0, (300, 400)),
+        lambda rng: rng.random((256, 256)),
+        lambda rng: np.log10(rng.exponential(1000.0, (256, 256)) + 1),
+        lambda rng: rng.normal(0.0, 50.0, (256, 256)),
+    ], ids=["poisson", "exponential", "unit", "log-display", "signed"])
+    def test_matches_percentile_within_tolerance(self, make):
+        image = make(np.random.default_rng(11))
+        lo, hi = autoscale_levels(image)
+        ref_lo, ref_hi = np.percentile(image, [5, 95])
+        span = ref_hi - ref_lo
+        assert abs(lo - ref_lo) < 0.02 * span
+        assert abs(hi - ref_hi) < 0.02 * span
+
+    def test_subsamples_large_frames(self):
+        image = np.random.default_rng(3).poisson(100, (2048, 2048)).astype(np.uint32)
+        scaler = HistogramAutoscale(max_samples=4096)
+        assert scaler.histogram(image).sum() <= 4096
+        lo, hi = scaler.update(image)
+        assert 75 < lo < 90 and 110 < hi < 125
+
+    def test_ignores_non_finite_and_empty(self):
+        image = np.full((10, 10), np.nan)
+        assert autoscale_levels(image) is None
+        image[0, :5] = [1, 2, 3, 4, 5]
+        image[1, 0] = np.inf
+        lo, hi = autoscale_levels(image, 0, 100)
+        assert lo == pytest.approx(1.0, rel=0.02)
+        assert hi == pytest.approx(5.0, rel=0.02)
+
+    def test_smoothing_blends_frames(self):
+        dim = np.full((64, 64), 100.0)
+        bright = np.full((64, 64), 1000.0)
+        sharp = HistogramAutoscale(low=50, high=50)
+        smooth = HistogramAutoscale(low=50, high=50, smoothing=0.75)
+        for scaler in (sharp, smooth):
+            scaler.update(dim)
+            scaler.update(bright)
+        assert sharp.percentile(50) == pytest.approx(1000.0, rel=0.02)
+        # 75% of the weight is still on the dim frame
+        assert smooth.percentile(50) == pytest.approx(100.0, rel=0.02)
+        smooth.reset()
+        assert smooth.levels() is None
+
+    def test_flat_frame_gets_nonzero_span(self):
+        lo, hi = autoscale_levels(np.full((8, 8), 7.0))
+        assert hi > lo
+
+    def test_rejects_bad_smoothing(self):
+        with pytest.raises(ValueError):
+            HistogramAutoscale(smoothing=1.0)
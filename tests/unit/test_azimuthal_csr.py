@@ -0,0 +1,94 @@
+"""Tests for dashpva.utils.azimuthal_csr — batched CSR azimuthal integration."""
+
+import numpy as np
+import pytest
+
+pytest.importorskip("pyFAI")
+pytest.importorskip("scipy")
+
+from dashpva.utils.azimuthal_csr import CsrIntegrator, geometry_key  # noqa: E402
+
+SHAPE = (192, 160)
+NPT = 120
+
+
+@pytest.fixture()
+def ai():
+    from pyFAI.detectors import Detector
+    from pyFAI.integrator.azimuthal import AzimuthalIntegrator
+    return AzimuthalIntegrator(dist=0.05, poni1=0.004, poni2=0.006, rot1=0.02,
+                               detector=Detector(pixel1=1e-4, pixel2=1e-4),
+                               wavelength=1e-10)
+
+
+@pytest.fixture()
+def frames():
+    return np.random.default_rng(5).poisson(80, (5,) + SHAPE).astype(np.float32)
+
+
+def _reference(ai, frame, mask=None, radial_range=None):
+    return ai.integrate1d(frame, NPT, mask=mask, unit="q_A^-1", radial_range=radial_range,
+                          method=('bbox', 'csr', 'cython'), error_model='poisson')
+
+
+class TestCsrIntegrator:
+
+    @pytest.mark.parametrize("radial_range", [None, (1.0, 4.0)])
+    def test_stack_matches_integrate1d(self, ai, frames, radial_range):
+        mask = np.zeros(SHAPE, dtype=bool)
+        mask[:20, :] = True
+        engine = CsrIntegrator(ai, SHAPE, NPT, mask=mask, radial_range=radial_range)
+        q, intensity, sigma = engine.integrate_stack(frames, chunk=2)
+        assert intensity.shape == sigma.shape == (len(frames), NPT)
+        for k, frame in enumerate(frames):
+            ref = _reference(ai, frame, mask, radial_range)
+            np.testing.assert_allclose(q, ref.radial, rtol=1e-6)
+            np.testing.assert_allclose(intensity[k], ref.intensity, rtol=1e-4, atol=1e-3)
+            np.testing.assert_allclose(sigma[k], ref.sigma, rtol=1e-4, atol=1e-4)
+
+    def test_non_finite_pixels_dropped_per_frame(self, ai, frames):
+        frames = frames.copy()
+        frames[1, 50:60, 40:90] = np.nan
+        frames[3, 10, 10] = np.inf
+        engine = CsrIntegrator(ai, SHAPE, NPT)
+        _, intensity, sigma = engine.integrate_stack(frames)
+        for k in (0, 1, 3):
+            ref = _reference(ai, frames[k])
+            np.testing.assert_allclose(intensity[k], ref.intensity, rtol=1e-4, atol=1e-3)
+            np.testing.assert_allclose(sigma[k], ref.sigma, rtol=1e-4, atol=1e-4)
+
+    def test_single_frame_and_no_error_model(self, ai, frames):
+        engine = CsrIntegrator(ai, SHAPE, NPT)
+        q, intensity, sigma = engine.integrate(frames[0], error_model=None)
+        assert sigma is None
+        np.testing.assert_allclose(intensity, engine.integrate_stack(frames[:1])[1][0])
+        with pytest.raises(ValueError):
+            engine.integrate(frames[0], error_model='azimuthal')
+        with pytest.raises(ValueError):
+            engine.integrate(frames[0][:, :-1])
+
+    def test_disk_cache_round_trip(self, ai, frames, tmp_path):
+        mask = np.zeros(SHAPE, dtype=bool)
+        mask[5, 5] = True
+        built = CsrIntegrator(ai, SHAPE, NPT, mask=mask, cache_dir=tmp_path)
+        files = list(tmp_path.glob("csr_*.npz"))
+        assert len(files) == 1
+        loaded = CsrIntegrator(ai, SHAPE, NPT, mask=mask, cache_dir=tmp_path)
+        assert loaded.key == built.key
+        np.testing.assert_array_equal(loaded.integrate_stack(frames)[1],
+                                      built.integrate_stack(frames)[1])
+        # A different mask gets its own file
+        CsrIntegrator(ai, SHAPE, NPT, cache_dir=tmp_path)
+        assert len(list(tmp_path.glob("csr_*.npz"))) == 2
+
+    def test_key_tracks_geometry_mask_and_binning(self, ai):
+        mask = np.zeros(SHAPE, dtype=bool)
+        key = geometry_key(ai, SHAPE, NPT, mask)
+        assert geometry_key(ai, SHAPE, NPT, mask.copy()) == key
+        mask[0, 0] = True
+        assert geometry_key(ai, SHAPE, NPT, mask) != key
+        assert geometry_key(ai, SHAPE, NPT + 1) != geometry_key(ai, SHAPE, NPT)
+        engine = CsrIntegrator(ai, SHAPE, NPT)
+        assert engine.matches(ai, SHAPE, NPT)
+        ai.dist = 0.06
+        assert not engine.matches(ai, SHAPE, NPT)
@@ -6,16 +6,26 @@ RunEngine) is skipped when blop/bluesky/ophyd are not installed.
 """
 
 import math
+import threading
+import time
 
+import numpy as np
 import pytest
 
 from dashpva.viewer.bayesian.blop_adapter import (
     DOFSpec,
     ObjectiveSpec,
     OptimizerConfig,
+    SurfacePredictor,
     _make_objective_readables,
     _objective_reading_value,
     extract_scalar,
+    iter_refinement,
+    model_lock,
+    note_model_updated,
+    predict_slice_1d,
+    predict_surface,
+    predict_surface_multi,
 )
 from dashpva.viewer.bayesian.pva_signal import PvaSignal
 
@@ -125,6 +135,165 @@ class TestPvaSignalStruct:
         assert sig.read()["X:Total_RBV"]["value"] == 42.0
 
 
+class _FakeChannel:
+    """pvaccess.Channel stand-in: counts gets and delivers monitor updates on demand."""
+
+    def __init__(self, value):
+        self.value = value
+        self.gets = 0
+        self._on_update = None
+        self._connected = False
+
+    def get(self, request=""):
+        self.gets += 1
+        return _FakePv({"value": self.value})
+
+    def put(self, value):
+        self.value = value
+
+    def subscribe(self, name, cb):
+        self._on_update = cb
+
+    def startMonitor(self, request=""):
+        self.connected(True)
+        self.update(self.value)
+
+    def stopMonitor(self):
+        pass
+
+    def unsubscribe(self, name):
+        self._on_update = None
+
+    def update(self, value):
+        self.value = value
+        self._on_update(_FakePv({"value": value}))
+
+    def connected(self, flag):
+        self._connected = flag
+
+    def isConnected(self):
+        return self._connected
+
+
+@pytest.fixture()
+def fake_channels(monkeypatch):
+    """Route PvaSignal channels and shared monitors to in-memory fakes."""
+    from dashpva.viewer.bayesian import pva_signal
+
+    channels = {}
+
+    def channel(pv):
+        return channels.setdefault(pv, _FakeChannel(0.0))
+
+    monkeypatch.setattr(PvaSignal, "_ch", lambda self: channel(self.pv))
+    monkeypatch.setattr(pva_signal, "_shared_monitor",
+                        lambda pv, provider=None: pva_signal._ChannelMonitor(channel(pv)))
+    return channel
+
+
+class TestPvaSignalMonitor:
+
+    def test_reads_after_first_get_come_from_monitor(self, fake_channels):
+        ch = fake_channels("X:Total_RBV")
+        ch.value = 1.0
+        sig = PvaSignal("X:Total_RBV", name="total")
+        assert sig.get() == 1.0
+        assert ch.gets == 1
+        ch.update(2.0)
+        assert sig.get() == 2.0
+        assert sig.read()["total"]["value"] == 2.0
+        assert ch.gets == 1
+
+    def test_disconnect_and_max_age_fall_back_to_get(self, fake_channels):
+        ch = fake_channels("X:Total_RBV")
+        sig = PvaSignal("X:Total_RBV", name="total", max_age=60.0)
+        sig.get()
+        ch.connected(False)
+        sig.get()
+        assert ch.gets == 2
+        ch.connected(True)
+        sig.get()
+        assert ch.gets == 2
+        sig.max_age = 0.0
+        sig.get()
+        assert ch.gets == 3
+
+    def test_read_after_own_put_is_a_get(self, fake_channels):
+        ch = fake_channels("X:dof")
+        sig = PvaSignal("X:dof", name="dof")
+        sig.get()
+        sig.put(3.0)                     # the monitor has not seen it yet
+        assert sig.get() == 3.0
+        assert ch.gets == 2
+        ch.update(3.0)
+        assert sig.get() == 3.0
+        assert ch.gets == 2
+
+    def test_read_after_commit_waits_for_newer_update(self, fake_channels):
+        from dashpva.viewer.bayesian.pva_signal import note_commit
+        ch = fake_channels("X:phase")
+        ch.value = 1.0
+        sig = PvaSignal("X:phase", name="phase", fresh_timeout=5.0)
+        assert sig.get() == 1.0
+        note_commit()
+        # The monitor still holds the pre-commit value; the read waits for the next update
+        threading.Timer(0.05, ch.update, args=(2.0,)).start()
+        assert sig.get() == 2.0
+        assert sig.get() == 2.0
+        assert ch.gets == 1
+
+    def test_read_after_commit_gets_when_no_update_follows(self, fake_channels):
+        from dashpva.viewer.bayesian.pva_signal import note_commit
+        ch = fake_channels("X:phase")
+        sig = PvaSignal("X:phase", name="phase", fresh_timeout=0.05)
+        sig.get()
+        note_commit()
+        ch.value = 3.0                   # changed on the server, no monitor event
+        assert sig.get() == 3.0
+        assert ch.gets == 2
+        sig.get()                        # that commit is honoured: back to the monitor
+        assert ch.gets == 2
+
+    def test_done_counter_marks_commit(self, fake_channels, monkeypatch):
+        from dashpva.viewer.bayesian import pva_signal
+        done = fake_channels("X:done")
+        done.value = 4
+        sig = PvaSignal("X:fire", name="fire", done_channel="X:done", done_timeout=5.0)
+        sig._done_ch = done
+        monkeypatch.setattr(sig, "put", lambda value: threading.Timer(
+            0.05, done.update, args=(5,)).start())
+        before = time.monotonic()
+        sig.set(1).wait()
+        sig._done_mon.close()
+        assert before < pva_signal.last_commit() <= time.monotonic()
+
+    def test_monitor_false_always_gets(self, fake_channels):
+        ch = fake_channels("X:Total_RBV")
+        sig = PvaSignal("X:Total_RBV", name="total", monitor=False)
+        sig.get()
+        sig.get()
+        assert ch.gets == 2
+
+    def test_set_waits_for_done_counter_event(self, fake_channels, monkeypatch):
+        done = fake_channels("X:done")
+        done.value = 4
+        sig = PvaSignal("X:fire", name="fire", done_channel="X:done", done_timeout=5.0)
+        sig._done_ch = done
+        monkeypatch.setattr(sig, "put", lambda value: threading.Timer(
+            0.05, done.update, args=(5,)).start())
+        sig.set(1).wait()
+        sig._done_mon.close()
+        assert done.gets == 1            # only the "before" snapshot; no polling
+
+    def test_done_wait_times_out_when_counter_stalls(self, fake_channels):
+        done = fake_channels("X:done")
+        sig = PvaSignal("X:fire", name="fire", done_channel="X:done", done_timeout=0.1)
+        sig._done_ch = done
+        assert sig._read_done_counter() == 0
+        done.update(0)
+        assert not sig._wait_done(0)
+
+
 # ---------------------------------------------------------------------------
 # _objective_reading_value + _make_objective_readables
 # ---------------------------------------------------------------------------
@@ -176,6 +345,8 @@ class TestMakeObjectiveReadables:
         assert reads["a"] is reads["b"]
         assert reads["a"].field is None
         assert reads["a"].name == "X:Stats"
+        # Monitored, but only served from an update newer than the last commit.
+        assert reads["a"].monitor and reads["a"].fresh_timeout is not None
 
 
 class TestMoveToPoint:
@@ -404,6 +575,107 @@ class TestObjectiveTable:
         assert len(names) == len(set(names)), f"duplicate objective names: {names}"
 
 
+# ---------------------------------------------------------------------------
+# Cached / progressive model-surface prediction (fake Ax client, no blop needed)
+# ---------------------------------------------------------------------------
+
+class _FakeAxClient:
+    """``predict`` -> {metric: (mean, sem)} with mean = a + b, sem = 0.1."""
+
+    def __init__(self):
+        self.calls = []
+
+    def predict(self, points):
+        self.calls.append(len(points))
+        return [{"ortho": (p["a"] + p["b"], 0.1), "mono": (p["a"] - p["b"], 0.2)}
+                for p in points]
+
+    def get_best_parameterization(self):
+        return ({"a": 0.0, "b": 0.0, "c": 0.25},)
+
+
+class _FakeAgent:
+    def __init__(self):
+        self.ax_client = _FakeAxClient()
+
+
+def _surface_config():
+    return OptimizerConfig(
+        dofs=[DOFSpec("a", "m:a", 0.0, 1.0), DOFSpec("b", "m:b", -1.0, 1.0),
+              DOFSpec("c", "m:c", 0.0, 1.0)],
+        objectives=[ObjectiveSpec("ortho", "det:o"),
+                    ObjectiveSpec("mono", "det:m", role="minimize")],
+    )
+
+
+class TestSurfacePredictor:
+
+    def test_surface_layout_and_acquisition(self):
+        agent, cfg = _FakeAgent(), _surface_config()
+        s = predict_surface(agent, cfg, "a", "b", grid_n=5, kappa=2.0)
+        assert s["mean"].shape == (5, 5) and s["fixed"] == {"c": 0.25}
+        # row-major (ny, nx): rows follow b, columns follow a
+        assert s["mean"][0, 4] == pytest.approx(1.0 + -1.0)
+        assert s["mean"][4, 0] == pytest.approx(0.0 + 1.0)
+        assert np.allclose(s["acq"], s["mean"] + 0.2)
+        m = predict_surface(agent, cfg, "a", "b", grid_n=5, objective="mono")
+        assert m["minimize"] and np.allclose(m["acq"], m["mean"] - 0.4)
+
+    def test_views_share_one_batched_prediction(self):
+        agent, cfg = _FakeAgent(), _surface_config()
+        predictor = SurfacePredictor()
+        predict_surface(agent, cfg, "a", "b", grid_n=8, predictor=predictor)
+        predict_surface(agent, cfg, "a", "b", grid_n=8, objective="mono", predictor=predictor)
+        multi = predict_surface_multi(agent, cfg, "a", "b", grid_n=8, predictor=predictor)
+        assert agent.ax_client.calls == [64]
+        assert set(multi["objectives"]) == {"ortho", "mono"}
+
+        # different fixed DOF value -> a different slice
+        predict_surface(agent, cfg, "a", "b", grid_n=8, predictor=predictor,
+                        fixed_overrides={"c": 0.75})
+        assert agent.ax_client.calls == [64, 64]
+        # new data ingested -> recompute
+        note_model_updated(agent)
+        predict_surface(agent, cfg, "a", "b", grid_n=8, predictor=predictor)
+        assert agent.ax_client.calls == [64, 64, 64]
+        assert predictor.hits == 2
+
+    def test_refinement_is_coarse_to_fine_until_cached(self):
+        agent, cfg = _FakeAgent(), _surface_config()
+        predictor = SurfacePredictor()
+        sizes = [p["grid_n"] for p in iter_refinement(
+            predict_surface, agent, cfg, "a", "b", grid_n=40, predictor=predictor)]
+        assert sizes == [10, 40]
+        assert agent.ax_client.calls == [100, 1600]
+        sizes = [p["mean"].shape for p in iter_refinement(
+            predict_surface, agent, cfg, "a", "b", grid_n=40, predictor=predictor)]
+        assert sizes == [(40, 40)] and len(agent.ax_client.calls) == 2
+
+    def test_slice_and_cache_bound(self):
+        agent, cfg = _FakeAgent(), _surface_config()
+        predictor = SurfacePredictor(max_entries=1)
+        sl = predict_slice_1d(agent, cfg, "b", grid_n=11, predictor=predictor)
+        assert sl["xi"][0] == -1.0 and sl["fixed"] == {"a": 0.0, "c": 0.25}
+        assert np.allclose(sl["objectives"]["mono"]["mean"], -sl["xi"])
+        predict_surface(agent, cfg, "a", "b", grid_n=4, predictor=predictor)
+        predict_slice_1d(agent, cfg, "b", grid_n=11, predictor=predictor)
+        assert agent.ax_client.calls == [11, 16, 11]
+
+    def test_predictions_wait_for_model_updates(self):
+        agent, cfg = _FakeAgent(), _surface_config()
+        lock = model_lock(agent)
+        assert model_lock(agent) is lock
+        result = []
+        with lock:      # the scan thread is in suggest/ingest
+            t = threading.Thread(target=lambda: result.append(
+                predict_surface(agent, cfg, "a", "b", grid_n=3)))
+            t.start()
+            t.join(0.2)
+            assert t.is_alive() and agent.ax_client.calls == []
+        t.join(5)
+        assert len(result) == 1
+
+
 # ---------------------------------------------------------------------------
 # blop integration (skipped if blop/bluesky/ophyd not available)
 # ---------------------------------------------------------------------------
@@ -0,0 +1,129 @@
+"""Tests for dashpva.hdf_viewer.chunk_loader — chunk-aligned background frame loading."""
+
+import threading
+
+import h5py
+import numpy as np
+import pytest
+
+from dashpva.hdf_viewer.chunk_loader import (
+    ChunkCache,
+    FrameRangeLoader,
+    FrameRangeReader,
+    block_shape,
+)
+
+SHAPE = (23, 40, 36)
+
+
+@pytest.fixture()
+def data():
+    return np.random.default_rng(2).integers(0, 5000, SHAPE, dtype=np.uint16)
+
+
+@pytest.fixture()
+def h5(tmp_path, data):
+    with h5py.File(tmp_path / 'scan.h5', 'w') as f:
+        f.create_dataset('chunked', data=data, chunks=(2, 16, 16), compression='gzip')
+        f.create_dataset('contiguous', data=data)
+        f.create_dataset('image', data=data[0], chunks=(16, 8))
+    with h5py.File(tmp_path / 'scan.h5', 'r') as f:
+        yield f
+
+
+def test_block_shape():
+    # Chunks grow across the frame before along frames
+    assert block_shape((100, 512, 512), (1, 64, 64), 2, block_bytes=64 * 1024) == (1, 256, 128)
+    assert block_shape((100, 512, 512), (1, 64, 64), 2, block_bytes=2 * 1024 * 1024) == (4, 512, 512)
+    # Contiguous data reads whole frames; never larger than the dataset
+    assert block_shape((10, 64, 64), None, 4, block_bytes=1 << 30) == (10, 64, 64)
+    assert block_shape((3, 8, 8), (4, 16, 16), 1, block_bytes=1) == (3, 8, 8)
+
+
+@pytest.mark.parametrize("name", ['chunked', 'contiguous'])
+@pytest.mark.parametrize("frames, rows, cols", [
+    ((0, None), None, None),
+    ((3, 18), slice(5, 37), slice(9, 30)),
+    ((21, 22), slice(15, 17), slice(0, 36)),
+])
+def test_reader_matches_slicing(h5, data, name, frames, rows, cols):
+    reader = FrameRangeReader(h5[name], *frames, rows=rows, cols=cols,
+                              cache=ChunkCache(), block_bytes=3000)
+    loaded = list(reader.bands())
+    expected = data[slice(*frames), rows or slice(None), cols or slice(None)]
+    np.testing.assert_array_equal(reader.out, expected)
+    assert loaded == sorted(loaded) and loaded[-1] == len(expected) == reader.loaded
+
+
+def test_two_dimensional_dataset(h5, data):
+    out = FrameRangeReader(h5['image'], rows=slice(3, 30), cols=slice(5, 20)).read()
+    np.testing.assert_array_equal(out, data[0, 3:30, 5:20][np.newaxis])
+
+
+def test_cache_is_shared_between_loads(h5, data):
+    cache = ChunkCache()
+    FrameRangeReader(h5['chunked'], 0, 10, cache=cache, block_bytes=3000).read()
+    misses = cache.misses
+    # An overlapping, cropped range decodes only the frames not seen yet
+    reader = FrameRangeReader(h5['chunked'], 5, 14, rows=slice(20, 40), cache=cache, block_bytes=3000)
+    np.testing.assert_array_equal(reader.read(), data[5:14, 20:40])
+    # Blocks are (2, 32, 32): only frame bands 10-11 and 12-13 (4 tiles each) are new
+    assert reader.block == (2, 32, 32)
+    assert cache.hits == 12 and cache.misses - misses == 8
+
+    cache.drop_file(h5.filename)
+    assert len(cache) == 0 and cache.nbytes == 0
+    # Contiguous data is read straight from the selection
+    FrameRangeReader(h5['contiguous'], cache=cache).read()
+    assert len(cache) == 0
+
+
+def test_cache_evicts_oldest_blocks():
+    cache = ChunkCache(max_bytes=250)
+    blocks = [np.zeros(100, dtype=np.uint8) for _ in range(3)]
+    for i, block in enumerate(blocks):
+        cache.put(i, block)
+    assert cache.get(0) is None and cache.get(2) is blocks[2]
+    assert cache.nbytes == 200 and not blocks[1].flags.writeable
+    cache.put('huge', np.zeros(1000, dtype=np.uint8))
+    assert cache.get('huge') is None and len(cache) == 2
+
+
+def test_cancel_stops_between_blocks(h5):
+    reader = FrameRangeReader(h5['chunked'], block_bytes=3000)
+    cancel = threading.Event()
+    for loaded in reader.bands(cancel):
+        cancel.set()
+    assert reader.cancelled and loaded == reader.loaded < len(reader)
+
+
+class TestFrameRangeLoader:
+
+    def _run(self, reader, cancel_after=None):
+        loader = FrameRangeLoader(7, reader)
+        events = []
+        loader.progress.connect(lambda job, n: events.append(('progress', job, n)))
+        loader.finished.connect(lambda job, out: events.append(('finished', job, out)))
+        loader.failed.connect(lambda job, msg: events.append(('failed', job, msg)))
+        if cancel_after is not None:
+            loader.progress.connect(lambda job, n: n >= cancel_after and loader.cancel())
+        loader.run()
+        return events
+
+    def test_reports_progress_then_array(self, h5, data):
+        events = self._run(FrameRangeReader(h5['chunked'], 4, 20, block_bytes=3000))
+        assert [e[0] for e in events[:-1]] == ['progress'] * (len(events) - 1)
+        assert events[-2][2] == 16
+        kind, job, out = events[-1]
+        assert (kind, job) == ('finished', 7)
+        np.testing.assert_array_equal(out, data[4:20])
+
+    def test_cancelled_load_finishes_without_data(self, h5):
+        events = self._run(FrameRangeReader(h5['chunked'], block_bytes=3000), cancel_after=1)
+        assert events[-1] == ('finished', 7, None)
+
+    def test_read_error_is_reported(self, h5):
+        reader = FrameRangeReader(h5['chunked'])
+        h5.close()
+        events = self._run(reader)
+        assert len(events) == 1 and events[0][:2] == ('failed', 7)
@@ -62,6 +62,58 @@ class TestCLI:
             assert result.exit_code == 0
             mock_run.assert_called_once()
 
+    def test_sim_replay_builds_replay_command(self, runner, tmp_path):
+        scan = tmp_path / "scan.h5"
+        scan.touch()
+        with patch("dashpva.cli.subprocess.run") as mock_run:
+            mock_run.return_value.returncode = 0
+            result = runner.invoke(cli, ["sim", "replay", "--scan", str(scan), "--profile", "burst",
+                                         "--fps", "2000"])
+        assert result.exit_code == 0, result.output
+        cmd = mock_run.call_args[0][0]
+        assert "dashpva.consumers.caIOC_servers.ad_sim_server_modified" in cmd
+        assert cmd[cmd.index("-rf") + 1] == str(scan)
+        assert cmd[cmd.index("-rpf") + 1] == "burst" and cmd[cmd.index("-rc") + 1] == "lz4"
+        assert cmd[cmd.index("-fps") + 1] == "2000.0" and cmd[cmd.index("-nf") + 1] == "0"
+
+    def test_vit_stitch_writes_panels(self, runner, tmp_path):
+        import h5py
+        import numpy as np
+
+        positions = tmp_path / "positions.csv"
+        np.savetxt(positions, np.column_stack([np.arange(8) * 1e-7, np.zeros(8)]), delimiter=",")
+        scan = tmp_path / "scan.h5"
+        with h5py.File(scan, "w") as h5:
+            h5["/entry/data/data"] = np.random.default_rng(0).random((6, 512, 256), dtype=np.float32)
+        result = runner.invoke(cli, ["vit-stitch", str(scan), "--first-id", "0", "--positions", str(positions),
+                                     "--workers", "1", "--chunk", "4"])
+        assert result.exit_code == 0, result.output
+        assert "6 frames" in result.output
+        with h5py.File(tmp_path / "scan_stitched.h5", "r") as h5:
+            grp = h5["/entry/stitch"]
+            assert grp.attrs["frames"] == 6
+            assert grp["diffraction"].shape == (256, 256)
+
+        result = runner.invoke(cli, ["vit-stitch", str(scan), "--dataset", "/missing", "--positions", str(positions)])
+        assert result.exit_code != 0 and "not found" in result.output
+
     def test_monitor_invalid_name(self, runner):
         result = runner.invoke(cli, ["monitor", "invalid_view"])
         assert result.exit_code != 0
+
+    def test_startup_rejects_unknown_entry(self, runner):
+        result = runner.invoke(cli, ["startup", "nonexistent"])
+        assert result.exit_code != 0
+        assert "nonexistent" in result.output
+
+    def test_startup_profiles_selected_entries(self, runner, tmp_path):
+        from dashpva.utils.startup import ImportReport
+
+        out = tmp_path / "startup.json"
+        with patch("dashpva.utils.startup.profile_imports",
+                   side_effect=lambda module: ImportReport(module)) as mock_profile:
+            result = runner.invoke(cli, ["startup", "h5viewer", "--json", str(out)])
+        assert result.exit_code == 0, result.output
+        assert [c.args[0] for c in mock_profile.call_args_list] == [
+            "dashpva.cli", "dashpva.hdf_viewer.interactive"]
+        assert out.exists()
@@ -0,0 +1,98 @@
+"""Tests for dashpva.database.cache — shared read cache, invalidation and subscriptions."""
+
+import gc
+import sqlite3
+
+from dashpva.database import DatabaseInterface
+from dashpva.database.cache import EXTERNAL, PROFILES, SETTINGS
+
+
+def _hits(db):
+    return db.cache_info()['hits']
+
+
+class _Window:
+    def __init__(self):
+        self.events = []
+
+    def on_change(self, topic, detail):
+        self.events.append((topic, detail))
+
+
+class TestReadCache:
+
+    def test_repeated_reads_are_served_from_cache(self, tmp_db):
+        setting = tmp_db.create_setting('detector', 'hardware')
+        tmp_db.add_setting_value(setting.id, 'prefix', '13SIM1:')
+        assert tmp_db.get_all_setting_values(setting.id) == {'prefix': '13SIM1:'}
+        hits = _hits(tmp_db)
+        for _ in range(3):
+            assert tmp_db.get_all_setting_values(setting.id) == {'prefix': '13SIM1:'}
+        assert _hits(tmp_db) == hits + 3
+
+    def test_returned_containers_are_copies(self, tmp_db):
+        setting = tmp_db.create_setting('roi', 'analysis')
+        tmp_db.add_setting_value(setting.id, 'x', 1)
+        tmp_db.get_all_setting_values(setting.id)['x'] = 99
+        tmp_db.get_all_settings().clear()
+        assert tmp_db.get_all_setting_values(setting.id) == {'x': 1}
+        assert len(tmp_db.get_all_settings()) == 1
+
+    def test_writes_invalidate_for_every_interface(self, tmp_db):
+        other = DatabaseInterface()
+        prof = tmp_db.create_profile('beamline_a')
+        assert other.get_profile_by_name('beamline_a').id == prof.id
+        assert other.get_selected_profile() is None
+        tmp_db.set_selected_profile(prof.id)
+        assert other.get_selected_profile().id == prof.id
+        tmp_db.update_profile_name(prof.id, 'beamline_b')
+        assert other.get_profile_by_name('beamline_a') is None
+        assert other.get_profile_by_id(prof.id).name == 'beamline_b'
+
+    def test_uncached_interface_always_reads(self, tmp_db):
+        raw = DatabaseInterface(use_cache=False)
+        tmp_db.create_profile('p')
+        misses = tmp_db.cache_info()['misses']
+        raw.get_all_profiles()
+        raw.get_all_profiles()
+        assert tmp_db.cache_info()['misses'] == misses
+
+
+class TestSubscriptions:
+
+    def test_topic_filter_and_unsubscribe(self, tmp_db):
+        seen = []
+        unsubscribe = tmp_db.subscribe(lambda topic, detail: seen.append((topic, detail)),
+                                       topics=[SETTINGS])
+        tmp_db.create_profile('ignored')
+        tmp_db.create_setting('s', 't')
+        assert seen == [(SETTINGS, 'create_setting')]
+        unsubscribe()
+        tmp_db.create_setting('s2', 't')
+        assert len(seen) == 1
+
+    def test_bound_method_subscribers_are_weak(self, tmp_db):
+        window = _Window()
+        tmp_db.subscribe(window.on_change)
+        tmp_db.create_profile('p')
+        assert window.events == [(PROFILES, 'create_profile')]
+        del window
+        gc.collect()
+        tmp_db.create_profile('q')   # must not raise on the dead subscriber
+
+    def test_external_commit_detected(self, tmp_db, tmp_path):
+        prof = tmp_db.create_profile('shared')
+        assert tmp_db.get_profile_by_id(prof.id).name == 'shared'
+        seen = []
+        tmp_db.subscribe(lambda topic, detail: seen.append(topic))
+        assert tmp_db.poll_external_changes() is False
+
+        # Another process renaming the profile
+        conn = sqlite3.connect(tmp_path / 'test.db')
+        conn.execute('UPDATE profiles SET name = ? WHERE id = ?', ('renamed', prof.id))
+        conn.commit()
+        conn.close()
+
+        assert tmp_db.poll_external_changes() is True
+        assert seen == [EXTERNAL]
+        assert tmp_db.get_profile_by_id(prof.id).name == 'renamed'
@@ -0,0 +1,180 @@
+"""Tests for dashpva.viewer.tools.file_convert image helpers.
+
+Skipped when the GUI stack is unavailable (the module imports PyQt5).
+"""
+
+import time
+
+import h5py
+import numpy as np
+import pytest
+
+pytest.importorskip("PyQt5")
+Image = pytest.importorskip("PIL.Image")
+
+from PyQt5.QtCore import QThread  # noqa: E402
+
+from dashpva.utils.frame_cache import FrameCache  # noqa: E402
+from dashpva.viewer.tools.file_convert import (  # noqa: E402
+    ConvertJob,
+    ConvertWorker,
+    FileConvertDialog,
+    ImageFolderStack,
+    convert_images_to_h5,
+    natural_key,
+)
+
+
+def _write_tiffs(folder, count, shape=(12, 10), odd=None):
+    folder.mkdir(parents=True, exist_ok=True)
+    frames = []
+    for i in range(count):
+        hw = odd if (odd is not None and i == count // 2) else shape
+        arr = np.full(hw, float(i), dtype=np.float32)
+        Image.fromarray(arr, mode="F").save(str(folder / f"img_{i}.tif"))
+        frames.append(arr)
+    return frames
+
+
+@pytest.fixture()
+def cache():
+    c = FrameCache(ahead=6, behind=2, workers=4)
+    yield c
+    c.close()
+
+
+class TestImageFolderStack:
+
+    def test_natural_order_and_shape(self, cache, tmp_path):
+        _write_tiffs(tmp_path / "imgs", 12)
+        stack = ImageFolderStack.from_folder(cache, tmp_path / "imgs", ["*.tif"])
+        assert stack.shape == (12, 12, 10)
+        # img_10 sorts after img_9 (natural order), so frame 10 holds value 10
+        assert stack[10][0, 0] == 10.0
+        assert stack[2][0, 0] == 2.0
+
+    def test_mismatched_image_is_blank_and_recorded(self, cache, tmp_path):
+        _write_tiffs(tmp_path / "imgs", 6, odd=(5, 5))
+        stack = ImageFolderStack.from_folder(cache, tmp_path / "imgs", ["*.tif"])
+        frame = stack[3]
+        assert frame.shape == (12, 10)
+        assert not frame.any()
+        assert any("size mismatch" in reason for reason in stack.bad_files.values())
+
+    def test_prefetch_decodes_ahead_in_parallel(self, cache, tmp_path):
+        _write_tiffs(tmp_path / "imgs", 20)
+        stack = ImageFolderStack.from_folder(cache, tmp_path / "imgs", ["*.tif"])
+        assert stack.read_workers == 4
+        stack[0]
+        deadline = time.monotonic() + 2.0
+        while time.monotonic() < deadline and not all(cache.contains(stack, i) for i in range(1, 7)):
+            time.sleep(0.01)
+        assert all(cache.contains(stack, i) for i in range(1, 7))
+
+    def test_no_readable_images_raises(self, cache, tmp_path):
+        bad = tmp_path / "bad.tif"
+        bad.write_bytes(b"not an image")
+        with pytest.raises(ValueError):
+            ImageFolderStack(cache, [bad])
+
+
+class TestConvertImagesToH5:
+
+    def test_streams_in_order_and_skips_mismatch(self, tmp_path):
+        frames = _write_tiffs(tmp_path / "imgs", 9, odd=(5, 5))
+        paths = sorted((tmp_path / "imgs").glob("*.tif"), key=lambda p: natural_key(p.name))
+        out = tmp_path / "out.h5"
+        result = convert_images_to_h5(paths, out, metadata={"source_folder": "imgs"},
+                                      log=lambda m: None, workers=3, window=4)
+        assert result.complete
+        assert result.frames_written == 8
+        assert result.skipped == ["img_4.tif"]
+        with h5py.File(out, "r") as f:
+            data = f["entry/data/data"]
+            assert data.shape == (8, 12, 10)
+            assert data.chunks == (1, 12, 10)
+            assert data.compression is not None
+            expected = [i for i in range(9) if i != 4]
+            assert [float(data[k][0, 0]) for k in range(8)] == [float(frames[i][0, 0]) for i in expected]
+            assert "entry/data/conversion" not in f
+            assert int(f["entry/data/metadata/num_images"][()]) == 8
+            assert f["entry/data/metadata/source_folder"].asstr()[()] == "imgs"
+
+    def test_interrupt_then_resume(self, tmp_path):
+        _write_tiffs(tmp_path / "imgs", 10)
+        paths = sorted((tmp_path / "imgs").glob("*.tif"), key=lambda p: natural_key(p.name))
+        out = tmp_path / "out.h5"
+        calls = {"n": 0}
+
+        def cancel():
+            calls["n"] += 1
+            return calls["n"] > 4
+
+        first = convert_images_to_h5(paths, out, log=lambda m: None, cancel=cancel, workers=2)
+        assert not first.complete
+        assert first.frames_written == 4
+        with h5py.File(out, "r") as f:
+            assert f["entry/data/data"].shape[0] == 4
+
+        second = convert_images_to_h5(paths, out, log=lambda m: None, resume=True, workers=2)
+        assert second.complete
+        assert second.resumed_from == 4
+        with h5py.File(out, "r") as f:
+            data = f["entry/data/data"][()]
+        assert data.shape == (10, 12, 10)
+        assert np.array_equal(data[:, 0, 0], np.arange(10, dtype=np.float32))
+
+    def test_resume_after_crash_drops_rows_past_checkpoint(self, tmp_path):
+        _write_tiffs(tmp_path / "imgs", 12)
+        paths = sorted((tmp_path / "imgs").glob("*.tif"), key=lambda p: natural_key(p.name))
+        out = tmp_path / "out.h5"
+        calls = {"n": 0}
+
+        def cancel():
+            calls["n"] += 1
+            return calls["n"] > 7
+
+        convert_images_to_h5(paths, out, log=lambda m: None, cancel=cancel, workers=1, flush_every=4)
+        # What a crash after image 6 leaves behind: rows 4-6 reached the file
+        # but the last checkpoint (every 4 frames) still says 4
+        with h5py.File(out, "a") as f:
+            assert f["entry/data/data"].shape[0] == 7
+            f["entry/data/conversion"].attrs["next_source"] = 4
+
+        logs = []
+        result = convert_images_to_h5(paths, out, log=logs.append, resume=True, workers=2)
+        assert result.complete and result.resumed_from == 4
+        assert any("Discarding 3 frame(s)" in m for m in logs)
+        with h5py.File(out, "r") as f:
+            data = f["entry/data/data"][()]
+            file_list = list(f["entry/data/metadata/file_list"].asstr()[()])
+        assert np.array_equal(data[:, 0, 0], np.arange(12, dtype=np.float32))
+        assert file_list == [p.name for p in paths]
+
+
+@pytest.fixture()
+def qapp():
+    from PyQt5.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
+
+
+class TestFileConvertDialog:
+
+    def test_close_stops_running_conversion(self, qapp, tmp_path):
+        _write_tiffs(tmp_path / "imgs", 40)
+        paths = sorted((tmp_path / "imgs").glob("*.tif"), key=lambda p: natural_key(p.name))
+        out = tmp_path / "out.h5"
+        dlg = FileConvertDialog()
+        thread = QThread()
+        worker = ConvertWorker([ConvertJob(paths, out, [p.name for p in paths], {})])
+        worker.moveToThread(thread)
+        thread.started.connect(worker.run)
+        worker.finished.connect(dlg._on_convert_finished)
+        dlg._convert_thread, dlg._convert_worker = thread, worker
+        thread.start()
+        dlg.close()
+        assert thread.isFinished() and dlg._convert_thread is None
+        # Stopped early: nothing written yet, or a resumable partial file
+        if out.exists():
+            with h5py.File(out, "r") as f:
+                assert "entry/data/conversion" in f
@@ -0,0 +1,145 @@
+"""Tests for dashpva.utils.frame_cache — lazy HDF5 frame stacks, LRU and prefetch."""
+
+import time
+
+import h5py
+import numpy as np
+import pytest
+
+from dashpva.utils.frame_cache import FrameCache, FrameStack, H5FrameStack
+
+
+@pytest.fixture()
+def h5_stack(tmp_path):
+    path = tmp_path / "scan.h5"
+    data = np.arange(20 * 8 * 6, dtype=np.uint32).reshape(20, 8, 6)
+    data[3, 0, 0] = 10_000_000  # overflow value the Workbench zeroes
+    with h5py.File(path, "w") as f:
+        f.create_dataset("entry/data/data", data=data, chunks=(1, 8, 6))
+    return str(path), data
+
+
+@pytest.fixture()
+def cache():
+    c = FrameCache(ahead=4, behind=2)
+    yield c
+    c.close()
+
+
+def _wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+
+class TestH5FrameStack:
+
+    def test_array_like_surface(self, cache, h5_stack):
+        path, data = h5_stack
+        stack = H5FrameStack(cache, path, "entry/data/data")
+        assert stack.ndim == 3
+        assert stack.shape == data.shape
+        assert len(stack) == 20
+        assert stack.dtype == np.float32
+
+    def test_frame_values_and_cleaning(self, cache, h5_stack):
+        path, data = h5_stack
+        stack = H5FrameStack(cache, path, "entry/data/data")
+        assert np.array_equal(stack[5], data[5].astype(np.float32))
+        assert stack[3][0, 0] == 0.0
+        raw = H5FrameStack(cache, path, "entry/data/data", clean=False)
+        assert raw[3][0, 0] == 10_000_000
+
+    def test_indexing_forms(self, cache, h5_stack):
+        path, data = h5_stack
+        stack = H5FrameStack(cache, path, "entry/data/data")
+        assert np.array_equal(stack[-1], data[-1])
+        assert stack[2:5].shape == (3, 8, 6)
+        assert stack[4, 1, 2] == data[4, 1, 2]
+        assert np.asarray(stack).shape == data.shape
+        with pytest.raises(IndexError):
+            stack[20]
+
+    def test_frames_are_read_only(self, cache, h5_stack):
+        path, _ = h5_stack
+        frame = H5FrameStack(cache, path, "entry/data/data")[0]
+        with pytest.raises(ValueError):
+            frame[0, 0] = 1.0
+
+    def test_rejects_non_3d(self, cache, tmp_path):
+        path = tmp_path / "flat.h5"
+        with h5py.File(path, "w") as f:
+            f.create_dataset("img", data=np.zeros((4, 4)))
+        with pytest.raises(ValueError):
+            H5FrameStack(cache, str(path), "img")
+
+    def test_subclass_without_read_frame_fails_on_creation(self, cache):
+        class Incomplete(FrameStack):
+            pass
+
+        with pytest.raises(TypeError, match="read_frame"):
+            Incomplete(cache, "key", (2, 3, 4))
+
+
+class TestFrameCache:
+
+    def test_single_handle_per_file(self, cache, h5_stack):
+        path, _ = h5_stack
+        assert cache.file(path) is cache.file(path)
+
+    def test_byte_budget_evicts_lru(self, h5_stack):
+        path, _ = h5_stack
+        frame_bytes = 8 * 6 * 4
+        c = FrameCache(max_bytes=3 * frame_bytes, ahead=0, behind=0)
+        try:
+            stack = H5FrameStack(c, path, "entry/data/data")
+            for i in range(6):
+                stack[i]
+            assert c.nbytes <= 3 * frame_bytes
+            assert c.contains(stack, 5)
+            assert not c.contains(stack, 0)
+        finally:
+            c.close()
+
+    def test_prefetches_ahead_of_playhead(self, cache, h5_stack):
+        path, _ = h5_stack
+        stack = H5FrameStack(cache, path, "entry/data/data")
+        stack[10]
+        assert _wait_for(lambda: all(cache.contains(stack, i) for i in range(11, 15)))
+        assert _wait_for(lambda: cache.contains(stack, 9) and cache.contains(stack, 8))
+
+    def test_prefetch_wraps_for_replay(self, cache, h5_stack):
+        path, _ = h5_stack
+        stack = H5FrameStack(cache, path, "entry/data/data")
+        stack[18]
+        assert _wait_for(lambda: cache.contains(stack, 19) and cache.contains(stack, 0))
+
+    def test_released_allows_writing(self, cache, h5_stack):
+        path, _ = h5_stack
+        stack = H5FrameStack(cache, path, "entry/data/data")
+        stack[0]
+        with cache.released(path):
+            with pytest.raises(OSError):
+                cache.file(path)
+            with h5py.File(path, "a") as f:
+                f["entry/data"].create_dataset("extra", data=[1, 2, 3])
+        assert not cache.contains(stack, 0)
+        assert "entry/data/extra" in cache.file(path)
+        assert stack[1].shape == (8, 6)
+
+    def test_read_racing_close_file_is_not_cached(self, cache, h5_stack):
+        path, _ = h5_stack
+        stack = H5FrameStack(cache, path, "entry/data/data")
+        read_frame = stack.read_frame
+
+        def read_then_close(index):
+            data = read_frame(index)
+            cache.close_file(path)  # e.g. the file is reloaded while this frame decodes
+            return data
+
+        stack.read_frame = read_then_close
+        assert stack[7].shape == (8, 6)
+        assert not cache.contains(stack, 7)
@@ -0,0 +1,110 @@
+"""Tests for dashpva.utils.hpc_telemetry — pvapy consumer stats as time series."""
+
+import pytest
+
+from dashpva.utils.hpc_telemetry import (
+    JsonlRecorder,
+    StatsBlockParser,
+    TelemetryStore,
+    read_jsonl,
+    sample_from_stats,
+)
+
+# As printed by hpcConsumer -rp 1 -dc (PvaPyPrettyPrinter), after Worker strips each line
+CONSUMER_REPORT = """\
+{ 'consumerId': 2,
+'inputChannel': 'pvapy:image',
+'metadataStats': {'metadata-1': {'channel': 'ca://x:pos', 'queueStats': {}, 'receiverStats': {'nReceived': 5, 'receivedRate': 0.0Hz}}},
+'objectId': 3,
+'processorStats': {'errorRate': 0.0Hz, 'missedRate': 0.0800Hz, 'nErrors': 0, 'nMissed': 1, 'nProcessed': {n}, 'processedRate': 9.9000Hz, 'receivingTime': 11.9000s, 'runtime': 12.3000s},
+'publisherStats': {'errorRate': 0.0Hz, 'nErrors': 0, 'nPublished': 118, 'publishedRate': 9.8000Hz},
+'queueStats': {'nDelivered': 118, 'nQueued': 20, 'nReceived': 120, 'nRejected': 4},
+'receiverStats': {'errorRate': 0.0Hz, 'nErrors': 1, 'nOverruns': 2, 'nReceived': 120, 'nRejected': 0, 'overrunRate': 0.1700Hz, 'receivedRate': 10.0000Hz},
+'userStats': {'nFrameErrors': 0, 'nFramesProcessed': 118, 'processedFrameRate': 9.9000Hz}}"""
+
+COLLECTOR_REPORT = (
+    "{ 'collectorId': 1, 'collectorStats': {'collectedRate': 20.0Hz, 'nCached': 7, 'nCollected': 200, "
+    "'nMissed': 3, 'nRejected': 1}, 'metadataStats': {}, 'processorStats': {'nErrors': 0, "
+    "'nProcessed': 200, 'processedRate': 20.0Hz}, 'producerStats': {'producer-1': {'channel': "
+    "'a:1:output', 'queueStats': {}, 'receiverStats': {'nReceived': 101}}, 'producer-2': {'channel': "
+    "'a:2:output', 'queueStats': {}, 'receiverStats': {'nReceived': 99}}}, 'userStats': {}}")
+
+
+def _feed(parser, text):
+    out = [parser.feed(line) for line in text.splitlines()]
+    return [d for d in out if d is not None]
+
+
+class TestStatsBlockParser:
+
+    def test_reassembles_multiline_report(self):
+        parser = StatsBlockParser()
+        text = "Starting consumer\n" + CONSUMER_REPORT.replace('{n}', '118') + "\nunrelated {brace"
+        (stats,) = _feed(parser, text)
+        assert stats['consumerId'] == 2
+        assert stats['processorStats']['processedRate'] == pytest.approx(9.9)
+        assert stats['metadataStats']['metadata-1']['channel'] == 'ca://x:pos'
+
+    def test_units_inside_strings_untouched_and_garbage_dropped(self):
+        parser = StatsBlockParser()
+        assert _feed(parser, "{'inputChannel': 'det:10s', 'rate': 1.5Hz, 'x': {...}}") == [
+            {'inputChannel': 'det:10s', 'rate': 1.5, 'x': None}]
+        assert _feed(parser, "{'a': not python}") == []
+        # Parser recovers for the next block
+        assert _feed(parser, "{'consumerId': 1}") == [{'consumerId': 1}]
+
+
+class TestSamples:
+
+    def test_consumer_sample_fields(self):
+        (stats,) = _feed(StatsBlockParser(), CONSUMER_REPORT.replace('{n}', '118'))
+        s = sample_from_stats('analysis', stats, t=10.0)
+        assert (s.key, s.channel) == (('analysis', 2), 'pvapy:image')
+        assert (s.received, s.processed, s.published, s.queued) == (120, 118, 118, 20)
+        # overruns + queue rejections + missed ids; receiver errors
+        assert (s.dropped, s.errors) == (2 + 4 + 1, 1)
+
+    def test_collector_sample_and_other_dicts(self):
+        (stats,) = _feed(StatsBlockParser(), COLLECTOR_REPORT)
+        s = sample_from_stats('collector', stats, t=0.0)
+        assert (s.consumer_id, s.received, s.queued, s.dropped) == (1, 200, 7, 4)
+        assert s.channel == 'producer-1,producer-2'
+        assert sample_from_stats('collector', {'nCollected': 1}) is None
+
+
+class TestTelemetryStore:
+
+    def _sample(self, n, t):
+        (stats,) = _feed(StatsBlockParser(), CONSUMER_REPORT.replace('{n}', str(n)))
+        return sample_from_stats('analysis', stats, t=t)
+
+    def test_interval_rate_latency_and_restart(self):
+        store = TelemetryStore(history=3)
+        first = store.add(self._sample(100, 10.0))
+        assert first.rate == pytest.approx(9.9)   # pvapy's average until a second report
+        second = store.add(self._sample(140, 12.0))
+        assert second.rate == pytest.approx(20.0)
+        assert second.latency == pytest.approx(20 / 20.0)
+        # Counters going backwards (restart) fall back to the reported average
+        assert store.add(self._sample(5, 13.0)).rate == pytest.approx(9.9)
+        store.add(self._sample(15, 14.0))
+        t, rate = store.series(('analysis', 2), 'rate')
+        assert list(t) == [2.0, 3.0, 4.0] and list(rate) == pytest.approx([20.0, 9.9, 10.0])
+        with pytest.raises(ValueError):
+            store.series(('analysis', 2), 'channel')
+        store.clear('collector')
+        assert store.keys() == [('analysis', 2)]
+        store.clear('analysis')
+        assert store.keys() == [] and store.latest(('analysis', 2)) is None
+
+    def test_jsonl_round_trip(self, tmp_path):
+        path = tmp_path / 'telemetry' / 'run.jsonl'
+        recorder = JsonlRecorder(path)
+        store = TelemetryStore()
+        written = [store.add(self._sample(n, float(n))) for n in (10, 20)]
+        for s in written:
+            recorder.write(s)
+        recorder.close()
+        with open(path, 'a') as f:
+            f.write('truncated {\n')
+        assert read_jsonl(path) == written
@@ -6,7 +6,7 @@ import os
 import numpy as np
 import pytest
 
-from dashpva.utils.mask_manager import MaskManager
+from dashpva.utils.mask_manager import MaskManager, PixelStatistics
 
 
 class TestMaskManagerInit:
@@ -159,3 +159,56 @@ class TestDeadHotPixelDetection:
         assert result is not None
         assert result[2, 2]        # negative -> masked
         assert not result[4, 4]    # zero -> not masked
+
+
+class TestPixelStatistics:
+
+    def test_matches_stacked_variance_and_median(self):
+        rng = np.random.default_rng(3)
+        frames = rng.normal(100, 10, size=(21, 16, 16)).astype(np.float32)
+        frames[5, 1, 1] = -1.0
+        stats = PixelStatistics(track_median=True).update_many(frames)
+        stack = frames.astype(np.float64)
+        assert stats.count == 21
+        assert np.allclose(stats.mean, stack.mean(axis=0))
+        assert np.allclose(stats.variance, stack.var(axis=0))
+        # Within the reservoir the median is exact
+        assert np.allclose(stats.median, np.median(stack, axis=0))
+        assert stats.negative[1, 1] and stats.negative.sum() == 1
+
+    def test_sampled_median_beyond_reservoir(self):
+        rng = np.random.default_rng(4)
+        frames = rng.normal(50, 5, size=(200, 8, 8)).astype(np.float32)
+        frames[::7, 2, 3] = 1e6  # sparse cosmic-ray hits
+        stats = PixelStatistics(track_median=True, reservoir_size=15).update_many(frames)
+        assert stats.count == 200
+        assert stats._reservoir.shape[0] == 15
+        assert np.all(np.abs(stats.median - 50) < 10)
+
+    def test_rejects_shape_change(self):
+        stats = PixelStatistics()
+        stats.update(np.zeros((4, 4)))
+        with pytest.raises(ValueError):
+            stats.update(np.zeros((4, 5)))
+
+    def test_detection_from_statistics_and_h5(self, tmp_path):
+        h5py = pytest.importorskip("h5py")
+        mm = MaskManager(masks_dir=str(tmp_path / "masks"))
+        rng = np.random.default_rng(5)
+        frames = np.abs(rng.normal(0, 1, size=(12, 20, 20))).astype(np.float32)
+        frames[:, 6, 6] = 500.0  # hot pixel
+        path = tmp_path / "dark.h5"
+        with h5py.File(path, "w") as f:
+            f.create_dataset("entry/data/data", data=frames, chunks=(1, 20, 20))
+
+        stats = PixelStatistics.from_h5(str(path), track_median=True)
+        streamed = mm.detect_hot_pixels(stats)
+        assert np.array_equal(streamed, mm.detect_hot_pixels(list(frames)))
+        assert streamed[6, 6]
+        assert np.array_equal(mm.detect_dead_pixels(stats), mm.detect_dead_pixels(frames))
+
+    def test_hot_detection_requires_median(self, tmp_path):
+        mm = MaskManager(masks_dir=str(tmp_path / "masks"))
+        stats = PixelStatistics().update_many(np.ones((4, 5, 5)))
+        with pytest.raises(ValueError):
+            mm.detect_hot_pixels(stats)
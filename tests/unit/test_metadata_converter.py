@@ -0,0 +1,111 @@
+"""Tests for dashpva.utils.metadata_converter — dataset index and batch conversion."""
+
+import h5py
+import numpy as np
+import pytest
+
+from dashpva.utils.metadata_converter import (
+    DatasetIndex,
+    convert_batch,
+    convert_files_or_dir,
+    resolve_pv_dataset,
+)
+
+BASE = "entry/data/metadata"
+
+MAPPING = """
+[METADATA.CA]
+ETA = "6idb1:m17.RBV"
+
+[HKL.SAMPLE_AXIS_1]
+POSITION = "6idb1:m17_RBV:Position"
+ENERGY = "6idb1:Energy"
+SCALE = 2.5
+"""
+
+
+def _write_scan(path, eta=1.0):
+    with h5py.File(path, "w") as f:
+        f.create_dataset(f"{BASE}/motor_positions/6idb1:m17_RBV:Position", data=np.full(4, eta))
+        f.create_dataset(f"{BASE}/beamline/6idb1:Energy", data=np.array([11.2]))
+        f.create_dataset("entry/data/data", data=np.zeros((4, 2, 2)))
+
+
+@pytest.fixture()
+def mapping(tmp_path):
+    path = tmp_path / "mapping.toml"
+    path.write_text(MAPPING)
+    return str(path)
+
+
+class TestDatasetIndex:
+
+    def test_single_walk_finds_nested_leaf(self, tmp_path):
+        path = tmp_path / "scan.h5"
+        _write_scan(path)
+        with h5py.File(path, "r") as f:
+            index = DatasetIndex(f, BASE)
+            assert len(index) == 2
+            assert index.find(f, "6idb1:Energy") == f"{BASE}/beamline/6idb1:Energy"
+            resolved, node = resolve_pv_dataset(f, "6idb1:Energy", BASE, index)
+            assert resolved == f"{BASE}/beamline/6idb1:Energy"
+            assert node[0] == pytest.approx(11.2)
+            assert resolve_pv_dataset(f, "missing:pv", BASE, index) == (None, None)
+
+    def test_deleted_and_added_datasets(self, tmp_path):
+        path = tmp_path / "scan.h5"
+        _write_scan(path)
+        with h5py.File(path, "r+") as f:
+            index = DatasetIndex(f, BASE)
+            del f[f"{BASE}/beamline/6idb1:Energy"]
+            assert index.find(f, "6idb1:Energy") is None
+            f.create_dataset(f"{BASE}/other/6idb1:Energy", data=[1.0])
+            index.add(f"{BASE}/other/6idb1:Energy")
+            assert index.find(f, "6idb1:Energy") == f"{BASE}/other/6idb1:Energy"
+
+    def test_missing_base_group(self, tmp_path):
+        path = tmp_path / "empty.h5"
+        with h5py.File(path, "w") as f:
+            assert len(DatasetIndex(f, BASE)) == 0
+
+
+class TestConvertBatch:
+
+    def test_copies_in_parallel_with_per_file_results(self, tmp_path, mapping):
+        src = tmp_path / "scans"
+        src.mkdir()
+        for i in range(3):
+            _write_scan(src / f"scan_{i}.h5", eta=float(i))
+        (src / "broken.h5").write_bytes(b"not hdf5")
+        out = tmp_path / "out"
+
+        seen = []
+        results = convert_batch(mapping, str(src), include=True, output_dir=str(out), workers=2,
+                                progress=lambda r, done, total: seen.append((done, total)))
+
+        assert [r.source.rsplit("/", 1)[-1] for r in results] == ["broken.h5", "scan_0.h5", "scan_1.h5", "scan_2.h5"]
+        assert not results[0].ok and results[0].error
+        assert all(r.ok and r.elapsed > 0 for r in results[1:])
+        assert sorted(seen) == [(n, 4) for n in range(1, 5)]
+        for i, r in enumerate(results[1:]):
+            assert r.stats["created"] == 2 and r.stats["constants"] == 1
+            with h5py.File(r.output, "r") as f:
+                pos = f[f"{BASE}/HKL/SAMPLE_AXIS_1/POSITION"]
+                assert np.all(pos[()] == float(i))
+                assert f[f"{BASE}/HKL/SAMPLE_AXIS_1/ENERGY"][0] == pytest.approx(11.2)
+                assert f[f"{BASE}/HKL/SAMPLE_AXIS_1/SCALE"][()] == pytest.approx(2.5)
+                assert f[f"{BASE}/motor_positions/ETA"].attrs["units"] == "deg"
+
+    def test_convert_files_or_dir_single_file(self, tmp_path, mapping):
+        path = tmp_path / "scan.h5"
+        _write_scan(path)
+        outputs = convert_files_or_dir(mapping, str(path), include=True, in_place=True)
+        assert outputs == [str(path)]
+        with h5py.File(path, "r") as f:
+            link = f.get(f"{BASE}/HKL/SAMPLE_AXIS_1/POSITION", getlink=True)
+            assert isinstance(link, h5py.SoftLink)
+            assert link.path == f"/{BASE}/motor_positions/ETA"
+
+    def test_missing_path_raises(self, tmp_path, mapping):
+        with pytest.raises(FileNotFoundError):
+            convert_batch(mapping, str(tmp_path / "nope"))
@@ -0,0 +1,120 @@
+"""Tests for dashpva.utils.multitau — streaming multi-tau g2."""
+
+import h5py
+import numpy as np
+import pytest
+from click.testing import CliRunner
+
+from dashpva.utils.multitau import MultiTauCorrelator, correlate_hdf5, roi_labels
+
+SHAPE = (12, 16)
+LEVELS, BUFS = 5, 8
+
+
+def _reference(frames, labels, levels=LEVELS, bufs=BUFS):
+    """Offline multi-tau: build every level's averaged stream, then correlate it."""
+    data = frames.reshape(len(frames), -1).astype(float)
+    streams = [data]
+    for _ in range(1, levels):
+        s = streams[-1]
+        n = len(s) // 2
+        streams.append((s[0:2 * n:2] + s[1:2 * n:2]) / 2)
+    flat = labels.ravel()
+    out = {}
+    for k, s in enumerate(streams):
+        for j in (range(bufs) if k == 0 else range(bufs // 2, bufs)):
+            if len(s) <= j:
+                continue
+            cur, prev = s[j:], s[:len(s) - j]
+            out[j * 2 ** k] = [
+                (cur * prev)[:, flat == q].mean() / (cur[:, flat == q].mean() * prev[:, flat == q].mean())
+                for q in np.unique(flat[flat > 0])]
+    return out
+
+
+@pytest.fixture()
+def frames():
+    return np.random.default_rng(1).poisson(3, (203,) + SHAPE)
+
+
+@pytest.fixture()
+def labels():
+    return roi_labels(SHAPE, [(0, 0, 8, 6), (4, 4, 10, 8)])
+
+
+class TestMultiTauCorrelator:
+
+    @pytest.mark.parametrize("batch", [1, 7, 64, 500])
+    def test_matches_offline_multitau_for_any_split(self, frames, labels, batch):
+        engine = MultiTauCorrelator(labels, num_levels=LEVELS, num_bufs=BUFS, batch=batch)
+        start = 0
+        for size in [1, 5, 33, 2, 100, 62]:
+            engine.update(frames[start:start + size] if size > 1 else frames[start])
+            start += size
+        result = engine.g2()
+        reference = _reference(frames, labels)
+        assert result.frames == len(frames)
+        assert list(result.lags) == sorted(reference)
+        for i, lag in enumerate(result.lags):
+            np.testing.assert_allclose(result.g2[:, i], reference[lag])
+
+    def test_regrouping_partitions(self, frames, labels):
+        engine = MultiTauCorrelator(labels, num_levels=LEVELS, num_bufs=BUFS)
+        engine.update(frames)
+        merged = (labels > 0).astype(int)
+        result = engine.g2(merged)
+        reference = _reference(frames, merged)
+        assert list(result.q_labels) == [1]
+        np.testing.assert_allclose(result.g2[0], [reference[lag][0] for lag in result.lags])
+
+    def test_memory_does_not_grow_and_reset(self, frames, labels):
+        engine = MultiTauCorrelator(labels, num_levels=LEVELS, num_bufs=BUFS)
+
+        def held():
+            arrays = [engine._G, engine._total] + engine._head + engine._history + engine._carry
+            return sum(a.nbytes for a in arrays)
+
+        for _ in range(2):
+            engine.update(frames)
+        before = held()
+        for _ in range(4):
+            engine.update(frames)
+        assert held() == before
+        engine.reset()
+        assert engine.frames == 0 and not len(engine.g2().lags)
+
+    def test_rejects_bad_input(self, labels):
+        with pytest.raises(ValueError, match="even"):
+            MultiTauCorrelator(labels, num_bufs=5)
+        with pytest.raises(ValueError, match="no pixels"):
+            MultiTauCorrelator(np.zeros(SHAPE))
+        with pytest.raises(ValueError, match="does not match"):
+            MultiTauCorrelator(labels).update(np.zeros((3, 4)))
+
+
+class TestFileInput:
+
+    def test_correlate_hdf5_matches_in_memory(self, tmp_path, frames, labels):
+        path = tmp_path / 'scan.h5'
+        with h5py.File(path, 'w') as h5:
+            h5.create_dataset('entry/data/data', data=frames.astype(np.uint16))
+        result = correlate_hdf5(str(path), 'entry/data/data', labels, chunk=40,
+                                num_levels=LEVELS, num_bufs=BUFS)
+        engine = MultiTauCorrelator(labels, num_levels=LEVELS, num_bufs=BUFS)
+        engine.update(frames)
+        np.testing.assert_allclose(result.g2, engine.g2().g2)
+
+    def test_cli_xpcs(self, tmp_path, frames):
+        from dashpva.cli import cli
+
+        path = tmp_path / 'scan.h5'
+        with h5py.File(path, 'w') as h5:
+            h5.create_dataset('entry/data/data', data=frames.astype(np.uint16))
+        out = tmp_path / 'g2.json'
+        res = CliRunner().invoke(cli, ['xpcs', str(path), '--roi', '0,0,8,6', '--roi', '4,4,10,8',
+                                       '--frame-time', '0.001', '--json', str(out)])
+        assert res.exit_code == 0, res.output
+        assert '203 frames, 2 partition(s)' in res.output
+        assert out.exists()
+        bad = CliRunner().invoke(cli, ['xpcs', str(path), '--roi', '1,2'])
+        assert bad.exit_code != 0
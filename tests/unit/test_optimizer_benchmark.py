@@ -0,0 +1,115 @@
+"""Tests for dashpva.viewer.bayesian.benchmark — phase accounting, fit timing, report, CLI."""
+
+import sys
+import types
+from unittest.mock import patch
+
+import pytest
+from click.testing import CliRunner
+
+from dashpva.cli import cli
+from dashpva.viewer.bayesian import benchmark
+from dashpva.viewer.bayesian.benchmark import (
+    BenchmarkCase,
+    BenchmarkResult,
+    PhaseRecorder,
+    format_results,
+    time_model_fits,
+)
+
+
+def _result(**kwargs):
+    rounds = [
+        {"fit": 0.0, "acquisition": 0.1, "move": 0.2, "commit": 0.0, "read": 0.1, "tell": 0.0},
+        {"fit": 0.3, "acquisition": 0.2, "move": 0.2, "commit": 0.0, "read": 0.1, "tell": 0.1},
+    ]
+    defaults = dict(case=BenchmarkCase(2), evaluations=4, wall_time=2.0, rounds=rounds,
+                    fit_timed=True)
+    defaults.update(kwargs)
+    return BenchmarkResult(**defaults)
+
+
+class TestPhaseAccounting:
+
+    def test_recorder_splits_fit_from_acquisition_per_round(self):
+        rec = PhaseRecorder()
+        rec("suggest", 0.5)                 # Sobol round: nothing fitted
+        rec("move", 0.1)
+        rec("read", 0.2)
+        rec("ingest", 0.05)
+        rec.fit(0.3)
+        rec.fit(0.1)
+        rec("suggest", 0.6)
+        rec("move", 0.1)
+        rec("read", 0.2)
+        rec("move", 0.1)
+        rec("read", 0.2)
+        assert len(rec.rounds) == 2
+        assert rec.rounds[0]["fit"] == 0.0 and rec.rounds[0]["acquisition"] == 0.5
+        assert rec.rounds[0]["tell"] == 0.05
+        assert rec.rounds[1]["fit"] == pytest.approx(0.4)
+        assert rec.rounds[1]["acquisition"] == pytest.approx(0.2)
+        assert rec.rounds[1]["move"] == pytest.approx(0.2)
+
+    def test_result_per_evaluation_and_overhead(self):
+        r = _result()
+        assert r.evals_per_s == 2.0
+        assert r.per_evaluation()["move"] == pytest.approx(0.1)
+        assert r.overhead() == pytest.approx(2.0 - 1.3)
+        assert r.to_dict()["case"]["n_dofs"] == 2
+
+    def test_time_model_fits_wraps_and_restores(self, monkeypatch):
+        class Spec:
+            def fit(self, x):
+                return x * 2
+
+        module = types.ModuleType("fake_ax_spec")
+        module.Spec = Spec
+        monkeypatch.setitem(sys.modules, "fake_ax_spec", module)
+        monkeypatch.setattr(benchmark, "_FIT_HOOKS", (("fake_ax_spec", "Spec"),
+                                                      ("fake_ax_missing", "Spec")))
+        seen = []
+        with time_model_fits(seen.append) as hooked:
+            assert hooked and Spec().fit(3) == 6
+        assert len(seen) == 1 and seen[0] >= 0
+        assert Spec().fit(1) == 2 and len(seen) == 1
+
+
+class TestCases:
+
+    def test_config_and_validation(self):
+        cfg = BenchmarkCase(3, 2, iterations=5, n_points=2, transport="pva").config()
+        assert [d.name for d in cfg.active_dofs()] == ["x0", "x1", "x2"]
+        assert cfg.total_points() == 10 and cfg.validate() is None
+        assert cfg.objectives[1].pv.endswith(":true_cx")
+        assert BenchmarkCase(1, 6, transport="pva").validate()
+        assert BenchmarkCase(1, transport="ca").validate()
+
+    def test_format_results(self):
+        text = format_results([_result(), _result(fit_timed=False, error="ImportError: blop")])
+        lines = text.splitlines()
+        assert "evals/s" in lines[0] and "commit" not in lines[0]
+        assert "2.00" in lines[2] and "error: ImportError: blop" in lines[3]
+
+
+class TestCLI:
+
+    def test_reports_missing_dependencies(self):
+        with patch.object(benchmark, "missing_dependencies", return_value=["blop"]):
+            result = CliRunner().invoke(cli, ["optbench"])
+        assert result.exit_code != 0 and "needs blop" in result.output
+
+    def test_runs_the_case_grid(self):
+        with patch.object(benchmark, "missing_dependencies", return_value=[]), \
+                patch.object(benchmark, "run_case", side_effect=lambda c, seed: _result(case=c)) as run:
+            result = CliRunner().invoke(cli, ["optbench", "--dofs", "1,3", "--objectives", "1,2",
+                                              "--iterations", "4"])
+        assert result.exit_code == 0, result.output
+        cases = [c.args[0] for c in run.call_args_list]
+        assert [(c.n_dofs, c.n_objectives, c.iterations) for c in cases] == [
+            (1, 1, 4), (1, 2, 4), (3, 1, 4), (3, 2, 4)]
+        assert "3 DOF x 2 obj" in result.output
+
+    def test_rejects_bad_counts(self):
+        result = CliRunner().invoke(cli, ["optbench", "--dofs", "two"])
+        assert result.exit_code != 0 and "comma-separated" in result.output
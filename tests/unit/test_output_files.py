@@ -0,0 +1,32 @@
+"""Tests for dashpva.utils.output_files — output subdirectories and atomic writes."""
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+import dashpva.settings as settings
+from dashpva.utils.output_files import atomic_write, output_subdir
+
+
+def test_output_subdir_follows_settings(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, 'OUTPUT_PATH', str(tmp_path), raising=False)
+    assert output_subdir('csr_cache') == tmp_path / 'csr_cache'
+    monkeypatch.setattr(settings, 'OUTPUT_PATH', '', raising=False)
+    assert output_subdir('telemetry') == Path('./outputs') / 'telemetry'
+
+
+def test_atomic_write_replaces_only_on_success(tmp_path):
+    path = tmp_path / 'sub' / 'matrix.npz'
+    with atomic_write(path) as tmp:
+        assert tmp.parent == path.parent and tmp.suffix == '.npz'
+        np.savez(tmp, a=np.arange(3))
+        assert not path.exists()
+    np.testing.assert_array_equal(np.load(path)['a'], np.arange(3))
+
+    with pytest.raises(RuntimeError):
+        with atomic_write(path) as tmp:
+            np.savez(tmp, a=np.zeros(2))
+            raise RuntimeError('interrupted')
+    np.testing.assert_array_equal(np.load(path)['a'], np.arange(3))
+    assert sorted(p.name for p in path.parent.iterdir()) == ['matrix.npz']
@@ -0,0 +1,102 @@
+"""Tests for dashpva.utils.phase_cache — content-addressed reflection cache."""
+
+import os
+from pathlib import Path
+
+import pytest
+
+from dashpva.utils.phase_cache import ReflectionCache, cif_digest, load_phase_library
+
+
+class FakePhase:
+    """Stand-in for PhaseModel: picklable, named, with a peak list."""
+
+    def __init__(self, name, peaks):
+        self.name = name
+        self.peaks = peaks
+
+
+def fake_calculate(cif_path, wavelength):
+    text = Path(cif_path).read_text()
+    if 'broken' in text:
+        raise ValueError("unparseable CIF")
+    # Record which process computed it so tests can tell hits from misses
+    return FakePhase(Path(cif_path).stem, [(len(text), wavelength, os.getpid())])
+
+
+@pytest.fixture()
+def library(tmp_path):
+    cif_dir = tmp_path / "cifs"
+    cif_dir.mkdir()
+    for name, body in [("a", "data_a\n"), ("b", "data_bb\n"), ("c", "data_ccc\n")]:
+        (cif_dir / f"{name}.cif").write_text(body)
+    return sorted(cif_dir.glob("*.cif"))
+
+
+class TestReflectionCache:
+
+    def test_key_tracks_content_and_wavelength(self, library, tmp_path):
+        cache = ReflectionCache(tmp_path / "cache")
+        digest = cif_digest(library[0])
+        assert cache.key(digest, 0.7293) == cache.key(digest, 0.7293000001)
+        assert cache.key(digest, 0.7293) != cache.key(digest, 0.73)
+        assert cache.key(digest, 0.7293) != cache.key(cif_digest(library[1]), 0.7293)
+        wide = ReflectionCache(tmp_path / "cache", two_theta_range=(0.0, 90.0))
+        assert wide.key(digest, 0.7293) != cache.key(digest, 0.7293)
+
+    def test_round_trip_and_unreadable_entry(self, tmp_path):
+        cache = ReflectionCache(tmp_path / "cache")
+        key = cache.key("0" * 64, 1.0)
+        assert cache.get(key) is None
+        cache.put(key, FakePhase("x", [1, 2]))
+        assert cache.get(key).peaks == [1, 2]
+        cache._path(key).write_bytes(b"not a pickle")
+        assert cache.get(key) is None
+
+
+class TestLoadPhaseLibrary:
+
+    def test_second_load_is_served_from_cache(self, library, tmp_path):
+        cache = ReflectionCache(tmp_path / "cache")
+        seen = []
+        first = load_phase_library(library, 0.8, cache=cache, workers=1,
+                                   calculate=fake_calculate,
+                                   progress=lambda r, done, total: seen.append((done, total)))
+        assert [r.ok for r in first] == [True] * 3
+        assert not any(r.cached for r in first)
+        assert seen == [(1, 3), (2, 3), (3, 3)]
+
+        second = load_phase_library(library, 0.8, cache=cache, workers=1, calculate=fake_calculate)
+        assert all(r.cached for r in second)
+        assert [r.phase.peaks for r in second] == [r.phase.peaks for r in first]
+
+        # A new wavelength misses; a renamed copy of a CIF hits under its new name
+        assert not any(r.cached for r in load_phase_library(
+            library, 0.9, cache=cache, workers=1, calculate=fake_calculate))
+        copy = library[0].with_name("renamed.cif")
+        copy.write_bytes(library[0].read_bytes())
+        (hit,) = load_phase_library([copy], 0.8, cache=cache, calculate=fake_calculate)
+        assert hit.cached and hit.phase.name == "renamed"
+
+    def test_failures_are_reported_in_order(self, library, tmp_path):
+        bad = library[0].with_name("bad.cif")
+        bad.write_text("broken")
+        files = [library[0], bad, library[1]]
+        cache = ReflectionCache(tmp_path / "cache")
+        results = load_phase_library(files, 0.8, cache=cache, workers=1, calculate=fake_calculate)
+        assert [r.ok for r in results] == [True, False, True]
+        assert "unparseable" in results[1].error
+        # Failures are not cached
+        again = load_phase_library(files, 0.8, cache=cache, workers=1, calculate=fake_calculate)
+        assert [r.cached for r in again] == [True, False, True]
+
+    def test_misses_computed_across_processes(self, library, tmp_path):
+        results = load_phase_library(library, 0.8, cache=ReflectionCache(tmp_path / "cache"),
+                                     workers=2, calculate=fake_calculate)
+        assert [Path(r.path).name for r in results] == ["a.cif", "b.cif", "c.cif"]
+        assert all(r.ok for r in results)
+        assert all(r.phase.peaks[0][2] != os.getpid() for r in results)
+
+    def test_without_cache(self, library):
+        results = load_phase_library(library, 0.8, workers=1, calculate=fake_calculate)
+        assert all(r.ok and not r.cached for r in results)
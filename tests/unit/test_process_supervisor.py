@@ -0,0 +1,213 @@
+"""Tests for dashpva.utils.process_supervisor — restart/backoff/stall logic with fake processes."""
+
+import sys
+import time
+
+import pytest
+
+from dashpva.utils.process_supervisor import (
+    BACKOFF,
+    EXITED,
+    FAILED,
+    RUNNING,
+    ProcessSpec,
+    ProcessSupervisor,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeProcess:
+    _next_pid = 100
+
+    def __init__(self, cmd):
+        self.cmd = cmd
+        self.returncode = None
+        FakeProcess._next_pid += 1
+        self.pid = FakeProcess._next_pid
+
+    def poll(self):
+        return self.returncode
+
+
+@pytest.fixture()
+def chain():
+    clock = FakeClock()
+    launched, terminated, events = [], [], []
+
+    def launch(spec):
+        proc = FakeProcess(list(spec.cmd))
+        launched.append((spec.name, proc))
+        return proc
+
+    def terminate(entry):
+        terminated.append(entry.name)
+        entry.process.returncode = -15
+
+    sup = ProcessSupervisor(launch=launch, terminate=terminate, backoff_initial=1.0,
+                            backoff_max=4.0, healthy_after=10.0, clock=clock,
+                            on_event=lambda name, msg: events.append((name, msg)))
+    # Registered out of order on purpose: order, not insertion, defines the chain
+    sup.add(ProcessSpec('collector', ['collect', '--cache', '5'], order=2, stall_timeout=5.0))
+    sup.add(ProcessSpec('sim', ['sim', '-fps', '10'], order=0))
+    sup.add(ProcessSpec('consumer', ['consume', '--n', '2'], order=1, stall_timeout=5.0))
+    sup.start_all()
+    return sup, clock, launched, terminated, events
+
+
+class TestProcessSupervisor:
+
+    def test_starts_in_chain_order(self, chain):
+        sup, _, launched, _, _ = chain
+        assert [name for name, _ in launched] == ['sim', 'consumer', 'collector']
+        assert [e.state for e in sup.entries()] == [RUNNING] * 3
+
+    def test_crash_restarts_same_command_with_backoff(self, chain):
+        sup, clock, launched, _, events = chain
+        consumer = sup.get('consumer')
+        delays = []
+        for _ in range(4):
+            consumer.process.returncode = 1
+            sup.poll()
+            assert consumer.state == BACKOFF
+            delays.append(consumer.next_start - clock.now)
+            clock.now = consumer.next_start
+            sup.poll()
+            assert consumer.state == RUNNING
+        assert delays == [1.0, 2.0, 4.0, 4.0]
+        assert consumer.restarts == 4
+        assert [p.cmd for n, p in launched if n == 'consumer'] == [['consume', '--n', '2']] * 5
+        assert any('exited with code 1' in msg for _, msg in events)
+        # Staying up (and progressing) resets the backoff
+        for _ in range(5):
+            clock.now += 2.0
+            sup.report_progress('consumer', int(clock.now))
+            sup.poll()
+        assert consumer.failures == 0
+
+    def test_clean_exit_is_not_restarted(self, chain):
+        sup, clock, launched, _, _ = chain
+        sup.get('sim').process.returncode = 0
+        sup.poll()
+        clock.now += 100
+        sup.poll()
+        assert sup.get('sim').state == EXITED
+        assert [n for n, _ in launched].count('sim') == 1
+
+    def test_stall_only_counts_while_upstream_progresses(self, chain):
+        sup, clock, _, terminated, _ = chain
+        # The consumer goes silent; the collector never reported, so only liveness counts
+        sup.report_progress('consumer', 10, source=1)
+        clock.now = 4.0
+        sup.report_progress('consumer', 20, source=1)
+        clock.now = 30.0
+        sup.poll()
+        assert terminated == ['consumer']
+        assert sup.get('collector').state == RUNNING
+        clock.now = 31.0
+        sup.poll()
+        consumer = sup.get('consumer')
+        assert consumer.state == RUNNING and consumer.counters == {}
+
+        # Consumer advances, collector keeps reporting the same count -> collector is stalled
+        for t in range(32, 38):
+            clock.now = float(t)
+            sup.report_progress('consumer', t, source=1)
+            sup.report_progress('collector', 5)
+            sup.poll()
+        assert terminated == ['consumer', 'collector']
+
+    def test_downstream_waits_for_upstream_restart(self, chain):
+        sup, clock, launched, _, _ = chain
+        sup.get('consumer').process.returncode = 1
+        sup.get('collector').process.returncode = 1
+        sup.get('consumer').failures = 2    # longer backoff upstream
+        sup.poll()
+        clock.now = 1.5
+        sup.poll()
+        # Collector's backoff (1 s) expired, but the consumer upstream (4 s) has not restarted
+        assert sup.get('collector').state == BACKOFF
+        clock.now = 4.0
+        sup.poll()
+        assert [n for n, _ in launched][-2:] == ['consumer', 'collector']
+
+    def test_max_restarts_and_removal(self, chain):
+        sup, _, launched, terminated, _ = chain
+        sup.max_restarts = 0
+        sup.get('collector').process.returncode = 2
+        sup.poll()
+        assert sup.get('collector').state == FAILED
+        sup.remove('consumer', terminate=True)
+        assert terminated == ['consumer'] and sup.get('consumer') is None
+        sup.stop_all()
+        assert terminated == ['consumer', 'collector', 'sim'] and sup.entries() == []
+
+    def test_idle_chain_head_is_not_restarted(self):
+        clock = FakeClock()
+        sup = ProcessSupervisor(launch=lambda spec: FakeProcess(spec.cmd), clock=clock)
+        head = sup.add(ProcessSpec('consumer', ['c'], stall_timeout=5.0))
+        sup.start_all()
+        for t in range(1, 20):
+            clock.now = float(t)
+            sup.report_progress('consumer', 0)
+            sup.poll()
+        assert head.state == RUNNING and head.restarts == 0
+        clock.now = 30.0   # ...until it stops reporting
+        sup.poll()
+        assert head.state == BACKOFF
+
+    def test_idle_consumer_behind_silent_upstream_is_not_restarted(self, chain):
+        sup, clock, _, terminated, _ = chain
+        # The sim server reports no counters: a paused source is indistinguishable from a
+        # stuck consumer, so a consumer that keeps reporting the same count stays up
+        for t in range(1, 30):
+            clock.now = float(t)
+            sup.report_progress('consumer', 7, source=1)
+            sup.poll()
+        assert 'consumer' not in terminated
+        assert sup.get('consumer').state == RUNNING
+
+    def test_launch_failure_is_retried(self):
+        clock = FakeClock()
+        attempts = []
+
+        def launch(spec):
+            attempts.append(clock.now)
+            if len(attempts) < 3:
+                raise OSError('no such file')
+            return FakeProcess(spec.cmd)
+
+        sup = ProcessSupervisor(launch=launch, backoff_initial=0.5, clock=clock)
+        sup.add(ProcessSpec('x', ['x']))
+        sup.start_all()
+        for t in (0.5, 1.5):
+            clock.now = t
+            sup.poll()
+        assert attempts == [0.0, 0.5, 1.5] and sup.get('x').state == RUNNING
+
+
+def test_default_launch_reads_stats(tmp_path):
+    # A real child printing one pvapy-style report, then exiting with an error
+    script = tmp_path / 'fake_consumer.py'
+    script.write_text(
+        "print(\"{ 'consumerId': 3,\")\n"
+        "print(\"'processorStats': {'nProcessed': 42, 'processedRate': 1.0Hz}}\")\n"
+        "raise SystemExit(3)\n")
+    lines = []
+    sup = ProcessSupervisor(backoff_initial=60.0, on_output=lambda name, line: lines.append(line))
+    entry = sup.add(ProcessSpec('fake', [sys.executable, str(script)], stall_timeout=60.0))
+    sup.start_all()
+    entry.process.wait(timeout=30)
+    for _ in range(100):
+        if len(lines) == 2:
+            break
+        time.sleep(0.05)
+    assert entry.counters == {3: 42} and entry.last_progress is not None
+    sup.poll()
+    assert entry.state == BACKOFF and entry.last_exit == 3
@@ -0,0 +1,53 @@
+"""Runs the pyFAI viewer's background save on a wrapped waterfall ring.
+
+Skipped when the GUI/pyFAI stack is unavailable.
+"""
+
+import numpy as np
+import pytest
+
+pytest.importorskip("PyQt5")
+pytest.importorskip("pyFAI")
+h5py = pytest.importorskip("h5py")
+
+from PyQt5.QtCore import Qt  # noqa: E402
+
+from dashpva.utils.row_ring import RowRing  # noqa: E402
+from dashpva.viewer.pyFAI_analysis import SaveWorker  # noqa: E402
+
+
+def test_save_writes_waterfall_snapshot_oldest_first(tmp_path):
+    ring = RowRing(3)
+    for i in range(5):
+        ring.append(np.full(4, float(i)))
+    q = np.linspace(0.1, 0.4, 4)
+    images = [np.full((6, 5), i, dtype=np.uint16) for i in range(3)]
+    integration = [(q, np.full(4, float(i))) for i in range(3)]
+    filename = str(tmp_path / "out.h5")
+
+    worker = SaveWorker(filename, images, integration, ring.rows().copy(), q, "sim:image", {},
+                        None, None, 5, 3, compression="gzip")
+    results = []
+    worker.finished.connect(lambda ok, msg: results.append((ok, msg)), Qt.DirectConnection)
+    ring.append(np.full(4, 99.0))  # the live ring keeps moving; the snapshot must not
+    worker.run()
+
+    assert results and results[0][0], results
+    with h5py.File(filename, "r") as h5:
+        waterfall = h5["entry/analysis/waterfall"][()]
+        np.testing.assert_array_equal(h5["entry/analysis/waterfall_q_values"][()], q)
+        assert h5["entry/data/images"].shape == (3, 6, 5)
+    np.testing.assert_array_equal(waterfall[:, 0], [2.0, 3.0, 4.0])
+
+
+def test_save_without_waterfall_rows(tmp_path):
+    filename = str(tmp_path / "out.h5")
+    worker = SaveWorker(filename, [np.zeros((2, 2), dtype=np.uint16)], [], None, None, "", {},
+                        None, None, 1, 1, compression="gzip")
+    results = []
+    worker.finished.connect(lambda ok, msg: results.append(ok), Qt.DirectConnection)
+    worker.run()
+
+    assert results == [True]
+    with h5py.File(filename, "r") as h5:
+        assert "waterfall" not in h5["entry/analysis"]
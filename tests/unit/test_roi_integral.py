@@ -0,0 +1,138 @@
+"""Tests for dashpva.utils.roi_integral — summed-area-table ROI statistics."""
+
+import numpy as np
+import pytest
+
+from dashpva.utils.roi_integral import RoiIntegralStats
+
+
+def _reference(sub, offset=(0, 0)):
+    a = np.asarray(sub, dtype=np.float64)
+    s = a.sum()
+    i0 = np.arange(a.shape[0]) + offset[0]
+    i1 = np.arange(a.shape[1]) + offset[1]
+    return {'n': a.size, 'total': s, 'min': a.min(), 'max': a.max(), 'mean': a.mean(),
+            'sigma': a.std(), 'com0': float(a.sum(axis=1) @ i0) / s,
+            'com1': float(a.sum(axis=0) @ i1) / s}
+
+
+@pytest.fixture()
+def frame():
+    rng = np.random.default_rng(7)
+    return rng.poisson(50, size=(64, 48)).astype(np.float32)
+
+
+def _engine(frame, tables):
+    engine = RoiIntegralStats()
+    engine.set_frame(frame)
+    if tables:
+        engine.build_tables()
+    return engine
+
+
+@pytest.mark.parametrize("tables", [False, True], ids=["direct", "tables"])
+class TestRectStats:
+
+    def test_matches_direct_reduction(self, frame, tables):
+        engine = _engine(frame, tables)
+        for a0, a1, b0, b1 in [(0, 64, 0, 48), (5, 9, 30, 47), (10, 11, 3, 4)]:
+            got = engine.rect_stats(a0, a1, b0, b1)
+            want = _reference(frame[a0:a1, b0:b1], (a0, b0))
+            assert got == pytest.approx(want)
+
+    def test_clips_and_empty(self, frame, tables):
+        engine = _engine(frame, tables)
+        assert engine.rect_stats(-5, 3, 40, 100) == pytest.approx(_reference(frame[0:3, 40:48], (0, 40)))
+        assert engine.rect_stats(70, 80, 0, 5) == {}
+        assert RoiIntegralStats().rect_stats(0, 1, 0, 1) == {}
+
+    def test_nan_pixels_are_excluded(self, frame, tables):
+        frame = frame.copy()
+        frame[2, 2] = np.nan
+        frame[3, 3] = np.inf
+        engine = _engine(frame, tables)
+        got = engine.rect_stats(0, 5, 0, 5)
+        vals = frame[0:5, 0:5]
+        finite = vals[np.isfinite(vals)].astype(np.float64)
+        assert got['n'] == 23
+        assert got['total'] == pytest.approx(finite.sum())
+        assert got['sigma'] == pytest.approx(finite.std())
+        assert got['max'] == finite.max()
+        assert engine.rect_stats(2, 3, 2, 3) == {}
+
+    def test_index_stats_matches_rect(self, frame, tables):
+        engine = _engine(frame, tables)
+        a, b = np.meshgrid(np.arange(4, 12), np.arange(6, 20), indexing='ij')
+        flat = (a * frame.shape[1] + b).ravel()
+        assert engine.index_stats(flat) == pytest.approx(engine.rect_stats(4, 12, 6, 20))
+
+
+@pytest.fixture(scope="module")
+def app():
+    pytest.importorskip("PyQt5")
+    pytest.importorskip("pyqtgraph")
+    from PyQt5 import QtWidgets
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+
+class TestPyqtgraphRois:
+
+    def test_tables_built_past_break_even(self, app, frame):
+        import pyqtgraph as pg
+        view, item = self._scene(frame, "col-major")
+        rois = [pg.ROI([0, 0], [64, 48]) for _ in range(3)]
+        for roi in rois:
+            view.addItem(roi)
+        engine = RoiIntegralStats(break_even=2.0)
+        engine.set_frame(frame)
+        small = engine.roi_stats_many(rois[:2], item)
+        assert not engine.has_tables
+        big = engine.roi_stats_many(rois, item)
+        assert engine.has_tables
+        assert big[0] == pytest.approx(small[0])
+        assert big[0] == pytest.approx(_reference(frame))
+        engine.set_frame(frame)
+        assert not engine.has_tables
+
+    def _scene(self, frame, axis_order):
+        import pyqtgraph as pg
+        view = pg.ViewBox()
+        item = pg.ImageItem(axisOrder=axis_order)
+        item.setImage(frame)
+        view.addItem(item)
+        return view, item
+
+    @pytest.mark.parametrize("axis_order", ["col-major", "row-major"])
+    def test_axis_aligned_roi_uses_rectangle(self, app, frame, axis_order):
+        import pyqtgraph as pg
+        view, item = self._scene(frame, axis_order)
+        roi = pg.ROI([5, 7], [10, 4])
+        view.addItem(roi)
+        engine = RoiIntegralStats()
+        engine.set_frame(frame)
+        kind, rect = engine.footprint(roi, item)
+        assert kind == 'rect'
+        # View x is axis 0 for col-major images and axis 1 for row-major
+        expected = (5, 15, 7, 11) if axis_order == "col-major" else (7, 11, 5, 15)
+        assert rect == expected
+        a0, a1, b0, b1 = expected
+        assert engine.roi_stats(roi, item) == pytest.approx(_reference(frame[a0:a1, b0:b1], (a0, b0)))
+
+    def test_rotated_roi_uses_cached_index_list(self, app, frame):
+        import pyqtgraph as pg
+        view, item = self._scene(frame, "col-major")
+        roi = pg.ROI([20, 10], [12, 6], angle=30)
+        view.addItem(roi)
+        engine = RoiIntegralStats()
+        engine.set_frame(frame)
+        kind, index = engine.footprint(roi, item)
+        assert kind == 'index'
+        assert engine.footprint(roi, item)[1] is index
+        # Every selected pixel centre maps inside the ROI rectangle
+        i0, i1 = np.divmod(index, frame.shape[1])
+        assert abs(index.size - 12 * 6) <= 12
+        for a, b in zip(i0[::7], i1[::7]):
+            p = roi.mapFromParent(pg.Point(a + 0.5, b + 0.5))
+            assert 0 <= p.x() < 12 and 0 <= p.y() < 6
+        roi.setAngle(45)
+        assert engine.footprint(roi, item)[1] is not index
@@ -0,0 +1,66 @@
+"""Tests for dashpva.utils.row_ring — the preallocated waterfall row ring."""
+
+import numpy as np
+import pytest
+
+from dashpva.utils.row_ring import RowRing
+
+
+def _row(value, width=4):
+    return np.full(width, float(value), dtype=np.float32)
+
+
+class TestRowRing:
+
+    def test_fills_in_order_then_wraps(self):
+        ring = RowRing(4)
+        for i in range(3):
+            ring.append(_row(i + 1))
+        assert len(ring) == 3
+        assert len(ring.segments()) == 1
+        for i in range(3, 6):
+            ring.append(_row(i + 1))
+        assert len(ring) == 4
+        segs = ring.segments()
+        assert len(segs) == 2
+        # Views into storage, not copies
+        assert all(seg.base is not None for seg in segs)
+        assert ring.rows()[:, 0].tolist() == [3.0, 4.0, 5.0, 6.0]
+
+    def test_log_rows_and_levels_track_overwrites(self):
+        ring = RowRing(3)
+        ring.append(np.array([1000.0, 0.0], dtype=np.float32))
+        ring.append(_row(10, 2))
+        ring.append(_row(100, 2))
+        assert ring.levels() == (0.0, 1000.0)
+        assert ring.levels(log=True) == pytest.approx((-10.0, 3.0))
+        assert ring.rows(log=True)[1].tolist() == [1.0, 1.0]
+        # Overwriting the oldest row drops its extremes from the levels
+        ring.append(_row(50, 2))
+        assert ring.levels() == (10.0, 100.0)
+
+    def test_resize_keeps_most_recent(self):
+        ring = RowRing(5)
+        for i in range(7):
+            ring.append(_row(i))
+        ring.resize(3)
+        assert ring.rows()[:, 0].tolist() == [4.0, 5.0, 6.0]
+        ring.append(_row(7))
+        assert ring.rows()[:, 0].tolist() == [5.0, 6.0, 7.0]
+        ring.resize(6)
+        ring.append(_row(8))
+        assert ring.rows()[:, 0].tolist() == [5.0, 6.0, 7.0, 8.0]
+
+    def test_width_change_rejected_until_cleared(self):
+        ring = RowRing(3)
+        ring.append(_row(1, 4))
+        with pytest.raises(ValueError):
+            ring.append(_row(1, 5))
+        ring.clear()
+        ring.append(_row(1, 5))
+        assert ring.width == 5 and len(ring) == 1
+
+    def test_all_nan_rows_have_no_levels(self):
+        ring = RowRing(2)
+        ring.append(np.full(3, np.nan, dtype=np.float32))
+        assert ring.levels() is None
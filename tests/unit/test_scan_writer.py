@@ -0,0 +1,145 @@
+"""Tests for dashpva.utils.scan_writer — incremental analysis-scan HDF5 writer."""
+
+import subprocess
+import sys
+import textwrap
+import threading
+
+import h5py
+import hdf5plugin
+import numpy as np
+import pytest
+from PyQt5.QtCore import Qt
+
+from dashpva.utils.scan_writer import AnalysisScanWriter
+
+FRAME = (6, 5)
+
+
+def frames(n, start=0):
+    return np.arange(start, start + n)[:, None, None] + np.zeros((n,) + FRAME, dtype=np.uint16)
+
+
+def test_appends_frames_and_series(tmp_path):
+    path = tmp_path / 'scan.h5'
+    with AnalysisScanWriter(path, flush_every=4) as writer:
+        for i, frame in enumerate(frames(10)):
+            # Positions only arrive from the third point on
+            values = {'intensity': i * 10.0, 'com_x': i + 0.5}
+            if i >= 2:
+                values.update(x=i, y=-i)
+            writer.append(frame, **values)
+        assert writer.written == 8 and writer.frames == 10
+        writer.extend(frames(3, start=10), intensity=[100, 110, 120])
+    with h5py.File(path, 'r') as h5:
+        images = h5['/data/images']
+        np.testing.assert_array_equal(images[()], frames(13))
+        assert images.chunks == (1,) + FRAME and images.maxshape == (None,) + FRAME
+        assert str(hdf5plugin.BLOSC_ID) in images._filters
+        np.testing.assert_array_equal(h5['/analysis/total_intensity'][()], np.arange(13) * 10.0)
+        np.testing.assert_array_equal(h5['/analysis/com_x'][10:], np.nan)
+        x = h5['/data/scan_pos/x_positions'][()]
+        assert np.isnan(x[:2]).all() and list(x[2:10]) == list(range(2, 10))
+        assert '/analysis/com_y' not in h5
+        assert h5.attrs['frames'] == 13
+
+
+def test_close_writes_scan_level_values(tmp_path):
+    path = tmp_path / 'scan.h5'
+    writer = AnalysisScanWriter(path, compress=False)
+    writer.append(frames(1)[0], intensity=1.0)
+    writer.close(metadata={'energy': 8.5, 'nested': {'a': 1}}, attributes={'det': 'PILATUS'},
+                 datasets={'/analysis/com_x': np.ones((2, 2))})
+    writer.close()  # closing twice is harmless
+    with h5py.File(path, 'r') as h5:
+        assert h5['/metadata'].attrs['energy'] == 8.5 and 'nested' not in h5['/metadata'].attrs
+        assert h5['/attributes'].attrs['det'] == 'PILATUS'
+        assert h5['/analysis/com_x'].shape == (2, 2)
+    with pytest.raises(ValueError, match="closed"):
+        writer.append(frames(1)[0])
+
+
+def test_rejects_bad_input(tmp_path):
+    with AnalysisScanWriter(tmp_path / 'scan.h5', flush_every=1) as writer:
+        with pytest.raises(ValueError, match="unknown"):
+            writer.append(frames(1)[0], temperature=3)
+        with pytest.raises(ValueError, match="2 values for 3 frames"):
+            writer.extend(frames(3), intensity=[1, 2])
+        writer.append(frames(1)[0], intensity=1)
+        with pytest.raises(ValueError, match="does not match"):
+            writer.append(np.zeros((2, 2)))
+        with pytest.raises(ValueError, match="point by point"):
+            writer.close(datasets={'/analysis/total_intensity': [1]})
+
+
+def test_crash_leaves_flushed_points_readable(tmp_path):
+    path = tmp_path / 'scan.h5'
+    script = textwrap.dedent(f"""
+        import os
+        import numpy as np
+        from dashpva.utils.scan_writer import AnalysisScanWriter
+        writer = AnalysisScanWriter({str(path)!r}, flush_every=16)
+        for i in range(40):
+            writer.append(np.full({FRAME}, i, dtype=np.uint16), intensity=float(i))
+        os._exit(1)
+    """)
+    assert subprocess.run([sys.executable, '-c', script]).returncode == 1
+    with h5py.File(path, 'r') as h5:
+        assert h5['/data/images'].shape == (32,) + FRAME
+        np.testing.assert_array_equal(h5['/analysis/total_intensity'][()], np.arange(32))
+        assert h5['/data/images'][31].max() == 31
+
+
+class TestHDF5WriterThread:
+
+    @pytest.fixture(autouse=True)
+    def _writer_thread(self):
+        from dashpva.viewer.analysis_window import HDF5WriterThread
+        self.HDF5WriterThread = HDF5WriterThread
+
+    def test_streams_points_on_its_thread(self, tmp_path):
+        path = tmp_path / 'scan.h5'
+        thread = self.HDF5WriterThread(str(path))
+        written = []
+        thread.file_written.connect(lambda: written.append(True), Qt.DirectConnection)
+        thread.start()
+        for i, frame in enumerate(frames(20)):
+            thread.append_point(frame, intensity=float(i), com_x=1.0, x=i, y=0)
+        thread.finish(metadata={'scan': 'grid'})
+        assert thread.wait(10000)
+        assert written and thread.frames_written == 20
+        with h5py.File(path, 'r') as h5:
+            np.testing.assert_array_equal(h5['/data/images'][()], frames(20))
+            np.testing.assert_array_equal(h5['/data/scan_pos/x_positions'][()], np.arange(20))
+            assert h5['/metadata'].attrs['scan'] == 'grid'
+
+    def test_one_shot_arrays(self, tmp_path):
+        path = tmp_path / 'scan.h5'
+        thread = self.HDF5WriterThread(str(path), frames(4), {'x_positions': [0, 1, 0, 1], 'y_positions': [0, 0, 1, 1]},
+                                       {'m': 1}, {'a': 2}, np.arange(4.0), np.ones((2, 2)), np.zeros((2, 2)))
+        thread.run()
+        with h5py.File(path, 'r') as h5:
+            np.testing.assert_array_equal(h5['/data/images'][()], frames(4))
+            assert h5['/analysis/com_y'].shape == (2, 2)
+            np.testing.assert_array_equal(h5['/data/scan_pos/y_positions'][()], [0, 0, 1, 1])
+            assert h5['/attributes'].attrs['a'] == 2
+
+    def test_failed_writer_releases_and_drops_frames(self, tmp_path):
+        from dashpva.viewer.analysis_window import WRITER_QUEUE_SIZE
+        thread = self.HDF5WriterThread(str(tmp_path / 'missing' / 'scan.h5'))
+        failures = []
+        thread.write_failed.connect(failures.append, Qt.DirectConnection)
+        for frame in frames(WRITER_QUEUE_SIZE):
+            thread.append_point(frame)
+        # A reader thread blocked on the full queue must be released when the writer dies
+        blocked = threading.Thread(target=thread.append_point, args=(frames(1)[0],))
+        blocked.start()
+        thread.start()
+        assert thread.wait(10000)
+        blocked.join(5)
+        assert not blocked.is_alive()
+        assert thread.error is not None and len(failures) == 1
+        for frame in frames(2 * WRITER_QUEUE_SIZE):
+            thread.append_point(frame)
+        thread.finish()
+        assert thread.frames_dropped >= 2 * WRITER_QUEUE_SIZE and thread.frames_written == 0
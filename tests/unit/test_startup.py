@@ -0,0 +1,118 @@
+"""Tests for dashpva.utils.startup — lazy imports, import profiling, first-window probe."""
+
+import json
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+from dashpva.utils.startup import (
+    LazyModule,
+    is_loaded,
+    lazy_module,
+    measure_first_window,
+    parse_importtime,
+    profile_imports,
+)
+
+IMPORTTIME = """\
+import time: self [us] | cumulative | imported package
+import time:       481 |        481 |   encodings.aliases
+import time:      1200 |       1300 |     numpy.linalg
+import time:      3000 |       5000 |   numpy
+import time:       100 |       5100 | app
+"""
+
+
+def _imported_after(code):
+    """Modules in sys.modules after running ``code`` in a fresh interpreter."""
+    out = subprocess.run([sys.executable, '-c', code + '\nimport sys, json; print(json.dumps(sorted(sys.modules)))'],
+                         capture_output=True, text=True, check=True)
+    return set(json.loads(out.stdout.splitlines()[-1]))
+
+
+class TestLazyModule:
+
+    def test_import_deferred_until_attribute_access(self, tmp_path, monkeypatch):
+        (tmp_path / 'heavy_mod.py').write_text('VALUE = 42\n')
+        monkeypatch.syspath_prepend(str(tmp_path))
+        monkeypatch.delitem(sys.modules, 'heavy_mod', raising=False)
+        loaded = []
+        proxy = lazy_module('heavy_mod', on_load=lambda m: loaded.append(m.__name__))
+        assert isinstance(proxy, LazyModule) and not is_loaded(proxy)
+        assert 'heavy_mod' not in sys.modules
+        assert proxy.VALUE == 42 and proxy.VALUE == 42
+        assert is_loaded(proxy) and loaded == ['heavy_mod']
+        assert 'VALUE' in dir(proxy)
+        # Already imported -> the module itself
+        assert lazy_module('heavy_mod') is sys.modules['heavy_mod']
+
+    def test_missing_module_raises_on_use(self):
+        proxy = lazy_module('dashpva_no_such_module')
+        with pytest.raises(ModuleNotFoundError):
+            proxy.anything
+
+    def test_entry_points_do_not_import_heavy_stacks(self):
+        mods = _imported_after('import dashpva.cli')
+        assert not {'hdf5plugin', 'h5py', 'numpy', 'importlib.metadata'} & mods
+        mods = _imported_after('import os; os.environ["QT_QPA_PLATFORM"] = "offscreen"\n'
+                               'import dashpva.hdf_viewer.interactive')
+        assert not {'matplotlib.pyplot', 'scipy'} & mods
+
+    def test_hdf5plugin_registered_when_h5py_is_imported(self, tmp_path):
+        hdf5plugin = pytest.importorskip('hdf5plugin')
+        import h5py
+        import numpy as np
+        path = tmp_path / 'compressed.h5'
+        with h5py.File(path, 'w') as f:
+            f.create_dataset('data', data=np.arange(64).reshape(8, 8), **hdf5plugin.Bitshuffle(cname='lz4'))
+        out = subprocess.run([sys.executable, '-c', textwrap.dedent(f"""
+            import sys, dashpva
+            before = 'hdf5plugin' in sys.modules
+            import h5py
+            with h5py.File({str(path)!r}) as f:
+                print(before, int(f['data'][3, 4]), h5py.__spec__.loader is h5py.__loader__)
+            """)], capture_output=True, text=True)
+        assert out.stdout.split() == ['False', '28', 'True'], out.stderr
+
+
+class TestImportProfile:
+
+    def test_parse_importtime(self):
+        recs = parse_importtime(IMPORTTIME)
+        assert [(r.name, r.depth) for r in recs] == [
+            ('encodings.aliases', 1), ('numpy.linalg', 2), ('numpy', 1), ('app', 0)]
+        assert recs[2].cumulative == pytest.approx(0.005)
+
+    def test_profile_imports_child(self):
+        report = profile_imports('json')
+        assert not report.error
+        assert any(r.name == 'json' for r in report.records)
+        assert report.total > 0 and 'json' in report.by_package()
+        assert profile_imports('dashpva_no_such_module').error
+
+
+def test_measure_first_window(tmp_path):
+    pytest.importorskip('PyQt5')
+    script = tmp_path / 'viewer.py'
+    script.write_text(textwrap.dedent("""
+        import sys
+        from PyQt5.QtWidgets import QApplication, QLabel
+        from dashpva.gui import configure_app
+        app = QApplication(sys.argv)
+        configure_app(app)
+        w = QLabel('hi')
+        w.setWindowTitle('Probe Test')
+        w.show()
+        sys.exit(app.exec_())
+        """))
+    result = measure_first_window([sys.executable, str(script)], repeat=2, timeout=30)
+    assert not result.error
+    assert len(result.times) == 2 and 0 < result.median < 30
+    assert result.title == 'Probe Test'
+
+    failing = tmp_path / 'crash.py'
+    failing.write_text("raise SystemExit('no display')\n")
+    result = measure_first_window([sys.executable, str(failing)], timeout=30)
+    assert result.times == [] and result.error == 'no display'
@@ -0,0 +1,125 @@
+"""Tests for dashpva.hdf_viewer.crosscor.TwoTimeCorrelator — cached-spectra frame correlations."""
+
+import numpy as np
+import pytest
+
+pytest.importorskip("scipy")
+
+from dashpva.hdf_viewer.crosscor import TwoTimeCorrelator, crosscor  # noqa: E402
+
+SHAPE = (21, 30)
+NORMALIZATIONS = ['symavg', 'regular', ['symavg', 'regular']]
+
+
+@pytest.fixture()
+def frames():
+    return np.random.default_rng(3).poisson(5, (9,) + SHAPE).astype(float)
+
+
+class TestTwoTimeCorrelator:
+
+    @pytest.mark.parametrize("normalization", NORMALIZATIONS)
+    def test_pair_matches_crosscor(self, frames, normalization):
+        engine = TwoTimeCorrelator(frames, normalization=normalization)
+        reference = crosscor(SHAPE, mask=None, normalization=normalization)
+        for i, j in [(0, 0), (1, 5), (7, 2)]:
+            np.testing.assert_allclose(engine.pair(i, j), reference(frames[i], frames[j]))
+        np.testing.assert_allclose(engine.pair(4), reference(frames[4]))
+
+    def test_mask_crops_to_its_bounding_box(self, frames):
+        mask = np.zeros(SHAPE)
+        mask[3:15, 4:22] = 1
+        mask[5, 5] = 0
+        engine = TwoTimeCorrelator(frames, mask=mask, normalization='symavg')
+        sub = frames[:, 3:15, 4:22]
+        reference = crosscor(sub.shape[1:], mask=mask[3:15, 4:22], normalization='symavg')
+        np.testing.assert_allclose(engine.pair(1, 4), reference(sub[1], sub[4]))
+
+    @pytest.mark.parametrize("normalization", NORMALIZATIONS)
+    def test_two_time_matches_pairs(self, frames, normalization):
+        # A tiny block budget forces many blocks, including ragged ones.
+        engine = TwoTimeCorrelator(frames, normalization=normalization, block_bytes=40_000)
+        center = engine.two_time('center')
+        peak = engine.two_time('peak')
+        cy, cx = engine.centers
+        for i in range(len(frames)):
+            for j in range(i, len(frames)):
+                ccorr = engine.pair(i, j)
+                assert center[i, j] == pytest.approx(ccorr[cy, cx])
+                assert center[j, i] == pytest.approx(engine.pair(j, i)[cy, cx])
+                assert peak[i, j] == pytest.approx(ccorr.max())
+        np.testing.assert_array_equal(peak, peak.T)
+
+    def test_reads_frames_in_blocks(self, frames):
+        class Reads:
+            shape = frames.shape
+            slices = []
+
+            def __len__(self):
+                return len(frames)
+
+            def __getitem__(self, key):
+                self.slices.append(key)
+                return frames[key]
+
+        source = Reads()
+        engine = TwoTimeCorrelator(source, block_bytes=200_000)
+        assert len(source.slices) > 1
+        assert all(isinstance(key, slice) for key in source.slices)
+        np.testing.assert_allclose(engine.pair(2, 3), TwoTimeCorrelator(frames).pair(2, 3))
+
+    def test_rejects_bad_input(self, frames):
+        with pytest.raises(ValueError, match="mask selects no pixels"):
+            TwoTimeCorrelator(frames, mask=np.zeros(SHAPE))
+        with pytest.raises(ValueError, match="does not match"):
+            TwoTimeCorrelator(frames, mask=np.ones((3, 3)))
+        with pytest.raises(ValueError, match="unknown statistic"):
+            TwoTimeCorrelator(frames).two_time('mean')
+
+
+class TestTwoTimeWorker:
+
+    def test_worker_reports_correlator_and_matrix(self, frames):
+        pytest.importorskip("PyQt5")
+        from PyQt5.QtCore import Qt
+
+        from dashpva.hdf_viewer.interactive import TwoTimeWorker
+
+        worker = TwoTimeWorker("key", frames)
+        results, errors = [], []
+        worker.finished.connect(lambda *args: results.append(args), Qt.DirectConnection)
+        worker.failed.connect(errors.append, Qt.DirectConnection)
+        worker.run()
+        assert not errors and len(results) == 1
+        key, engine, c2 = results[0]
+        assert key == "key" and c2.shape == (len(frames), len(frames))
+        np.testing.assert_allclose(c2, TwoTimeCorrelator(frames, normalization='symavg').two_time())
+        np.testing.assert_allclose(engine.pair(1, 2), TwoTimeCorrelator(frames, normalization='symavg').pair(1, 2))
+
+        worker = TwoTimeWorker("key", np.zeros(3))
+        worker.failed.connect(errors.append, Qt.DirectConnection)
+        worker.run()
+        assert len(errors) == 1 and len(results) == 1
+
+
+class TestViewerCorrelatorCache:
+
+    def test_reloaded_frames_drop_cached_correlator(self, frames, tmp_path, monkeypatch):
+        pytest.importorskip("PyQt5")
+        from PyQt5.QtWidgets import QApplication
+
+        from dashpva.hdf_viewer.interactive import HDF5ImageViewer
+
+        monkeypatch.setenv("HOME", str(tmp_path))
+        app = QApplication.instance() or QApplication([])  # noqa: F841
+        viewer = HDF5ImageViewer()
+        roi = (10, 10, 8, 8)
+        viewer._set_binned_data(frames)
+        viewer._correlator = TwoTimeCorrelator(frames[:, 6:14, 6:14])
+        viewer._correlator_key = viewer._correlator_key_for(roi)
+        assert viewer._cached_correlator(roi) is viewer._correlator
+        # Same array object and shape, new contents: must not reuse the old spectra
+        frames[:] = 0
+        viewer._set_binned_data(frames)
+        assert viewer._cached_correlator(roi) is None
+        viewer.close()
@@ -0,0 +1,102 @@
+"""Tests for dashpva.viewer.launcher.viewer_host — the launcher's pre-warmed fork server."""
+
+import subprocess
+import sys
+import textwrap
+from unittest.mock import patch
+
+import pytest
+
+from dashpva.viewer.launcher import viewer_host
+from dashpva.viewer.launcher.viewer_host import (
+    CHILD_ENV,
+    ViewerHostClient,
+    _split_command,
+    run_in_process,
+    runnable,
+)
+
+needs_host = pytest.mark.skipif(not viewer_host.supported(), reason='viewer host needs Linux')
+
+
+class TestCommands:
+
+    def test_split_command(self):
+        assert _split_command([sys.executable, '-u', '-m', 'dashpva.cli', 'setup']) == \
+            ('module', 'dashpva.cli', ['setup'])
+        assert _split_command([sys.executable, 'viewer.py', '-x']) == ('path', 'viewer.py', ['-x'])
+        assert not runnable(['/usr/bin/env', 'python', '-m', 'json.tool'])
+        assert not runnable([sys.executable, '-c', 'print(1)'])
+
+    def test_run_in_process_returns_exit_code(self, tmp_path, monkeypatch):
+        script = tmp_path / 'exits.py'
+        script.write_text('import sys\nassert sys.argv[1:] == ["a"]\nraise SystemExit(3)\n')
+        monkeypatch.setattr(sys, 'argv', list(sys.argv))
+        assert run_in_process([sys.executable, str(script), 'a']) == 3
+        assert run_in_process(['ls']) is None
+
+    def test_cli_runs_in_process_only_in_host_children(self, monkeypatch):
+        from dashpva import cli
+        monkeypatch.setenv(CHILD_ENV, '1')
+        with patch.object(viewer_host, 'run_in_process', return_value=5) as run, \
+                patch.object(cli.subprocess, 'run') as popen:
+            assert cli._run([sys.executable, '-m', 'dashpva.viewer.ui.setup']) == 5
+            run.assert_called_once()
+            popen.assert_not_called()
+            popen.return_value.returncode = 0
+            assert cli._run([sys.executable, '-m', 'dashpva.viewer.ui.setup']) == 0
+            popen.assert_called_once()
+
+
+@pytest.fixture()
+def host(tmp_path):
+    """A host with a tiny preload so the test does not pay for the viewer stack."""
+    socket_path = str(tmp_path / 'host.sock')
+    process = subprocess.Popen([sys.executable, '-c', textwrap.dedent(f"""
+        from dashpva.viewer.launcher.viewer_host import ViewerHost
+        host = ViewerHost({socket_path!r}, preload=('json',))
+        host.warm_up()
+        host.bind()
+        host.serve_forever()
+        """)], stdin=subprocess.DEVNULL)
+    client = ViewerHostClient(socket_path, process)
+    assert client.wait_ready(timeout=30)
+    yield client
+    client.close()
+
+
+@needs_host
+class TestHost:
+
+    def test_spawn_applies_env_cwd_and_stdio(self, host, tmp_path):
+        script = tmp_path / 'viewer.py'
+        script.write_text(textwrap.dedent("""
+            import os, sys
+            print(os.environ['DASHPVA_TEST_VALUE'], os.getcwd(), os.getsid(0) == os.getpid())
+            sys.exit(7)
+            """))
+        out = tmp_path / 'out.txt'
+        with open(out, 'w') as stdout:
+            proc = host.spawn([sys.executable, str(script)], env={'DASHPVA_TEST_VALUE': 'hello'},
+                              cwd=str(tmp_path), stdout=stdout, stderr=subprocess.DEVNULL)
+        assert proc is not None
+        assert proc.wait(timeout=30) == 7
+        assert proc.poll() == 7
+        assert out.read_text().split() == ['hello', str(tmp_path), 'True']
+
+    def test_crashing_viewer_leaves_host_running(self, host, tmp_path):
+        script = tmp_path / 'crash.py'
+        script.write_text('import os\nos.abort()\n')
+        proc = host.spawn([sys.executable, str(script)], stderr=subprocess.DEVNULL)
+        assert proc.wait(timeout=30) != 0
+        assert host.ready()
+        assert host.spawn(['/bin/true']) is None
+
+    def test_wait_timeout_and_kill(self, host, tmp_path):
+        script = tmp_path / 'sleeps.py'
+        script.write_text('import time\ntime.sleep(60)\n')
+        proc = host.spawn([sys.executable, str(script)])
+        with pytest.raises(subprocess.TimeoutExpired):
+            proc.wait(timeout=0.2)
+        proc.kill()
+        assert proc.wait(timeout=10) != 0
@@ -0,0 +1,124 @@
+"""Tests for VitStitcher.process_stream — pipelined, tiled stitching."""
+
+import h5py
+import numpy as np
+import pytest
+
+from dashpva.utils.vit_stitch import PANEL_NAMES, VitStitcher, _TiledCanvas, stitch_hdf5
+
+ID_OFFSET = 621356
+PIXEL_SIZE = 6.89e-9
+
+
+@pytest.fixture()
+def positions_csv(tmp_path):
+    # 6 x 10 raster with sub-pixel steps, in meters (col0=y, col1=x)
+    yy, xx = np.meshgrid(np.arange(6) * 23.37, np.arange(10) * 19.61, indexing="ij")
+    pos = np.column_stack([yy.ravel() - 60, xx.ravel() - 90]) * PIXEL_SIZE
+    path = tmp_path / "positions.csv"
+    np.savetxt(path, pos, delimiter=",")
+    return str(path)
+
+
+@pytest.fixture()
+def frames():
+    rng = np.random.default_rng(0)
+    # Starts mid-scan and crosses the reset at uid 60
+    return [(rng.random((512, 256)).astype(np.float32), ID_OFFSET + 3 + k) for k in range(75)]
+
+
+def _stitcher(path):
+    return VitStitcher(positions_csv_path=path, center_crop_display=0)
+
+
+def _serial(path, frames):
+    ref = _stitcher(path)
+    for stream, uid in frames:
+        composite, panels = ref.process_frame(stream, uid)
+    return ref, panels
+
+
+class TestProcessStream:
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_matches_per_frame_processing(self, positions_csv, frames, workers):
+        ref, ref_panels = _serial(positions_csv, frames)
+        stitcher = _stitcher(positions_csv)
+        seen = []
+        _, panels, stats = stitcher.process_stream(frames, workers=workers, chunk=8, tile=64,
+                                                   progress=lambda s: seen.append(s.frames))
+        for got, want in zip(panels, ref_panels):
+            np.testing.assert_allclose(got, want, rtol=1e-5, atol=1e-6)
+        np.testing.assert_allclose(stitcher._pred_ph, ref._pred_ph, rtol=1e-5, atol=1e-6)
+        assert stats.frames == len(frames) and stats.resets == 1
+        assert seen[-1] == len(frames) and stats.chunks == len(seen)
+        assert 0 < stats.max_queue <= 2 * workers
+        assert stats.fps > 0 and "fps" in stats.summary()
+
+    def test_continues_from_live_state(self, positions_csv, frames):
+        ref, ref_panels = _serial(positions_csv, frames)
+        stitcher = _stitcher(positions_csv)
+        for stream, uid in frames[:10]:
+            stitcher.process_frame(stream, uid)
+        _, panels, _ = stitcher.process_stream(iter(frames[10:]), workers=1, chunk=5)
+        np.testing.assert_allclose(panels[4], ref_panels[4], rtol=1e-5, atol=1e-6)
+        # And live processing picks up from the merged canvas
+        stream, uid = frames[0][0], frames[-1][1] + 1
+        np.testing.assert_allclose(stitcher.process_frame(stream, uid)[1][4],
+                                   ref.process_frame(stream, uid)[1][4], rtol=1e-5, atol=1e-6)
+
+    def test_requires_positions_and_handles_empty(self, positions_csv, tmp_path, monkeypatch):
+        monkeypatch.setattr("dashpva.utils.vit_stitch.DEFAULT_POSITIONS_CSV", str(tmp_path / "none.csv"))
+        monkeypatch.chdir(tmp_path)
+        with pytest.raises(ValueError):
+            VitStitcher().process_stream([])
+        composite, panels, stats = _stitcher(positions_csv).process_stream([], workers=1)
+        assert composite is None and panels is None and stats.frames == 0
+
+
+class TestStitchHdf5:
+
+    @pytest.fixture()
+    def scan(self, tmp_path, frames):
+        path = tmp_path / "scan.h5"
+        with h5py.File(path, "w") as h5:
+            h5["/entry/data/data"] = np.stack([stream for stream, _ in frames])
+            h5["/entry/data/ids"] = [uid for _, uid in frames]
+        return str(path)
+
+    def test_matches_per_frame_processing(self, positions_csv, frames, scan):
+        _, ref_panels = _serial(positions_csv, frames)
+        panels, stats = stitch_hdf5(scan, ids_dataset="/entry/data/ids", positions_csv_path=positions_csv,
+                                    center_crop_display=0, workers=1, chunk=8)
+        assert stats.frames == len(frames) and len(panels) == len(PANEL_NAMES)
+        for got, want in zip(panels, ref_panels):
+            np.testing.assert_allclose(got, want, rtol=1e-5, atol=1e-6)
+        # Consecutive ids from first_id give the same result as the recorded ids
+        panels, _ = stitch_hdf5(scan, first_id=frames[0][1], positions_csv_path=positions_csv,
+                                center_crop_display=0, workers=1, chunk=8)
+        np.testing.assert_allclose(panels[4], ref_panels[4], rtol=1e-5, atol=1e-6)
+
+    def test_rejects_mismatched_ids(self, positions_csv, scan):
+        with h5py.File(scan, "a") as h5:
+            h5["/entry/data/short"] = np.arange(3)
+        with pytest.raises(ValueError, match="3 ids"):
+            stitch_hdf5(scan, ids_dataset="/entry/data/short", positions_csv_path=positions_csv, workers=1)
+
+
+class TestTiledCanvas:
+
+    def test_place_clips_and_round_trips(self):
+        canvas = _TiledCanvas((100, 70), tile=32)
+        canvas.place(-5, 60, np.ones((20, 20), dtype=np.float32))
+        pred, buf = canvas.merge()
+        assert pred[:15, 60:].sum() == pytest.approx(15 * 10)
+        assert pred.sum() == pytest.approx(150) and buf.max() == 1.0
+        # Only the tiles the footprint touched were allocated
+        assert sorted(canvas._pred) == [(0, 1), (0, 2)]
+        canvas.place(0, 60, np.full((20, 20), 3.0, dtype=np.float32))
+        pred, buf = canvas.merge()
+        # Overlap blends 50/50, new area takes the patch
+        assert pred[0, 65] == pytest.approx(2.0) and pred[16, 65] == pytest.approx(3.0)
+        other = _TiledCanvas((100, 70), tile=32)
+        other.load(pred, buf)
+        np.testing.assert_array_equal(other.merge()[0], pred)
@@ -0,0 +1,11 @@
+"""Tests for dashpva.utils.worker_pool — spawned process pools."""
+
+import os
+
+from dashpva.utils.worker_pool import spawn_pool
+
+
+def test_spawn_pool_runs_in_spawned_children():
+    with spawn_pool(1) as pool:
+        assert pool._mp_context.get_start_method() == 'spawn'
+        assert pool.submit(os.getpid).result(timeout=60) != os.getpid()
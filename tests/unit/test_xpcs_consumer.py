@@ -0,0 +1,104 @@
+"""Unit tests for HpcXpcsProcessor (live multi-tau g2 on an image stream)."""
+
+import numpy as np
+import pytest
+from pvapy.utility.adImageUtility import AdImageUtility
+
+from dashpva.consumers.hpc.analysis.hpc_xpcs_consumer import (
+    HpcXpcsProcessor,
+    parse_rois,
+)
+from dashpva.utils.multitau import MultiTauCorrelator, roi_labels
+
+
+class _Server:
+    """Records what the processor publishes instead of serving it."""
+
+    def __init__(self):
+        self.records = {}
+        self.updates = []
+
+    def addRecord(self, name, pv_object):
+        self.records[name] = pv_object
+
+    def update(self, name, pv_object):
+        self.updates.append((name, pv_object))
+
+
+def make_processor(**cfg):
+    proc = HpcXpcsProcessor(cfg)
+    proc.outputChannel = 'det:Xpcs'
+    proc.pvaServer = _Server()
+    proc.start()
+    return proc
+
+
+def test_parse_rois():
+    assert parse_rois('0,0,8,8; 8,0,4,4') == [(0, 0, 8, 8), (8, 0, 4, 4)]
+    with pytest.raises(ValueError):
+        parse_rois('1,2,3')
+    with pytest.raises(ValueError, match="labels"):
+        HpcXpcsProcessor({})
+
+
+def test_publishes_g2_every_n_frames():
+    proc = make_processor(rois='0,0,8,8;8,0,8,8', publishEvery='50', frameTime='0.001')
+    assert 'det:Xpcs:g2' in proc.pvaServer.records
+    frames = np.random.default_rng(0).poisson(4, (120, 16, 20)).astype(np.uint16)
+    for i, frame in enumerate(frames):
+        proc.process(AdImageUtility.generateNtNdArray2D(i, frame))
+    assert proc.nFramesProcessed == 120 and proc.nFrameErrors == 0
+    assert [name for name, _ in proc.pvaServer.updates] == ['det:Xpcs:g2'] * 2
+
+    published = proc.pvaServer.updates[-1][1]
+    reference = MultiTauCorrelator(roi_labels((16, 20), [(0, 0, 8, 8), (8, 0, 8, 8)]))
+    reference.update(frames[:100])
+    expected = reference.g2()
+    assert published['nFrames'] == 100
+    assert published['nQ'] == 2 and published['nLags'] == len(expected.lags)
+    np.testing.assert_allclose(published['lags'], expected.lags * 0.001)
+    np.testing.assert_allclose(np.reshape(published['g2'], (2, -1)), expected.g2)
+
+    proc.stop()
+    assert proc.pvaServer.updates[-1][1]['nFrames'] == 120
+
+
+def test_reconfigure_restarts_only_for_layout_changes():
+    proc = make_processor(rois='0,0,4,4')
+    proc.process(AdImageUtility.generateNtNdArray2D(0, np.ones((8, 8), dtype=np.uint16)))
+    correlator = proc.correlator
+    proc.configure({'publishEvery': 10})
+    assert proc.correlator is correlator
+    proc.configure({'numBufs': 4})
+    assert proc.correlator is None
+
+
+def test_uniqueid_gap_restarts_correlation():
+    proc = make_processor(rois='0,0,8,8', publishEvery='1000')
+    frames = np.random.default_rng(1).poisson(4, (30, 8, 8)).astype(np.uint16)
+    ids = list(range(1, 11)) + list(range(14, 34))        # ids 11-13 lost
+    for uid, frame in zip(ids, frames):
+        proc.process(AdImageUtility.generateNtNdArray2D(uid, frame))
+    assert proc.nFrameErrors == 0 and (proc.nGaps, proc.nMissedFrames) == (1, 3)
+    # The run before the gap was published, then correlation restarted on the new run
+    assert len(proc.pvaServer.updates) == 1
+    assert proc.pvaServer.updates[0][1]['nFrames'] == 10
+    assert proc.correlator.frames == 20
+
+    proc.stop()
+    published = proc.pvaServer.updates[-1][1]
+    reference = MultiTauCorrelator(roi_labels((8, 8), [(0, 0, 8, 8)]))
+    reference.update(frames[10:])
+    np.testing.assert_allclose(np.reshape(published['g2'], (1, -1)), reference.g2().g2)
+    assert (published['nGaps'], published['nMissed']) == (1, 3)
+
+
+def test_uniqueid_gap_is_counted_without_reset():
+    proc = make_processor(rois='0,0,8,8', resetOnGap='false')
+    frame = np.ones((8, 8), dtype=np.uint16)
+    for uid in (1, 2, 5, 6, 1, 2):                       # a gap, then a restarted acquisition
+        proc.process(AdImageUtility.generateNtNdArray2D(uid, frame))
+    assert (proc.nGaps, proc.nMissedFrames) == (2, 2)
+    assert proc.correlator.frames == 6 and not proc.pvaServer.updates
+    stats = proc.getStats()
+    assert stats['nGaps'] == 2 and stats['nMissedFrames'] == 2